@@ -5,9 +5,20 @@ from io import BytesIO
 from pathlib import Path
 from typing import Any
 
+from .memory import _memory_stage
+from .telemetry import _span
+
 
 def _coerce_audio_to_wav_bytes(audio: Any) -> tuple[bytes, str]:
     """Coerce ComfyUI AUDIO input into WAV bytes for upload."""
+    with _memory_stage("read", "audio") as stage:
+        audio_bytes, source = _read_audio_input(audio)
+        stage["bytes"] = len(audio_bytes)
+        stage["buffers"]["file"] = len(audio_bytes)
+    return audio_bytes, source
+
+
+def _read_audio_input(audio: Any) -> tuple[bytes, str]:
     if isinstance(audio, (bytes, bytearray)):
         return bytes(audio), "bytes"
 
@@ -38,6 +49,13 @@ def _coerce_audio_to_wav_bytes(audio: Any) -> tuple[bytes, str]:
 
 def _waveform_to_wav_bytes(waveform, sample_rate: int) -> bytes:
     """Encode a waveform tensor/array as 16-bit PCM WAV bytes."""
+    with _span("encode", kind="wav") as span:
+        wav_bytes = _encode_wav(waveform, sample_rate)
+        span["bytes"] = len(wav_bytes)
+    return wav_bytes
+
+
+def _encode_wav(waveform, sample_rate: int) -> bytes:
     try:
         import numpy as np
     except Exception as exc:
@@ -85,13 +103,26 @@ def _audio_bytes_to_comfy_audio(audio_bytes: bytes, filename_hint: str = "audio.
     if not isinstance(audio_bytes, (bytes, bytearray)) or not audio_bytes:
         raise RuntimeError("audio_bytes must be non-empty bytes.")
 
+    with _span("decode", kind="audio", bytes=len(audio_bytes)), _memory_stage("decode", "audio") as stage:
+        audio_output = _decode_audio(audio_bytes, filename_hint)
+        stage["bytes"] = len(audio_bytes)
+        waveform = audio_output.get("waveform")
+        if hasattr(waveform, "element_size"):
+            stage["buffers"]["waveform"] = waveform.numel() * waveform.element_size()
+    return audio_output
+
+
+def _decode_audio(audio_bytes: bytes, filename_hint: str):
+
     try:
         from tempfile import gettempdir
         from time import time
         from pathlib import Path
+        from uuid import uuid4
         tmp_dir = Path(gettempdir())
         suffix = Path(filename_hint).suffix or ".mp3"
-        tmp_path = tmp_dir / f"kie_audio_{int(time() * 1000)}{suffix}"
+        # Tracks may be decoded concurrently, so the timestamp alone is not unique.
+        tmp_path = tmp_dir / f"kie_audio_{int(time() * 1000)}_{uuid4().hex[:8]}{suffix}"
         tmp_path.write_bytes(audio_bytes)
     except Exception as exc:
         raise RuntimeError(f"Failed to write temp audio file: {exc}") from exc
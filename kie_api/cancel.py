@@ -0,0 +1,85 @@
+"""Cooperative cancellation on ComfyUI interrupts.
+
+KIE jobs spend most of their time waiting: between polls, on uploads, on result
+downloads, and on other threads' futures. These helpers replace those waits with
+short slices that check ComfyUI's interrupt flag, so cancelling a queue item frees
+the worker within CANCEL_CHECK_INTERVAL_S instead of a full poll interval or
+download. On interrupt they raise ComfyUI's own InterruptProcessingException, which
+the executor treats as a cancellation rather than a node error.
+
+Work that cannot be aborted mid-call (a multipart upload) runs on a helper thread
+that is abandoned on interrupt. Tasks already created on KIE keep running; the job
+journal lets a re-run re-attach to them.
+
+Outside ComfyUI (headless use) nothing is ever interrupted.
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, TypeVar
+
+
+CANCEL_CHECK_INTERVAL_S = 0.25
+
+T = TypeVar("T")
+
+
+def _interrupted() -> bool:
+    """Return True if ComfyUI has asked the current prompt to stop."""
+    # Never import ComfyUI ourselves: importing model_management initializes devices.
+    model_management = sys.modules.get("comfy.model_management")
+    if model_management is None:
+        return False
+    try:
+        return bool(model_management.processing_interrupted())
+    except Exception:
+        return False
+
+
+def _raise_if_interrupted() -> None:
+    """Raise ComfyUI's InterruptProcessingException if the prompt was interrupted.
+
+    The flag is left set (ComfyUI clears it before the next prompt), so every
+    thread working for the cancelled node sees it.
+    """
+    if _interrupted():
+        raise sys.modules["comfy.model_management"].InterruptProcessingException()
+
+
+def _interruptible_sleep(seconds: float) -> None:
+    """time.sleep that returns early with an exception when ComfyUI interrupts."""
+    deadline = time.time() + max(seconds, 0.0)
+    while True:
+        _raise_if_interrupted()
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return
+        time.sleep(min(remaining, CANCEL_CHECK_INTERVAL_S))
+
+
+def _wait_future(future: Future) -> Any:
+    """Future.result() that stops waiting when ComfyUI interrupts."""
+    while True:
+        _raise_if_interrupted()
+        try:
+            return future.result(timeout=CANCEL_CHECK_INTERVAL_S)
+        except FutureTimeoutError:
+            continue
+
+
+def _run_interruptibly(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking call on a helper thread and abandon it if ComfyUI interrupts."""
+    future: Future = Future()
+
+    def target() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    threading.Thread(target=target, name="kie-interruptible", daemon=True).start()
+    return _wait_future(future)
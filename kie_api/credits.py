@@ -2,18 +2,22 @@ import json
 from typing import Any, Tuple
 
 from .http import requests
+from .ledger import _ledger_balance, _ledger_set_balance
+from .pool import _submit_fetch
+from .telemetry import _span
 
 
 API_URL = "https://api.kie.ai/api/v1/chat/credit"
 
 
 def _fetch_remaining_credits(api_key: str) -> Tuple[str, int]:
-    try:
-        response = requests.get(
-            API_URL, headers={"Authorization": f"Bearer {api_key}"}, timeout=30
-        )
-    except requests.RequestException as exc:
-        raise RuntimeError(f"Failed to call remaining credits endpoint: {exc}") from exc
+    with _span("credits"):
+        try:
+            response = requests.get(
+                API_URL, headers={"Authorization": f"Bearer {api_key}"}, timeout=30
+            )
+        except requests.RequestException as exc:
+            raise RuntimeError(f"Failed to call remaining credits endpoint: {exc}") from exc
 
     try:
         payload: Any = response.json()
@@ -32,10 +36,28 @@ def _fetch_remaining_credits(api_key: str) -> Tuple[str, int]:
     except (TypeError, ValueError) as exc:
         raise RuntimeError("Remaining credits value is not an integer.") from exc
 
+    _ledger_set_balance(credits_remaining, api_key)
     formatted_json = json.dumps(payload, indent=2, ensure_ascii=False)
     return formatted_json, credits_remaining
 
 
+def _cached_remaining_credits(api_key: str, refresh: bool = False) -> Tuple[str, int, float | None]:
+    """Return the ledger's cached balance, calling the credits endpoint only when it is stale.
+
+    Returns:
+        A tuple of (json_text, credits_remaining, cache_age_s); cache_age_s is None
+        when the balance was just fetched.
+    """
+    cached = None if refresh else _ledger_balance(api_key)
+    if cached is None:
+        formatted_json, credits_remaining = _fetch_remaining_credits(api_key)
+        return formatted_json, credits_remaining, None
+
+    balance, age_s = cached
+    payload = {"code": 200, "msg": "success", "data": int(balance), "cached": True, "age_s": round(age_s, 1)}
+    return json.dumps(payload, indent=2, ensure_ascii=False), int(balance), age_s
+
+
 def _log_remaining_credits(log: bool, record_data: dict[str, Any], api_key: str, log_fn) -> None:
     if not log:
         return
@@ -45,6 +67,17 @@ def _log_remaining_credits(log: bool, record_data: dict[str, Any], api_key: str,
         log_fn(True, f"Remaining credits: {remaining}")
         return
 
+    cached = _ledger_balance(api_key)
+    if cached is not None:
+        log_fn(True, f"Remaining credits: {int(cached[0])} (as of {cached[1]:.0f}s ago)")
+        return
+
+    # Neither the record nor the ledger has a balance; look it up on the fetch pool
+    # so the credit call never delays returning the generated output.
+    _submit_fetch(_log_fetched_remaining_credits, api_key, log_fn)
+
+
+def _log_fetched_remaining_credits(api_key: str, log_fn) -> None:
     try:
         _raw, credits_remaining = _fetch_remaining_credits(api_key)
         log_fn(True, f"Remaining credits: {credits_remaining}")
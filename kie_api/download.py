@@ -0,0 +1,209 @@
+"""Resumable, chunked downloads for KIE result artifacts.
+
+Result files (especially 1080p videos) can be large. A dropped connection near the
+end of a transfer used to fail the whole job even though the artifact was still
+available on the CDN. `_download_bytes` streams the body in chunks, resumes with an
+HTTP Range request after transient failures, verifies the final size against
+Content-Length / Content-Range, and logs throughput.
+
+Downloads ask for `Accept-Encoding: identity`, because both the size check and the
+resume offset count bytes on the wire. A server that compresses the body anyway is
+still accepted, but that download is neither size-checked nor resumed.
+"""
+
+import re
+import sys
+import time
+
+from .cancel import _interruptible_sleep, _raise_if_interrupted
+from .http import requests
+from .log import _log
+from .metrics import _metric_inc
+from .telemetry import _span
+
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_CONNECT_TIMEOUT_S = 30
+DOWNLOAD_MAX_ATTEMPTS = 4
+DOWNLOAD_RETRY_BACKOFF_S = 2.0
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+_CONTENT_RANGE_RE = re.compile(r"^bytes\s+(\d+)-(\d+)/(\d+|\*)$", re.IGNORECASE)
+
+
+class _RetryableDownloadError(RuntimeError):
+    """Raised internally for failures that should be retried (and resumed when possible)."""
+
+
+def _parse_content_range(value: str | None) -> tuple[int, int | None] | None:
+    """Parse a Content-Range header into (start, total) or None when malformed."""
+    match = _CONTENT_RANGE_RE.match((value or "").strip())
+    if not match:
+        return None
+    total = match.group(3)
+    return int(match.group(1)), (int(total) if total != "*" else None)
+
+
+def _parse_content_length(value: str | None) -> int | None:
+    try:
+        length = int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+    return length if length is not None and length >= 0 else None
+
+
+def _download_bytes(
+    url: str,
+    *,
+    label: str,
+    timeout_s: float,
+    log: bool = False,
+    max_attempts: int = DOWNLOAD_MAX_ATTEMPTS,
+    retry_backoff_s: float = DOWNLOAD_RETRY_BACKOFF_S,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    buffers: dict[str, int] | None = None,
+) -> bytes:
+    """Download a URL into memory with chunked streaming, Range resume, and size checks.
+
+    Args:
+        url: Artifact URL.
+        label: Human-readable name used in log and error messages (e.g. "result video").
+        timeout_s: Per-read timeout in seconds.
+        log: Log retries and throughput.
+        max_attempts: Total attempts including the first one.
+        retry_backoff_s: Base backoff between attempts (multiplied by the attempt number).
+        chunk_size: Streaming chunk size in bytes.
+        buffers: When given, receives the allocated size of the download buffer at its
+            largest (`download_buffer`) and the size of the returned copy (`result`),
+            for memory tracking (see memory.py).
+
+    Returns:
+        The downloaded bytes.
+    Raises:
+        RuntimeError: If the server returns a non-retryable status, or all attempts fail.
+    """
+    with _span("download", label=label) as span:
+        data = _stream_download(url, label, timeout_s, log, max_attempts, retry_backoff_s, chunk_size, buffers)
+        span["bytes"] = len(data)
+    return data
+
+
+def _stream_download(
+    url: str,
+    label: str,
+    timeout_s: float,
+    log: bool,
+    max_attempts: int,
+    retry_backoff_s: float,
+    chunk_size: int,
+    buffers: dict[str, int] | None,
+) -> bytes:
+    buffer = bytearray()
+    # Allocated size of `buffer` at its largest, over-allocation included.
+    buffer_peak = 0
+    expected_total: int | None = None
+    supports_range = False
+    attempts = max(int(max_attempts), 1)
+    start_time = time.time()
+    last_error: Exception | None = None
+
+    for attempt in range(1, attempts + 1):
+        resume_from = len(buffer) if supports_range else 0
+        if resume_from == 0:
+            buffer.clear()
+        headers = {"Accept-Encoding": "identity"}
+        if resume_from > 0:
+            headers["Range"] = f"bytes={resume_from}-"
+
+        try:
+            try:
+                response = requests.get(
+                    url,
+                    headers=headers,
+                    stream=True,
+                    timeout=(DOWNLOAD_CONNECT_TIMEOUT_S, timeout_s),
+                )
+            except requests.RequestException as exc:
+                raise _RetryableDownloadError(str(exc)) from exc
+
+            with response:
+                status = response.status_code
+                if status == 416 and expected_total is not None and len(buffer) == expected_total:
+                    break
+                if status in RETRYABLE_STATUS_CODES:
+                    raise _RetryableDownloadError(f"status code {status}")
+                if status not in (200, 206):
+                    raise RuntimeError(f"Failed to download {label} (status code {status}).")
+
+                content_encoding = (response.headers.get("Content-Encoding") or "identity").strip().lower()
+                encoded = content_encoding != "identity"
+                if status == 206:
+                    if encoded:
+                        # Our offset counts decoded bytes, which do not map onto an encoded range.
+                        supports_range = False
+                        raise _RetryableDownloadError(f"resumed download came back {content_encoding}-encoded")
+                    content_range = _parse_content_range(response.headers.get("Content-Range"))
+                    if content_range is None or content_range[0] != resume_from:
+                        # The server answered with a range we did not ask for; start over.
+                        supports_range = False
+                        raise _RetryableDownloadError("unexpected Content-Range in resumed download")
+                    if content_range[1] is not None:
+                        expected_total = content_range[1]
+                else:
+                    # Full body: either the first request or the server ignored our Range header.
+                    buffer.clear()
+                    if encoded:
+                        # Content-Length is the encoded size; iter_content yields the decoded body.
+                        expected_total = None
+                        supports_range = False
+                    else:
+                        expected_total = _parse_content_length(response.headers.get("Content-Length"))
+                        accept_ranges = (response.headers.get("Accept-Ranges") or "").lower()
+                        supports_range = accept_ranges == "bytes"
+
+                try:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        # Leaving the `with response` block closes (aborts) the stream.
+                        _raise_if_interrupted()
+                        if chunk:
+                            buffer.extend(chunk)
+                            if buffers is not None:
+                                buffer_peak = max(buffer_peak, sys.getsizeof(buffer))
+                except requests.RequestException as exc:
+                    raise _RetryableDownloadError(f"connection dropped after {len(buffer)} bytes: {exc}") from exc
+
+            if expected_total is not None and len(buffer) != expected_total:
+                if len(buffer) > expected_total:
+                    supports_range = False
+                raise _RetryableDownloadError(
+                    f"size mismatch (received {len(buffer)} of {expected_total} bytes)"
+                )
+            if not buffer:
+                raise _RetryableDownloadError("empty response body")
+            break
+        except _RetryableDownloadError as exc:
+            last_error = exc
+            if attempt >= attempts:
+                raise RuntimeError(f"Failed to download {label}: {exc}") from exc
+            _metric_inc("kie_retries_total", op="download")
+            delay = retry_backoff_s * attempt if retry_backoff_s > 0 else 0.0
+            resume_text = f", resuming at byte {len(buffer)}" if supports_range and buffer else ""
+            _log(
+                log,
+                f"Download of {label} interrupted ({exc}); retrying "
+                f"(attempt {attempt + 1}/{attempts}) in {delay:.1f}s{resume_text}",
+            )
+            _interruptible_sleep(delay)
+    else:
+        raise RuntimeError(f"Failed to download {label}: {last_error}")
+
+    elapsed = max(time.time() - start_time, 1e-6)
+    size_mb = len(buffer) / (1024 * 1024)
+    _log(
+        log,
+        f"Downloaded {label}: {size_mb:.2f} MB in {elapsed:.1f}s ({size_mb / elapsed:.2f} MB/s)",
+    )
+    data = bytes(buffer)
+    if buffers is not None:
+        buffers.update(download_buffer=buffer_peak, result=len(data))
+    return data
@@ -1,25 +1,26 @@
 """Flux 2 Pro/Flex image-to-image helper."""
 
 import json
-import time
 from typing import Any
 
 import torch
 
 from .auth import _load_api_key
-from .credits import _log_remaining_credits
-from .http import TransientKieError, requests
-from .jobs import _poll_task_until_complete
+from .http import requests, TransientKieError
+from .jobs import _run_task
 from .log import _log
-from .results import _extract_result_urls
+from .metrics import _count_http_error
+from .options import (
+    FLUX2_MODEL_OPTIONS as MODEL_OPTIONS,
+    FLUX2_ASPECT_RATIO_OPTIONS as ASPECT_RATIO_OPTIONS,
+    FLUX2_RESOLUTION_OPTIONS as RESOLUTION_OPTIONS,
+)
+from .profiling import _profiled
 from .upload import _image_tensor_to_png_bytes, _truncate_url, _upload_image
-from .images import _download_image, _image_bytes_to_tensor
+from .images import _fetch_result_image, _validate_output_precision
 from .validation import _validate_prompt
 
 CREATE_TASK_URL = "https://api.kie.ai/api/v1/jobs/createTask"
-MODEL_OPTIONS = ["flux-2/pro-image-to-image", "flux-2/flex-image-to-image"]
-ASPECT_RATIO_OPTIONS = ["1:1", "4:3", "3:4", "16:9", "9:16", "3:2", "2:3", "auto"]
-RESOLUTION_OPTIONS = ["1K", "2K"]
 PROMPT_MIN_LENGTH = 3
 PROMPT_MAX_LENGTH = 5000
 MAX_IMAGE_COUNT = 8
@@ -54,6 +55,7 @@ def _create_flux_task(api_key: str, payload: dict[str, Any]) -> tuple[str, str]:
     except requests.RequestException as exc:
         raise RuntimeError(f"Failed to call createTask endpoint: {exc}") from exc
 
+    _count_http_error(response.status_code)
     if response.status_code == 429 or response.status_code >= 500:
         raise TransientKieError(
             f"createTask returned HTTP {response.status_code}: {response.text}", status_code=response.status_code
@@ -75,6 +77,7 @@ def _create_flux_task(api_key: str, payload: dict[str, Any]) -> tuple[str, str]:
     return task_id, response.text
 
 
+@_profiled
 def run_flux2_i2i(
     *,
     model: str,
@@ -85,8 +88,10 @@ def run_flux2_i2i(
     poll_interval_s: float = 10.0,
     timeout_s: int = 300,
     log: bool = True,
+    output_precision: str = "float32",
 ) -> torch.Tensor:
     """Run Flux 2 Pro/Flex image-to-image job end-to-end."""
+    _validate_output_precision(output_precision)
     if model not in MODEL_OPTIONS:
         raise RuntimeError("Invalid model. Use the pinned enum options.")
     if aspect_ratio not in ASPECT_RATIO_OPTIONS:
@@ -124,27 +129,13 @@ def run_flux2_i2i(
     }
 
     _log(log, "Creating Flux 2 I2I task...")
-    start_time = time.time()
-    task_id, create_response_text = _create_flux_task(api_key, payload)
-    _log(log, f"createTask response (elapsed={time.time() - start_time:.1f}s): {create_response_text}")
-    _log(log, f"Task created with ID {task_id}. Polling for completion...")
-
-    record_data = _poll_task_until_complete(
+    image_tensor, _record_data, _task_id = _run_task(
         api_key,
-        task_id,
-        poll_interval_s,
-        timeout_s,
-        log,
-        start_time,
+        payload,
+        fetch=lambda record_data: _fetch_result_image(record_data, log, output_precision),
+        poll_interval_s=poll_interval_s,
+        timeout_s=timeout_s,
+        log=log,
+        create_task=_create_flux_task,
     )
-
-    result_urls = _extract_result_urls(record_data)
-    _log(log, f"Result URLs: {result_urls}")
-
-    _log(log, f"Downloading result image from {result_urls[0]}...")
-    image_bytes = _download_image(result_urls[0])
-    image_tensor = _image_bytes_to_tensor(image_bytes)
-    _log(log, "Image downloaded and decoded.")
-
-    _log_remaining_credits(log, record_data, api_key, _log)
     return image_tensor
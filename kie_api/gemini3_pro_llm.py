@@ -7,18 +7,17 @@ from .auth import _load_api_key
 from .http import TransientKieError, requests
 from .audio import _coerce_audio_to_wav_bytes
 from .log import _log
+from .metrics import _count_http_error
+from .options import (
+    GEMINI3_REASONING_EFFORT_OPTIONS as REASONING_EFFORT_OPTIONS,
+    GEMINI3_ROLE_OPTIONS as ROLE_OPTIONS,
+    GEMINI3_MODEL_OPTIONS as MODEL_OPTIONS,
+)
+from .profiling import _profiled
 from .upload import _image_tensor_to_png_bytes, _truncate_url, _upload_audio, _upload_image, _upload_video
 from .video import _coerce_video_to_mp4_bytes
 
-CHAT_COMPLETIONS_URLS = {
-    "gemini-3-pro": "https://api.kie.ai/gemini-3-pro/v1/chat/completions",
-    "gemini-3-flash": "https://api.kie.ai/gemini-3-flash/v1/chat/completions",
-    "gemini-2.5-pro": "https://api.kie.ai/gemini-2.5-pro/v1/chat/completions",
-    "gemini-2.5-flash": "https://api.kie.ai/gemini-2.5-flash/v1/chat/completions",
-}
-REASONING_EFFORT_OPTIONS = ["low", "high"]
-ROLE_OPTIONS = ["developer", "system", "user", "assistant", "tool"]
-MODEL_OPTIONS = list(CHAT_COMPLETIONS_URLS.keys())
+CHAT_COMPLETIONS_URLS = {model: f"https://api.kie.ai/{model}/v1/chat/completions" for model in MODEL_OPTIONS}
 
 
 def _parse_json_optional(raw: str | None, label: str) -> Any | None:
@@ -78,6 +77,7 @@ def _normalize_messages(
     ]
 
 
+@_profiled
 def run_gemini3_pro_chat(
     *,
     model: str = "gemini-3-pro",
@@ -188,6 +188,7 @@ def run_gemini3_pro_chat(
     except requests.RequestException as exc:
         raise RuntimeError(f"Failed to call chat completions endpoint: {exc}") from exc
 
+    _count_http_error(response.status_code)
     if response.status_code == 429 or response.status_code >= 500:
         raise TransientKieError(
             f"chat completions returned HTTP {response.status_code}: {response.text}",
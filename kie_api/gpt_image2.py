@@ -1,24 +1,25 @@
 """GPT Image 2 text-to-image and image-to-image helpers."""
 
-import time
-
 import torch
 
 from .auth import _load_api_key
-from .credits import _log_remaining_credits
+from .cancel import _interruptible_sleep
 from .http import TransientKieError
-from .images import _download_image, _image_bytes_to_tensor
-from .jobs import _create_task, _poll_task_until_complete
+from .images import _fetch_result_image, _validate_output_precision
+from .jobs import _run_task
 from .log import _log
-from .results import _extract_result_urls
+from .metrics import _count_task_retry
+from .options import (
+    GPT_IMAGE2_ASPECT_RATIO_OPTIONS as ASPECT_RATIO_OPTIONS,
+    GPT_IMAGE2_RESOLUTION_OPTIONS as RESOLUTION_OPTIONS,
+)
+from .profiling import _profiled
 from .upload import _image_tensor_to_png_bytes, _truncate_url, _upload_image
 from .validation import _validate_image_tensor_batch, _validate_prompt
 
 
 TEXT_TO_IMAGE_MODEL_NAME = "gpt-image-2-text-to-image"
 IMAGE_TO_IMAGE_MODEL_NAME = "gpt-image-2-image-to-image"
-ASPECT_RATIO_OPTIONS = ["auto", "1:1", "9:16", "16:9", "4:3", "3:4"]
-RESOLUTION_OPTIONS = ["1K", "2K", "4K"]
 PROMPT_MAX_LENGTH = 20000
 MAX_IMAGE_COUNT = 16
 
@@ -41,33 +42,22 @@ def _run_gpt_image2_payload(
     timeout_s: int,
     log: bool,
     create_label: str,
+    output_precision: str = "float32",
 ) -> torch.Tensor:
     api_key = _load_api_key()
     _log(log, f"Creating {create_label} task...")
-    start_time = time.time()
-    task_id, create_response_text = _create_task(api_key, payload)
-    _log(log, f"createTask response (elapsed={time.time() - start_time:.1f}s): {create_response_text}")
-    _log(log, f"Task created with ID {task_id}. Polling for completion...")
-
-    record_data = _poll_task_until_complete(
+    image_tensor, _record_data, _task_id = _run_task(
         api_key,
-        task_id,
-        poll_interval_s,
-        timeout_s,
-        log,
-        start_time,
+        payload,
+        fetch=lambda record_data: _fetch_result_image(record_data, log, output_precision),
+        poll_interval_s=poll_interval_s,
+        timeout_s=timeout_s,
+        log=log,
     )
-
-    result_urls = _extract_result_urls(record_data)
-    _log(log, f"Result URLs: {result_urls}")
-    _log(log, f"Downloading result image from {result_urls[0]}...")
-    image_bytes = _download_image(result_urls[0])
-    image_tensor = _image_bytes_to_tensor(image_bytes)
-    _log(log, "Image downloaded and decoded.")
-    _log_remaining_credits(log, record_data, api_key, _log)
     return image_tensor
 
 
+@_profiled
 def run_gpt_image2_text_to_image(
     *,
     prompt: str,
@@ -79,8 +69,10 @@ def run_gpt_image2_text_to_image(
     retry_on_fail: bool = True,
     max_retries: int = 2,
     retry_backoff_s: float = 3.0,
+    output_precision: str = "float32",
 ) -> torch.Tensor:
     """Run a GPT Image 2 text-to-image job end-to-end."""
+    _validate_output_precision(output_precision)
     _validate_prompt(prompt, max_length=PROMPT_MAX_LENGTH)
     _validate_options(aspect_ratio, resolution)
 
@@ -105,16 +97,19 @@ def run_gpt_image2_text_to_image(
                 timeout_s=timeout_s,
                 log=log,
                 create_label="GPT Image 2 text-to-image",
+                output_precision=output_precision,
             )
-        except TransientKieError:
+        except TransientKieError as exc:
             if not retry_on_fail or attempt >= attempts:
                 raise
+            _count_task_retry(exc, TEXT_TO_IMAGE_MODEL_NAME)
             _log(log, f"Retrying (attempt {attempt + 1}/{attempts}) after {backoff}s")
-            time.sleep(backoff)
+            _interruptible_sleep(backoff)
 
     raise RuntimeError("GPT Image 2 text-to-image job failed after retry attempts.")
 
 
+@_profiled
 def run_gpt_image2_image_to_image(
     *,
     prompt: str,
@@ -127,8 +122,10 @@ def run_gpt_image2_image_to_image(
     retry_on_fail: bool = True,
     max_retries: int = 2,
     retry_backoff_s: float = 3.0,
+    output_precision: str = "float32",
 ) -> torch.Tensor:
     """Run a GPT Image 2 image-to-image job end-to-end."""
+    _validate_output_precision(output_precision)
     _validate_prompt(prompt, max_length=PROMPT_MAX_LENGTH)
     _validate_options(aspect_ratio, resolution)
     images = _validate_image_tensor_batch(images)
@@ -173,11 +170,13 @@ def run_gpt_image2_image_to_image(
                 timeout_s=timeout_s,
                 log=log,
                 create_label="GPT Image 2 image-to-image",
+                output_precision=output_precision,
             )
-        except TransientKieError:
+        except TransientKieError as exc:
             if not retry_on_fail or attempt >= attempts:
                 raise
+            _count_task_retry(exc, IMAGE_TO_IMAGE_MODEL_NAME)
             _log(log, f"Retrying (attempt {attempt + 1}/{attempts}) after {backoff}s")
-            time.sleep(backoff)
+            _interruptible_sleep(backoff)
 
     raise RuntimeError("GPT Image 2 image-to-image job failed after retry attempts.")
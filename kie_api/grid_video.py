@@ -0,0 +1,249 @@
+"""Grid-to-video fan-out for Kling 2.6, Seedance 1.5 Pro, and Grok Imagine I2V.
+
+Animates every tile of a sliced grid (see grid.py) with one image-to-video job
+per tile:
+
+- tiles are PNG-encoded and uploaded in parallel
+- one I2V task per tile runs through `run_many`, which handles 429 backoff and
+  the shared scheduler budget
+- the tasks are polled together and each video is downloaded as soon as it finishes
+- videos are returned in tile order
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import torch
+
+from . import grok_imagine_i2v, kling26_i2v, seedance15pro_i2v
+from .auth import _load_api_key
+from .cancel import _wait_future
+from .jobs import run_many
+from .journal import _journal_record_delivered, _journal_release
+from .log import _log
+from .options import (
+    GRID_VIDEO_MODEL_OPTIONS,
+    GRID_VIDEO_DURATION_OPTIONS,
+    GRID_VIDEO_RESOLUTION_OPTIONS,
+    GRID_VIDEO_ASPECT_RATIO_OPTIONS,
+    GRID_VIDEO_GROK_MODE_OPTIONS,
+    GRID_VIDEO_DEFAULT_MAX_CONCURRENCY as DEFAULT_MAX_CONCURRENCY,
+    GRID_VIDEO_MAX_CONCURRENCY as MAX_CONCURRENCY,
+)
+from .profiling import _profiled
+from .upload import _image_tensor_to_png_bytes, _truncate_url, _upload_image
+from .validation import _validate_image_tensor_batch, _validate_prompt
+from .video import _fetch_result_video
+
+
+MAX_TILES = 36
+TILE_UPLOAD_WORKERS = 6
+
+_DURATION_OPTIONS = {
+    "kling-2.6": kling26_i2v.DURATION_OPTIONS,
+    "seedance-1.5-pro": seedance15pro_i2v.DURATION_OPTIONS,
+    "grok-imagine": grok_imagine_i2v.DURATION_OPTIONS,
+}
+_PROMPT_MAX_LENGTHS = {
+    "kling-2.6": kling26_i2v.PROMPT_MAX_LENGTH,
+    "seedance-1.5-pro": seedance15pro_i2v.PROMPT_MAX_LENGTH,
+    "grok-imagine": grok_imagine_i2v.PROMPT_MAX_LENGTH,
+}
+
+
+def _validate_grid_video_options(
+    model: str,
+    duration: str,
+    resolution: str,
+    aspect_ratio: str,
+    grok_mode: str,
+) -> None:
+    if model not in GRID_VIDEO_MODEL_OPTIONS:
+        raise RuntimeError(f"Invalid model '{model}'. Use one of: {', '.join(GRID_VIDEO_MODEL_OPTIONS)}.")
+    if duration not in _DURATION_OPTIONS[model]:
+        raise RuntimeError(
+            f"Invalid duration '{duration}' for {model}. Use one of: {', '.join(_DURATION_OPTIONS[model])}."
+        )
+    if model == "seedance-1.5-pro":
+        seedance15pro_i2v._validate_options(aspect_ratio, resolution, duration, False, False)
+    elif model == "grok-imagine":
+        if resolution not in grok_imagine_i2v.RESOLUTION_OPTIONS:
+            raise RuntimeError("Invalid resolution. Use the pinned enum options.")
+        if grok_mode not in GRID_VIDEO_GROK_MODE_OPTIONS:
+            raise RuntimeError("Invalid grok_mode. Use the pinned enum options.")
+
+
+def _normalize_tile_prompts(prompts: list[str] | str, tile_count: int, model: str) -> list[str]:
+    """Return one prompt per tile; a single prompt is reused for every tile."""
+    if isinstance(prompts, str):
+        prompts = [prompts]
+    if not isinstance(prompts, (list, tuple)):
+        raise RuntimeError("prompts_list must be a list of strings.")
+
+    cleaned = [str(prompt).strip() for prompt in prompts if str(prompt or "").strip()]
+    if not cleaned:
+        raise RuntimeError("prompts_list is empty.")
+    if len(cleaned) == 1:
+        cleaned = cleaned * tile_count
+    if len(cleaned) != tile_count:
+        raise RuntimeError(
+            f"prompts_list has {len(cleaned)} prompt(s) but the grid has {tile_count} tile(s); "
+            "provide one prompt per tile or a single prompt for all tiles."
+        )
+    for prompt in cleaned:
+        if model == "seedance-1.5-pro":
+            seedance15pro_i2v._validate_prompt_input(prompt)
+        else:
+            _validate_prompt(prompt, max_length=_PROMPT_MAX_LENGTHS[model])
+    return cleaned
+
+
+def _upload_tiles(api_key: str, tiles: torch.Tensor, log: bool) -> list[str]:
+    """Upload every tile in parallel and return the URLs in tile order."""
+    tile_count = tiles.shape[0]
+    _log(log, f"Uploading {tile_count} tile(s) ({min(tile_count, TILE_UPLOAD_WORKERS)} at a time)...")
+
+    def upload_tile(idx: int) -> str:
+        image_url = _upload_image(api_key, _image_tensor_to_png_bytes(tiles[idx]))
+        _log(log, f"Tile {idx + 1} upload success: {_truncate_url(image_url)}")
+        return image_url
+
+    executor = ThreadPoolExecutor(max_workers=min(tile_count, TILE_UPLOAD_WORKERS), thread_name_prefix="kie-tile")
+    try:
+        futures = [executor.submit(upload_tile, idx) for idx in range(tile_count)]
+        return [_wait_future(future) for future in futures]
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _build_tile_payload(
+    model: str,
+    prompt: str,
+    image_url: str,
+    duration: str,
+    resolution: str,
+    aspect_ratio: str,
+    sound: bool,
+    fixed_lens: bool,
+    grok_mode: str,
+) -> dict[str, Any]:
+    if model == "kling-2.6":
+        return {
+            "model": kling26_i2v.MODEL_NAME,
+            "input": {"prompt": prompt, "image_urls": [image_url], "sound": sound, "duration": duration},
+        }
+    if model == "seedance-1.5-pro":
+        return {
+            "model": seedance15pro_i2v.MODEL_NAME,
+            "input": {
+                "prompt": prompt,
+                "input_urls": [image_url],
+                "aspect_ratio": aspect_ratio,
+                "resolution": resolution,
+                "duration": duration,
+                "fixed_lens": fixed_lens,
+                "generate_audio": sound,
+            },
+        }
+    return {
+        "model": grok_imagine_i2v.MODEL_NAME,
+        "input": {
+            "mode": grok_mode,
+            "duration": duration,
+            "resolution": resolution,
+            "prompt": prompt,
+            "image_urls": [image_url],
+        },
+    }
+
+
+@_profiled
+def run_grid_to_video(
+    *,
+    tiles: torch.Tensor,
+    prompts: list[str] | str,
+    model: str = "kling-2.6",
+    duration: str = "5",
+    resolution: str = "720p",
+    aspect_ratio: str = "1:1",
+    sound: bool = False,
+    fixed_lens: bool = False,
+    grok_mode: str = "normal",
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    poll_interval_s: float = 10.0,
+    timeout_s: int = 2000,
+    max_retries: int = 2,
+    retry_backoff_s: float = 3.0,
+    priority: str = "auto",
+    log: bool = True,
+) -> list[Any]:
+    """Run one image-to-video job per grid tile concurrently and return the videos in tile order.
+
+    Returns:
+        A list of ComfyUI VIDEO objects, one per tile.
+    Raises:
+        RuntimeError: For validation errors or if any tile fails.
+    """
+    _validate_grid_video_options(model, duration, resolution, aspect_ratio, grok_mode)
+    tiles = _validate_image_tensor_batch(tiles)
+    tile_count = tiles.shape[0]
+    if tile_count > MAX_TILES:
+        raise RuntimeError(f"Too many tiles ({tile_count}); the maximum is {MAX_TILES}.")
+    prompt_list = _normalize_tile_prompts(prompts, tile_count, model)
+    max_concurrency = min(max(int(max_concurrency), 1), MAX_CONCURRENCY)
+
+    api_key = _load_api_key()
+    start_time = time.time()
+    image_urls = _upload_tiles(api_key, tiles, log)
+    payloads = [
+        _build_tile_payload(
+            model, prompt, image_url, duration, resolution, aspect_ratio, sound, fixed_lens, grok_mode
+        )
+        for prompt, image_url in zip(prompt_list, image_urls)
+    ]
+
+    _log(log, f"Running {len(payloads)} {model} I2V task(s) (max_concurrency={max_concurrency})...")
+    results: dict[int, Any] = {}
+    errors: dict[int, str] = {}
+    # Videos count as delivered only when every tile made it, so a re-run after a
+    # failed tile re-attaches to the finished tiles instead of generating them again.
+    task_ids: list[str] = []
+    try:
+        for item in run_many(
+            payloads,
+            api_key=api_key,
+            max_concurrency=max_concurrency,
+            fetch=lambda record_data: _fetch_result_video(record_data, log),
+            poll_interval_s=poll_interval_s,
+            timeout_s=timeout_s,
+            min_create_interval_s=0.0,
+            max_create_attempts=max(max_retries + 1, 1),
+            rate_limit_backoff_s=max(retry_backoff_s, 0.0),
+            priority=priority,
+            defer_delivery=True,
+            log=log,
+        ):
+            index = item["index"]
+            if item["error"] is not None:
+                prefix = "" if item["task_id"] else "createTask failed: "
+                errors[index] = f"{prefix}{item['error']}"
+                continue
+            task_ids.append(item["task_id"])
+            results[index] = item["output"]
+            _log(log, f"Tile {index + 1} video done ({len(results)}/{len(payloads)}).")
+
+        if errors:
+            details = "; ".join(f"tile {index + 1}: {errors[index]}" for index in sorted(errors))
+            raise RuntimeError(
+                f"{len(errors)} of {len(payloads)} tile(s) failed: {details}. "
+                "Re-run to retry them; finished tiles are reused from the job journal."
+            )
+
+        _log(log, f"All {len(payloads)} tile video(s) completed (elapsed={time.time() - start_time:.1f}s).")
+        for task_id in task_ids:
+            _journal_record_delivered(task_id)
+        return [results[index] for index in range(len(payloads))]
+    finally:
+        for task_id in task_ids:
+            _journal_release(task_id)
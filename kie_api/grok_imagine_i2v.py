@@ -1,25 +1,25 @@
 """Grok Imagine image-to-video helper."""
 
-import time
 from typing import Optional
 
 import torch
 
 from .auth import _load_api_key
-from .credits import _log_remaining_credits
-from .jobs import _create_task, _poll_task_until_complete
+from .jobs import _run_task
 from .log import _log
-from .results import _extract_result_urls
+from .options import (
+    GROK_I2V_MODE_OPTIONS as MODE_OPTIONS,
+    GROK_I2V_DURATION_OPTIONS as DURATION_OPTIONS,
+    GROK_I2V_RESOLUTION_OPTIONS as RESOLUTION_OPTIONS,
+)
+from .profiling import _profiled
 from .upload import _image_tensor_to_png_bytes, _truncate_url, _upload_image
 from .validation import _validate_image_tensor_batch
-from .video import _download_video, _video_bytes_to_comfy_video
+from .video import _fetch_result_video
 
 
 MODEL_NAME = "grok-imagine/image-to-video"
 PROMPT_MAX_LENGTH = 5000
-MODE_OPTIONS = ["fun", "normal", "spicy"]
-DURATION_OPTIONS = ["6", "10", "15"]
-RESOLUTION_OPTIONS = ["480p", "720p"]
 INDEX_MIN = 0
 INDEX_MAX = 5
 
@@ -31,6 +31,7 @@ def _validate_optional_prompt(prompt: str) -> None:
         raise RuntimeError(f"Prompt exceeds the maximum length of {PROMPT_MAX_LENGTH} characters.")
 
 
+@_profiled
 def run_grok_imagine_i2v_video(
     images: Optional[torch.Tensor],
     task_id_ref: str,
@@ -100,29 +101,12 @@ def run_grok_imagine_i2v_video(
     }
 
     _log(log, "Creating Grok Imagine I2V task...")
-    start_time = time.time()
-    task_id, create_response_text = _create_task(api_key, payload)
-    _log(
-        log,
-        f"createTask response (elapsed={time.time() - start_time:.1f}s): {create_response_text}",
-    )
-    _log(log, f"Task created with ID {task_id}. Polling for completion...")
-
-    record_data = _poll_task_until_complete(
+    video_output, _record_data, _task_id = _run_task(
         api_key,
-        task_id,
-        poll_interval_s,
-        timeout_s,
-        log,
-        start_time,
+        payload,
+        fetch=lambda record_data: _fetch_result_video(record_data, log),
+        poll_interval_s=poll_interval_s,
+        timeout_s=timeout_s,
+        log=log,
     )
-
-    result_urls = _extract_result_urls(record_data)
-    video_url = result_urls[0]
-    _log(log, f"Final video URL: {video_url}")
-
-    video_bytes = _download_video(video_url)
-    video_output = _video_bytes_to_comfy_video(video_bytes)
-
-    _log_remaining_credits(log, record_data, api_key, _log)
     return video_output
@@ -0,0 +1,108 @@
+"""Opt-in tail-latency hedging for KIE tasks.
+
+KIE queue times vary a lot: a job can sit in `waiting` for minutes while identical
+jobs finish in seconds. When hedging is enabled for a model and a task has been
+running longer than that model's observed p95 latency, the job engine submits one
+duplicate task; whichever finishes first wins and the other is abandoned (it still
+runs, and is billed, on KIE's side).
+
+Only single-task jobs are hedged (the model nodes and KIE Await go through
+`_run_task`). Batches run by `run_many`, such as KIE Image Prompt Batch and KIE
+Grid To Video, never submit duplicates.
+
+Latency history comes from the job journal (created -> success times of recent
+tasks), so hedging needs the journal enabled and at least HEDGE_MIN_SAMPLES
+completed tasks of the model.
+
+Environment:
+- KIE_HEDGE_MODELS: comma-separated `model=credits` pairs, the models to hedge and
+  the credits one duplicate costs, e.g. `nano-banana-2=8,gpt-image-2-text-to-image=6`.
+  Empty (the default) disables hedging.
+- KIE_HEDGE_CREDIT_BUDGET: hard cap on credits spent on duplicates by this process
+  (default 0, which also disables hedging).
+"""
+
+import os
+import threading
+from typing import Any
+
+from .journal import _journal_latencies
+
+
+HEDGE_MIN_SAMPLES = 20
+# Never hedge earlier than this, however fast the model usually is.
+HEDGE_MIN_DELAY_S = 15.0
+HEDGE_PERCENTILE = 0.95
+
+_lock = threading.Lock()
+_spent_credits = 0.0
+_hedges_submitted = 0
+
+
+def _hedge_policy() -> dict[str, float]:
+    """Parse KIE_HEDGE_MODELS into {model: credits per duplicate}."""
+    policy: dict[str, float] = {}
+    for item in os.environ.get("KIE_HEDGE_MODELS", "").split(","):
+        model, _sep, cost = item.strip().partition("=")
+        if not model:
+            continue
+        try:
+            policy[model.strip()] = max(float(cost), 0.0)
+        except ValueError:
+            continue
+    return policy
+
+
+def _hedge_budget() -> float:
+    try:
+        return max(float(os.environ.get("KIE_HEDGE_CREDIT_BUDGET", "0")), 0.0)
+    except ValueError:
+        return 0.0
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def _hedge_delay_s(model: Any) -> float | None:
+    """Return how long a task of this model may run before it is hedged, or None to never hedge."""
+    if not model or model not in _hedge_policy() or _hedge_budget() <= 0:
+        return None
+    samples = _journal_latencies(str(model))
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return None
+    return max(_percentile(samples, HEDGE_PERCENTILE), HEDGE_MIN_DELAY_S)
+
+
+def _reserve_hedge_credits(model: Any) -> bool:
+    """Charge one duplicate of this model against the budget; False if it does not fit."""
+    global _spent_credits, _hedges_submitted
+    cost = _hedge_policy().get(str(model))
+    if cost is None:
+        return False
+    with _lock:
+        if _spent_credits + cost > _hedge_budget():
+            return False
+        _spent_credits += cost
+        _hedges_submitted += 1
+    return True
+
+
+def _refund_hedge_credits(model: Any) -> None:
+    """Give back a reservation whose duplicate could not be created."""
+    global _spent_credits, _hedges_submitted
+    cost = _hedge_policy().get(str(model), 0.0)
+    with _lock:
+        _spent_credits = max(_spent_credits - cost, 0.0)
+        _hedges_submitted = max(_hedges_submitted - 1, 0)
+
+
+def _hedge_stats() -> dict[str, Any]:
+    with _lock:
+        return {
+            "budget_credits": _hedge_budget(),
+            "spent_credits": _spent_credits,
+            "hedges_submitted": _hedges_submitted,
+            "models": sorted(_hedge_policy()),
+        }
@@ -1,7 +1,17 @@
-import requests
-
+import importlib
+from typing import Any
 
 class TransientKieError(RuntimeError):
     def __init__(self, message: str, status_code: int | None = None):
         super().__init__(message)
         self.status_code = status_code
+
+
+def __getattr__(name: str) -> Any:
+    # `from .http import requests` imports requests on first use rather than when
+    # nodes.py (which only needs TransientKieError) is loaded.
+    if name == "requests":
+        module = importlib.import_module("requests")
+        globals()["requests"] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
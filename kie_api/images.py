@@ -1,45 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 
 import torch
 import numpy as np
 from PIL import Image
 
-from .http import requests
+from .download import _download_bytes
+from .log import _log
+from .options import IMAGE_OUTPUT_PRECISION_OPTIONS as OUTPUT_PRECISION_OPTIONS
+from .results import _extract_result_urls
+from .telemetry import _span
 
 
-def _image_bytes_to_tensor(image_bytes: bytes) -> torch.Tensor:
-    """Convert image bytes into a normalized torch tensor.
+BATCH_DOWNLOAD_WORKERS = 4
+PRECISION_DTYPES = {"float32": torch.float32, "float16": torch.float16}
+
+
+def _validate_output_precision(precision: str) -> str:
+    if precision not in OUTPUT_PRECISION_OPTIONS:
+        raise RuntimeError(
+            f"Invalid output_precision '{precision}'. Use one of: {', '.join(OUTPUT_PRECISION_OPTIONS)}."
+        )
+    return precision
+
+
+def _image_bytes_to_tensor(image_bytes: bytes, precision: str = "float32") -> torch.Tensor:
+    """Convert image bytes into a ComfyUI IMAGE tensor.
+
+    Args:
+        image_bytes: Encoded image bytes.
+        precision: "float32" (ComfyUI default) or "float16" (half the memory); values
+            are in [0, 1] either way.
 
     Returns:
-        A tensor of shape (1, H, W, 3) with float values in [0, 1].
+        A tensor of shape (1, H, W, 3).
     Raises:
         RuntimeError: If the image cannot be decoded.
     """
-    try:
-        with Image.open(BytesIO(image_bytes)) as img:
-            rgb_image = img.convert("RGB")
-            
-            # FIX: Use numpy to create the array. This creates a writable buffer
-            # automatically, resolving the PyTorch warning.
-            tensor = torch.from_numpy(np.array(rgb_image))
-            
-            tensor = tensor.float() / 255.0
-            return tensor.unsqueeze(0)
-    except Exception as exc:
-        raise RuntimeError("Failed to decode result image.") from exc
-
-
-def _download_image(url: str) -> bytes:
+    _validate_output_precision(precision)
+    with _span("decode", kind="image", bytes=len(image_bytes), precision=precision):
+        try:
+            with Image.open(BytesIO(image_bytes)) as img:
+                rgb_image = img.convert("RGB")
+                
+                # FIX: Use numpy to create the array. This creates a writable buffer
+                # automatically, resolving the PyTorch warning.
+                tensor = torch.from_numpy(np.array(rgb_image))
+        except Exception as exc:
+            raise RuntimeError("Failed to decode result image.") from exc
+
+        # Convert once and scale in place so no second full-size float copy is made.
+        tensor = tensor.to(PRECISION_DTYPES[precision]).div_(255.0)
+    return tensor.unsqueeze(0)
+
+
+def _download_image(url: str, log: bool = False) -> bytes:
     """Download a result image and return its raw bytes."""
-    try:
-        response = requests.get(url, timeout=120)
-    except requests.RequestException as exc:
-        raise RuntimeError(f"Failed to download result image: {exc}") from exc
-
-    if response.status_code != 200:
-        raise RuntimeError(f"Failed to download result image (status code {response.status_code}).")
-
-    return response.content
+    return _download_bytes(url, label="result image", timeout_s=120, log=log)
 
 
 def _stack_image_tensors(image_tensors: list[torch.Tensor]) -> torch.Tensor:
@@ -58,10 +75,42 @@ def _stack_image_tensors(image_tensors: list[torch.Tensor]) -> torch.Tensor:
     return torch.cat(image_tensors, dim=0)
 
 
-def _download_images_as_batch(urls: list[str]) -> torch.Tensor:
+def _download_images_as_batch(urls: list[str], log: bool = False, precision: str = "float32") -> torch.Tensor:
     """Download multiple image URLs and return a single IMAGE batch tensor."""
     if not urls:
         raise RuntimeError("No result image URLs were returned.")
 
-    image_tensors = [_image_bytes_to_tensor(_download_image(url)) for url in urls]
+    def _fetch(url: str) -> torch.Tensor:
+        return _image_bytes_to_tensor(_download_image(url, log=log), precision)
+
+    if len(urls) == 1:
+        return _stack_image_tensors([_fetch(urls[0])])
+
+    # A private executor (not the shared fetch pool) because this usually runs inside
+    # a fetch-pool job itself. map() keeps the result order identical to urls.
+    with ThreadPoolExecutor(max_workers=min(len(urls), BATCH_DOWNLOAD_WORKERS)) as executor:
+        image_tensors = list(executor.map(_fetch, urls))
     return _stack_image_tensors(image_tensors)
+
+
+def _fetch_result_image(record_data: dict, log: bool = False, precision: str = "float32") -> torch.Tensor:
+    """Download and decode the first result image of a successful task record."""
+    result_urls = _extract_result_urls(record_data)
+    _log(log, f"Result URLs: {result_urls}")
+    _log(log, f"Downloading result image from {result_urls[0]}...")
+    image_bytes = _download_image(result_urls[0], log=log)
+    image_tensor = _image_bytes_to_tensor(image_bytes, precision)
+    _log(log, "Image downloaded and decoded.")
+    return image_tensor
+
+
+def _fetch_result_image_batch(
+    record_data: dict, label: str, log: bool = False, precision: str = "float32"
+) -> torch.Tensor:
+    """Download and decode every result image of a successful task record as one batch."""
+    result_urls = _extract_result_urls(record_data)
+    _log(log, f"Result URLs: {result_urls}")
+    _log(log, f"Downloading {len(result_urls)} {label} result image(s)...")
+    image_batch = _download_images_as_batch(result_urls, log=log, precision=precision)
+    _log(log, "Images downloaded and decoded.")
+    return image_batch
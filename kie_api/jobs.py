@@ -5,22 +5,70 @@ This module centralizes common KIE job lifecycle operations that are model-agnos
 - Fetch `recordInfo` for a task id.
 - Decide whether a task failure is likely transient.
 - Poll a task until completion, failure, or timeout.
-
-Behavior (logging text, timing, error types) is intentionally kept identical to the
-original model-specific implementations.
+- Run a task end to end, starting the artifact fetch on the shared fetch pool the
+  moment the task reaches `success`.
+- Poll several tasks together, prefetching each one's artifacts as it finishes.
+- Run many prebuilt createTask payloads with a concurrency limit (`run_many`).
+- Journal every created task, so a request interrupted by a restart or a cancel
+  re-attaches to its task when re-run (see journal.py).
+- Optionally share one task, poll loop, and decoded result between identical
+  concurrent requests (singleflight, KIE_SINGLEFLIGHT=1).
+- Admit tasks through the priority-aware scheduler's shared in-flight budget.
+- Optionally hedge stragglers of single-task jobs with one duplicate task (see
+  hedging.py).
+
+Log lines, errors and timeouts still follow the original model-specific
+implementations. What differs is how tasks are created and awaited:
+
+- A re-run can reuse an unfinished or undelivered task from the journal instead of
+  calling createTask.
+- With KIE_SINGLEFLIGHT=1, identical concurrent requests share one task.
+- A task may wait for a scheduler slot before createTask.
+- A hedged job may return the result of its duplicate task.
+- Artifacts are fetched on the shared fetch pool rather than on the calling
+  thread.
 """
 
 import json
 import time
-from typing import Any
-
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, Iterator, TypeVar
+
+from .auth import _load_api_key
+from .cancel import CANCEL_CHECK_INTERVAL_S, _interruptible_sleep, _raise_if_interrupted, _wait_future
+from .credits import _log_remaining_credits
+from .hedging import _hedge_delay_s, _refund_hedge_credits, _reserve_hedge_credits
 from .http import TransientKieError, requests
+from .journal import (
+    _journal_lookup,
+    _journal_record_created,
+    _journal_record_delivered,
+    _journal_record_from_entry,
+    _journal_record_state,
+    _journal_release,
+    _payload_hash,
+)
+from .ledger import _ledger_task_finished
 from .log import _log
+from .pool import _failed_future, _submit_fetch
+from .results import _extract_result_urls
+from .scheduler import _release_task_slot, _request_task_slot, _task_slot, _wait_for_task_slot
+from .singleflight import _fetch_share_key, _singleflight, _singleflight_enabled
+from .metrics import _count_http_error, _metric_inc
+from .stats import _record_timestamps
+from .telemetry import _span, _telemetry_task_created, _telemetry_task_state, _telemetry_task_timed_out
 
 
 CREATE_TASK_URL = "https://api.kie.ai/api/v1/jobs/createTask"
 RECORD_INFO_URL = "https://api.kie.ai/api/v1/jobs/recordInfo"
 DEFAULT_TIMEOUT_S = 2000
+RUN_MANY_DEFAULT_CONCURRENCY = 4
+RUN_MANY_MIN_CREATE_INTERVAL_S = 0.5
+RUN_MANY_MAX_CREATE_ATTEMPTS = 4
+RUN_MANY_RATE_LIMIT_BACKOFF_S = 5.0
+
+T = TypeVar("T")
 
 
 def _create_task(api_key: str, payload: dict[str, Any]) -> tuple[str, str]:
@@ -42,6 +90,7 @@ def _create_task(api_key: str, payload: dict[str, Any]) -> tuple[str, str]:
     except requests.RequestException as exc:
         raise RuntimeError(f"Failed to call createTask endpoint: {exc}") from exc
 
+    _count_http_error(response.status_code)
     if response.status_code == 429 or response.status_code >= 500:
         raise TransientKieError(
             f"createTask returned HTTP {response.status_code}: {response.text}", status_code=response.status_code
@@ -83,6 +132,7 @@ def _fetch_task_record(api_key: str, task_id: str) -> tuple[dict[str, Any], str,
     except requests.RequestException as exc:
         raise RuntimeError(f"Failed to call recordInfo endpoint: {exc}") from exc
 
+    _count_http_error(response.status_code)
     if response.status_code == 429 or response.status_code >= 500:
         raise TransientKieError(
             f"recordInfo returned HTTP {response.status_code}: {response.text}", status_code=response.status_code
@@ -133,6 +183,99 @@ def _should_retry_fail(fail_code: Any, fail_msg: Any, message: Any) -> bool:
     return False
 
 
+def _task_failure_error(task_id: str, data: dict[str, Any], message_field: Any) -> RuntimeError:
+    """Build the error raised for a task whose recordInfo state is `fail`.
+
+    Returns:
+        TransientKieError when the failure looks retryable, otherwise RuntimeError.
+    """
+    fail_code = data.get("failCode")
+    fail_msg = data.get("failMsg") or data.get("msg")
+    parts = [f"Task {task_id} failed"]
+    if fail_code is not None:
+        parts.append(f"failCode={fail_code}")
+    if fail_msg:
+        parts.append(f"failMsg={fail_msg}")
+    if message_field:
+        parts.append(f"message={message_field}")
+    error_message = "; ".join(parts)
+
+    if _should_retry_fail(fail_code, fail_msg, message_field):
+        return TransientKieError(error_message)
+
+    return RuntimeError(error_message)
+
+
+def _observe_task(api_key: str, task_id: str, last_state: Any) -> tuple[Any, dict[str, Any], Any]:
+    """Fetch a task's record and, when its state changed, record it in the journal, telemetry and ledger.
+
+    Returns:
+        A tuple of (state, data_dict, message_field).
+    Raises:
+        RuntimeError: If recordInfo fails (see `_fetch_task_record`).
+        TransientKieError: If recordInfo responds with a retryable error.
+    """
+    data, _raw_json, message_field = _fetch_task_record(api_key, task_id)
+    state = data.get("state")
+    if state != last_state:
+        _journal_record_state(task_id, state, data)
+        _telemetry_task_state(task_id, state, terminal=state in ("success", "fail"), record=data)
+        _ledger_task_finished(task_id, state, data, api_key=api_key)
+    return state, data, message_field
+
+
+def _abandon_task(task_id: str, reason: str, log: bool) -> None:
+    """Stop waiting for a task that may still run on KIE, so it is never re-attached."""
+    _journal_record_state(task_id, "abandoned")
+    _telemetry_task_state(task_id, "abandoned", terminal=True)
+    _log(log, f"Abandoning task {task_id}; {reason}.")
+
+
+def _create_or_resume_task(
+    api_key: str,
+    payload: dict[str, Any],
+    *,
+    log: bool,
+    create_task: Callable[[str, dict[str, Any]], tuple[str, str]] = _create_task,
+) -> tuple[str, str, dict[str, Any] | None]:
+    """Create a task unless the job journal holds an orphaned one for the same payload.
+
+    The returned task is claimed in the journal; the caller releases it with
+    `_journal_release` (after `_journal_record_delivered` once its outputs are
+    delivered).
+
+    Returns:
+        A tuple of (task_id, raw_response_text, record). `record` is the completed
+        record when the journal holds undelivered results for this payload, otherwise
+        None and the task must be polled. `raw_response_text` is empty when no
+        createTask call was made.
+    """
+    payload_hash = _payload_hash(payload)
+
+    def create_once() -> tuple[str, str, dict[str, Any] | None]:
+        entry = _journal_lookup(payload_hash)
+        if entry is not None:
+            if entry["state"] == "success":
+                _log(log, f"Reusing undelivered results of task {entry['task_id']} from the job journal.")
+                return entry["task_id"], "", _journal_record_from_entry(entry)
+            _log(log, f"Re-attaching to unfinished task {entry['task_id']} from the job journal.")
+            return entry["task_id"], "", None
+
+        with _span("createTask", model=payload.get("model")) as span:
+            task_id, raw_text = create_task(api_key, payload)
+            span["task_id"] = task_id
+        _journal_record_created(task_id, payload, payload_hash)
+        _telemetry_task_created(task_id, payload.get("model"))
+        return task_id, raw_text, None
+
+    create_key = ("create", payload_hash) if _singleflight_enabled() else None
+    (task_id, raw_text, record), shared = _singleflight(create_key, create_once)
+    if shared:
+        _log(log, f"Sharing task {task_id} with an identical request created concurrently.")
+        return task_id, "", record
+    return task_id, raw_text, record
+
+
 def _poll_task_until_complete(
     api_key: str,
     task_id: str,
@@ -159,6 +302,7 @@ def _poll_task_until_complete(
         now = time.time()
         elapsed = now - start_time
         if elapsed > effective_timeout_s:
+            _telemetry_task_timed_out(task_id)
             last_state_text = last_state if last_state is not None else "unknown"
             raise RuntimeError(
                 f"Task {task_id} timed out after {effective_timeout_s}s "
@@ -166,8 +310,7 @@ def _poll_task_until_complete(
                 "Try increasing timeout or retry."
             )
 
-        data, raw_json, message_field = _fetch_task_record(api_key, task_id)
-        state = data.get("state")
+        state, data, message_field = _observe_task(api_key, task_id, last_state)
         # Log only on state change or every 30s to give progress without noisy output.
         should_log = log and (state != last_state or (now - last_log_time) >= 30.0)
         if should_log:
@@ -177,30 +320,540 @@ def _poll_task_until_complete(
                 f"(elapsed={elapsed:.1f}s)"
             )
             last_log_time = now
-
         last_state = state
 
         if state == "success":
             if log:
-                _log(log, f"Task {task_id} completed (elapsed={elapsed:.1f}s)")
+                _log(log, f"Task {task_id} completed (elapsed={elapsed:.1f}s{_kie_timing_text(data)})")
             return data
         if state == "fail":
-            fail_code = data.get("failCode")
-            fail_msg = data.get("failMsg") or data.get("msg")
-            parts = [f"Task {task_id} failed"]
-            if fail_code is not None:
-                parts.append(f"failCode={fail_code}")
-            if fail_msg:
-                parts.append(f"failMsg={fail_msg}")
-            if message_field:
-                parts.append(f"message={message_field}")
-            error_message = "; ".join(parts)
-
-            if _should_retry_fail(fail_code, fail_msg, message_field):
-                raise TransientKieError(error_message)
-
-            raise RuntimeError(error_message)
+            raise _task_failure_error(task_id, data, message_field)
 
         if should_log:
             _log(log, f"Polling again in {interval} seconds...")
-        time.sleep(interval)
+        _interruptible_sleep(interval)
+
+
+def _kie_timing_text(record_data: dict[str, Any]) -> str:
+    """KIE's queue and generation time for a completion log line, when the record reports them."""
+    timestamps = _record_timestamps(record_data)
+    created, started, completed = (
+        timestamps["kie_created_at"],
+        timestamps["kie_started_at"],
+        timestamps["kie_completed_at"],
+    )
+    if created is None or started is None or completed is None or not created <= started <= completed:
+        return ""
+    return f", KIE queue {started - created:.1f}s, generation {completed - started:.1f}s"
+
+
+def _poll_task_with_hedge(
+    api_key: str,
+    task_id: str,
+    payload: dict[str, Any],
+    *,
+    hedge_after_s: float,
+    create_task: Callable[[str, dict[str, Any]], tuple[str, str]],
+    poll_interval_s: float,
+    timeout_s: int,
+    log: bool,
+    start_time: float,
+) -> tuple[str, dict[str, Any]]:
+    """Poll a task, submitting one duplicate once it outlives `hedge_after_s` (see hedging.py).
+
+    The first of the two tasks to succeed wins and the other is marked abandoned in
+    the job journal. A failure of one task is tolerated while the other is running.
+
+    Returns:
+        A tuple of (winning_task_id, record_data).
+    Raises:
+        RuntimeError: If the task(s) time out or every task fails non-retryably.
+        TransientKieError: If the last running task fails with a retryable condition.
+    """
+    interval = poll_interval_s if poll_interval_s > 0 else 1.0
+    effective_timeout_s = timeout_s if timeout_s >= DEFAULT_TIMEOUT_S else DEFAULT_TIMEOUT_S
+    model = payload.get("model")
+    running: dict[str, Any] = {task_id: None}
+    primary_created_at = time.time()
+    hedged = False
+    hedge_ticket: dict[str, Any] | None = None
+    last_log_time = start_time
+
+    try:
+        while True:
+            now = time.time()
+            elapsed = now - start_time
+            if elapsed > effective_timeout_s:
+                for tid in running:
+                    _telemetry_task_timed_out(tid)
+                states = ", ".join(f"{tid}={state or 'unknown'}" for tid, state in running.items())
+                raise RuntimeError(
+                    f"Task {task_id} timed out after {effective_timeout_s}s "
+                    f"(last state {states}, elapsed={elapsed:.1f}s). "
+                    "Try increasing timeout or retry."
+                )
+
+            if not hedged and now - primary_created_at >= hedge_after_s:
+                hedge_ticket = _request_task_slot(model, priority="interactive")
+                if not _wait_for_task_slot(hedge_ticket, timeout=0):
+                    # No free slot: do not take one from a waiting job; try next round.
+                    _release_task_slot(hedge_ticket)
+                    hedge_ticket = None
+                elif not _reserve_hedge_credits(model):
+                    _log(log, f"Task {task_id} is slower than usual, but the hedging credit budget is used up.")
+                    _release_task_slot(hedge_ticket)
+                    hedge_ticket = None
+                    hedged = True
+                else:
+                    hedged = True
+                    try:
+                        with _span("createTask", model=model, hedge=True) as span:
+                            hedge_id, _raw_text = create_task(api_key, payload)
+                            span["task_id"] = hedge_id
+                    except Exception as exc:
+                        _refund_hedge_credits(model)
+                        _release_task_slot(hedge_ticket)
+                        hedge_ticket = None
+                        _log(log, f"Failed to submit hedge for task {task_id}: {exc}")
+                    else:
+                        _journal_record_created(hedge_id, payload, _payload_hash(payload))
+                        _telemetry_task_created(hedge_id, model)
+                        running[hedge_id] = None
+                        _log(
+                            log,
+                            f"Task {task_id} exceeded the p95 latency of {model} ({hedge_after_s:.0f}s); "
+                            f"submitted duplicate task {hedge_id}. The first to finish wins.",
+                        )
+
+            periodic_log = log and (now - last_log_time) >= 30.0
+            if periodic_log:
+                last_log_time = now
+            for tid in list(running):
+                try:
+                    state, data, message_field = _observe_task(api_key, tid, running[tid])
+                except TransientKieError as exc:
+                    _metric_inc("kie_retries_total", op="recordInfo")
+                    _log(log, f"Task {tid} recordInfo error, retrying next round: {exc}")
+                    continue
+                except RuntimeError as exc:
+                    # A non-retryable recordInfo error ends this task like a `fail`.
+                    del running[tid]
+                    _abandon_task(tid, f"recordInfo failed ({exc})", log)
+                    if not running:
+                        raise
+                    _log(log, f"Continuing with task {next(iter(running))}.")
+                    continue
+
+                if log and (state != running[tid] or periodic_log):
+                    _log(log, f"Task {tid} state: {state or 'unknown'} (elapsed={elapsed:.1f}s)")
+                running[tid] = state
+
+                if state == "success":
+                    _log(log, f"Task {tid} completed (elapsed={elapsed:.1f}s)")
+                    for loser in running:
+                        if loser != tid:
+                            _abandon_task(loser, f"task {tid} finished first", log)
+                    return tid, data
+                if state == "fail":
+                    error = _task_failure_error(tid, data, message_field)
+                    del running[tid]
+                    if not running:
+                        raise error
+                    _log(log, f"{error}; continuing with task {next(iter(running))}.")
+
+            _interruptible_sleep(interval)
+    except BaseException:
+        # Left unfinished (timeout, interrupt): let a re-run re-attach to them.
+        for tid in running:
+            _journal_release(tid)
+        raise
+    finally:
+        _release_task_slot(hedge_ticket)
+
+
+def _run_task(
+    api_key: str,
+    payload: dict[str, Any],
+    *,
+    fetch: Callable[[dict[str, Any]], T],
+    poll_interval_s: float,
+    timeout_s: int,
+    log: bool,
+    start_time: float | None = None,
+    create_task: Callable[[str, dict[str, Any]], tuple[str, str]] = _create_task,
+    priority: str = "auto",
+) -> tuple[T, dict[str, Any], str]:
+    """Create a task, poll it to completion, and fetch its artifacts.
+
+    `fetch` receives the successful record and returns the decoded output (URL
+    extraction, download, decode). It runs on the shared fetch pool as soon as the
+    task reaches `success`; the remaining-credits lookup is scheduled there too, so
+    neither sits on the critical path of the next task.
+
+    The task holds one scheduler slot (see scheduler.py) from createTask until it
+    finishes; `priority` picks its class ("auto" infers it from the model). Models
+    enabled for hedging get one duplicate task once they outlive their p95 latency.
+
+    Concurrent calls with the same canonical payload share one task and poll loop,
+    and, when their `fetch` callables match (same code and captured values), one
+    decoded result.
+
+    Returns:
+        A tuple of (fetch_output, record_data, task_id).
+    Raises:
+        RuntimeError: If creation, polling, or fetching fails.
+        TransientKieError: If creation or the task fails with a retryable condition.
+    """
+    if start_time is None:
+        start_time = time.time()
+
+    def create_and_poll() -> tuple[str, dict[str, Any]]:
+        with _task_slot(payload.get("model"), priority=priority, log=log):
+            task_id, create_response_text, record_data = _create_or_resume_task(
+                api_key, payload, log=log, create_task=create_task
+            )
+            if create_response_text:
+                _log(log, f"createTask response (elapsed={time.time() - start_time:.1f}s): {create_response_text}")
+                _log(log, f"Task created with ID {task_id}. Polling for completion...")
+
+            hedge_after_s = _hedge_delay_s(payload.get("model")) if record_data is None else None
+            if hedge_after_s is not None:
+                # The hedge poller releases its tasks itself when it gives up.
+                task_id, record_data = _poll_task_with_hedge(
+                    api_key,
+                    task_id,
+                    payload,
+                    hedge_after_s=hedge_after_s,
+                    create_task=create_task,
+                    poll_interval_s=poll_interval_s,
+                    timeout_s=timeout_s,
+                    log=log,
+                    start_time=start_time,
+                )
+            elif record_data is None:
+                try:
+                    record_data = _poll_task_until_complete(
+                        api_key,
+                        task_id,
+                        poll_interval_s,
+                        timeout_s,
+                        log,
+                        start_time,
+                    )
+                except BaseException:
+                    _journal_release(task_id)
+                    raise
+        return task_id, record_data
+
+    share = _singleflight_enabled()
+    task_key = ("task", _payload_hash(payload)) if share else None
+    (task_id, record_data), shared = _singleflight(task_key, create_and_poll)
+    if shared:
+        _log(log, f"Identical request finished as task {task_id}; sharing its results.")
+
+    fetch_key = _fetch_share_key(fetch) if share else None
+    _log_remaining_credits(log, record_data, api_key, _log)
+    try:
+        output, _shared = _singleflight(
+            ("fetch", task_id, fetch_key) if fetch_key is not None else None,
+            lambda: _wait_future(_submit_fetch(fetch, record_data)),
+        )
+        _journal_record_delivered(task_id)
+    finally:
+        _journal_release(task_id)
+    return output, record_data, task_id
+
+
+def _poll_tasks_until_complete(
+    api_key: str,
+    task_ids: list[str],
+    *,
+    fetch: Callable[[dict[str, Any]], T],
+    poll_interval_s: float,
+    timeout_s: int,
+    log: bool,
+    start_time: float,
+) -> Iterator[tuple[str, Future]]:
+    """Poll several tasks together and prefetch each one's artifacts as it succeeds.
+
+    One recordInfo request per pending task is made per round, followed by a single
+    sleep, so N tasks cost one poll interval rather than N. Transient recordInfo
+    errors (429/5xx) are retried on the next round instead of failing the batch.
+
+    Yields:
+        (task_id, future) pairs in completion order. The future resolves to the
+        `fetch` output, or raises the task's failure/timeout error.
+    """
+    interval = poll_interval_s if poll_interval_s > 0 else 1.0
+    effective_timeout_s = timeout_s if timeout_s >= DEFAULT_TIMEOUT_S else DEFAULT_TIMEOUT_S
+    pending = list(dict.fromkeys(task_ids))
+    last_states: dict[str, Any] = {}
+    last_log_time = start_time
+
+    while pending:
+        now = time.time()
+        elapsed = now - start_time
+        if elapsed > effective_timeout_s:
+            for task_id in pending:
+                _telemetry_task_timed_out(task_id)
+                last_state_text = last_states.get(task_id) or "unknown"
+                yield task_id, _failed_future(
+                    RuntimeError(
+                        f"Task {task_id} timed out after {effective_timeout_s}s "
+                        f"(last state={last_state_text}, elapsed={elapsed:.1f}s). "
+                        "Try increasing timeout or retry."
+                    )
+                )
+            return
+
+        periodic_log = log and (now - last_log_time) >= 30.0
+        if periodic_log:
+            last_log_time = now
+
+        for task_id in list(pending):
+            try:
+                state, data, message_field = _observe_task(api_key, task_id, last_states.get(task_id))
+            except TransientKieError as exc:
+                _metric_inc("kie_retries_total", op="recordInfo")
+                _log(log, f"Task {task_id} recordInfo error, retrying next round: {exc}")
+                continue
+            except RuntimeError as exc:
+                pending.remove(task_id)
+                yield task_id, _failed_future(exc)
+                continue
+
+            if log and (state != last_states.get(task_id) or periodic_log):
+                _log(log, f"Task {task_id} state: {state or 'unknown'} (elapsed={elapsed:.1f}s)")
+            last_states[task_id] = state
+
+            if state == "success":
+                _log(log, f"Task {task_id} completed (elapsed={elapsed:.1f}s)")
+                pending.remove(task_id)
+                yield task_id, _submit_fetch(fetch, data)
+            elif state == "fail":
+                pending.remove(task_id)
+                yield task_id, _failed_future(_task_failure_error(task_id, data, message_field))
+
+        if pending:
+            if periodic_log:
+                _log(log, f"{len(pending)} task(s) pending. Polling again in {interval} seconds...")
+            _interruptible_sleep(interval)
+
+
+def run_many(
+    payloads: list[dict[str, Any]],
+    *,
+    api_key: str | None = None,
+    max_concurrency: int = RUN_MANY_DEFAULT_CONCURRENCY,
+    fetch: Callable[[dict[str, Any]], Any] | None = None,
+    poll_interval_s: float = 10.0,
+    timeout_s: int = DEFAULT_TIMEOUT_S,
+    min_create_interval_s: float = RUN_MANY_MIN_CREATE_INTERVAL_S,
+    max_create_attempts: int = RUN_MANY_MAX_CREATE_ATTEMPTS,
+    rate_limit_backoff_s: float = RUN_MANY_RATE_LIMIT_BACKOFF_S,
+    priority: str = "auto",
+    owner: str | None = None,
+    defer_delivery: bool = False,
+    log: bool = True,
+) -> Iterator[dict[str, Any]]:
+    """Run prebuilt createTask payloads concurrently and yield each result as it completes.
+
+    Payloads are the dicts produced by helpers such as `preflight_kling3_payload` or
+    `preflight_seedance2_payload`. At most `max_concurrency` tasks are in flight
+    (created but not finished) at any time, and each one also holds a slot of the
+    shared scheduler budget, so other jobs in the process are not starved.
+    createTask calls are spaced by `min_create_interval_s`; a 429/5xx response
+    pauses all submissions for `rate_limit_backoff_s` (growing per attempt) before
+    the payload is retried. In-flight tasks are polled together, once per
+    `poll_interval_s`, and each successful record is handed to `fetch` on the
+    shared fetch pool.
+
+    Args:
+        payloads: createTask request bodies ({"model": ..., "input": {...}}).
+        api_key: KIE API key (loaded from config when omitted).
+        max_concurrency: Maximum number of tasks in flight.
+        fetch: Called with the successful record; defaults to returning its result URLs.
+        poll_interval_s: Seconds between polling rounds.
+        timeout_s: Per-task timeout in seconds (never below DEFAULT_TIMEOUT_S).
+        min_create_interval_s: Minimum spacing between createTask calls.
+        max_create_attempts: createTask attempts per payload for retryable errors.
+        rate_limit_backoff_s: Base pause after a retryable createTask error.
+        priority: Scheduler class ("auto", "interactive", "normal", or "batch").
+        owner: Fair-sharing owner for the scheduler (defaults to the ComfyUI prompt).
+        defer_delivery: Leave successful tasks claimed and undelivered in the job
+            journal. The caller records them with `_journal_record_delivered` once
+            its node returns and must `_journal_release` every yielded task id, so
+            results of a node that fails as a whole can be reused by its re-run.
+        log: Console logging on/off.
+
+    Yields:
+        One dict per payload, in completion order, with keys `index` (position in
+        `payloads`), `task_id` (None if creation failed), `record` (recordInfo data or
+        None), `output` (fetch result or None), and `error` (None on success,
+        otherwise the exception). Errors never abort the remaining items.
+    """
+    if api_key is None:
+        api_key = _load_api_key()
+    if fetch is None:
+        fetch = _extract_result_urls
+
+    max_concurrency = max(int(max_concurrency), 1)
+    interval = poll_interval_s if poll_interval_s > 0 else 1.0
+    effective_timeout_s = timeout_s if timeout_s >= DEFAULT_TIMEOUT_S else DEFAULT_TIMEOUT_S
+    total = len(payloads)
+
+    queue: deque[int] = deque(range(total))
+    create_attempts: dict[int, int] = {}
+    # Keyed by payload index: every item owns its own task, even for identical payloads.
+    in_flight: dict[int, dict[str, Any]] = {}
+    fetching: dict[Future, dict[str, Any]] = {}
+    # Scheduler ticket requested for the payload at the head of the queue.
+    slot_ticket: dict[str, Any] | None = None
+    next_create_at = 0.0
+    next_poll_at = 0.0
+    last_log_time = time.time()
+
+    def _result(index: int, task_id: str | None, record: Any = None, output: Any = None, error: Any = None):
+        return {"index": index, "task_id": task_id, "record": record, "output": output, "error": error}
+
+    def _finish(index: int) -> dict[str, Any]:
+        task = in_flight.pop(index)
+        _release_task_slot(task["ticket"])
+        return task
+
+    def _failed(index: int, task_id: str, record: Any, error: Any) -> dict[str, Any]:
+        _journal_release(task_id)
+        return _result(index, task_id, record=record, error=error)
+
+    try:
+        while queue or in_flight or fetching:
+            # Submit new tasks while there is room in the window, the scheduler grants
+            # a slot, and the rate limiter allows it.
+            while queue and len(in_flight) < max_concurrency and time.time() >= next_create_at:
+                index = queue[0]
+                if slot_ticket is None:
+                    slot_ticket = _request_task_slot(payloads[index].get("model"), priority=priority, owner=owner)
+                if not _wait_for_task_slot(slot_ticket, timeout=0):
+                    break
+                queue.popleft()
+                create_attempts[index] = create_attempts.get(index, 0) + 1
+                try:
+                    task_id, _raw, record = _create_or_resume_task(api_key, payloads[index], log=log)
+                except TransientKieError as exc:
+                    attempt = create_attempts[index]
+                    if attempt >= max_create_attempts:
+                        _release_task_slot(slot_ticket)
+                        slot_ticket = None
+                        yield _result(index, None, error=exc)
+                        continue
+                    delay = rate_limit_backoff_s * attempt
+                    _metric_inc("kie_retries_total", op="createTask")
+                    _log(log, f"Item {index + 1}: createTask throttled ({exc}); pausing submissions for {delay:.1f}s")
+                    # Keep the granted slot: this payload is still next in line.
+                    queue.appendleft(index)
+                    next_create_at = time.time() + delay
+                    break
+                except Exception as exc:
+                    _release_task_slot(slot_ticket)
+                    slot_ticket = None
+                    yield _result(index, None, error=exc)
+                    next_create_at = time.time() + min_create_interval_s
+                    continue
+                ticket, slot_ticket = slot_ticket, None
+                if record is not None:
+                    _release_task_slot(ticket)
+                    future = _submit_fetch(fetch, record)
+                    fetching[future] = {"index": index, "task_id": task_id, "record": record}
+                    continue
+                if _raw:
+                    next_create_at = time.time() + min_create_interval_s
+                in_flight[index] = {"task_id": task_id, "start_time": time.time(), "state": None, "ticket": ticket}
+                _log(log, f"Item {index + 1}/{total}: task created with ID {task_id}")
+
+            now = time.time()
+            periodic_log = log and (now - last_log_time) >= 30.0
+            if periodic_log:
+                last_log_time = now
+                _log(
+                    log,
+                    f"run_many: {len(in_flight)} in flight, {len(queue)} queued, {len(fetching)} downloading",
+                )
+
+            poll_due = bool(in_flight) and time.time() >= next_poll_at
+            if poll_due:
+                next_poll_at = time.time() + interval
+                for index, task in list(in_flight.items()):
+                    task_id = task["task_id"]
+                    elapsed = time.time() - task["start_time"]
+                    if elapsed > effective_timeout_s:
+                        _finish(index)
+                        _telemetry_task_timed_out(task_id)
+                        error = RuntimeError(
+                            f"Task {task_id} timed out after {effective_timeout_s}s "
+                            f"(last state={task['state'] or 'unknown'}, elapsed={elapsed:.1f}s). "
+                            "Try increasing timeout or retry."
+                        )
+                        yield _failed(index, task_id, None, error)
+                        continue
+                    try:
+                        state, data, message_field = _observe_task(api_key, task_id, task["state"])
+                    except TransientKieError as exc:
+                        _metric_inc("kie_retries_total", op="recordInfo")
+                        _log(log, f"Task {task_id} recordInfo error, retrying next round: {exc}")
+                        continue
+                    except Exception as exc:
+                        _finish(index)
+                        yield _failed(index, task_id, None, exc)
+                        continue
+
+                    if log and state != task["state"]:
+                        _log(log, f"Task {task_id} state: {state or 'unknown'} (elapsed={elapsed:.1f}s)")
+                    task["state"] = state
+                    if state == "success":
+                        _finish(index)
+                        future = _submit_fetch(fetch, data)
+                        fetching[future] = {"index": index, "task_id": task_id, "record": data}
+                    elif state == "fail":
+                        _finish(index)
+                        yield _failed(index, task_id, data, _task_failure_error(task_id, data, message_field))
+
+            # Wait for the next polling round (or the next allowed createTask), waking
+            # early whenever a download finishes so its result is yielded immediately,
+            # or when the scheduler grants the slot the next payload is waiting for.
+            wait_s = max(next_poll_at - time.time(), 0.0) if in_flight else None
+            waiting_for_slot = False
+            if queue and len(in_flight) < max_concurrency:
+                create_wait_s = max(next_create_at - time.time(), 0.0)
+                waiting_for_slot = create_wait_s == 0.0 and slot_ticket is not None
+                if not waiting_for_slot:
+                    wait_s = create_wait_s if wait_s is None else min(wait_s, create_wait_s)
+            _raise_if_interrupted()
+            if fetching or waiting_for_slot:
+                # Wake at least every CANCEL_CHECK_INTERVAL_S to notice ComfyUI interrupts.
+                wait_s = CANCEL_CHECK_INTERVAL_S if wait_s is None else min(wait_s, CANCEL_CHECK_INTERVAL_S)
+            if fetching:
+                done, _not_done = wait(list(fetching), timeout=wait_s, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = fetching.pop(future)
+                    try:
+                        output = future.result()
+                    except Exception as exc:
+                        yield _failed(item["index"], item["task_id"], item["record"], exc)
+                        continue
+                    if not defer_delivery:
+                        _journal_record_delivered(item["task_id"])
+                        _journal_release(item["task_id"])
+                    yield _result(item["index"], item["task_id"], record=item["record"], output=output)
+            elif waiting_for_slot:
+                _wait_for_task_slot(slot_ticket, wait_s)
+            elif wait_s:
+                _interruptible_sleep(wait_s)
+    finally:
+        # Also runs when the caller stops iterating early: give back every slot, and
+        # leave unfinished tasks to be re-attached by a re-run.
+        _release_task_slot(slot_ticket)
+        for task in in_flight.values():
+            _release_task_slot(task["ticket"])
+            _journal_release(task["task_id"])
+        for item in fetching.values():
+            _journal_release(item["task_id"])
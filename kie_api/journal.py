@@ -0,0 +1,334 @@
+"""Crash-safe journal of created KIE tasks.
+
+Every task created through the shared job engine is appended to a JSON-lines file
+(`config/kie_jobs.jsonl`) together with its model, a canonical payload hash, and the
+ComfyUI prompt/node that owns it. State changes and result URLs are appended as the
+task is polled, and a task is marked delivered once its outputs reached a node.
+
+The journal only resumes work that was cut short. After a ComfyUI restart or an
+interrupted node, re-executing an identical request re-attaches to the
+still-running task, or reuses the results of a task that succeeded but was never
+delivered, instead of paying for a new createTask. A task some caller in this
+process is still waiting for is claimed and never handed to a second request, and
+delivered results are never reused, so running an identical request again (or
+twice in one batch) creates new generations. The only exception is opt-in task
+sharing (KIE_SINGLEFLIGHT=1, see singleflight.py), where identical requests that
+run at the same time share one task.
+
+Uploaded reference files get a new URL on every upload, so payload hashes replace
+URLs of files uploaded in this process by the SHA-256 of their content.
+
+Environment:
+- KIE_JOB_JOURNAL=0 disables the journal.
+- KIE_JOB_JOURNAL_PATH overrides the journal file location.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+
+JOURNAL_PATH = Path(__file__).resolve().parent.parent / "config" / "kie_jobs.jsonl"
+# Undelivered results are reused for a day; KIE result URLs stay valid well beyond that.
+RESULT_REUSE_TTL_S = 24 * 3600
+# Unfinished tasks older than this are not re-attached (matches the default async timeout).
+REATTACH_MAX_AGE_S = 2000
+# Entries older than this are dropped when the journal is compacted on load.
+RETENTION_S = 7 * 24 * 3600
+MAX_UPLOAD_FINGERPRINTS = 4096
+# "abandoned" marks the losing task of a hedged pair; it is never reused.
+TERMINAL_STATES = {"success", "fail", "abandoned"}
+MAX_LATENCY_SAMPLES = 200
+
+_lock = threading.Lock()
+_entries: dict[str, dict[str, Any]] | None = None
+# Payload hash -> ids of its tasks, oldest first.
+_task_by_hash: dict[str, list[str]] = {}
+# Tasks a caller in this process is polling or fetching; the rest are orphans.
+_claimed: set[str] = set()
+_upload_fingerprints: "OrderedDict[str, str]" = OrderedDict()
+
+
+def _journal_enabled() -> bool:
+    return os.environ.get("KIE_JOB_JOURNAL", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _journal_path() -> Path:
+    override = os.environ.get("KIE_JOB_JOURNAL_PATH", "").strip()
+    return Path(override) if override else JOURNAL_PATH
+
+
+def _remember_upload(url: str, content: bytes) -> None:
+    """Record the content hash of an uploaded file so payload hashes survive re-uploads."""
+    digest = hashlib.sha256(content).hexdigest()
+    with _lock:
+        _upload_fingerprints[url] = digest
+        _upload_fingerprints.move_to_end(url)
+        while len(_upload_fingerprints) > MAX_UPLOAD_FINGERPRINTS:
+            _upload_fingerprints.popitem(last=False)
+
+
+def _canonicalize(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {str(key): _canonicalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonicalize(item) for item in value]
+    if isinstance(value, str):
+        digest = _upload_fingerprints.get(value)
+        return f"upload:sha256:{digest}" if digest else value
+    return value
+
+
+def _payload_hash(payload: dict[str, Any]) -> str:
+    """Return a stable hash of a createTask payload (uploaded URLs replaced by content hashes)."""
+    with _lock:
+        canonical = _canonicalize(payload)
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _current_owner() -> dict[str, Any]:
+    """Best-effort ComfyUI prompt/node ids for the node currently executing."""
+    try:
+        from server import PromptServer
+
+        instance = PromptServer.instance
+        return {
+            "prompt_id": getattr(instance, "last_prompt_id", None),
+            "node_id": getattr(instance, "last_node_id", None),
+        }
+    except Exception:
+        return {}
+
+
+def _apply_event(entries: dict[str, dict[str, Any]], event: dict[str, Any]) -> None:
+    task_id = event.get("task_id")
+    if not task_id:
+        return
+    if event.get("event") == "created":
+        entries[task_id] = {
+            "task_id": task_id,
+            "model": event.get("model"),
+            "payload_hash": event.get("payload_hash"),
+            "owner": event.get("owner") or {},
+            "created_at": event.get("ts") or 0.0,
+            "updated_at": event.get("ts") or 0.0,
+            "state": "created",
+        }
+        return
+    entry = entries.get(task_id)
+    if entry is None:
+        return
+    if event.get("event") == "delivered":
+        entry["delivered"] = True
+        return
+    entry["state"] = event.get("state") or entry["state"]
+    entry["updated_at"] = event.get("ts") or entry["updated_at"]
+    if "result_json" in event:
+        entry["result_json"] = event["result_json"]
+    if "result_urls" in event:
+        entry["result_urls"] = event["result_urls"]
+
+
+def _load_entries() -> dict[str, dict[str, Any]]:
+    """Load (and compact) the journal once per process. Caller holds _lock."""
+    global _entries
+    if _entries is not None:
+        return _entries
+
+    entries: dict[str, dict[str, Any]] = {}
+    path = _journal_path()
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    _apply_event(entries, json.loads(line))
+                except (json.JSONDecodeError, AttributeError):
+                    # A crash mid-write can leave one truncated line; skip it.
+                    continue
+    except FileNotFoundError:
+        pass
+    except OSError:
+        entries = {}
+
+    cutoff = time.time() - RETENTION_S
+    entries = {task_id: entry for task_id, entry in entries.items() if entry["updated_at"] >= cutoff}
+    _rewrite(path, entries)
+
+    _task_by_hash.clear()
+    for entry in sorted(entries.values(), key=lambda item: item["created_at"]):
+        if entry.get("payload_hash"):
+            _task_by_hash.setdefault(entry["payload_hash"], []).append(entry["task_id"])
+    _entries = entries
+    return entries
+
+
+def _rewrite(path: Path, entries: dict[str, dict[str, Any]]) -> None:
+    """Compact the journal to one created (+ latest state, + delivered) event per live task."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            for entry in entries.values():
+                created = {
+                    "event": "created",
+                    "task_id": entry["task_id"],
+                    "model": entry.get("model"),
+                    "payload_hash": entry.get("payload_hash"),
+                    "owner": entry.get("owner") or {},
+                    "ts": entry["created_at"],
+                }
+                handle.write(json.dumps(created, ensure_ascii=False) + "\n")
+                if entry["state"] != "created":
+                    state = {"event": "state", "task_id": entry["task_id"], "state": entry["state"]}
+                    state["ts"] = entry["updated_at"]
+                    for key in ("result_json", "result_urls"):
+                        if key in entry:
+                            state[key] = entry[key]
+                    handle.write(json.dumps(state, ensure_ascii=False) + "\n")
+                if entry.get("delivered"):
+                    delivered = {"event": "delivered", "task_id": entry["task_id"], "ts": entry["updated_at"]}
+                    handle.write(json.dumps(delivered, ensure_ascii=False) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def _append(event: dict[str, Any], *, durable: bool) -> None:
+    """Append one event. Caller holds _lock."""
+    path = _journal_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(event, ensure_ascii=False) + "\n")
+            if durable:
+                handle.flush()
+                os.fsync(handle.fileno())
+    except OSError:
+        pass
+
+
+def _journal_record_created(task_id: str, payload: dict[str, Any], payload_hash: str) -> None:
+    """Record a new task, claimed by its creator until _journal_release."""
+    if not _journal_enabled():
+        return
+    event = {
+        "event": "created",
+        "task_id": task_id,
+        "model": payload.get("model"),
+        "payload_hash": payload_hash,
+        "owner": _current_owner(),
+        "ts": time.time(),
+    }
+    with _lock:
+        entries = _load_entries()
+        _apply_event(entries, event)
+        _task_by_hash.setdefault(payload_hash, []).append(task_id)
+        _claimed.add(task_id)
+        _append(event, durable=True)
+
+
+def _journal_record_state(task_id: str, state: Any, record_data: dict[str, Any] | None = None) -> None:
+    """Record a state change for a journaled task (no-op for tasks the journal does not know)."""
+    if not _journal_enabled() or not state:
+        return
+    with _lock:
+        entries = _load_entries()
+        entry = entries.get(task_id)
+        if entry is None or entry["state"] == state:
+            return
+        event: dict[str, Any] = {"event": "state", "task_id": task_id, "state": state, "ts": time.time()}
+        if state == "success" and record_data is not None and record_data.get("resultJson"):
+            event["result_json"] = record_data["resultJson"]
+            try:
+                event["result_urls"] = json.loads(record_data["resultJson"]).get("resultUrls")
+            except (TypeError, ValueError, AttributeError):
+                pass
+        _apply_event(entries, event)
+        if state != "success" and state in TERMINAL_STATES:
+            _claimed.discard(task_id)
+        _append(event, durable=state in TERMINAL_STATES)
+
+
+def _journal_record_delivered(task_id: str) -> None:
+    """Mark a task's outputs as delivered, so its results are never reused."""
+    if not _journal_enabled():
+        return
+    with _lock:
+        entries = _load_entries()
+        entry = entries.get(task_id)
+        if entry is None or entry.get("delivered"):
+            return
+        event = {"event": "delivered", "task_id": task_id, "ts": time.time()}
+        _apply_event(entries, event)
+        _append(event, durable=True)
+
+
+def _journal_release(task_id: str | None) -> None:
+    """Give up the claim on a task once its caller stops waiting for it."""
+    if task_id is None:
+        return
+    with _lock:
+        _claimed.discard(task_id)
+
+
+def _journal_lookup(payload_hash: str) -> dict[str, Any] | None:
+    """Claim and return an orphaned journal entry for this payload hash, if any.
+
+    Only tasks no caller in this process has claimed are considered: a task that
+    succeeded but was never delivered is reusable for RESULT_REUSE_TTL_S, and an
+    unfinished task can be re-attached for REATTACH_MAX_AGE_S. Failed, abandoned
+    and delivered tasks are never reused. The caller releases the claim with
+    _journal_release.
+    """
+    if not _journal_enabled():
+        return None
+    with _lock:
+        entries = _load_entries()
+        now = time.time()
+        for task_id in reversed(_task_by_hash.get(payload_hash, ())):
+            entry = entries.get(task_id)
+            if entry is None or task_id in _claimed or entry.get("delivered"):
+                continue
+            age = now - entry["created_at"]
+            reusable = entry["state"] == "success" and entry.get("result_json") and age <= RESULT_REUSE_TTL_S
+            if reusable or (entry["state"] not in TERMINAL_STATES and age <= REATTACH_MAX_AGE_S):
+                _claimed.add(task_id)
+                return dict(entry)
+        return None
+
+
+def _journal_record_from_entry(entry: dict[str, Any]) -> dict[str, Any]:
+    """Build a recordInfo-shaped dict from a completed journal entry."""
+    return {
+        "taskId": entry["task_id"],
+        "model": entry.get("model"),
+        "state": "success",
+        "resultJson": entry["result_json"],
+    }
+
+
+def _journal_latencies(model: str) -> list[float]:
+    """Create-to-success latencies (seconds) of the most recent successful tasks of a model."""
+    if not _journal_enabled():
+        return []
+    with _lock:
+        entries = _load_entries()
+        completed = [
+            entry
+            for entry in entries.values()
+            if entry.get("model") == model and entry["state"] == "success" and "result_json" in entry
+        ]
+    completed.sort(key=lambda entry: entry["updated_at"])
+    return [
+        entry["updated_at"] - entry["created_at"]
+        for entry in completed[-MAX_LATENCY_SAMPLES:]
+        if entry["updated_at"] >= entry["created_at"]
+    ]
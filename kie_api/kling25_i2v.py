@@ -1,23 +1,21 @@
 """Kling 2.5 Turbo Image-to-Video Pro helper."""
 
-import time
 from typing import Any, Callable
 
 import torch
 
 from .auth import _load_api_key
-from .credits import _log_remaining_credits
-from .jobs import _create_task, _poll_task_until_complete
+from .jobs import _run_task
 from .log import _log
-from .results import _extract_result_urls
+from .options import KLING25_DURATION_OPTIONS as DURATION_OPTIONS
+from .profiling import _profiled
 from .upload import _image_tensor_to_png_bytes, _truncate_url, _upload_image
 from .validation import _validate_prompt
-from .video import _download_video, _video_bytes_to_comfy_video
+from .video import _fetch_result_video
 
 
 MODEL_NAME = "kling/v2-5-turbo-image-to-video-pro"
 PROMPT_MAX_LENGTH = 1000
-DURATION_OPTIONS = ["5", "10"]
 
 
 def _validate_options(duration: str, cfg_scale: float) -> None:
@@ -43,6 +41,7 @@ def _validate_image_input(images: torch.Tensor | None, *, label: str, required:
     return images
 
 
+@_profiled
 def run_kling25_i2v_job(
     image: torch.Tensor,
     tail_image: torch.Tensor | None,
@@ -91,28 +90,14 @@ def run_kling25_i2v_job(
     payload = {"model": MODEL_NAME, "input": payload_input}
 
     _log(log, "Creating Kling 2.5 I2V Pro task...")
-    start_time = time.time()
-    task_id, create_response_text = _create_task(api_key, payload)
-    _log(log, f"createTask response (elapsed={time.time() - start_time:.1f}s): {create_response_text}")
-    _log(log, f"Task created with ID {task_id}. Polling for completion...")
     _log(log, "Check https://kie.ai/logs for request status if needed.")
-
     effective_timeout = 1000 if timeout_seconds is None else timeout_seconds
-    record_data = _poll_task_until_complete(
+    video_output, _record_data, _task_id = _run_task(
         api_key,
-        task_id,
-        10.0,
-        effective_timeout,
-        log,
-        start_time,
+        payload,
+        fetch=lambda record_data: _fetch_result_video(record_data, log),
+        poll_interval_s=10.0,
+        timeout_s=effective_timeout,
+        log=log,
     )
-
-    result_urls = _extract_result_urls(record_data)
-    video_url = result_urls[0]
-    _log(log, f"Final video URL: {video_url}")
-
-    video_bytes = _download_video(video_url)
-    video_output = _video_bytes_to_comfy_video(video_bytes)
-
-    _log_remaining_credits(log, record_data, api_key, _log)
     return video_output
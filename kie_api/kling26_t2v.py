@@ -1,23 +1,22 @@
 """Kling 2.6 text-to-video helper."""
 
-import time
-
 from .auth import _load_api_key
-from .credits import _log_remaining_credits
-from .jobs import _poll_task_until_complete
-from .jobs import _create_task
+from .jobs import _run_task
 from .log import _log
-from .results import _extract_result_urls
+from .options import (
+    KLING26_T2V_ASPECT_RATIO_OPTIONS as ASPECT_RATIO_OPTIONS,
+    KLING26_T2V_DURATION_OPTIONS as DURATION_OPTIONS,
+)
+from .profiling import _profiled
 from .validation import _validate_prompt
-from .video import _download_video, _video_bytes_to_comfy_video
+from .video import _fetch_result_video
 
 
 MODEL_NAME = "kling-2.6/text-to-video"
 PROMPT_MAX_LENGTH = 2500
-ASPECT_RATIO_OPTIONS = ["1:1", "16:9", "9:16"]
-DURATION_OPTIONS = ["5", "10"]
 
 
+@_profiled
 def run_kling26_t2v_video(
     prompt: str,
     sound: bool,
@@ -48,31 +47,18 @@ def run_kling26_t2v_video(
     }
 
     _log(log, "Creating Kling 2.6 T2V task...")
-    start_time = time.time()
-    task_id, create_response_text = _create_task(api_key, payload)
-    _log(log, f"createTask response (elapsed={time.time() - start_time:.1f}s): {create_response_text}")
-    _log(log, f"Task created with ID {task_id}. Polling for completion...")
-
-    record_data = _poll_task_until_complete(
+    video_output, _record_data, _task_id = _run_task(
         api_key,
-        task_id,
-        poll_interval_s,
-        timeout_s,
-        log,
-        start_time,
+        payload,
+        fetch=lambda record_data: _fetch_result_video(record_data, log),
+        poll_interval_s=poll_interval_s,
+        timeout_s=timeout_s,
+        log=log,
     )
-
-    result_urls = _extract_result_urls(record_data)
-    video_url = result_urls[0]
-    _log(log, f"Final video URL: {video_url}")
-
-    video_bytes = _download_video(video_url)
-    video_output = _video_bytes_to_comfy_video(video_bytes)
-
-    _log_remaining_credits(log, record_data, api_key, _log)
     return video_output
 
 
+@_profiled
 def run_kling26_t2v(
     prompt: str,
     sound: bool = False,
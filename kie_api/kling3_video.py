@@ -1,31 +1,39 @@
 """Kling 3.0 video helpers and element preparation."""
 
+import hashlib
 import re
-import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import torch
 
 from .auth import _load_api_key
-from .credits import _log_remaining_credits
-from .jobs import _create_task, _poll_task_until_complete
+from .cancel import _wait_future
+from .jobs import _run_task
 from .log import _log
-from .results import _extract_result_urls
+from .options import (
+    KLING3_MODE_OPTIONS as MODE_OPTIONS,
+    KLING3_ASPECT_RATIO_OPTIONS as ASPECT_RATIO_OPTIONS,
+    KLING3_DURATION_OPTIONS as DURATION_OPTIONS,
+)
+from .profiling import _profiled
+from .task_handle import submit_task
 from .upload import _image_tensor_to_png_bytes, _truncate_url, _upload_image, _upload_video
 from .validation import _validate_prompt
-from .video import _coerce_video_to_mp4_bytes, _download_video, _video_bytes_to_comfy_video
+from .video import _coerce_video_to_mp4_bytes, _fetch_result_video
 
 
 MODEL_NAME = "kling-3.0/video"
-MODE_OPTIONS = ["std", "pro"]
-ASPECT_RATIO_OPTIONS = ["1:1", "9:16", "16:9"]
-DURATION_OPTIONS = [str(i) for i in range(3, 16)]
 MULTI_SHOT_MIN = 1
 MULTI_SHOT_MAX = 12
 PROMPT_MAX_LENGTH = 2500
 ELEMENT_IMAGE_MIN = 2
 ELEMENT_IMAGE_MAX = 4
 ELEMENT_BATCH_MAX = 9
+ELEMENT_UPLOAD_WORKERS = 6
+# Deferred element media; replaced by uploaded URLs in _build_kling3_payload.
+PENDING_IMAGES_KEY = "_pending_images"
+PENDING_VIDEO_KEY = "_pending_video"
 
 
 def _validation_error(message: str) -> RuntimeError:
@@ -98,7 +106,12 @@ def build_kling3_element(
     video: Any | None,
     log: bool,
 ) -> dict[str, Any]:
-    """Build one Kling element with uploaded URLs for image or video."""
+    """Validate one Kling element and return its descriptor.
+
+    Media is not uploaded here: the descriptor carries the image batch (or video
+    bytes) under a private key, and `_build_kling3_payload` uploads the media of all
+    elements concurrently right before the task is created.
+    """
     element_name = (name or "").strip()
     if not element_name:
         raise _validation_error("Element name is required.")
@@ -114,7 +127,6 @@ def build_kling3_element(
     if not has_images and not has_video:
         raise _validation_error("Element requires either images or video.")
 
-    api_key = _load_api_key()
     description_text = (description or "").strip()
 
     if has_images:
@@ -124,33 +136,112 @@ def build_kling3_element(
             raise _validation_error(
                 f"Element images must contain {ELEMENT_IMAGE_MIN}-{ELEMENT_IMAGE_MAX} images; got {image_count}."
             )
-
-        image_urls: list[str] = []
-        _log(log, f"Uploading {image_count} element image(s) for '{element_name}'...")
-        for idx in range(image_count):
-            png_bytes = _image_tensor_to_png_bytes(image_batch[idx])
-            image_url = _upload_image(api_key, png_bytes)
-            image_urls.append(image_url)
-            _log(log, f"Element image {idx + 1} upload success: {_truncate_url(image_url)}")
-
-        payload: dict[str, Any] = {
+        _log(log, f"Element '{element_name}': {image_count} image(s) queued for upload with the Kling 3.0 task.")
+        return {
             "name": element_name,
             "description": description_text,
-            "element_input_urls": image_urls,
+            "element_input_urls": [],
+            PENDING_IMAGES_KEY: image_batch,
         }
-        return payload
 
     video_bytes, source = _coerce_video_to_mp4_bytes(video)
-    _log(log, f"Uploading element video for '{element_name}' ({source})...")
-    video_url = _upload_video(api_key, video_bytes, filename=f"{element_name}.mp4")
-    _log(log, f"Element video upload success: {_truncate_url(video_url)}")
+    _log(log, f"Element '{element_name}': video ({source}) queued for upload with the Kling 3.0 task.")
     return {
         "name": element_name,
         "description": description_text,
-        "element_input_video_urls": [video_url],
+        "element_input_video_urls": [],
+        PENDING_VIDEO_KEY: video_bytes,
     }
 
 
+def kling3_element_preview(element: dict[str, Any]) -> dict[str, Any]:
+    """Return a JSON-safe view of an element, with placeholders for media not uploaded yet."""
+    preview = {key: value for key, value in element.items() if key not in (PENDING_IMAGES_KEY, PENDING_VIDEO_KEY)}
+    if PENDING_IMAGES_KEY in element:
+        count = element[PENDING_IMAGES_KEY].shape[0]
+        preview["element_input_urls"] = [f"<image {idx + 1}: uploaded at generation>" for idx in range(count)]
+    if PENDING_VIDEO_KEY in element:
+        preview["element_input_video_urls"] = ["<video: uploaded at generation>"]
+    return preview
+
+
+def _upload_kling3_media(
+    api_key: str,
+    *,
+    frames: list[torch.Tensor],
+    elements: list[dict[str, Any]],
+    log: bool,
+) -> tuple[list[str], list[dict[str, Any]]]:
+    """Upload frame images and deferred element media concurrently.
+
+    PNG encoding and uploads run on a short-lived pool of ELEMENT_UPLOAD_WORKERS
+    threads. Identical files (the same reference image used by several elements,
+    or as a frame) are uploaded once and share one URL.
+
+    Returns:
+        (frame_urls, elements) where every element has its URL lists filled in.
+        Input element dicts are not modified.
+    """
+    image_tensors: list[torch.Tensor] = list(frames)
+    element_slots: list[tuple[int, str, list[int]]] = []
+    videos: list[tuple[bytes, str]] = []
+    for element_index, element in enumerate(elements):
+        if PENDING_IMAGES_KEY in element:
+            batch = element[PENDING_IMAGES_KEY]
+            first = len(image_tensors)
+            image_tensors.extend(batch[idx] for idx in range(batch.shape[0]))
+            element_slots.append((element_index, "images", list(range(first, len(image_tensors)))))
+        elif PENDING_VIDEO_KEY in element:
+            videos.append((element[PENDING_VIDEO_KEY], f"{element['name']}.mp4"))
+            element_slots.append((element_index, "video", [len(videos) - 1]))
+
+    if not image_tensors and not videos:
+        return [], list(elements)
+
+    with ThreadPoolExecutor(max_workers=ELEMENT_UPLOAD_WORKERS) as executor:
+        png_files = list(executor.map(_image_tensor_to_png_bytes, image_tensors))
+        files = [("image", png, "") for png in png_files] + [
+            ("video", video_bytes, filename) for video_bytes, filename in videos
+        ]
+        digests = [hashlib.sha256(content).hexdigest() for _kind, content, _filename in files]
+        unique: dict[str, tuple[str, bytes, str]] = {}
+        for digest, file_info in zip(digests, files):
+            unique.setdefault(digest, file_info)
+
+        _log(
+            log,
+            f"Uploading {len(files)} Kling 3.0 file(s) ({len(unique)} unique) "
+            f"with up to {ELEMENT_UPLOAD_WORKERS} parallel uploads...",
+        )
+        futures = {
+            digest: (
+                executor.submit(_upload_image, api_key, content)
+                if kind == "image"
+                else executor.submit(_upload_video, api_key, content, filename=filename)
+            )
+            for digest, (kind, content, filename) in unique.items()
+        }
+        url_by_digest = {digest: _wait_future(future) for digest, future in futures.items()}
+
+    urls = [url_by_digest[digest] for digest in digests]
+    image_urls, video_urls = urls[: len(png_files)], urls[len(png_files) :]
+    _log(log, f"Kling 3.0 uploads complete ({len(unique)} file(s)).")
+
+    resolved = list(elements)
+    for element_index, kind, slots in element_slots:
+        element = {
+            key: value
+            for key, value in elements[element_index].items()
+            if key not in (PENDING_IMAGES_KEY, PENDING_VIDEO_KEY)
+        }
+        if kind == "images":
+            element["element_input_urls"] = [image_urls[slot] for slot in slots]
+        else:
+            element["element_input_video_urls"] = [video_urls[slot] for slot in slots]
+        resolved[element_index] = element
+    return image_urls[: len(frames)], resolved
+
+
 def merge_kling3_elements(*elements: Any) -> list[dict[str, Any]]:
     """Merge up to the supported max element payloads."""
     merged: list[dict[str, Any]] = []
@@ -188,7 +279,7 @@ def _build_kling3_payload(
     elements: list[dict[str, Any]] | None,
     log: bool,
 ) -> tuple[dict[str, Any], str]:
-    """Build Kling 3.0 createTask payload after validation/uploads.
+    """Build Kling 3.0 createTask payload; uploads run after all validation passes.
 
     Returns:
         (payload, resolved_duration)
@@ -200,17 +291,15 @@ def _build_kling3_payload(
     if duration not in DURATION_OPTIONS:
         raise _validation_error("Invalid duration. Use 3-15 seconds.")
 
-    api_key = _load_api_key()
-    frame_urls: list[str] = []
+    frames: list[torch.Tensor] = []
+    frame_labels: list[str] = []
 
     if first_frame is not None:
         first_batch = _validate_batch_image(first_frame, "first_frame")
         if first_batch.shape[0] > 1:
             _log(log, f"More than 1 first_frame image provided ({first_batch.shape[0]}); using the first.")
-        _log(log, "Uploading first frame...")
-        first_url = _upload_image(api_key, _image_tensor_to_png_bytes(first_batch[0]))
-        frame_urls.append(first_url)
-        _log(log, f"First frame upload success: {_truncate_url(first_url)}")
+        frames.append(first_batch[0])
+        frame_labels.append("First frame")
 
     if last_frame is not None:
         if multi_shots:
@@ -218,10 +307,8 @@ def _build_kling3_payload(
         last_batch = _validate_batch_image(last_frame, "last_frame")
         if last_batch.shape[0] > 1:
             _log(log, f"More than 1 last_frame image provided ({last_batch.shape[0]}); using the first.")
-        _log(log, "Uploading last frame...")
-        last_url = _upload_image(api_key, _image_tensor_to_png_bytes(last_batch[0]))
-        frame_urls.append(last_url)
-        _log(log, f"Last frame upload success: {_truncate_url(last_url)}")
+        frames.append(last_batch[0])
+        frame_labels.append("Last frame")
 
     payload_input: dict[str, Any] = {
         "mode": mode,
@@ -250,9 +337,6 @@ def _build_kling3_payload(
         payload_input["multi_prompt"] = multi_prompt
     payload_input["duration"] = resolved_duration
 
-    if frame_urls:
-        payload_input["image_urls"] = frame_urls
-
     # Always include aspect_ratio; Kling 3.0 createTask may require this field.
     payload_input["aspect_ratio"] = aspect_ratio
 
@@ -261,7 +345,7 @@ def _build_kling3_payload(
         for shot in payload_input.get("multi_prompt", []):
             referenced |= _extract_referenced_elements(str(shot.get("prompt") or ""))
 
-    if referenced and not frame_urls:
+    if referenced and not frames:
         raise _validation_error(
             "Prompt uses @element references but no first_frame/image_urls were provided. "
             "Connect first_frame when using elements."
@@ -270,8 +354,6 @@ def _build_kling3_payload(
     if elements:
         if len(elements) > ELEMENT_BATCH_MAX:
             raise _validation_error(f"At most {ELEMENT_BATCH_MAX} elements are supported in this node.")
-        payload_input["kling_elements"] = elements
-
         available = {str(item.get("name") or "").strip() for item in elements}
         missing = sorted(ref for ref in referenced if ref not in available)
         if missing:
@@ -284,6 +366,16 @@ def _build_kling3_payload(
             "Add KIE Kling Elements + KIE Kling Elements Batch inputs."
         )
 
+    # Everything is validated; upload frames and element media in one concurrent pass.
+    api_key = _load_api_key()
+    frame_urls, resolved_elements = _upload_kling3_media(api_key, frames=frames, elements=elements or [], log=log)
+    if frame_urls:
+        payload_input["image_urls"] = frame_urls
+        for label, url in zip(frame_labels, frame_urls):
+            _log(log, f"{label} upload success: {_truncate_url(url)}")
+    if resolved_elements:
+        payload_input["kling_elements"] = resolved_elements
+
     payload = {"model": MODEL_NAME, "input": payload_input}
     return payload, resolved_duration
 
@@ -319,6 +411,7 @@ def preflight_kling3_payload(
     return payload
 
 
+@_profiled
 def run_kling3_video_payload(
     *,
     mode: str,
@@ -349,6 +442,7 @@ def run_kling3_video_payload(
     )
 
 
+@_profiled
 def run_kling3_video(
     *,
     mode: str,
@@ -387,14 +481,8 @@ def run_kling3_video(
     )
 
 
-def run_kling3_video_from_request(
-    *,
-    payload: dict[str, Any],
-    poll_interval_s: float,
-    timeout_s: int,
-    log: bool,
-) -> Any:
-    """Submit a prebuilt Kling 3.0 createTask payload and return VIDEO output."""
+def _normalize_kling3_request(payload: dict[str, Any]) -> dict[str, Any]:
+    """Validate a prebuilt Kling 3.0 createTask payload and apply compatibility fixes."""
     if not isinstance(payload, dict):
         raise _validation_error("request payload must be an object.")
     if payload.get("model") != MODEL_NAME:
@@ -414,28 +502,33 @@ def run_kling3_video_from_request(
         payload_input = dict(payload_input)
         payload_input["sound"] = True
         payload["input"] = payload_input
+    return payload
+
+
+def submit_kling3_video_from_request(*, payload: dict[str, Any], log: bool) -> dict[str, Any]:
+    """Create a Kling 3.0 task from a prebuilt payload and return a KIE_TASK handle."""
+    return submit_task(_normalize_kling3_request(payload), output_kind="video", label="Kling 3.0 video", log=log)
+
+
+@_profiled
+def run_kling3_video_from_request(
+    *,
+    payload: dict[str, Any],
+    poll_interval_s: float,
+    timeout_s: int,
+    log: bool,
+) -> Any:
+    """Submit a prebuilt Kling 3.0 createTask payload and return VIDEO output."""
+    payload = _normalize_kling3_request(payload)
 
     _log(log, "Creating Kling 3.0 video task...")
-    start_time = time.time()
     api_key = _load_api_key()
-    task_id, create_response_text = _create_task(api_key, payload)
-    _log(log, f"createTask response (elapsed={time.time() - start_time:.1f}s): {create_response_text}")
-    _log(log, f"Task created with ID {task_id}. Polling for completion...")
-
-    record_data = _poll_task_until_complete(
+    video_output, _record_data, _task_id = _run_task(
         api_key,
-        task_id,
-        poll_interval_s,
-        timeout_s,
-        log,
-        start_time,
+        payload,
+        fetch=lambda record_data: _fetch_result_video(record_data, log),
+        poll_interval_s=poll_interval_s,
+        timeout_s=timeout_s,
+        log=log,
     )
-    result_urls = _extract_result_urls(record_data)
-    video_url = result_urls[0]
-    _log(log, f"Final video URL: {video_url}")
-
-    video_bytes = _download_video(video_url)
-    video_output = _video_bytes_to_comfy_video(video_bytes)
-
-    _log_remaining_credits(log, record_data, api_key, _log)
     return video_output
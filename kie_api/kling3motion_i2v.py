@@ -7,19 +7,20 @@ from typing import Any
 import torch
 
 from .auth import _load_api_key
-from .credits import _log_remaining_credits
-from .jobs import _create_task, _poll_task_until_complete
+from .jobs import _run_task
 from .log import _log
-from .results import _extract_result_urls
+from .options import (
+    KLING3MOTION_CHARACTER_ORIENTATION_OPTIONS as CHARACTER_ORIENTATION_OPTIONS,
+    KLING3MOTION_MODE_OPTIONS as MODE_OPTIONS,
+)
+from .profiling import _profiled
 from .upload import _image_tensor_to_png_bytes, _truncate_url, _upload_image, _upload_video
 from .validation import _validate_image_tensor_batch
-from .video import _coerce_video_to_mp4_bytes, _download_video, _video_bytes_to_comfy_video
+from .video import _coerce_video_to_mp4_bytes, _fetch_result_video
 
 
 MODEL_NAME = "kling-3.0/motion-control"
 PROMPT_MAX_LENGTH = 2500
-CHARACTER_ORIENTATION_OPTIONS = ["image", "video"]
-MODE_OPTIONS = ["720p", "1080p"]
 MODE_ALIASES = {"std": "720p", "pro": "1080p"}
 IMAGE_MIN_EDGE_PX = 301
 IMAGE_MIN_ASPECT_RATIO = 2.0 / 5.0
@@ -83,6 +84,7 @@ def _build_motion_upload_filename(video_bytes: bytes) -> tuple[str, str]:
     return filename, fingerprint
 
 
+@_profiled
 def run_kling3motion_i2v_video(
     prompt: str,
     images: torch.Tensor,
@@ -137,31 +139,18 @@ def run_kling3motion_i2v_video(
     }
 
     _log(log, "Creating Kling 3.0 Motion I2V task...")
-    start_time = time.time()
-    task_id, create_response_text = _create_task(api_key, payload)
-    _log(log, f"createTask response (elapsed={time.time() - start_time:.1f}s): {create_response_text}")
-    _log(log, f"Task created with ID {task_id}. Polling for completion...")
-
-    record_data = _poll_task_until_complete(
+    video_output, _record_data, _task_id = _run_task(
         api_key,
-        task_id,
-        poll_interval_s,
-        timeout_s,
-        log,
-        start_time,
+        payload,
+        fetch=lambda record_data: _fetch_result_video(record_data, log),
+        poll_interval_s=poll_interval_s,
+        timeout_s=timeout_s,
+        log=log,
     )
-
-    result_urls = _extract_result_urls(record_data)
-    result_video_url = result_urls[0]
-    _log(log, f"Final video URL: {result_video_url}")
-
-    result_video_bytes = _download_video(result_video_url)
-    video_output = _video_bytes_to_comfy_video(result_video_bytes)
-
-    _log_remaining_credits(log, record_data, api_key, _log)
     return video_output
 
 
+@_profiled
 def run_kling3motion_i2v(
     prompt: str,
     images: torch.Tensor,
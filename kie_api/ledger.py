@@ -0,0 +1,214 @@
+"""Credit ledger: cached balance, per-model spend, and spend history.
+
+The account balance is kept in memory and refreshed from the `remainedCredits`
+field of every finished task record, so remaining-credits lookups during a batch
+cost nothing. The drop in balance since the previous observation is attributed
+to the task that finished, labeled by model, and each finished task is appended
+to a JSON-lines spend history (`config/kie_spend.jsonl`).
+
+The cached balance belongs to the API key that reported it; after the key in
+`config/kie_key.txt` changes, the next lookup goes to the API again.
+
+The balance is account-wide: when tasks of different models finish close together,
+or another client uses the same key, a drop is attributed to whichever task
+reported it first. Per-model totals are exact for single-model batches and
+approximate otherwise; the overall total is always exact. Records without
+`remainedCredits` (Suno) are logged with no cost.
+
+Environment:
+- KIE_CREDITS_TTL_S: how long a cached balance is used before
+  KIE_GetRemainingCredits queries the API again (default 300).
+- KIE_SPEND_HISTORY=0 disables the spend history file.
+- KIE_SPEND_HISTORY_PATH overrides its location.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from .metrics import _metric_inc
+
+
+SPEND_HISTORY_PATH = Path(__file__).resolve().parent.parent / "config" / "kie_spend.jsonl"
+DEFAULT_CREDITS_TTL_S = 300.0
+MAX_RECORDED_TASKS = 4096
+# Tasks per hour is not reported for histories shorter than this.
+MIN_RATE_WINDOW_S = 600.0
+
+_lock = threading.Lock()
+_balance: float | None = None
+_balance_at = 0.0
+# SHA-256 of the API key _balance belongs to.
+_balance_key: str | None = None
+_session_spend: dict[str, dict[str, float]] = {}
+# Tasks already in the ledger; a task re-attached after an interrupt is counted once.
+_recorded_tasks: "OrderedDict[str, None]" = OrderedDict()
+
+
+def _credits_ttl_s() -> float:
+    try:
+        return max(float(os.environ.get("KIE_CREDITS_TTL_S", DEFAULT_CREDITS_TTL_S)), 0.0)
+    except ValueError:
+        return DEFAULT_CREDITS_TTL_S
+
+
+def _history_enabled() -> bool:
+    return os.environ.get("KIE_SPEND_HISTORY", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _history_path() -> Path:
+    override = os.environ.get("KIE_SPEND_HISTORY_PATH", "").strip()
+    return Path(override) if override else SPEND_HISTORY_PATH
+
+
+def _key_id(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+def _parse_credits(value: Any) -> float | None:
+    try:
+        return float(value) if value is not None and value != "" else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _ledger_balance(api_key: str, max_age_s: float | None = None) -> tuple[float, float] | None:
+    """Return (balance, age in seconds) if a balance of this key younger than max_age_s is cached."""
+    if max_age_s is None:
+        max_age_s = _credits_ttl_s()
+    with _lock:
+        if _balance is None or _balance_key != _key_id(api_key):
+            return None
+        age = time.time() - _balance_at
+        return (_balance, age) if age <= max_age_s else None
+
+
+def _ledger_set_balance(balance: Any, api_key: str) -> None:
+    """Store a balance read from the credits endpoint (no spend is attributed)."""
+    global _balance, _balance_at, _balance_key
+    value = _parse_credits(balance)
+    if value is None:
+        return
+    with _lock:
+        _balance, _balance_at, _balance_key = value, time.time(), _key_id(api_key)
+
+
+def _record_duration_s(record_data: dict[str, Any]) -> float | None:
+    """Task run time from the record's createTime/completeTime (epoch ms), if present."""
+    created = _parse_credits(record_data.get("createTime"))
+    completed = _parse_credits(record_data.get("completeTime"))
+    if created is None or completed is None or completed < created:
+        return None
+    return round((completed - created) / 1000.0, 3)
+
+
+def _ledger_task_finished(
+    task_id: str,
+    state: Any,
+    record_data: dict[str, Any] | None,
+    *,
+    api_key: str | None = None,
+    model: Any = None,
+) -> None:
+    """Update the balance from a finished task record and log the task's spend.
+
+    Called on every observed state change; states other than "success" and "fail"
+    are ignored. `api_key` is the key the task ran under; without it the record's
+    balance is not cached. `model` defaults to the record's own `model` field.
+    """
+    global _balance, _balance_at, _balance_key
+    if state not in ("success", "fail"):
+        return
+    record_data = record_data or {}
+    model = str(model or record_data.get("model") or "unknown")
+    remained = _parse_credits(record_data.get("remainedCredits"))
+    now = time.time()
+    cost = None
+    with _lock:
+        if task_id in _recorded_tasks:
+            return
+        _recorded_tasks[task_id] = None
+        while len(_recorded_tasks) > MAX_RECORDED_TASKS:
+            _recorded_tasks.popitem(last=False)
+        if remained is not None and api_key:
+            key_id = _key_id(api_key)
+            # A higher balance than last seen is a top-up, not a negative cost.
+            if _balance is not None and _balance_key == key_id and remained <= _balance:
+                cost = _balance - remained
+            _balance, _balance_at, _balance_key = remained, now, key_id
+        spend = _session_spend.setdefault(model, {"tasks": 0, "failed": 0, "credits": 0.0})
+        spend["tasks"] += 1
+        spend["failed"] += 0 if state == "success" else 1
+        spend["credits"] += cost or 0.0
+    if cost:
+        _metric_inc("kie_credits_spent_total", cost, model=model)
+
+    if not _history_enabled():
+        return
+    event = {
+        "ts": round(now, 3),
+        "task_id": task_id,
+        "model": model,
+        "state": state,
+        "cost": cost,
+        "balance": remained,
+        "duration_s": _record_duration_s(record_data),
+    }
+    path = _history_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with _lock, path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(event, ensure_ascii=False) + "\n")
+    except OSError:
+        pass
+
+
+def _session_spend_by_model() -> dict[str, dict[str, float]]:
+    """Tasks, failures, and attributed credits per model for this process."""
+    with _lock:
+        return {model: dict(spend) for model, spend in _session_spend.items()}
+
+
+def _spend_report(since_s: float | None = None, path: Path | None = None) -> dict[str, dict[str, Any]]:
+    """Summarize the spend history per model.
+
+    Args:
+        since_s: Only include tasks finished in the last `since_s` seconds.
+        path: History file (defaults to the configured one).
+
+    Returns:
+        {model: {tasks, failed, credits, credits_per_task, avg_duration_s, tasks_per_hour}}
+    """
+    cutoff = time.time() - since_s if since_s else 0.0
+    rows: dict[str, list[dict[str, Any]]] = {}
+    try:
+        with (path or _history_path()).open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(event, dict) and (event.get("ts") or 0.0) >= cutoff:
+                    rows.setdefault(str(event.get("model") or "unknown"), []).append(event)
+    except OSError:
+        return {}
+
+    report: dict[str, dict[str, Any]] = {}
+    for model, events in sorted(rows.items()):
+        costs = [event["cost"] for event in events if event.get("cost") is not None]
+        durations = [event["duration_s"] for event in events if event.get("duration_s") is not None]
+        window_s = max(event["ts"] for event in events) - min(event["ts"] for event in events)
+        report[model] = {
+            "tasks": len(events),
+            "failed": sum(1 for event in events if event.get("state") != "success"),
+            "credits": round(sum(costs), 2),
+            "credits_per_task": round(sum(costs) / len(costs), 2) if costs else None,
+            "avg_duration_s": round(sum(durations) / len(durations), 1) if durations else None,
+            "tasks_per_hour": round(len(events) / window_s * 3600.0, 1) if window_s >= MIN_RATE_WINDOW_S else None,
+        }
+    return report
@@ -0,0 +1,203 @@
+"""Memory high-water marks for the video and audio paths.
+
+Video and audio jobs hold whole files in memory, often several copies at once:
+the input file read for upload, the multipart body of the upload request, the
+download buffer and the bytes returned from it, and the decoder's input. With
+KIE_MEMORY=1 each of these stages records, per job:
+
+- the process RSS when the stage started, the highest RSS sampled while it ran,
+  and the growth between the two
+- the file size the stage handled, and the measured size of the large buffers it
+  allocates: the file read (`file`), the encoded multipart request body
+  (`multipart_body`), the download bytearray at its largest, over-allocation
+  included (`download_buffer`) and the bytes copy returned from it (`result`),
+  and the decoded waveform (`waveform`)
+
+and logs one line per stage, e.g.
+
+    [KIE] Memory download (video, 48.0 MB): RSS peak +96.3 MB (2.0x file), largest buffer download_buffer 48.0 MB
+
+Buffers a stage only borrows (the bytes handed to a decoder, an upload shared with
+an identical concurrent request) are not listed.
+
+Stages are also written as `memory` events to the telemetry file (see
+telemetry.py) under the node they ran for, and exported as high-water-mark gauges
+on the metrics endpoint (see metrics.py).
+
+RSS is sampled by a background thread every KIE_MEMORY_SAMPLE_MS while a stage is
+running, so allocations that live shorter than the interval can be missed. RSS is
+process-wide: stages that overlap (parallel uploads, concurrent jobs) each see
+the others' allocations. On systems without /proc, psutil is used if installed;
+otherwise only buffer sizes are recorded.
+
+`scripts/check_memory.py` runs the stages against the offline stand-in and fails
+when the RSS growth of a stage exceeds a multiple of the file size.
+
+Environment:
+- KIE_MEMORY=1 enables tracking.
+- KIE_MEMORY_SAMPLE_MS: RSS sampling interval (default 5).
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from .log import _log
+from .metrics import _metric_gauge_max
+from .telemetry import _record_span, _telemetry_enabled
+
+
+DEFAULT_SAMPLE_MS = 5.0
+_STATM = Path("/proc/self/statm")
+
+_lock = threading.Lock()
+# Stages running right now, sampled by the sampler thread.
+_active: dict[int, dict[str, Any]] = {}
+_sampler: threading.Thread | None = None
+# (stage, kind) -> highest RSS growth and largest buffer seen in this process.
+_high_water: dict[tuple[str, str], dict[str, Any]] = {}
+
+
+def _memory_enabled() -> bool:
+    return os.environ.get("KIE_MEMORY", "0").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _sample_interval_s() -> float:
+    try:
+        return max(float(os.environ.get("KIE_MEMORY_SAMPLE_MS", DEFAULT_SAMPLE_MS)), 1.0) / 1000.0
+    except ValueError:
+        return DEFAULT_SAMPLE_MS / 1000.0
+
+
+def _rss_bytes() -> int | None:
+    """Current resident set size of this process, or None when it cannot be read."""
+    try:
+        return int(_STATM.read_text().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil
+
+        return int(psutil.Process().memory_info().rss)
+    except Exception:
+        return None
+
+
+def _sample_loop() -> None:
+    global _sampler
+    interval = _sample_interval_s()
+    while True:
+        rss = _rss_bytes()
+        with _lock:
+            if not _active:
+                _sampler = None
+                return
+            if rss is not None:
+                for record in _active.values():
+                    record["rss_peak"] = max(record["rss_peak"], rss)
+        time.sleep(interval)
+
+
+def _mb(value: float) -> float:
+    return value / (1024 * 1024)
+
+
+@contextmanager
+def _memory_stage(stage: str, kind: str) -> Iterator[dict[str, Any]]:
+    """Track RSS while the enclosed block runs, as one stage of a video/audio job.
+
+    Yields a dict for the block to fill in: `bytes` is the size of the file the
+    stage handles, and `buffers` maps a name to the measured size of each large
+    buffer the stage allocates, e.g.
+
+        with _memory_stage("download", "video") as stage:
+            data = _download_bytes(url, ..., buffers=stage["buffers"])
+            stage["bytes"] = len(data)
+    """
+    global _sampler
+    fields: dict[str, Any] = {"bytes": None, "buffers": {}}
+    if not _memory_enabled():
+        yield fields
+        return
+    rss_start = _rss_bytes()
+    record = {"rss_peak": rss_start or 0}
+    start = time.time()
+    began = time.perf_counter()
+    with _lock:
+        _active[id(record)] = record
+        if _sampler is None:
+            _sampler = threading.Thread(target=_sample_loop, name="kie-memory", daemon=True)
+            _sampler.start()
+    try:
+        yield fields
+    finally:
+        rss_end = _rss_bytes()
+        with _lock:
+            _active.pop(id(record), None)
+            rss_peak = max(record["rss_peak"], rss_end or 0)
+        _finish_stage(stage, kind, fields, rss_start, rss_peak, rss_end, start, time.perf_counter() - began)
+
+
+def _finish_stage(
+    stage: str,
+    kind: str,
+    fields: dict[str, Any],
+    rss_start: int | None,
+    rss_peak: int,
+    rss_end: int | None,
+    start: float,
+    duration_s: float,
+) -> None:
+    file_bytes = fields.get("bytes") or 0
+    buffers = {name: int(size) for name, size in fields["buffers"].items() if size}
+    largest = max(buffers.items(), key=lambda item: item[1]) if buffers else None
+    growth = max(rss_peak - rss_start, 0) if rss_start is not None else None
+
+    with _lock:
+        mark = _high_water.setdefault((stage, kind), {"rss_growth_bytes": 0, "file_bytes": 0, "largest_buffer_bytes": 0})
+        if growth is not None and growth >= mark["rss_growth_bytes"]:
+            mark["rss_growth_bytes"], mark["file_bytes"] = growth, file_bytes
+        if largest is not None:
+            mark["largest_buffer_bytes"] = max(mark["largest_buffer_bytes"], largest[1])
+        mark["rss_peak_bytes"] = max(mark.get("rss_peak_bytes", 0), rss_peak)
+
+    if growth is not None:
+        _metric_gauge_max("kie_memory_stage_rss_growth_bytes", growth, stage=stage, kind=kind)
+        _metric_gauge_max("kie_memory_rss_peak_bytes", rss_peak)
+    if largest is not None:
+        _metric_gauge_max("kie_memory_stage_buffer_bytes", largest[1], stage=stage, kind=kind)
+
+    if _telemetry_enabled():
+        _record_span(
+            "memory",
+            start,
+            duration_s,
+            stage=stage,
+            kind=kind,
+            bytes=file_bytes or None,
+            rss_start_bytes=rss_start,
+            rss_peak_bytes=rss_peak if rss_start is not None else None,
+            rss_end_bytes=rss_end,
+            rss_growth_bytes=growth,
+            buffers=buffers or None,
+        )
+
+    details = f"Memory {stage} ({kind}, {_mb(file_bytes):.1f} MB): "
+    if growth is None:
+        details += "RSS unavailable"
+    else:
+        details += f"RSS peak +{_mb(growth):.1f} MB"
+        if file_bytes:
+            details += f" ({growth / file_bytes:.1f}x file)"
+    if largest is not None:
+        details += f", largest buffer {largest[0]} {_mb(largest[1]):.1f} MB"
+    _log(True, details)
+
+
+def _memory_high_water() -> dict[tuple[str, str], dict[str, Any]]:
+    """Highest RSS growth (with the file size it was seen for) and largest buffer per (stage, kind)."""
+    with _lock:
+        return {key: dict(mark) for key, mark in _high_water.items()}
@@ -0,0 +1,278 @@
+"""Prometheus metrics for KIE jobs.
+
+Collects, per ComfyUI process:
+
+- histograms (seconds, labeled by model) of createTask, created-to-success task
+  time as seen by polling, uploads, and downloads
+- counters of HTTP 429 / 5xx responses, transient-error retries, resubmissions of
+  retryable task failures, timeouts, and credits spent (from ledger.py)
+- gauges of in-flight tasks and queued slot requests (from the scheduler), uploads
+  in progress, and hedged duplicates
+- high-water marks of RSS growth and buffer sizes per video/audio stage (from
+  memory.py, with KIE_MEMORY=1)
+
+Latencies come from the timing spans in telemetry.py; uploads that run before the
+node's first task is created are attributed to that task's model.
+
+The text exposition is served at `/kie/metrics` on the ComfyUI server and, when
+KIE_METRICS_PORT is set, on a separate local port for workers whose ComfyUI port
+is not reachable by Prometheus.
+
+Environment:
+- KIE_METRICS=1 enables collection (implied by KIE_METRICS_PORT).
+- KIE_METRICS_PORT serves `/metrics` on this port.
+- KIE_METRICS_HOST is the bind address for KIE_METRICS_PORT (default 127.0.0.1).
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from .hedging import _hedge_stats
+from .log import _log
+from .scheduler import _scheduler_stats
+
+
+HISTOGRAM_BUCKETS_S = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0, 2400.0)
+METRICS_ROUTE = "/kie/metrics"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Span phase -> histogram name.
+SPAN_HISTOGRAMS = {
+    "createTask": "kie_create_task_seconds",
+    "upload": "kie_upload_seconds",
+    "download": "kie_download_seconds",
+}
+
+_HELP = {
+    "kie_create_task_seconds": ("histogram", "createTask request latency."),
+    "kie_task_seconds": ("histogram", "Task created to success, as observed by polling."),
+    "kie_upload_seconds": ("histogram", "File upload latency."),
+    "kie_download_seconds": ("histogram", "Result download latency."),
+    "kie_http_errors_total": ("counter", "HTTP error responses from KIE by status class (429, 4xx, 5xx)."),
+    "kie_retries_total": ("counter", "Retries after transient errors, by operation."),
+    "kie_resubmissions_total": ("counter", "Tasks resubmitted after a retryable task failure."),
+    "kie_timeouts_total": ("counter", "Tasks that timed out while polling."),
+    "kie_credits_spent_total": ("counter", "Credits attributed to finished tasks by the credit ledger."),
+    "kie_uploads_in_progress": ("gauge", "Uploads running or waiting for an identical upload."),
+    "kie_tasks_in_flight": ("gauge", "Tasks created and not yet finished (scheduler slots in use)."),
+    "kie_task_slot_limit": ("gauge", "KIE_MAX_ACTIVE_TASKS (0 means unlimited)."),
+    "kie_task_slots_queued": ("gauge", "Jobs waiting for a task slot, by priority class."),
+    "kie_hedges_submitted": ("gauge", "Hedged duplicate tasks submitted by this process."),
+    "kie_hedge_credits_spent": ("gauge", "Credits reserved for hedged duplicates."),
+    "kie_memory_stage_rss_growth_bytes": ("gauge", "Highest RSS growth during one video/audio stage (read, upload, download, decode)."),
+    "kie_memory_stage_buffer_bytes": ("gauge", "Largest buffer held by one video/audio stage."),
+    "kie_memory_rss_peak_bytes": ("gauge", "Highest process RSS sampled during a video/audio stage."),
+}
+
+_lock = threading.Lock()
+_counters: dict[tuple[str, tuple[tuple[str, str], ...]], float] = {}
+_gauges: dict[tuple[str, tuple[tuple[str, str], ...]], float] = {}
+# (name, labels) -> [bucket counts..., +Inf count, sum]
+_histograms: dict[tuple[str, tuple[tuple[str, str], ...]], list[float]] = {}
+_server: Any = None
+
+
+def _metrics_port() -> int | None:
+    try:
+        port = int(os.environ.get("KIE_METRICS_PORT", "").strip())
+    except ValueError:
+        return None
+    return port if port > 0 else None
+
+
+def _metrics_enabled() -> bool:
+    enabled = os.environ.get("KIE_METRICS", "0").strip().lower() in ("1", "true", "yes", "on")
+    return enabled or _metrics_port() is not None
+
+
+def _label_key(labels: dict[str, Any]) -> tuple[tuple[str, str], ...]:
+    return tuple(sorted((key, str(value) if value is not None else "unknown") for key, value in labels.items()))
+
+
+def _metric_inc(name: str, amount: float = 1.0, **labels: Any) -> None:
+    if not _metrics_enabled():
+        return
+    key = (name, _label_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + amount
+
+
+def _metric_gauge_add(name: str, delta: float, **labels: Any) -> None:
+    if not _metrics_enabled():
+        return
+    key = (name, _label_key(labels))
+    with _lock:
+        _gauges[key] = _gauges.get(key, 0.0) + delta
+
+
+def _metric_gauge_max(name: str, value: float, **labels: Any) -> None:
+    """Raise a high-water-mark gauge to value if it is higher."""
+    if not _metrics_enabled():
+        return
+    key = (name, _label_key(labels))
+    with _lock:
+        _gauges[key] = max(_gauges.get(key, 0.0), value)
+
+
+def _metric_observe(name: str, value: float, **labels: Any) -> None:
+    if not _metrics_enabled():
+        return
+    key = (name, _label_key(labels))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [0.0] * (len(HISTOGRAM_BUCKETS_S) + 2)
+        for idx, bound in enumerate(HISTOGRAM_BUCKETS_S):
+            if value <= bound:
+                histogram[idx] += 1
+        histogram[-2] += 1
+        histogram[-1] += value
+
+
+@contextmanager
+def _metric_in_progress(name: str, **labels: Any) -> Iterator[None]:
+    """Count the enclosed block in a gauge while it runs."""
+    if not _metrics_enabled():
+        yield
+        return
+    _metric_gauge_add(name, 1, **labels)
+    try:
+        yield
+    finally:
+        _metric_gauge_add(name, -1, **labels)
+
+
+def _count_http_error(status_code: int) -> None:
+    """Count a KIE HTTP error response by status class ("429", "4xx" or "5xx"); other statuses are ignored."""
+    if status_code < 400:
+        return
+    _metric_inc("kie_http_errors_total", status="429" if status_code == 429 else f"{status_code // 100}xx")
+
+
+def _count_task_retry(exc: BaseException, model: Any) -> None:
+    """Count a whole-task retry: a resubmission for failed tasks, else an HTTP retry of createTask."""
+    if getattr(exc, "status_code", None) is None:
+        _metric_inc("kie_resubmissions_total", model=model)
+    else:
+        _metric_inc("kie_retries_total", op="createTask")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: tuple[tuple[str, str], ...], extra: tuple[tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _render_metrics() -> str:
+    """Return every metric in the Prometheus text exposition format."""
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        histograms = {key: list(values) for key, values in _histograms.items()}
+
+    scheduler = _scheduler_stats()
+    hedging = _hedge_stats()
+    gauges[("kie_tasks_in_flight", ())] = scheduler["active"]
+    gauges[("kie_task_slot_limit", ())] = scheduler["max_active"]
+    for priority, queued in scheduler["queued_by_priority"].items():
+        gauges[("kie_task_slots_queued", (("priority", priority),))] = queued
+    gauges[("kie_hedges_submitted", ())] = hedging["hedges_submitted"]
+    gauges[("kie_hedge_credits_spent", ())] = hedging["spent_credits"]
+    gauges.setdefault(("kie_uploads_in_progress", ()), 0)
+
+    lines: list[str] = []
+
+    def header(name: str) -> None:
+        kind, text = _HELP[name]
+        lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    for name in sorted({name for name, _labels in counters}):
+        header(name)
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f"{name}{_format_labels(labels)} {_format_number(value)}")
+    for name in sorted({name for name, _labels in gauges}):
+        header(name)
+        for (metric, labels), value in sorted(gauges.items()):
+            if metric == name:
+                lines.append(f"{name}{_format_labels(labels)} {_format_number(value)}")
+    for name in sorted({name for name, _labels in histograms}):
+        header(name)
+        for (metric, labels), values in sorted(histograms.items()):
+            if metric != name:
+                continue
+            for bound, count in zip(HISTOGRAM_BUCKETS_S, values):
+                le = (("le", _format_number(bound)),)
+                lines.append(f"{name}_bucket{_format_labels(labels, le)} {_format_number(count)}")
+            lines.append(f'{name}_bucket{_format_labels(labels, (("le", "+Inf"),))} {_format_number(values[-2])}')
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_number(values[-1])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {_format_number(values[-2])}")
+    return "\n".join(lines) + "\n"
+
+
+def _metrics_handler() -> type:
+    # http.server is imported only when the standalone endpoint is enabled.
+    from http.server import BaseHTTPRequestHandler
+
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?", 1)[0] not in ("/metrics", METRICS_ROUTE):
+                self.send_error(404)
+                return
+            body = _render_metrics().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            # Scrapes every few seconds would flood the ComfyUI console.
+            return
+
+    return _MetricsHandler
+
+
+def _start_metrics_server() -> None:
+    """Serve /metrics on KIE_METRICS_PORT (once per process; no-op when unset)."""
+    global _server
+    port = _metrics_port()
+    if port is None or _server is not None:
+        return
+    host = os.environ.get("KIE_METRICS_HOST", "127.0.0.1").strip() or "127.0.0.1"
+    from http.server import ThreadingHTTPServer
+
+    try:
+        _server = ThreadingHTTPServer((host, port), _metrics_handler())
+    except OSError as exc:
+        _log(True, f"Metrics server could not bind {host}:{port}: {exc}")
+        return
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name="kie-metrics", daemon=True).start()
+
+
+def _register_metrics_route() -> None:
+    """Expose the metrics at /kie/metrics on the ComfyUI server (no-op outside ComfyUI)."""
+    try:
+        from aiohttp import web
+        from server import PromptServer
+
+        routes = PromptServer.instance.routes
+    except Exception:
+        return
+
+    @routes.get(METRICS_ROUTE)
+    async def kie_metrics(_request):
+        return web.Response(body=_render_metrics().encode("utf-8"), headers={"Content-Type": CONTENT_TYPE})
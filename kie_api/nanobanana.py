@@ -17,21 +17,25 @@ from typing import Any
 import torch
 
 from .auth import _load_api_key
-from .credits import _log_remaining_credits
+from .cancel import _interruptible_sleep
 from .http import TransientKieError, requests
-from .jobs import _fetch_task_record, _poll_task_until_complete, _should_retry_fail
+from .jobs import _fetch_task_record, _poll_task_until_complete, _run_task, _should_retry_fail
 from .log import _log
+from .metrics import _count_http_error, _count_task_retry
+from .options import (
+    NANOBANANA_ASPECT_RATIO_OPTIONS as ASPECT_RATIO_OPTIONS,
+    NANOBANANA_RESOLUTION_OPTIONS as RESOLUTION_OPTIONS,
+    NANOBANANA_OUTPUT_FORMAT_OPTIONS as OUTPUT_FORMAT_OPTIONS,
+)
+from .profiling import _profiled
 from .results import _extract_result_urls
 from .upload import _image_tensor_to_png_bytes, _truncate_url, _upload_image
-from .images import _download_image, _image_bytes_to_tensor
+from .images import _download_image, _fetch_result_image, _validate_output_precision
 from .validation import _validate_prompt
 
 CREATE_TASK_URL = "https://api.kie.ai/api/v1/jobs/createTask"
 RECORD_INFO_URL = "https://api.kie.ai/api/v1/jobs/recordInfo"
 MODEL_NAME = "nano-banana-pro"
-ASPECT_RATIO_OPTIONS = ["1:1", "2:3", "3:2", "3:4", "4:3", "4:5", "5:4", "9:16", "16:9", "21:9", "auto"]
-RESOLUTION_OPTIONS = ["1K", "2K", "4K"]
-OUTPUT_FORMAT_OPTIONS = ["png", "jpg"]
 PROMPT_MAX_LENGTH = 10000
 
 
@@ -54,6 +58,7 @@ def _create_nano_banana_task(api_key: str, payload: dict[str, Any]) -> tuple[str
     except requests.RequestException as exc:
         raise RuntimeError(f"Failed to call createTask endpoint: {exc}") from exc
 
+    _count_http_error(response.status_code)
     if response.status_code == 429 or response.status_code >= 500:
         raise TransientKieError(
             f"createTask returned HTTP {response.status_code}: {response.text}", status_code=response.status_code
@@ -109,6 +114,7 @@ def _download_nanobanana_image(url: str) -> bytes:
     return _download_image(url)
 
 
+@_profiled
 def run_nanobanana_image_job(
     prompt: str,
     aspect_ratio: str = "auto",
@@ -121,6 +127,7 @@ def run_nanobanana_image_job(
     max_retries: int = 2,
     retry_backoff_s: float = 3.0,
     images: torch.Tensor | None = None,
+    output_precision: str = "float32",
 ) -> torch.Tensor:
     """Run a Nano Banana Pro image generation job end-to-end.
 
@@ -133,6 +140,7 @@ def run_nanobanana_image_job(
         RuntimeError: For validation errors, non-retryable API failures, timeouts, or decoding failures.
         TransientKieError: For retryable API/task failures (used to trigger retries when enabled).
     """
+    _validate_output_precision(output_precision)
     _validate_prompt(prompt, max_length=PROMPT_MAX_LENGTH)
 
     if aspect_ratio not in ASPECT_RATIO_OPTIONS:
@@ -190,32 +198,21 @@ def run_nanobanana_image_job(
             }
 
             _log(log, "Creating Nano Banana Pro task...")
-            task_id, create_response_text = _create_nano_banana_task(api_key, payload)
-            _log(log, f"createTask response (elapsed={time.time() - start_time:.1f}s): {create_response_text}")
-            _log(log, f"Task created with ID {task_id}. Polling for completion...")
-
-            record_data = _poll_task_until_complete(
+            image_tensor, _record_data, _task_id = _run_task(
                 api_key,
-                task_id,
-                poll_interval_s,
-                timeout_s,
-                log,
-                start_time,
+                payload,
+                fetch=lambda record_data: _fetch_result_image(record_data, log, output_precision),
+                poll_interval_s=poll_interval_s,
+                timeout_s=timeout_s,
+                log=log,
+                start_time=start_time,
+                create_task=_create_nano_banana_task,
             )
-
-            result_urls = _extract_result_urls(record_data)
-            _log(log, f"Result URLs: {result_urls}")
-
-            _log(log, f"Downloading result image from {result_urls[0]}...")
-            image_bytes = _download_image(result_urls[0])
-            image_tensor = _image_bytes_to_tensor(image_bytes)
-            _log(log, "Image downloaded and decoded.")
-
-            _log_remaining_credits(log, record_data, api_key, _log)
             return image_tensor
-        except TransientKieError:
+        except TransientKieError as exc:
             if not retry_on_fail or attempt >= attempts:
                 raise
+            _count_task_retry(exc, MODEL_NAME)
             _log(log, f"Retrying (attempt {attempt + 1}/{attempts}) after {backoff}s")
-            time.sleep(backoff)
+            _interruptible_sleep(backoff)
             continue
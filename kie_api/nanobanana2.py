@@ -5,36 +5,23 @@ import time
 import torch
 
 from .auth import _load_api_key
-from .credits import _log_remaining_credits
+from .cancel import _interruptible_sleep
 from .http import TransientKieError
-from .images import _download_image, _image_bytes_to_tensor
-from .jobs import _create_task, _poll_task_until_complete
+from .images import _fetch_result_image, _validate_output_precision
+from .jobs import _run_task
 from .log import _log
-from .results import _extract_result_urls
+from .metrics import _count_task_retry
+from .options import (
+    NANOBANANA2_ASPECT_RATIO_OPTIONS as ASPECT_RATIO_OPTIONS,
+    NANOBANANA2_RESOLUTION_OPTIONS as RESOLUTION_OPTIONS,
+    NANOBANANA2_OUTPUT_FORMAT_OPTIONS as OUTPUT_FORMAT_OPTIONS,
+)
+from .profiling import _profiled
 from .upload import _image_tensor_to_png_bytes, _truncate_url, _upload_image
 from .validation import _validate_image_tensor_batch, _validate_prompt
 
 
 MODEL_NAME = "nano-banana-2"
-ASPECT_RATIO_OPTIONS = [
-    "1:1",
-    "1:4",
-    "1:8",
-    "2:3",
-    "3:2",
-    "3:4",
-    "4:1",
-    "4:3",
-    "4:5",
-    "5:4",
-    "8:1",
-    "9:16",
-    "16:9",
-    "21:9",
-    "auto",
-]
-RESOLUTION_OPTIONS = ["1K", "2K", "4K"]
-OUTPUT_FORMAT_OPTIONS = ["jpg", "png"]
 PROMPT_MAX_LENGTH = 20000
 MAX_IMAGE_COUNT = 14
 
@@ -48,6 +35,7 @@ def _validate_options(aspect_ratio: str, resolution: str, output_format: str) ->
         raise RuntimeError("Invalid output_format. Use the pinned enum options.")
 
 
+@_profiled
 def run_nanobanana2_image_job(
     prompt: str,
     aspect_ratio: str,
@@ -61,8 +49,10 @@ def run_nanobanana2_image_job(
     max_retries: int = 2,
     retry_backoff_s: float = 3.0,
     images: torch.Tensor | None = None,
+    output_precision: str = "float32",
 ) -> torch.Tensor:
     """Run a Nano Banana 2 image generation job."""
+    _validate_output_precision(output_precision)
     _validate_prompt(prompt, max_length=PROMPT_MAX_LENGTH)
     _validate_options(aspect_ratio, resolution, output_format)
     if not isinstance(google_search, bool):
@@ -111,31 +101,21 @@ def run_nanobanana2_image_job(
             payload_to_send = {"model": MODEL_NAME, "input": input_payload}
 
             _log(log, "Creating Nano Banana 2 task...")
-            task_id, create_response_text = _create_task(api_key, payload_to_send)
-            _log(log, f"createTask response (elapsed={time.time() - start_time:.1f}s): {create_response_text}")
-            _log(log, f"Task created with ID {task_id}. Polling for completion...")
-
-            record_data = _poll_task_until_complete(
+            image_tensor, _record_data, _task_id = _run_task(
                 api_key,
-                task_id,
-                poll_interval_s,
-                timeout_s,
-                log,
-                start_time,
+                payload_to_send,
+                fetch=lambda record_data: _fetch_result_image(record_data, log, output_precision),
+                poll_interval_s=poll_interval_s,
+                timeout_s=timeout_s,
+                log=log,
+                start_time=start_time,
             )
-
-            result_urls = _extract_result_urls(record_data)
-            _log(log, f"Result URLs: {result_urls}")
-            _log(log, f"Downloading result image from {result_urls[0]}...")
-            image_bytes = _download_image(result_urls[0])
-            image_tensor = _image_bytes_to_tensor(image_bytes)
-            _log(log, "Image downloaded and decoded.")
-            _log_remaining_credits(log, record_data, api_key, _log)
             return image_tensor
-        except TransientKieError:
+        except TransientKieError as exc:
             if not retry_on_fail or attempt >= attempts:
                 raise
+            _count_task_retry(exc, MODEL_NAME)
             _log(log, f"Retrying (attempt {attempt + 1}/{attempts}) after {backoff}s")
-            time.sleep(backoff)
+            _interruptible_sleep(backoff)
 
     raise RuntimeError("Nano Banana 2 job failed after retry attempts.")
@@ -0,0 +1,110 @@
+"""Option lists shown by the nodes, kept apart from the model modules.
+
+nodes.py builds every node's INPUT_TYPES from these lists when ComfyUI loads the
+pack, without importing the model modules (and torch, PIL and ComfyUI's video
+types with them); a model module is imported the first time one of its nodes
+runs. Each model module re-exports its lists under its own names
+(`nanobanana2.ASPECT_RATIO_OPTIONS`, ...), so this module must not import
+anything from the pack.
+"""
+
+NANOBANANA_ASPECT_RATIO_OPTIONS = ["1:1", "2:3", "3:2", "3:4", "4:3", "4:5", "5:4", "9:16", "16:9", "21:9", "auto"]
+NANOBANANA_RESOLUTION_OPTIONS = ["1K", "2K", "4K"]
+NANOBANANA_OUTPUT_FORMAT_OPTIONS = ["png", "jpg"]
+
+NANOBANANA2_ASPECT_RATIO_OPTIONS = [
+    "1:1",
+    "1:4",
+    "1:8",
+    "2:3",
+    "3:2",
+    "3:4",
+    "4:1",
+    "4:3",
+    "4:5",
+    "5:4",
+    "8:1",
+    "9:16",
+    "16:9",
+    "21:9",
+    "auto",
+]
+NANOBANANA2_RESOLUTION_OPTIONS = ["1K", "2K", "4K"]
+NANOBANANA2_OUTPUT_FORMAT_OPTIONS = ["jpg", "png"]
+
+GPT_IMAGE2_ASPECT_RATIO_OPTIONS = ["auto", "1:1", "9:16", "16:9", "4:3", "3:4"]
+GPT_IMAGE2_RESOLUTION_OPTIONS = ["1K", "2K", "4K"]
+
+PROMPT_BATCH_MODEL_OPTIONS = ["nano-banana-pro", "nano-banana-2", "gpt-image-2"]
+# Nano Banana 2 accepts every aspect ratio the other two models accept; each model
+# is validated against its own list before any task is created.
+PROMPT_BATCH_ASPECT_RATIO_OPTIONS = NANOBANANA2_ASPECT_RATIO_OPTIONS
+PROMPT_BATCH_RESOLUTION_OPTIONS = ["1K", "2K", "4K"]
+PROMPT_BATCH_OUTPUT_FORMAT_OPTIONS = ["png", "jpg"]
+PROMPT_BATCH_DEFAULT_MAX_CONCURRENCY = 4
+PROMPT_BATCH_MAX_CONCURRENCY = 16
+
+SEEDREAM_ASPECT_RATIO_OPTIONS = ["1:1", "4:3", "3:4", "16:9", "9:16", "2:3", "3:2", "21:9"]
+SEEDREAM_QUALITY_OPTIONS = ["basic", "high"]
+SEEDREAM_EDIT_ASPECT_RATIO_OPTIONS = ["1:1", "4:3", "3:4", "16:9", "9:16", "2:3", "3:2", "21:9"]
+SEEDREAM_EDIT_QUALITY_OPTIONS = ["basic", "high"]
+
+SEEDANCE2_MODEL_OPTIONS = ["bytedance/seedance-2-fast", "bytedance/seedance-2"]
+SEEDANCE2_DEFAULT_MODEL = "bytedance/seedance-2-fast"
+SEEDANCE2_ASPECT_RATIO_OPTIONS = ["16:9", "9:16", "1:1"]
+SEEDANCE2_RESOLUTION_OPTIONS = ["480p", "720p", "1080p"]
+SEEDANCE2_DURATION_OPTIONS = ["5", "10", "15"]
+
+SEEDANCE_V1PRO_FAST_RESOLUTION_OPTIONS = ["720p", "1080p"]
+SEEDANCE_V1PRO_FAST_DURATION_OPTIONS = ["5", "10"]
+
+SEEDANCE15_ASPECT_RATIO_OPTIONS = ["1:1", "21:9", "4:3", "3:4", "16:9", "9:16"]
+SEEDANCE15_RESOLUTION_OPTIONS = ["480p", "720p"]
+SEEDANCE15_DURATION_OPTIONS = ["4", "8", "12"]
+
+KLING25_DURATION_OPTIONS = ["5", "10"]
+KLING26_DURATION_OPTIONS = ["5", "10"]
+KLING26_T2V_ASPECT_RATIO_OPTIONS = ["1:1", "16:9", "9:16"]
+KLING26_T2V_DURATION_OPTIONS = ["5", "10"]
+KLING26MOTION_CHARACTER_ORIENTATION_OPTIONS = ["image", "video"]
+KLING26MOTION_MODE_OPTIONS = ["720p", "1080p"]
+KLING3MOTION_CHARACTER_ORIENTATION_OPTIONS = ["image", "video"]
+KLING3MOTION_MODE_OPTIONS = ["720p", "1080p"]
+KLING3_MODE_OPTIONS = ["std", "pro"]
+KLING3_ASPECT_RATIO_OPTIONS = ["1:1", "9:16", "16:9"]
+KLING3_DURATION_OPTIONS = [str(i) for i in range(3, 16)]
+
+GROK_T2I_ASPECT_RATIO_OPTIONS = ["2:3", "3:2", "1:1", "9:16", "16:9"]
+GROK_T2V_ASPECT_RATIO_OPTIONS = ["2:3", "3:2", "1:1", "9:16", "16:9"]
+GROK_T2V_MODE_OPTIONS = ["fun", "normal", "spicy"]
+GROK_T2V_DURATION_OPTIONS = ["6", "10", "15"]
+GROK_T2V_RESOLUTION_OPTIONS = ["480p", "720p"]
+GROK_I2V_MODE_OPTIONS = ["fun", "normal", "spicy"]
+GROK_I2V_DURATION_OPTIONS = ["6", "10", "15"]
+GROK_I2V_RESOLUTION_OPTIONS = ["480p", "720p"]
+
+FLUX2_MODEL_OPTIONS = ["flux-2/pro-image-to-image", "flux-2/flex-image-to-image"]
+FLUX2_ASPECT_RATIO_OPTIONS = ["1:1", "4:3", "3:4", "16:9", "9:16", "3:2", "2:3", "auto"]
+FLUX2_RESOLUTION_OPTIONS = ["1K", "2K"]
+
+GEMINI3_MODEL_OPTIONS = ["gemini-3-pro", "gemini-3-flash", "gemini-2.5-pro", "gemini-2.5-flash"]
+GEMINI3_REASONING_EFFORT_OPTIONS = ["low", "high"]
+GEMINI3_ROLE_OPTIONS = ["developer", "system", "user", "assistant", "tool"]
+
+SUNO_MODEL_OPTIONS = ["V4", "V4_5", "V4_5PLUS", "V4_5ALL", "V5"]
+
+GRID_VIDEO_MODEL_OPTIONS = ["kling-2.6", "seedance-1.5-pro", "grok-imagine"]
+# Union of the per-model durations; each model is validated against its own list.
+GRID_VIDEO_DURATION_OPTIONS = ["4", "5", "6", "8", "10", "12", "15"]
+GRID_VIDEO_RESOLUTION_OPTIONS = ["480p", "720p"]
+GRID_VIDEO_ASPECT_RATIO_OPTIONS = SEEDANCE15_ASPECT_RATIO_OPTIONS
+# "spicy" is not available for external images, so it is not offered here.
+GRID_VIDEO_GROK_MODE_OPTIONS = ["normal", "fun"]
+GRID_VIDEO_DEFAULT_MAX_CONCURRENCY = 9
+GRID_VIDEO_MAX_CONCURRENCY = 16
+
+# uint8 IMAGE tensors (raw 0-255 values) are misread by stock ComfyUI nodes, so only
+# float precisions are offered.
+IMAGE_OUTPUT_PRECISION_OPTIONS = ["float32", "float16"]
+
+TASK_HANDLE_TYPE = "KIE_TASK"
@@ -0,0 +1,47 @@
+"""Shared background pool for result fetching.
+
+Downloads, decodes and remaining-credits lookups run here so they can start the
+moment a task reaches `success` and overlap with polling of other tasks.
+
+Work submitted to this pool must not itself wait on other work submitted to this
+pool (nested fan-out should use its own short-lived executor) to avoid starving
+the bounded worker set.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from .profiling import _profile_worker
+from .telemetry import _bind_context
+
+
+FETCH_POOL_MAX_WORKERS = 4
+
+_fetch_pool: ThreadPoolExecutor | None = None
+_fetch_pool_lock = threading.Lock()
+
+
+def _get_fetch_pool() -> ThreadPoolExecutor:
+    """Return the process-wide fetch pool, creating it on first use."""
+    global _fetch_pool
+    if _fetch_pool is None:
+        with _fetch_pool_lock:
+            if _fetch_pool is None:
+                _fetch_pool = ThreadPoolExecutor(
+                    max_workers=FETCH_POOL_MAX_WORKERS,
+                    thread_name_prefix="kie-fetch",
+                )
+    return _fetch_pool
+
+
+def _submit_fetch(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """Schedule fn on the shared fetch pool and return its Future."""
+    return _get_fetch_pool().submit(_bind_context(_profile_worker(fn)), *args, **kwargs)
+
+
+def _failed_future(exc: BaseException) -> Future:
+    """Return an already-completed Future carrying exc, for uniform per-item results."""
+    future: Future = Future()
+    future.set_exception(exc)
+    return future
@@ -0,0 +1,265 @@
+"""Opt-in profiling of the model entry points.
+
+With KIE_PROFILE set, every call of a `run_*` entry point (run_nanobanana_image_job,
+run_kling3_video_from_request, run_suno_generate, ...) is profiled and dumped to
+KIE_PROFILE_DIR (default `config/kie_profiles/`):
+
+- `<stem>.json`: wall and CPU time, peak traced memory, and the top functions and
+  allocation sites
+- `<stem>.prof`: cProfile stats (open with pstats or snakeviz)
+- `<stem>.tracemalloc`: tracemalloc snapshot
+
+Nested entry points (run_kling26_i2v calling run_kling26_i2v_video) are profiled
+once, at the outermost call. What cProfile covers depends on the Python version:
+
+- Python 3.10/3.11: the calling thread and work the job hands to the shared fetch
+  pool (downloads, decodes); other worker threads, such as parallel uploads, show
+  up as time spent waiting on them.
+- Python 3.12+: cProfile is process-wide, so the profile holds every thread of the
+  process, including other jobs running at the same time. Only one profiler can
+  be active, so a job that starts while another is profiled gets no `.prof`.
+
+tracemalloc is process-wide on every version, so jobs that overlap share their
+allocation figures.
+
+`scripts/profile_summary.py` lists the dumps and prints the hot spots of one or
+more of them.
+
+Environment:
+- KIE_PROFILE: comma-separated modes, any of `time` (perf_counter wall time and
+  CPU time), `cprofile`, `tracemalloc`; `1` or `all` enables all three.
+- KIE_PROFILE_DIR: where dumps are written.
+- KIE_PROFILE_TOP: rows kept in each summary (default 25).
+"""
+
+import contextvars
+import cProfile
+import functools
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+from typing import Any, Callable
+
+from .log import _log
+
+
+PROFILE_DIR = Path(__file__).resolve().parent.parent / "config" / "kie_profiles"
+PROFILE_MODES = ("time", "cprofile", "tracemalloc")
+DEFAULT_TOP = 25
+TRACEMALLOC_FRAMES = 10
+# From 3.12 cProfile is built on sys.monitoring: one profiler per process, seeing every thread.
+CPROFILE_PROCESS_WIDE = sys.version_info >= (3, 12)
+
+# The profiling session of the outermost entry point running in this context.
+_active_session: contextvars.ContextVar[dict[str, Any] | None] = contextvars.ContextVar(
+    "kie_profile", default=None
+)
+
+_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+
+
+def _profile_modes() -> set[str]:
+    raw = os.environ.get("KIE_PROFILE", "").strip().lower()
+    if raw in ("", "0", "false", "no", "off"):
+        return set()
+    if raw in ("1", "true", "yes", "on", "all"):
+        return set(PROFILE_MODES)
+    return {mode.strip() for mode in raw.split(",") if mode.strip() in PROFILE_MODES}
+
+
+def _profile_dir() -> Path:
+    override = os.environ.get("KIE_PROFILE_DIR", "").strip()
+    return Path(override) if override else PROFILE_DIR
+
+
+def _profile_top() -> int:
+    try:
+        return max(int(os.environ.get("KIE_PROFILE_TOP", DEFAULT_TOP)), 1)
+    except ValueError:
+        return DEFAULT_TOP
+
+
+def _start_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+        tracemalloc.reset_peak()
+
+
+def _stop_tracemalloc() -> None:
+    """Stop tracing when the last profiled job ends, unless someone else started it."""
+    global _tracemalloc_users, _tracemalloc_owned
+    with _lock:
+        _tracemalloc_users = max(_tracemalloc_users - 1, 0)
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+
+
+def _start_session(fn: Callable[..., Any], modes: set[str]) -> dict[str, Any]:
+    session: dict[str, Any] = {
+        "function": fn.__name__,
+        "module": fn.__module__,
+        "modes": sorted(modes),
+        "started": time.time(),
+        "began": time.perf_counter(),
+        "thread_cpu": time.thread_time(),
+        "process_cpu": time.process_time(),
+        "profiler": None,
+        "worker_profiles": [],
+        "lock": threading.Lock(),
+    }
+    if "tracemalloc" in modes:
+        _start_tracemalloc()
+    if "cprofile" in modes:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            session["profiler"] = profiler
+        except ValueError:
+            # An overlapping job holds the one profiler Python 3.12+ allows.
+            session["cprofile_skipped"] = True
+    return session
+
+
+def _top_functions(stats: pstats.Stats, limit: int) -> list[dict[str, Any]]:
+    stats.strip_dirs().sort_stats("cumulative")
+    rows = []
+    for func in stats.fcn_list[:limit]:
+        _primitive, calls, tottime, cumtime, _callers = stats.stats[func]
+        filename, line, name = func
+        rows.append(
+            {
+                "function": f"{filename}:{line}({name})",
+                "calls": calls,
+                "tottime_s": round(tottime, 4),
+                "cumtime_s": round(cumtime, 4),
+            }
+        )
+    return rows
+
+
+def _finish_session(session: dict[str, Any], error: str | None) -> None:
+    # Stop measuring before doing any work of our own.
+    profiler = session["profiler"]
+    if profiler is not None:
+        profiler.disable()
+    snapshot = None
+    if "tracemalloc" in session["modes"] and tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+
+    summary: dict[str, Any] = {
+        "function": session["function"],
+        "module": session["module"],
+        "modes": session["modes"],
+        "started": round(session["started"], 3),
+        "wall_s": round(time.perf_counter() - session["began"], 4),
+        "thread_cpu_s": round(time.thread_time() - session["thread_cpu"], 4),
+        "process_cpu_s": round(time.process_time() - session["process_cpu"], 4),
+        "ok": error is None,
+        "error": error,
+    }
+    if "tracemalloc" in session["modes"]:
+        _stop_tracemalloc()
+
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(session["started"]))
+    directory = _profile_dir()
+    stem = directory / f"{stamp}_{session['function']}_{uuid.uuid4().hex[:6]}"
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError as exc:
+        _log(True, f"Profile directory {directory} is not writable: {exc}")
+        return
+
+    if profiler is not None:
+        stats = pstats.Stats(profiler)
+        with session["lock"]:
+            for worker_profile in session["worker_profiles"]:
+                stats.add(worker_profile)
+            summary["worker_profiles"] = len(session["worker_profiles"])
+        summary["cprofile_scope"] = "process" if CPROFILE_PROCESS_WIDE else "job threads"
+        stats.dump_stats(str(stem.with_suffix(".prof")))
+        summary["top_functions"] = _top_functions(stats, _profile_top())
+    elif session.get("cprofile_skipped"):
+        summary["cprofile_skipped"] = "another profiler was active"
+
+    if snapshot is not None:
+        summary["traced_current_mb"] = round(current / (1024 * 1024), 2)
+        summary["traced_peak_mb"] = round(peak / (1024 * 1024), 2)
+        summary["top_allocations"] = [
+            {"site": str(stat.traceback[0]), "size_mb": round(stat.size / (1024 * 1024), 3), "blocks": stat.count}
+            for stat in snapshot.statistics("lineno")[: _profile_top()]
+        ]
+        snapshot.dump(str(stem.with_suffix(".tracemalloc")))
+
+    try:
+        stem.with_suffix(".json").write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+    except OSError as exc:
+        _log(True, f"Failed to write profile summary: {exc}")
+        return
+    details = f"{summary['wall_s']:.2f}s wall, {summary['thread_cpu_s']:.2f}s CPU"
+    if "traced_peak_mb" in summary:
+        details += f", {summary['traced_peak_mb']:.1f} MB peak traced"
+    _log(True, f"Profile {session['function']}: {details} -> {stem.with_suffix('.json')}")
+
+
+def _profiled(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Profile each call of a model entry point when KIE_PROFILE is set."""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        modes = _profile_modes()
+        if not modes or _active_session.get() is not None:
+            return fn(*args, **kwargs)
+        session = _start_session(fn, modes)
+        token = _active_session.set(session)
+        error = None
+        try:
+            return fn(*args, **kwargs)
+        except BaseException as exc:
+            error = type(exc).__name__
+            raise
+        finally:
+            _active_session.reset(token)
+            _finish_session(session, error)
+
+    return wrapper
+
+
+def _profile_worker(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Return fn profiled into the submitting job's cProfile session, for another thread.
+
+    On Python 3.12+ the job's profiler already sees every thread, and a second
+    profiler cannot be enabled, so fn is returned unchanged.
+    """
+    session = _active_session.get()
+    if session is None or session["profiler"] is None or CPROFILE_PROCESS_WIDE:
+        return fn
+
+    @functools.wraps(fn)
+    def profiled(*args, **kwargs):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return fn(*args, **kwargs)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+            with session["lock"]:
+                session["worker_profiles"].append(profiler)
+
+    return profiled
@@ -0,0 +1,215 @@
+"""Prompt-list fan-out for Nano Banana Pro, Nano Banana 2, and GPT Image 2.
+
+Runs one image job per prompt with shared reference images:
+
+- references are uploaded once and reused by every task
+- up to `max_concurrency` tasks run at once through `run_many`, which also takes
+  care of 429 backoff and the shared scheduler budget
+- the tasks are polled together and each result is downloaded as soon as it finishes
+- the combined IMAGE batch is returned in prompt order
+"""
+
+import time
+from typing import Any
+
+import torch
+
+from . import gpt_image2, nanobanana, nanobanana2
+from .auth import _load_api_key
+from .images import _fetch_result_image, _stack_image_tensors, _validate_output_precision
+from .jobs import run_many
+from .journal import _journal_record_delivered, _journal_release
+from .log import _log
+from .options import (
+    PROMPT_BATCH_MODEL_OPTIONS as BATCH_MODEL_OPTIONS,
+    PROMPT_BATCH_ASPECT_RATIO_OPTIONS as BATCH_ASPECT_RATIO_OPTIONS,
+    PROMPT_BATCH_RESOLUTION_OPTIONS as BATCH_RESOLUTION_OPTIONS,
+    PROMPT_BATCH_OUTPUT_FORMAT_OPTIONS as BATCH_OUTPUT_FORMAT_OPTIONS,
+    PROMPT_BATCH_DEFAULT_MAX_CONCURRENCY as DEFAULT_MAX_CONCURRENCY,
+    PROMPT_BATCH_MAX_CONCURRENCY as MAX_CONCURRENCY,
+)
+from .profiling import _profiled
+from .upload import _image_tensor_to_png_bytes, _truncate_url, _upload_image
+from .validation import _validate_image_tensor_batch, _validate_prompt
+
+
+MAX_PROMPTS = 32
+
+_MAX_REFERENCE_IMAGES = {
+    "nano-banana-pro": 8,
+    "nano-banana-2": nanobanana2.MAX_IMAGE_COUNT,
+    "gpt-image-2": gpt_image2.MAX_IMAGE_COUNT,
+}
+_PROMPT_MAX_LENGTHS = {
+    "nano-banana-pro": nanobanana.PROMPT_MAX_LENGTH,
+    "nano-banana-2": nanobanana2.PROMPT_MAX_LENGTH,
+    "gpt-image-2": gpt_image2.PROMPT_MAX_LENGTH,
+}
+
+
+def _normalize_prompts(prompts: list[str] | str, model: str) -> list[str]:
+    if isinstance(prompts, str):
+        prompts = [prompts]
+    if not isinstance(prompts, (list, tuple)):
+        raise RuntimeError("prompts must be a list of strings.")
+
+    cleaned = [str(prompt).strip() for prompt in prompts if str(prompt or "").strip()]
+    if not cleaned:
+        raise RuntimeError("prompts list is empty.")
+    if len(cleaned) > MAX_PROMPTS:
+        raise RuntimeError(f"Too many prompts ({len(cleaned)}); the maximum is {MAX_PROMPTS}.")
+    for prompt in cleaned:
+        _validate_prompt(prompt, max_length=_PROMPT_MAX_LENGTHS[model])
+    return cleaned
+
+
+def _validate_batch_options(model: str, aspect_ratio: str, resolution: str, output_format: str) -> None:
+    if model not in BATCH_MODEL_OPTIONS:
+        raise RuntimeError(f"Invalid model '{model}'. Use one of: {', '.join(BATCH_MODEL_OPTIONS)}.")
+    if model == "gpt-image-2":
+        gpt_image2._validate_options(aspect_ratio, resolution)
+        return
+    module = nanobanana if model == "nano-banana-pro" else nanobanana2
+    if aspect_ratio not in module.ASPECT_RATIO_OPTIONS:
+        raise RuntimeError(f"Invalid aspect_ratio '{aspect_ratio}' for {model}.")
+    if resolution not in module.RESOLUTION_OPTIONS:
+        raise RuntimeError("Invalid resolution. Use the pinned enum options.")
+    if output_format not in module.OUTPUT_FORMAT_OPTIONS:
+        raise RuntimeError("Invalid output_format. Use the pinned enum options.")
+
+
+def _upload_reference_images(api_key: str, images: torch.Tensor | None, model: str, log: bool) -> list[str]:
+    if images is None:
+        return []
+    images = _validate_image_tensor_batch(images)
+    max_images = _MAX_REFERENCE_IMAGES[model]
+    total_images = images.shape[0]
+    if total_images > max_images:
+        _log(log, f"More than {max_images} images provided ({total_images}); only first {max_images} used.")
+
+    upload_count = min(total_images, max_images)
+    _log(log, f"Uploading {upload_count} shared reference image(s) once for all prompts...")
+    image_urls: list[str] = []
+    for idx in range(upload_count):
+        png_bytes = _image_tensor_to_png_bytes(images[idx])
+        image_url = _upload_image(api_key, png_bytes)
+        image_urls.append(image_url)
+        _log(log, f"Image {idx + 1} upload success: {_truncate_url(image_url)}")
+    return image_urls
+
+
+def _build_batch_payload(
+    model: str,
+    prompt: str,
+    image_urls: list[str],
+    aspect_ratio: str,
+    resolution: str,
+    output_format: str,
+    google_search: bool,
+) -> dict[str, Any]:
+    if model == "gpt-image-2":
+        input_payload: dict[str, Any] = {"prompt": prompt, "aspect_ratio": aspect_ratio, "resolution": resolution}
+        if image_urls:
+            input_payload["input_urls"] = image_urls
+            return {"model": gpt_image2.IMAGE_TO_IMAGE_MODEL_NAME, "input": input_payload}
+        return {"model": gpt_image2.TEXT_TO_IMAGE_MODEL_NAME, "input": input_payload}
+
+    input_payload = {
+        "prompt": prompt,
+        "aspect_ratio": aspect_ratio,
+        "resolution": resolution,
+        "output_format": output_format,
+        "image_input": image_urls,
+    }
+    if model == "nano-banana-2":
+        input_payload["google_search"] = google_search
+    return {"model": model, "input": input_payload}
+
+
+@_profiled
+def run_image_prompt_batch(
+    *,
+    prompts: list[str] | str,
+    model: str = "nano-banana-pro",
+    images: torch.Tensor | None = None,
+    aspect_ratio: str = "1:1",
+    resolution: str = "1K",
+    output_format: str = "png",
+    google_search: bool = False,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    poll_interval_s: float = 10.0,
+    timeout_s: int = 300,
+    max_retries: int = 2,
+    retry_backoff_s: float = 3.0,
+    priority: str = "auto",
+    log: bool = True,
+    output_precision: str = "float32",
+) -> torch.Tensor:
+    """Run one image job per prompt concurrently and return an IMAGE batch in prompt order.
+
+    Returns:
+        A torch tensor of shape (N, H, W, 3), one image per prompt.
+    Raises:
+        RuntimeError: For validation errors, if any prompt fails, or if results differ in size.
+    """
+    _validate_output_precision(output_precision)
+    _validate_batch_options(model, aspect_ratio, resolution, output_format)
+    prompt_list = _normalize_prompts(prompts, model)
+    max_concurrency = min(max(int(max_concurrency), 1), MAX_CONCURRENCY)
+
+    api_key = _load_api_key()
+    start_time = time.time()
+    image_urls = _upload_reference_images(api_key, images, model, log)
+    payloads = [
+        _build_batch_payload(model, prompt, image_urls, aspect_ratio, resolution, output_format, google_search)
+        for prompt in prompt_list
+    ]
+
+    _log(log, f"Running {len(payloads)} {model} task(s) (max_concurrency={max_concurrency})...")
+    results: dict[int, torch.Tensor] = {}
+    errors: dict[int, str] = {}
+    # Finished tasks are only marked delivered once the whole batch is returned, so a
+    # re-run after a failed prompt reuses them instead of paying for them again.
+    task_ids: list[str] = []
+    try:
+        for item in run_many(
+            payloads,
+            api_key=api_key,
+            max_concurrency=max_concurrency,
+            fetch=lambda record_data: _fetch_result_image(record_data, log, output_precision),
+            poll_interval_s=poll_interval_s,
+            timeout_s=timeout_s,
+            min_create_interval_s=0.0,
+            max_create_attempts=max(max_retries + 1, 1),
+            rate_limit_backoff_s=max(retry_backoff_s, 0.0),
+            priority=priority,
+            defer_delivery=True,
+            log=log,
+        ):
+            index = item["index"]
+            if item["error"] is not None:
+                prefix = "" if item["task_id"] else "createTask failed: "
+                errors[index] = f"{prefix}{item['error']}"
+                continue
+            task_ids.append(item["task_id"])
+            results[index] = item["output"]
+            _log(log, f"Prompt {index + 1} done ({len(results)}/{len(payloads)}).")
+
+        if errors:
+            details = "; ".join(f"prompt {index + 1}: {errors[index]}" for index in sorted(errors))
+            raise RuntimeError(
+                f"{len(errors)} of {len(payloads)} prompt(s) failed: {details}. "
+                "Re-run to retry them; finished prompts are reused from the job journal."
+            )
+
+        _log(log, f"All {len(payloads)} prompt(s) completed (elapsed={time.time() - start_time:.1f}s).")
+        try:
+            batch = _stack_image_tensors([results[index] for index in range(len(payloads))])
+        except RuntimeError as exc:
+            raise RuntimeError(f"{exc} Set an explicit aspect_ratio so every prompt returns the same size.") from exc
+        for task_id in task_ids:
+            _journal_record_delivered(task_id)
+        return batch
+    finally:
+        for task_id in task_ids:
+            _journal_release(task_id)
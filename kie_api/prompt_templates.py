@@ -0,0 +1,263 @@
+"""Cached index of the system prompt templates in `prompts/`.
+
+ComfyUI calls INPUT_TYPES of every node whenever it builds the node list
+(`/object_info`), so the KIE System Prompt Selector must not read its whole
+template library each time. The index maps each dropdown label to its file and
+parsed body. It is built once per prompt folder and kept until something
+changes:
+
+- With watchdog installed, a file watcher marks the index stale on any change
+  below the folder, and lookups do no file system work at all.
+- Otherwise every lookup compares the modification times of the folder and its
+  subfolders (this catches added, removed and renamed templates), and the
+  template files themselves are re-checked at most every KIE_PROMPT_RESCAN_S.
+
+A rebuild re-parses only the files whose size or modification time changed.
+`_prompt_template` always checks the one file it returns, so a node always runs
+the current text even when the dropdown lags behind an in-place edit.
+
+Templates live in `prompts/images/` and `prompts/videos/`, and in subfolders of
+either at any depth; the label is `<category>: <name>`, where the category is
+the folder path below `prompts/` (`images`, `videos/wan`, ...).
+
+Environment:
+- KIE_PROMPT_WATCH=0 disables the file watcher.
+- KIE_PROMPT_RESCAN_S: how often template files are re-checked without a
+  watcher (default 5).
+"""
+
+import os
+import threading
+import time
+from typing import Any
+
+from .log import _log
+
+
+SYSTEM_PROMPT_MARKER = "system prompt below"
+SYSTEM_PROMPT_CATEGORIES = ("images", "videos")
+DEFAULT_RESCAN_S = 5.0
+# Events watchdog reports for reads, including the index's own.
+_READ_EVENTS = {"opened", "closed_no_write"}
+
+_lock = threading.Lock()
+# Prompt folder -> its index (see _build_index).
+_indexes: dict[str, dict[str, Any]] = {}
+
+
+def _watch_enabled() -> bool:
+    return os.environ.get("KIE_PROMPT_WATCH", "1").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _rescan_interval_s() -> float:
+    try:
+        return max(float(os.environ.get("KIE_PROMPT_RESCAN_S", DEFAULT_RESCAN_S)), 0.0)
+    except ValueError:
+        return DEFAULT_RESCAN_S
+
+
+def _parse_template(path: str) -> tuple[str, str] | None:
+    """(name, body) of a template file, or None when it is not a valid template."""
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            lines = handle.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+    name: str | None = None
+    body_index: int | None = None
+    for idx, line in enumerate(lines):
+        stripped = line.strip()
+        lower = stripped.lower()
+        if lower.startswith("name:") and name is None:
+            name = stripped[5:].strip()
+        if lower == SYSTEM_PROMPT_MARKER and body_index is None:
+            body_index = idx + 1
+
+    if not name or body_index is None:
+        return None
+    body = "\n".join(lines[body_index:]).strip()
+    if not body:
+        return None
+    return name, body
+
+
+def _file_signature(stat: os.stat_result) -> tuple[int, int]:
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _walk_templates(prompt_dir: str) -> tuple[list[tuple[str, str, tuple[int, int]]], dict[str, int | None]]:
+    """Template files as (category, path, signature), and the mtime of every folder walked."""
+    files: list[tuple[str, str, tuple[int, int]]] = []
+    folders: dict[str, int | None] = {prompt_dir: os.stat(prompt_dir).st_mtime_ns}
+    pending = [(os.path.join(prompt_dir, category), category) for category in reversed(SYSTEM_PROMPT_CATEGORIES)]
+    while pending:
+        folder, category = pending.pop()
+        try:
+            folders[folder] = os.stat(folder).st_mtime_ns
+            entries = sorted(os.scandir(folder), key=lambda entry: entry.name)
+        except OSError:
+            # A category that does not exist yet shows up as a change of its parent.
+            folders.setdefault(folder, None)
+            continue
+        subfolders = []
+        for entry in entries:
+            name = entry.name
+            if name.startswith("."):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subfolders.append((entry.path, f"{category}/{name}"))
+                elif name.lower().endswith(".txt") and name.lower() != "readme.txt" and entry.is_file():
+                    files.append((category, entry.path, _file_signature(entry.stat())))
+            except OSError:
+                continue
+        pending.extend(reversed(subfolders))
+    return files, folders
+
+
+def _build_index(prompt_dir: str, previous: dict[str, Any] | None) -> dict[str, Any]:
+    if not os.path.isdir(prompt_dir):
+        raise RuntimeError(f"Prompt folder not found: {prompt_dir}")
+    index: dict[str, Any] = previous or {"files": {}, "watcher": None}
+    # Watch before walking, so changes made during the walk mark the new index stale.
+    if index["watcher"] is None and _watch_enabled():
+        index["watcher"] = _start_watcher(prompt_dir, index)
+    index["stale"] = False
+    try:
+        files, folders = _walk_templates(prompt_dir)
+    except OSError as exc:
+        raise RuntimeError(f"Prompt folder not readable: {prompt_dir}: {exc}") from exc
+
+    parsed: dict[str, dict[str, Any]] = {}
+    templates: dict[str, str] = {}
+    for category, path, signature in files:
+        entry = index["files"].get(path)
+        if entry is None or entry["signature"] != signature:
+            template = _parse_template(path)
+            entry = {
+                "signature": signature,
+                "label": f"{category}: {template[0]}" if template else None,
+                "body": template[1] if template else None,
+            }
+        parsed[path] = entry
+        if entry["label"] is not None:
+            # Later files win, as in a folder listing sorted by name.
+            templates[entry["label"]] = path
+
+    index["files"] = parsed
+    index["folders"] = folders
+    index["templates"] = templates
+    index["labels"] = sorted(templates)
+    index["checked"] = time.monotonic()
+    return index
+
+
+def _start_watcher(prompt_dir: str, index: dict[str, Any]) -> Any:
+    """Mark the index stale on any change below prompt_dir; None without watchdog."""
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    class _StaleOnChange(FileSystemEventHandler):
+        def on_any_event(self, event) -> None:
+            if event.event_type not in _READ_EVENTS:
+                index["stale"] = True
+
+    observer = Observer()
+    observer.daemon = True
+    try:
+        observer.schedule(_StaleOnChange(), prompt_dir, recursive=True)
+        observer.start()
+    except Exception as exc:
+        _log(True, f"Prompt folder watcher could not start, checking modification times instead: {exc}")
+        return None
+    return observer
+
+
+def _stop_watcher(index: dict[str, Any]) -> None:
+    observer = index.get("watcher")
+    index["watcher"] = None
+    if observer is not None:
+        try:
+            observer.stop()
+        except Exception:
+            pass
+
+
+def _index_is_current(index: dict[str, Any]) -> bool:
+    if index["stale"]:
+        return False
+    if index["watcher"] is not None and index["watcher"].is_alive():
+        return True
+    for folder, mtime in index["folders"].items():
+        try:
+            current = os.stat(folder).st_mtime_ns
+        except OSError:
+            current = None
+        if current != mtime:
+            return False
+    if time.monotonic() - index["checked"] < _rescan_interval_s():
+        return True
+    for path, entry in index["files"].items():
+        try:
+            if _file_signature(os.stat(path)) != entry["signature"]:
+                return False
+        except OSError:
+            return False
+    index["checked"] = time.monotonic()
+    return True
+
+
+def _current_index(prompt_dir: str) -> dict[str, Any]:
+    """The index of prompt_dir, rebuilt first when something changed. Call with _lock held."""
+    index = _indexes.get(prompt_dir)
+    if index is not None and _index_is_current(index):
+        return index
+    try:
+        index = _build_index(prompt_dir, index)
+    except RuntimeError:
+        stale = _indexes.pop(prompt_dir, None)
+        if stale is not None:
+            _stop_watcher(stale)
+        raise
+    _indexes[prompt_dir] = index
+    return index
+
+
+def _prompt_template_labels(prompt_dir: str) -> list[str]:
+    """Sorted dropdown labels of the templates in prompt_dir."""
+    with _lock:
+        return list(_current_index(prompt_dir)["labels"])
+
+
+def _prompt_template(prompt_dir: str, label: str) -> str | None:
+    """Body of the template with this label, read fresh if its file changed; None if there is none."""
+    with _lock:
+        index = _current_index(prompt_dir)
+        path = index["templates"].get(label)
+        if path is None:
+            return None
+        entry = index["files"][path]
+        try:
+            unchanged = _file_signature(os.stat(path)) == entry["signature"]
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            index["stale"] = True
+            index = _current_index(prompt_dir)
+            path = index["templates"].get(label)
+            if path is None:
+                return None
+            entry = index["files"][path]
+        return entry["body"]
+
+
+def _reset_prompt_templates() -> None:
+    """Drop every cached index (and stop its watcher), so the next lookup scans from scratch."""
+    with _lock:
+        for index in _indexes.values():
+            _stop_watcher(index)
+        _indexes.clear()
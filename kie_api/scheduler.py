@@ -0,0 +1,214 @@
+"""Priority-aware admission of KIE tasks.
+
+Concurrent jobs share one budget of in-flight tasks (created but not finished),
+`KIE_MAX_ACTIVE_TASKS` (default 16; 0 disables the limit). A job takes a slot right
+before createTask and gives it back when the task reaches a terminal state. When
+the budget is exhausted, waiting jobs are admitted by:
+
+1. priority class: `interactive` before `normal` before `batch`. `auto` infers the
+   class from the model (image models are interactive, video models are batch).
+2. starvation protection: every `PRIORITY_AGING_S` seconds of waiting promotes a
+   job by one class, so long video batches always make progress.
+3. fair sharing: within a class, the owner (ComfyUI prompt, or the `owner` given to
+   `run_many`) with the fewest active slots goes first, then arrival order.
+
+A job that cannot give its slot back itself (a KIE Submit node, whose task is
+awaited by a later KIE Await node) takes it with `max_hold_s`; a slot held longer
+than that is reclaimed, so an Await that never runs does not leak it.
+
+`_scheduler_stats()` reports queue depth and recent slot wait times.
+"""
+
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from .cancel import CANCEL_CHECK_INTERVAL_S, _raise_if_interrupted
+from .log import _log
+
+
+PRIORITY_OPTIONS = ["auto", "interactive", "normal", "batch"]
+PRIORITY_LEVELS = {"interactive": 0, "normal": 1, "batch": 2}
+DEFAULT_MAX_ACTIVE_TASKS = 16
+PRIORITY_AGING_S = 60.0
+WAIT_SAMPLE_SIZE = 200
+
+_BATCH_MODEL_MARKERS = ("video", "kling", "seedance", "motion")
+_INTERACTIVE_MODEL_MARKERS = ("image", "nano-banana", "seedream", "flux")
+
+_condition = threading.Condition()
+_waiting: list[dict[str, Any]] = []
+_active: dict[int, dict[str, Any]] = {}
+_ticket_ids = itertools.count(1)
+_recent_waits: deque[float] = deque(maxlen=WAIT_SAMPLE_SIZE)
+_granted_total = 0
+
+
+def _max_active_tasks() -> int:
+    try:
+        return max(int(os.environ.get("KIE_MAX_ACTIVE_TASKS", DEFAULT_MAX_ACTIVE_TASKS)), 0)
+    except ValueError:
+        return DEFAULT_MAX_ACTIVE_TASKS
+
+
+def _resolve_priority(priority: str | None, model: Any) -> str:
+    """Return the concrete priority class for a job ("auto" is inferred from the model)."""
+    if priority in PRIORITY_LEVELS:
+        return priority
+    if priority not in (None, "", "auto"):
+        raise RuntimeError(f"Invalid priority '{priority}'. Use one of: {', '.join(PRIORITY_OPTIONS)}.")
+    name = str(model or "").lower()
+    if any(marker in name for marker in _BATCH_MODEL_MARKERS):
+        return "batch"
+    if any(marker in name for marker in _INTERACTIVE_MODEL_MARKERS):
+        return "interactive"
+    return "normal"
+
+
+def _default_owner() -> str:
+    """Owner used for fair sharing: the running ComfyUI prompt, else the calling thread."""
+    try:
+        from server import PromptServer
+
+        prompt_id = getattr(PromptServer.instance, "last_prompt_id", None)
+        if prompt_id:
+            return str(prompt_id)
+    except Exception:
+        pass
+    return threading.current_thread().name
+
+
+def _effective_level(ticket: dict[str, Any], now: float) -> int:
+    promoted = int((now - ticket["enqueued_at"]) // PRIORITY_AGING_S)
+    return max(PRIORITY_LEVELS[ticket["priority"]] - promoted, 0)
+
+
+def _dispatch() -> None:
+    """Reclaim expired holds and grant free slots to the best waiters. Caller holds _condition."""
+    global _granted_total
+    limit = _max_active_tasks()
+    granted_any = False
+    now = time.time()
+    for ticket_id, ticket in list(_active.items()):
+        if ticket["max_hold_s"] is not None and now - ticket["granted_at"] >= ticket["max_hold_s"]:
+            del _active[ticket_id]
+    while _waiting and (limit == 0 or len(_active) < limit):
+        now = time.time()
+        owner_load: dict[str, int] = {}
+        for ticket in _active.values():
+            owner_load[ticket["owner"]] = owner_load.get(ticket["owner"], 0) + 1
+        best = min(
+            _waiting,
+            key=lambda ticket: (
+                _effective_level(ticket, now),
+                owner_load.get(ticket["owner"], 0),
+                ticket["enqueued_at"],
+            ),
+        )
+        _waiting.remove(best)
+        best["granted_at"] = now
+        _active[best["id"]] = best
+        _recent_waits.append(now - best["enqueued_at"])
+        _granted_total += 1
+        granted_any = True
+    if granted_any:
+        _condition.notify_all()
+
+
+def _request_task_slot(
+    model: Any,
+    *,
+    priority: str | None = "auto",
+    owner: str | None = None,
+    max_hold_s: float | None = None,
+) -> dict[str, Any]:
+    """Queue a request for a task slot and return its ticket (possibly already granted)."""
+    ticket = {
+        "id": next(_ticket_ids),
+        "model": model,
+        "priority": _resolve_priority(priority, model),
+        "owner": owner or _default_owner(),
+        "enqueued_at": time.time(),
+        "granted_at": None,
+        "max_hold_s": max_hold_s,
+    }
+    with _condition:
+        _waiting.append(ticket)
+        _dispatch()
+    return ticket
+
+
+def _wait_for_task_slot(ticket: dict[str, Any], timeout: float | None = None) -> bool:
+    """Block until the ticket is granted or timeout expires. Returns True once granted."""
+    deadline = None if timeout is None else time.time() + max(timeout, 0.0)
+    with _condition:
+        while ticket["granted_at"] is None:
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                return False
+            _condition.wait(remaining)
+            _dispatch()
+    return True
+
+
+def _release_task_slot(ticket: dict[str, Any] | None) -> None:
+    """Give back a granted slot, or withdraw a ticket that is still waiting."""
+    if ticket is None:
+        return
+    with _condition:
+        if _active.pop(ticket["id"], None) is None and ticket in _waiting:
+            _waiting.remove(ticket)
+        _dispatch()
+
+
+@contextmanager
+def _task_slot(
+    model: Any,
+    *,
+    priority: str | None = "auto",
+    owner: str | None = None,
+    log: bool = False,
+) -> Iterator[dict[str, Any]]:
+    """Hold one task slot for the duration of the block, waiting for it if needed."""
+    ticket = _request_task_slot(model, priority=priority, owner=owner)
+    try:
+        if not _wait_for_task_slot(ticket, timeout=0):
+            with _condition:
+                ahead = len(_waiting) - 1
+            _log(
+                log,
+                f"All {_max_active_tasks()} KIE task slots are busy; waiting "
+                f"(priority={ticket['priority']}, {ahead} other job(s) queued)...",
+            )
+            while not _wait_for_task_slot(ticket, timeout=CANCEL_CHECK_INTERVAL_S):
+                _raise_if_interrupted()
+            _log(log, f"Task slot granted after {ticket['granted_at'] - ticket['enqueued_at']:.1f}s.")
+        yield ticket
+    finally:
+        _release_task_slot(ticket)
+
+
+def _scheduler_stats() -> dict[str, Any]:
+    """Snapshot of the scheduler: slot usage, queue depth per class, and recent wait times."""
+    with _condition:
+        now = time.time()
+        queued_by_priority = {name: 0 for name in PRIORITY_LEVELS}
+        for ticket in _waiting:
+            queued_by_priority[ticket["priority"]] += 1
+        waits = sorted(_recent_waits)
+        oldest_wait = max((now - ticket["enqueued_at"] for ticket in _waiting), default=0.0)
+        return {
+            "max_active": _max_active_tasks(),
+            "active": len(_active),
+            "queued": len(_waiting),
+            "queued_by_priority": queued_by_priority,
+            "oldest_wait_s": round(oldest_wait, 3),
+            "granted_total": _granted_total,
+            "recent_wait_avg_s": round(sum(waits) / len(waits), 3) if waits else 0.0,
+            "recent_wait_p95_s": round(waits[min(int(len(waits) * 0.95), len(waits) - 1)], 3) if waits else 0.0,
+            "recent_wait_max_s": round(waits[-1], 3) if waits else 0.0,
+        }
@@ -1,29 +1,30 @@
 """Seedance 1.5 Pro image/text-to-video helper."""
 
 import json
-import time
 from typing import Any
 
 import torch
 
 from .auth import _load_api_key
-from .credits import _log_remaining_credits
 from .http import TransientKieError, requests
-from .jobs import _poll_task_until_complete
+from .jobs import _run_task
 from .log import _log
-from .results import _extract_result_urls
+from .metrics import _count_http_error
+from .options import (
+    SEEDANCE15_ASPECT_RATIO_OPTIONS as ASPECT_RATIO_OPTIONS,
+    SEEDANCE15_RESOLUTION_OPTIONS as RESOLUTION_OPTIONS,
+    SEEDANCE15_DURATION_OPTIONS as DURATION_OPTIONS,
+)
+from .profiling import _profiled
 from .upload import _image_tensor_to_png_bytes, _truncate_url, _upload_image
 from .validation import _validate_prompt
-from .video import _download_video, _video_bytes_to_comfy_video
+from .video import _fetch_result_video
 
 
 CREATE_TASK_URL = "https://api.kie.ai/api/v1/jobs/createTask"
 MODEL_NAME = "bytedance/seedance-1.5-pro"
 PROMPT_MAX_LENGTH = 2500
 PROMPT_MIN_LENGTH = 3
-ASPECT_RATIO_OPTIONS = ["1:1", "21:9", "4:3", "3:4", "16:9", "9:16"]
-RESOLUTION_OPTIONS = ["480p", "720p"]
-DURATION_OPTIONS = ["4", "8", "12"]
 
 
 def _validate_prompt_input(prompt: str) -> None:
@@ -80,6 +81,7 @@ def _create_seedance15_task(api_key: str, payload: dict[str, Any]) -> tuple[str,
     except requests.RequestException as exc:
         raise RuntimeError(f"Failed to call createTask endpoint: {exc}") from exc
 
+    _count_http_error(response.status_code)
     if response.status_code == 429 or response.status_code >= 500:
         raise TransientKieError(
             f"createTask returned HTTP {response.status_code}: {response.text}", status_code=response.status_code
@@ -123,6 +125,7 @@ def _build_input_urls(api_key: str, images: torch.Tensor | None, log: bool) -> l
     return image_urls
 
 
+@_profiled
 def run_seedance15pro_i2v_video(
     prompt: str,
     images: torch.Tensor | None,
@@ -161,96 +164,13 @@ def run_seedance15pro_i2v_video(
     }
 
     _log(log, "Creating Seedance 1.5 Pro task...")
-    start_time = time.time()
-    task_id, create_response_text = _create_seedance15_task(api_key, payload)
-    _log(log, f"createTask response (elapsed={time.time() - start_time:.1f}s): {create_response_text}")
-    _log(log, f"Task created with ID {task_id}. Polling for completion...")
-
-    record_data = _poll_task_until_complete(
+    video_output, _record_data, _task_id = _run_task(
         api_key,
-        task_id,
-        poll_interval_s,
-        timeout_s,
-        log,
-        start_time,
+        payload,
+        fetch=lambda record_data: _fetch_result_video(record_data, log),
+        poll_interval_s=poll_interval_s,
+        timeout_s=timeout_s,
+        log=log,
+        create_task=_create_seedance15_task,
     )
-
-    result_urls = _extract_result_urls(record_data)
-    video_url = result_urls[0]
-    _log(log, f"Final video URL: {video_url}")
-
-    video_bytes = _download_video(video_url)
-    video_output = _video_bytes_to_comfy_video(video_bytes)
-
-    _log_remaining_credits(log, record_data, api_key, _log)
     return video_output
-
-
-class KIE_Seedance15Pro_I2V:
-    HELP = """
-KIE Seedance 1.5 Pro (Image-to-Video / Text-to-Video)
-
-Generate a short video clip from a prompt with optional reference images.
-
-Inputs:
-- prompt: Text prompt (required)
-- images: Optional image batch (first two images used)
-- aspect_ratio: 1:1, 21:9, 4:3, 3:4, 16:9, or 9:16
-- resolution: 480p or 720p
-- duration: 4s, 8s, or 12s
-- fixed_lens: Lock camera lens during generation
-- generate_audio: Enable audio generation (additional cost)
-- poll_interval_s / timeout_s / log
-
-Outputs:
-- VIDEO: ComfyUI video output referencing a temporary .mp4 file
-"""
-
-    @classmethod
-    def INPUT_TYPES(cls):
-        return {
-            "required": {
-                "prompt": ("STRING", {"multiline": True}),
-            },
-            "optional": {
-                "images": ("IMAGE",),
-                "aspect_ratio": ("COMBO", {"options": ASPECT_RATIO_OPTIONS, "default": "1:1"}),
-                "resolution": ("COMBO", {"options": RESOLUTION_OPTIONS, "default": "720p"}),
-                "duration": ("COMBO", {"options": DURATION_OPTIONS, "default": "8"}),
-                "fixed_lens": ("BOOLEAN", {"default": False}),
-                "generate_audio": ("BOOLEAN", {"default": False}),
-                "log": ("BOOLEAN", {"default": True}),
-            },
-        }
-
-    RETURN_TYPES = ("VIDEO",)
-    RETURN_NAMES = ("video",)
-    FUNCTION = "generate"
-    CATEGORY = "kie/api"
-
-    def generate(
-        self,
-        prompt: str,
-        images: torch.Tensor | None = None,
-        aspect_ratio: str = "1:1",
-        resolution: str = "720p",
-        duration: str = "8",
-        fixed_lens: bool = False,
-        generate_audio: bool = False,
-        log: bool = True,
-        poll_interval_s: float = 10.0,
-        timeout_s: int = 2000,
-    ):
-        video_output = run_seedance15pro_i2v_video(
-            prompt=prompt,
-            images=images,
-            aspect_ratio=aspect_ratio,
-            resolution=resolution,
-            duration=duration,
-            fixed_lens=fixed_lens,
-            generate_audio=generate_audio,
-            poll_interval_s=poll_interval_s,
-            timeout_s=timeout_s,
-            log=log,
-        )
-        return (video_output,)
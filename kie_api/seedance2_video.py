@@ -1,28 +1,30 @@
 """Seedance 2.0 video helpers."""
 
 import json
-import time
 from typing import Any
 
 import torch
 
 from .audio import _coerce_audio_to_wav_bytes
 from .auth import _load_api_key
-from .credits import _log_remaining_credits
-from .jobs import _create_task, _poll_task_until_complete
+from .jobs import _run_task
 from .log import _log
+from .options import (
+    SEEDANCE2_MODEL_OPTIONS as MODEL_OPTIONS,
+    SEEDANCE2_DEFAULT_MODEL as DEFAULT_MODEL,
+    SEEDANCE2_ASPECT_RATIO_OPTIONS as ASPECT_RATIO_OPTIONS,
+    SEEDANCE2_RESOLUTION_OPTIONS as RESOLUTION_OPTIONS,
+    SEEDANCE2_DURATION_OPTIONS as DURATION_OPTIONS,
+)
+from .profiling import _profiled
 from .results import _extract_result_urls
+from .task_handle import submit_task
 from .upload import _image_tensor_to_png_bytes, _truncate_url, _upload_audio, _upload_image, _upload_video
 from .validation import _validate_image_tensor_batch, _validate_prompt
-from .video import _coerce_video_to_mp4_bytes, _download_video, _video_bytes_to_comfy_video
+from .video import _coerce_video_to_mp4_bytes, _download_video, _select_video_url, _video_bytes_to_comfy_video
 
 
-MODEL_OPTIONS = ["bytedance/seedance-2-fast", "bytedance/seedance-2"]
-DEFAULT_MODEL = "bytedance/seedance-2-fast"
 PROMPT_MAX_LENGTH = 5000
-ASPECT_RATIO_OPTIONS = ["16:9", "9:16", "1:1"]
-RESOLUTION_OPTIONS = ["480p", "720p", "1080p"]
-DURATION_OPTIONS = ["5", "10", "15"]
 
 
 def _validation_error(message: str) -> RuntimeError:
@@ -304,6 +306,7 @@ def preflight_seedance2_payload(
     return payload
 
 
+@_profiled
 def run_seedance2_video_payload(
     *,
     model: str,
@@ -356,14 +359,7 @@ def _normalize_request_payload(payload: dict[str, Any]) -> dict[str, Any]:
     return normalized
 
 
-def _select_video_url(result_urls: list[str]) -> str:
-    for url in result_urls:
-        lower = str(url).lower()
-        if any(lower.endswith(ext) for ext in (".mp4", ".mov", ".webm", ".m4v")):
-            return url
-    return result_urls[0]
-
-
+@_profiled
 def run_seedance2_video(
     *,
     model: str,
@@ -407,6 +403,26 @@ def run_seedance2_video(
     )
 
 
+def _fetch_seedance2_video(record_data: dict[str, Any], log: bool):
+    result_urls = _extract_result_urls(record_data)
+    video_url = _select_video_url(result_urls)
+    if len(result_urls) > 1:
+        _log(log, f"Seedance 2.0 returned {len(result_urls)} result URLs; selecting video URL {video_url}")
+    else:
+        _log(log, f"Final video URL: {video_url}")
+
+    video_bytes = _download_video(video_url, log=log)
+    return _video_bytes_to_comfy_video(video_bytes)
+
+
+def submit_seedance2_video_from_request(*, payload: dict[str, Any], log: bool) -> dict[str, Any]:
+    """Create a Seedance 2.0 task from a prebuilt payload and return a KIE_TASK handle."""
+    if not isinstance(payload, dict):
+        raise _validation_error("request payload must be an object.")
+    return submit_task(_normalize_request_payload(payload), output_kind="video", label="Seedance 2.0", log=log)
+
+
+@_profiled
 def run_seedance2_video_from_request(
     *,
     payload: dict[str, Any],
@@ -420,30 +436,13 @@ def run_seedance2_video_from_request(
     payload = _normalize_request_payload(payload)
 
     _log(log, "Creating Seedance 2.0 task...")
-    start_time = time.time()
     api_key = _load_api_key()
-    task_id, create_response_text = _create_task(api_key, payload)
-    _log(log, f"createTask response (elapsed={time.time() - start_time:.1f}s): {create_response_text}")
-    _log(log, f"Task created with ID {task_id}. Polling for completion...")
-
-    record_data = _poll_task_until_complete(
+    video_output, _record_data, _task_id = _run_task(
         api_key,
-        task_id,
-        poll_interval_s,
-        timeout_s,
-        log,
-        start_time,
+        payload,
+        fetch=lambda record_data: _fetch_seedance2_video(record_data, log),
+        poll_interval_s=poll_interval_s,
+        timeout_s=timeout_s,
+        log=log,
     )
-
-    result_urls = _extract_result_urls(record_data)
-    video_url = _select_video_url(result_urls)
-    if len(result_urls) > 1:
-        _log(log, f"Seedance 2.0 returned {len(result_urls)} result URLs; selecting video URL {video_url}")
-    else:
-        _log(log, f"Final video URL: {video_url}")
-
-    video_bytes = _download_video(video_url)
-    video_output = _video_bytes_to_comfy_video(video_bytes)
-
-    _log_remaining_credits(log, record_data, api_key, _log)
     return video_output
@@ -11,24 +11,24 @@ This module:
 - downloads and decodes the resulting image (shared helper)
 """
 
-import time
 from typing import Any
 
 import torch
 
 from .auth import _load_api_key
-from .credits import _log_remaining_credits
-from .images import _download_image, _image_bytes_to_tensor
-from .jobs import _create_task, _poll_task_until_complete
+from .images import _fetch_result_image, _validate_output_precision
+from .jobs import _run_task
 from .log import _log
-from .results import _extract_result_urls
+from .options import (
+    SEEDREAM_EDIT_ASPECT_RATIO_OPTIONS as ASPECT_RATIO_OPTIONS,
+    SEEDREAM_EDIT_QUALITY_OPTIONS as QUALITY_OPTIONS,
+)
+from .profiling import _profiled
 from .upload import _image_tensor_to_png_bytes, _truncate_url, _upload_image
 from .validation import _validate_image_tensor_batch, _validate_prompt
 
 
 MODEL_NAME = "seedream/4.5-edit"
-ASPECT_RATIO_OPTIONS = ["1:1", "4:3", "3:4", "16:9", "9:16", "2:3", "3:2", "21:9"]
-QUALITY_OPTIONS = ["basic", "high"]
 PROMPT_MAX_LENGTH = 3000
 MAX_IMAGE_COUNT = 14
 
@@ -40,6 +40,7 @@ def _validate_options(aspect_ratio: str, quality: str) -> None:
         raise RuntimeError("Invalid quality. Use the pinned enum options.")
 
 
+@_profiled
 def run_seedream45_edit(
     prompt: str,
     images: torch.Tensor,
@@ -48,6 +49,7 @@ def run_seedream45_edit(
     poll_interval_s: float,
     timeout_s: int,
     log: bool,
+    output_precision: str = "float32",
 ) -> torch.Tensor:
     """Run a Seedream 4.5 image edit job.
 
@@ -67,6 +69,7 @@ def run_seedream45_edit(
         RuntimeError: For validation errors or non-retryable API/task failures.
         TransientKieError: For retryable API/task failures.
     """
+    _validate_output_precision(output_precision)
     _validate_prompt(prompt, max_length=PROMPT_MAX_LENGTH)
     _validate_options(aspect_ratio, quality)
     images = _validate_image_tensor_batch(images)
@@ -100,27 +103,12 @@ def run_seedream45_edit(
 
     _log(log, f"Sending {len(image_urls)} image URL(s) to createTask")
     _log(log, "Creating Seedream 4.5 edit task...")
-    start_time = time.time()
-    task_id, create_response_text = _create_task(api_key, payload)
-    _log(log, f"createTask response (elapsed={time.time() - start_time:.1f}s): {create_response_text}")
-    _log(log, f"Task created with ID {task_id}. Polling for completion...")
-
-    record_data = _poll_task_until_complete(
+    image_tensor, _record_data, _task_id = _run_task(
         api_key,
-        task_id,
-        poll_interval_s,
-        timeout_s,
-        log,
-        start_time,
+        payload,
+        fetch=lambda record_data: _fetch_result_image(record_data, log, output_precision),
+        poll_interval_s=poll_interval_s,
+        timeout_s=timeout_s,
+        log=log,
     )
-
-    result_urls = _extract_result_urls(record_data)
-    _log(log, f"Result URLs: {result_urls}")
-    _log(log, f"Downloading result image from {result_urls[0]}...")
-
-    image_bytes = _download_image(result_urls[0])
-    image_tensor = _image_bytes_to_tensor(image_bytes)
-    _log(log, "Image downloaded and decoded.")
-
-    _log_remaining_credits(log, record_data, api_key, _log)
     return image_tensor
@@ -1,25 +1,26 @@
 """Seedream 4.5 text-to-image helper."""
 
 import json
-import time
 from typing import Any
 
 import torch
 
 from .auth import _load_api_key
-from .credits import _log_remaining_credits
-from .http import TransientKieError, requests
-from .images import _download_image, _image_bytes_to_tensor
-from .jobs import _poll_task_until_complete
+from .http import requests, TransientKieError
+from .images import _fetch_result_image, _validate_output_precision
+from .jobs import _run_task
 from .log import _log
-from .results import _extract_result_urls
+from .metrics import _count_http_error
+from .options import (
+    SEEDREAM_ASPECT_RATIO_OPTIONS as ASPECT_RATIO_OPTIONS,
+    SEEDREAM_QUALITY_OPTIONS as QUALITY_OPTIONS,
+)
+from .profiling import _profiled
 from .validation import _validate_prompt
 
 
 CREATE_TASK_URL = "https://api.kie.ai/api/v1/jobs/createTask"
 MODEL_NAME = "seedream/4.5-text-to-image"
-ASPECT_RATIO_OPTIONS = ["1:1", "4:3", "3:4", "16:9", "9:16", "2:3", "3:2", "21:9"]
-QUALITY_OPTIONS = ["basic", "high"]
 PROMPT_MAX_LENGTH = 3000
 
 
@@ -41,6 +42,7 @@ def _create_seedream_task(api_key: str, payload: dict[str, Any]) -> tuple[str, s
     except requests.RequestException as exc:
         raise RuntimeError(f"Failed to call createTask endpoint: {exc}") from exc
 
+    _count_http_error(response.status_code)
     if response.status_code == 429 or response.status_code >= 500:
         raise TransientKieError(
             f"createTask returned HTTP {response.status_code}: {response.text}", status_code=response.status_code
@@ -62,6 +64,7 @@ def _create_seedream_task(api_key: str, payload: dict[str, Any]) -> tuple[str, s
     return task_id, response.text
 
 
+@_profiled
 def run_seedream45_text_to_image(
     prompt: str,
     aspect_ratio: str,
@@ -69,7 +72,9 @@ def run_seedream45_text_to_image(
     poll_interval_s: float,
     timeout_s: int,
     log: bool,
+    output_precision: str = "float32",
 ) -> torch.Tensor:
+    _validate_output_precision(output_precision)
     _validate_prompt(prompt, max_length=PROMPT_MAX_LENGTH)
     _validate_options(aspect_ratio, quality)
 
@@ -84,27 +89,13 @@ def run_seedream45_text_to_image(
     }
 
     _log(log, "Creating Seedream 4.5 text-to-image task...")
-    start_time = time.time()
-    task_id, create_response_text = _create_seedream_task(api_key, payload)
-    _log(log, f"createTask response (elapsed={time.time() - start_time:.1f}s): {create_response_text}")
-    _log(log, f"Task created with ID {task_id}. Polling for completion...")
-
-    record_data = _poll_task_until_complete(
+    image_tensor, _record_data, _task_id = _run_task(
         api_key,
-        task_id,
-        poll_interval_s,
-        timeout_s,
-        log,
-        start_time,
+        payload,
+        fetch=lambda record_data: _fetch_result_image(record_data, log, output_precision),
+        poll_interval_s=poll_interval_s,
+        timeout_s=timeout_s,
+        log=log,
+        create_task=_create_seedream_task,
     )
-
-    result_urls = _extract_result_urls(record_data)
-    _log(log, f"Result URLs: {result_urls}")
-    _log(log, f"Downloading result image from {result_urls[0]}...")
-
-    image_bytes = _download_image(result_urls[0])
-    image_tensor = _image_bytes_to_tensor(image_bytes)
-    _log(log, "Image downloaded and decoded.")
-
-    _log_remaining_credits(log, record_data, api_key, _log)
     return image_tensor
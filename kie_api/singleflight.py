@@ -0,0 +1,116 @@
+"""In-process singleflight for identical concurrent KIE work.
+
+When the same graph is queued twice, or two branches run the same node with the
+same inputs, each call used to upload, create a task, poll, and download on its
+own. `_singleflight` lets the first caller for a key (the leader) do the work
+while concurrent callers with the same key wait for and share its result:
+
+- uploads are keyed by the SHA-256 of the file content (on by default)
+- createTask + polling is keyed by the canonical payload hash (see journal.py)
+- result fetching is keyed by task id and the fetch function
+
+Sharing an upload never changes what a node produces. Sharing a task does: KIE
+generators take no seed, so two identical requests normally return two different
+generations, and with task sharing they return the same one. Task and result
+sharing is therefore opt-in.
+
+Only in-flight work is shared; a flight is forgotten as soon as it completes.
+Completed results are reused across calls by the job journal instead.
+
+Shared results follow ComfyUI's own convention that node outputs are immutable
+(one output tensor is already fanned out to every downstream consumer), so
+tensors and VIDEO objects are handed to every waiter as-is. Mutable containers
+(dicts, lists) are shallow-copied for each waiter so one caller's edits do not
+leak into another's.
+
+Environment:
+- KIE_SINGLEFLIGHT=1 shares tasks and results between identical concurrent requests.
+- KIE_UPLOAD_DEDUP=0 disables sharing of concurrent identical uploads.
+"""
+
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, TypeVar
+
+from .cancel import _wait_future
+
+
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_flights: dict[Hashable, Future] = {}
+
+
+def _singleflight_enabled() -> bool:
+    return os.environ.get("KIE_SINGLEFLIGHT", "0").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _upload_dedup_enabled() -> bool:
+    return os.environ.get("KIE_UPLOAD_DEDUP", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _share_result(value: Any) -> Any:
+    """Return a waiter's view of a shared result (copy-on-write for mutable containers)."""
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, tuple):
+        return tuple(_share_result(item) for item in value)
+    return value
+
+
+def _singleflight(key: Hashable | None, fn: Callable[[], T]) -> tuple[T, bool]:
+    """Run fn once among concurrent callers that use the same key.
+
+    The leader's exception is re-raised in every waiter. A None key always runs
+    fn directly; callers pass None when their kind of sharing is disabled.
+
+    Returns:
+        A tuple of (result, shared). `shared` is True when the result came from
+        another caller's in-flight work.
+    """
+    if key is None:
+        return fn(), False
+
+    with _lock:
+        future = _flights.get(key)
+        is_leader = future is None
+        if is_leader:
+            future = Future()
+            _flights[key] = future
+
+    if not is_leader:
+        return _share_result(_wait_future(future)), True
+
+    try:
+        result = fn()
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(result)
+        return result, False
+    finally:
+        with _lock:
+            _flights.pop(key, None)
+
+
+def _fetch_share_key(fetch: Callable[..., Any]) -> Hashable | None:
+    """Identify a fetch callable by its code and captured values, or None if not shareable.
+
+    Runners pass small lambdas such as
+    `lambda record_data: _fetch_result_image(record_data, log, output_precision)`;
+    two of them produce the same output exactly when the code and the captured
+    values match.
+    """
+    code = getattr(fetch, "__code__", None)
+    if code is None:
+        return None
+    try:
+        captured = tuple(cell.cell_contents for cell in (fetch.__closure__ or ()))
+        hash(captured)
+    except (TypeError, ValueError):
+        return None
+    return code, captured
@@ -0,0 +1,324 @@
+"""Latency statistics: where the time of each KIE task goes.
+
+With KIE_STATS=1, every task that finishes is stored as one row in a local SQLite
+database (`config/kie_stats.sqlite`), with its latency split into:
+
+- upload: wall time of the node's uploads (before the task was created)
+- queue: time the task waited at KIE before generation started
+- generation: time KIE spent generating
+- download: wall time of the node's result downloads
+
+Queue and generation come from the record's `createTime`, `startTime` and
+`completeTime` (epoch milliseconds) when KIE reports them; a missing start is
+derived from `completeTime - costTime`. Otherwise they fall back to the times
+observed by polling, which are only as precise as the poll interval. Both are
+stored, and the difference between the observed and KIE-reported totals is kept
+as `poll_lag_s`: how long after KIE finished the task the pack noticed.
+
+Nodes that create several tasks (grids, batches) report the same upload and
+download times for each of their tasks: the wall time the user waited on them.
+Tasks finished outside a node (the batch API) have no upload or download times.
+
+The timings are collected through the telemetry spans (see telemetry.py).
+`scripts/stats_report.py` and the KIE Latency Stats node break them down per
+model and hour of day.
+
+Environment:
+- KIE_STATS=1 enables the database.
+- KIE_STATS_PATH overrides its location.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+
+STATS_PATH = Path(__file__).resolve().parent.parent / "config" / "kie_stats.sqlite"
+GROUP_OPTIONS = ["model", "model_hour", "hour"]
+PHASES = ("upload_s", "queue_s", "generation_s", "download_s")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    node TEXT,
+    model TEXT,
+    state TEXT,
+    created_at REAL,
+    finished_at REAL,
+    hour INTEGER,
+    upload_s REAL,
+    queue_s REAL,
+    generation_s REAL,
+    download_s REAL,
+    observed_queue_s REAL,
+    observed_generation_s REAL,
+    observed_total_s REAL,
+    kie_created_at REAL,
+    kie_started_at REAL,
+    kie_completed_at REAL,
+    kie_total_s REAL,
+    poll_lag_s REAL
+)
+"""
+_COLUMNS = (
+    "task_id",
+    "node",
+    "model",
+    "state",
+    "created_at",
+    "finished_at",
+    "hour",
+    "upload_s",
+    "queue_s",
+    "generation_s",
+    "download_s",
+    "observed_queue_s",
+    "observed_generation_s",
+    "observed_total_s",
+    "kie_created_at",
+    "kie_started_at",
+    "kie_completed_at",
+    "kie_total_s",
+    "poll_lag_s",
+)
+
+_lock = threading.Lock()
+
+
+def _stats_enabled() -> bool:
+    return os.environ.get("KIE_STATS", "0").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _stats_path() -> Path:
+    override = os.environ.get("KIE_STATS_PATH", "").strip()
+    return Path(override) if override else STATS_PATH
+
+
+def _epoch_s(value: Any) -> float | None:
+    """Epoch seconds from a record timestamp in milliseconds (or seconds)."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if number <= 0:
+        return None
+    return number / 1000.0 if number > 1e11 else number
+
+
+def _record_timestamps(record_data: dict[str, Any] | None) -> dict[str, float | None]:
+    """KIE's own creation, start and completion times of a task, where the record has them."""
+    record_data = record_data or {}
+    created = _epoch_s(record_data.get("createTime"))
+    completed = _epoch_s(record_data.get("completeTime"))
+    started = _epoch_s(record_data.get("startTime"))
+    if started is None and completed is not None:
+        try:
+            cost_s = float(record_data.get("costTime")) / 1000.0
+        except (TypeError, ValueError):
+            cost_s = None
+        if cost_s is not None and cost_s >= 0:
+            started = completed - cost_s
+    return {"kie_created_at": created, "kie_started_at": started, "kie_completed_at": completed}
+
+
+def _difference(later: float | None, earlier: float | None) -> float | None:
+    if later is None or earlier is None or later < earlier:
+        return None
+    return round(later - earlier, 3)
+
+
+def _stats_task_row(
+    task_id: str,
+    model: Any,
+    state: Any,
+    created_at: float,
+    started_seen: float | None,
+    finished_at: float,
+    record_data: dict[str, Any] | None,
+) -> dict[str, Any]:
+    """Build the row of a finished task from the observed times and its record."""
+    kie = _record_timestamps(record_data)
+    observed_total = _difference(finished_at, created_at)
+    kie_total = _difference(kie["kie_completed_at"], kie["kie_created_at"])
+    kie_queue = _difference(kie["kie_started_at"], kie["kie_created_at"])
+    kie_generation = _difference(kie["kie_completed_at"], kie["kie_started_at"])
+    observed_queue = _difference(started_seen, created_at)
+    observed_generation = _difference(finished_at, started_seen)
+    return {
+        "task_id": task_id,
+        "model": str(model or "unknown"),
+        "state": state,
+        "created_at": round(created_at, 3),
+        "finished_at": round(finished_at, 3),
+        "hour": time.localtime(created_at).tm_hour,
+        "queue_s": kie_queue if kie_queue is not None else observed_queue,
+        "generation_s": kie_generation if kie_generation is not None else observed_generation,
+        "observed_queue_s": observed_queue,
+        "observed_generation_s": observed_generation,
+        "observed_total_s": observed_total,
+        **kie,
+        "kie_total_s": kie_total,
+        "poll_lag_s": _difference(observed_total, kie_total),
+    }
+
+
+def _busy_s(intervals: list[tuple[float, float]]) -> float | None:
+    """Wall time covered by (start, duration) intervals; overlapping ones count once."""
+    if not intervals:
+        return None
+    total = 0.0
+    current_start, current_end = None, None
+    for start, duration in sorted(intervals):
+        end = start + duration
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    total += current_end - current_start
+    return round(total, 3)
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(str(path), timeout=10)
+    connection.execute(_SCHEMA)
+    return connection
+
+
+def _stats_record_tasks(
+    rows: list[dict[str, Any]],
+    *,
+    node: str | None = None,
+    upload_s: float | None = None,
+    download_s: float | None = None,
+) -> None:
+    """Store finished tasks, with the upload and download times of the node that ran them."""
+    if not rows or not _stats_enabled():
+        return
+    values = [
+        tuple({**row, "node": node, "upload_s": upload_s, "download_s": download_s}.get(column) for column in _COLUMNS)
+        for row in rows
+    ]
+    placeholders = ", ".join("?" for _ in _COLUMNS)
+    try:
+        with _lock:
+            connection = _connect(_stats_path())
+            try:
+                with connection:
+                    connection.executemany(
+                        f"INSERT OR REPLACE INTO tasks ({', '.join(_COLUMNS)}) VALUES ({placeholders})", values
+                    )
+            finally:
+                connection.close()
+    except (OSError, sqlite3.Error):
+        pass
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(round(pct / 100.0 * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def _mean(values: list[float]) -> float | None:
+    return round(sum(values) / len(values), 2) if values else None
+
+
+def _stats_report(
+    since_s: float | None = None,
+    *,
+    group_by: str = "model_hour",
+    model: str | None = None,
+    path: Path | None = None,
+) -> list[dict[str, Any]]:
+    """Summarize the stored tasks per model and/or hour of day.
+
+    Args:
+        since_s: Only include tasks created in the last `since_s` seconds.
+        group_by: "model", "model_hour", or "hour" (local hour of day the task was created).
+        model: Only include this model.
+        path: Database file (defaults to the configured one).
+
+    Returns:
+        One dict per group: the group keys, task and failure counts, mean upload,
+        queue, generation and download seconds of successful tasks, p50/p90 of
+        their total time, mean poll lag, and the share of tasks whose queue and
+        generation times came from KIE's timestamps.
+    """
+    if group_by not in GROUP_OPTIONS:
+        raise RuntimeError(f"group_by must be one of {', '.join(GROUP_OPTIONS)}.")
+    path = path or _stats_path()
+    if not path.is_file():
+        return []
+    query = f"SELECT {', '.join(_COLUMNS)} FROM tasks WHERE created_at >= ?"
+    params: list[Any] = [time.time() - since_s if since_s else 0.0]
+    if model:
+        query += " AND model = ?"
+        params.append(model)
+    try:
+        connection = sqlite3.connect(str(path), timeout=10)
+        try:
+            rows = [dict(zip(_COLUMNS, values)) for values in connection.execute(query, params)]
+        finally:
+            connection.close()
+    except sqlite3.Error as exc:
+        raise RuntimeError(f"Failed to read the stats database {path}: {exc}") from exc
+
+    groups: dict[tuple, list[dict[str, Any]]] = {}
+    for row in rows:
+        key = {
+            "model": (row["model"],),
+            "model_hour": (row["model"], row["hour"]),
+            "hour": (row["hour"],),
+        }[group_by]
+        groups.setdefault(key, []).append(row)
+
+    report = []
+    for key, group in sorted(groups.items(), key=lambda item: tuple(str(part) for part in item[0])):
+        succeeded = [row for row in group if row["state"] == "success"]
+        entry: dict[str, Any] = {}
+        if group_by in ("model", "model_hour"):
+            entry["model"] = key[0]
+        if group_by in ("model_hour", "hour"):
+            entry["hour"] = key[-1]
+        entry["tasks"] = len(group)
+        entry["failed"] = len(group) - len(succeeded)
+        for phase in PHASES:
+            entry[phase] = _mean([row[phase] for row in succeeded if row[phase] is not None])
+        totals = [
+            sum(row[phase] or 0.0 for phase in PHASES)
+            for row in succeeded
+            if row["queue_s"] is not None and row["generation_s"] is not None
+        ]
+        entry["total_p50_s"] = round(_percentile(totals, 50), 2) if totals else None
+        entry["total_p90_s"] = round(_percentile(totals, 90), 2) if totals else None
+        entry["poll_lag_s"] = _mean([row["poll_lag_s"] for row in succeeded if row["poll_lag_s"] is not None])
+        entry["kie_timed"] = round(
+            sum(1 for row in group if row["kie_started_at"] is not None) / len(group), 2
+        )
+        report.append(entry)
+    return report
+
+
+def _format_stats_report(report: list[dict[str, Any]]) -> str:
+    """Render a report from `_stats_report` as a fixed-width text table."""
+    if not report:
+        return "No task statistics recorded yet. Set KIE_STATS=1 and run some nodes."
+    keys = [key for key in ("model", "hour") if key in report[0]]
+    header = [*keys, "tasks", "failed", "upload", "queue", "generation", "download", "p50", "p90", "poll lag", "kie timed"]
+    lines = []
+    for entry in report:
+        cells = [str(entry[key]) for key in keys] + [str(entry["tasks"]), str(entry["failed"])]
+        for field in (*PHASES, "total_p50_s", "total_p90_s", "poll_lag_s"):
+            cells.append("-" if entry[field] is None else f"{entry[field]:.1f}s")
+        cells.append(f"{entry['kie_timed'] * 100:.0f}%")
+        lines.append(cells)
+    widths = [max(len(row[idx]) for row in [header, *lines]) for idx in range(len(header))]
+    return "\n".join(
+        "  ".join(cell.ljust(width) if idx < len(keys) else cell.rjust(width) for idx, (cell, width) in enumerate(zip(row, widths)))
+        for row in [header, *lines]
+    )
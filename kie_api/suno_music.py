@@ -2,27 +2,38 @@
 
 import json
 import time
-from typing import Any
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
 
 import torch
 from .auth import _load_api_key
+from .cancel import _interruptible_sleep, _wait_future
 from .audio import _audio_bytes_to_comfy_audio
+from .download import _download_bytes
 from .images import _download_image, _image_bytes_to_tensor
 from .http import TransientKieError, requests
+from .ledger import _ledger_task_finished
 from .log import _log
+from .memory import _memory_stage
+from .metrics import _count_http_error
+from .options import SUNO_MODEL_OPTIONS as MODEL_OPTIONS
+from .profiling import _profiled
+from .telemetry import _span, _telemetry_task_created, _telemetry_task_state, _telemetry_task_timed_out
 
 GENERATE_URL = "https://api.kie.ai/api/v1/generate"
 RECORD_INFO_URL = "https://api.kie.ai/api/v1/generate/record-info"
-MODEL_OPTIONS = ["V4", "V4_5", "V4_5PLUS", "V4_5ALL", "V5"]
 VOCAL_GENDER_OPTIONS = ["m", "f"]
 POLLABLE_STATES = {"PENDING", "TEXT_SUCCESS", "FIRST_SUCCESS"}
 SUCCESS_STATE = "SUCCESS"
+FIRST_SUCCESS_STATE = "FIRST_SUCCESS"
 FAIL_STATES = {
     "CREATE_TASK_FAILED",
     "GENERATE_AUDIO_FAILED",
     "CALLBACK_EXCEPTION",
     "SENSITIVE_WORD_ERROR",
 }
+# Two tracks + two cover images are fetched in parallel once the task completes.
+FETCH_WORKERS = 4
 
 
 def _format_record_for_output(record: dict[str, Any]) -> str:
@@ -67,6 +78,7 @@ def _fetch_music_record(api_key: str, task_id: str) -> dict[str, Any]:
     except requests.RequestException as exc:
         raise RuntimeError(f"Failed to call record-info endpoint: {exc}") from exc
 
+    _count_http_error(response.status_code)
     if response.status_code == 429 or response.status_code >= 500:
         raise TransientKieError(
             f"record-info returned HTTP {response.status_code}: {response.text}",
@@ -161,41 +173,227 @@ def _extract_image_urls(record_data: dict[str, Any]) -> list[str]:
     return urls
 
 
+def _download_audio(url: str, index: int) -> bytes:
+    with _memory_stage("download", "audio") as stage:
+        audio_bytes = _download_bytes(url, label=f"audio {index}", timeout_s=180, buffers=stage["buffers"])
+        stage["bytes"] = len(audio_bytes)
+    return audio_bytes
+
+
+def _fetch_audio_output(url: str, index: int) -> dict:
+    """Download and decode one Suno track into a ComfyUI AUDIO dict with a [B, C, T] waveform."""
+    audio_bytes = _download_audio(url, index)
+    audio_output = _audio_bytes_to_comfy_audio(audio_bytes, f"audio_{index}.mp3")
+    try:
+        waveform = audio_output.get("waveform")
+        if not isinstance(waveform, torch.Tensor):
+            waveform = torch.as_tensor(waveform)
+        if waveform.ndim == 1:
+            waveform = waveform.unsqueeze(0)
+        if waveform.ndim == 2:
+            waveform = waveform.unsqueeze(0)
+        audio_output["waveform"] = waveform
+    except Exception as exc:
+        raise RuntimeError(f"Failed to normalize audio waveform for ComfyUI: {exc}") from exc
+    return audio_output
+
+
+def _fetch_cover_image(url: str) -> torch.Tensor:
+    try:
+        return _image_bytes_to_tensor(_download_image(url))
+    except Exception as exc:
+        raise RuntimeError(f"Failed to download cover image: {exc}") from exc
+
+
+def _extract_tracks(record_data: dict[str, Any]) -> list[dict[str, str | None]]:
+    """Return per-track URL info (final audio, stream audio, cover image) in track order."""
+    items: list[Any] = []
+    callback_items = record_data.get("data")
+    if isinstance(callback_items, list):
+        items.extend(callback_items)
+    response = record_data.get("response")
+    if isinstance(response, dict) and isinstance(response.get("sunoData"), list):
+        items.extend(response["sunoData"])
+
+    tracks: list[dict[str, str | None]] = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        tracks.append(
+            {
+                "audio_url": item.get("audioUrl") or item.get("audio_url") or None,
+                "stream_url": item.get("streamAudioUrl") or item.get("stream_audio_url") or None,
+                "image_url": item.get("imageUrl") or item.get("image_url") or None,
+            }
+        )
+    return tracks
+
+
+def _first_track_url(record_data: dict[str, Any], use_stream_url: bool) -> str | None:
+    """Return the URL usable for track 1, preferring the final audio over the stream."""
+    tracks = _extract_tracks(record_data)
+    if not tracks:
+        return None
+    if tracks[0]["audio_url"]:
+        return tracks[0]["audio_url"]
+    if use_stream_url:
+        return tracks[0]["stream_url"]
+    return None
+
+
+def _silent_audio_like(audio_output: dict) -> dict:
+    """Build a one-second silent AUDIO placeholder matching another track's layout."""
+    waveform = audio_output["waveform"]
+    sample_rate = int(audio_output["sample_rate"])
+    channels = waveform.shape[1] if waveform.ndim == 3 else 1
+    return {"waveform": torch.zeros((1, channels, sample_rate)), "sample_rate": sample_rate}
+
+
 def _poll_music_until_complete(
     api_key: str,
     task_id: str,
     poll_interval_s: float,
     timeout_s: int,
     log: bool,
+    return_on_first: bool = False,
+    use_stream_url: bool = False,
+    on_record: Callable[[dict[str, Any], str | None], None] | None = None,
 ) -> dict[str, Any]:
+    """Poll record-info until SUCCESS (or, with return_on_first, until track 1 is usable).
+
+    on_record is called with every non-terminal record so callers can start work
+    (for example downloading track 1) while polling continues.
+    """
     start_time = time.time()
     last_state = None
 
     while True:
         elapsed = time.time() - start_time
         if elapsed > timeout_s:
+            _telemetry_task_timed_out(task_id)
             raise RuntimeError(f"Task {task_id} timed out after {timeout_s}s.")
 
         record = _fetch_music_record(api_key, task_id)
         state = record.get("status") or record.get("state") or record.get("callbackType")
+        _telemetry_task_state(
+            task_id,
+            state,
+            terminal=state in (SUCCESS_STATE, "complete", "error") or state in FAIL_STATES,
+            record=record,
+        )
 
         if log and state != last_state:
             _log(log, f"Suno task {task_id} state: {state}")
             last_state = state
 
         if state == SUCCESS_STATE or state == "complete":
+            _ledger_task_finished(task_id, "success", record, model="suno")
             return record
         if state in FAIL_STATES or state == "error":
+            _ledger_task_finished(task_id, "fail", record, model="suno")
             raise RuntimeError(f"Suno task {task_id} failed with state: {state}")
 
+        if on_record is not None:
+            on_record(record, state)
+        if return_on_first and state == FIRST_SUCCESS_STATE and _first_track_url(record, use_stream_url):
+            return record
+
         if state in POLLABLE_STATES or state is None:
-            time.sleep(poll_interval_s)
+            _interruptible_sleep(poll_interval_s)
             continue
 
         # Unknown state, keep polling conservatively
-        time.sleep(poll_interval_s)
+        _interruptible_sleep(poll_interval_s)
 
 
+def _fetch_suno_outputs(
+    record: dict[str, Any],
+    *,
+    log: bool,
+    executor: ThreadPoolExecutor,
+    prefetched: dict[str, Future],
+) -> tuple[dict, dict, torch.Tensor, torch.Tensor]:
+    """Fetch both tracks and both covers concurrently, reusing any prefetched track."""
+    audio_urls = _extract_audio_urls(record)
+    if len(audio_urls) < 2:
+        raise RuntimeError("Expected two audio_url entries in record-info response.")
+    audio_url_1 = audio_urls[0]
+    audio_url_2 = audio_urls[1]
+    if log:
+        _log(log, f"Suno audio URL 1: {audio_url_1}")
+        _log(log, f"Suno audio URL 2: {audio_url_2}")
+
+    image_urls = _extract_image_urls(record)
+    if len(image_urls) < 2:
+        raise RuntimeError("Expected two image_url entries in record-info response.")
+    image_url_1 = image_urls[0]
+    image_url_2 = image_urls[1]
+    if log:
+        _log(log, f"Suno cover image URL 1: {image_url_1}")
+        _log(log, f"Suno cover image URL 2: {image_url_2}")
+
+    # Results are collected in output order so the first failing artifact
+    # (in that order) is the one reported.
+    futures = [
+        prefetched.get(audio_url_1) or executor.submit(_fetch_audio_output, audio_url_1, 1),
+        executor.submit(_fetch_audio_output, audio_url_2, 2),
+        executor.submit(_fetch_cover_image, image_url_1),
+        executor.submit(_fetch_cover_image, image_url_2),
+    ]
+    audio_output_1, audio_output_2, image_tensor_1, image_tensor_2 = [_wait_future(future) for future in futures]
+
+    if log:
+        waveform_1 = audio_output_1.get("waveform")
+        shape_1 = getattr(waveform_1, "shape", None)
+        _log(log, f"Suno audio 1 waveform shape: {shape_1}")
+        waveform_2 = audio_output_2.get("waveform")
+        shape_2 = getattr(waveform_2, "shape", None)
+        _log(log, f"Suno audio 2 waveform shape: {shape_2}")
+
+    return audio_output_1, audio_output_2, image_tensor_1, image_tensor_2
+
+
+def _fetch_suno_first_track(
+    record: dict[str, Any],
+    *,
+    task_id: str,
+    log: bool,
+    use_stream_url: bool,
+    executor: ThreadPoolExecutor,
+    prefetched: dict[str, Future],
+) -> tuple[dict, dict, torch.Tensor, torch.Tensor]:
+    """Fetch track 1 and the available covers; track 2 and missing covers are placeholders."""
+    audio_url_1 = _first_track_url(record, use_stream_url)
+    if not audio_url_1:
+        raise RuntimeError("No audio_url found for track 1 in record-info response.")
+    tracks = _extract_tracks(record)
+    image_url_1 = tracks[0]["image_url"]
+    image_url_2 = tracks[1]["image_url"] if len(tracks) > 1 else None
+    if log:
+        _log(log, f"Suno early return: track 1 URL: {audio_url_1}")
+
+    audio_future = prefetched.get(audio_url_1) or executor.submit(_fetch_audio_output, audio_url_1, 1)
+    image_future_1 = executor.submit(_fetch_cover_image, image_url_1) if image_url_1 else None
+    image_future_2 = executor.submit(_fetch_cover_image, image_url_2) if image_url_2 else None
+
+    audio_output_1 = _wait_future(audio_future)
+    image_tensor_1 = _wait_future(image_future_1) if image_future_1 is not None else torch.zeros((1, 64, 64, 3))
+    image_tensor_2 = _wait_future(image_future_2) if image_future_2 is not None else torch.zeros_like(image_tensor_1)
+
+    # The placeholders look like real outputs downstream, so say so even with logging off.
+    placeholders = ["audio_2 is 1 s of silence"]
+    for index, future in ((1, image_future_1), (2, image_future_2)):
+        if future is None:
+            placeholders.append(f"image_{index} is a black placeholder (cover not ready)")
+    _log(
+        True,
+        f"Suno early return: track 2 is still generating; {', '.join(placeholders)}. "
+        f"Run KIE Suno Music (Fetch) with task_id {task_id} to collect the real outputs.",
+    )
+    return audio_output_1, _silent_audio_like(audio_output_1), image_tensor_1, image_tensor_2
+
+
+@_profiled
 def run_suno_generate(
     *,
     prompt: str,
@@ -212,8 +410,16 @@ def run_suno_generate(
     poll_interval_s: float = 30.0,
     timeout_s: int = 1800,
     log: bool = True,
-) -> tuple[dict, dict, str, torch.Tensor, torch.Tensor]:
-    """Create a Suno music generation task and return two audio outputs + formatted record-info JSON + two cover images."""
+    early_return: bool = False,
+    use_stream_url: bool = False,
+) -> tuple[dict, dict, str, torch.Tensor, torch.Tensor, str]:
+    """Create a Suno music generation task and return two audio outputs + formatted record-info JSON + two cover images + the task id.
+
+    With early_return, the call returns as soon as track 1 is available (FIRST_SUCCESS);
+    audio_2 is then one second of silence, covers that are not ready yet are black
+    64x64 images, and run_suno_fetch can collect the real outputs later.
+    use_stream_url allows the streaming URL to stand in for track 1 before its final file exists.
+    """
     if model not in MODEL_OPTIONS:
         raise RuntimeError("Invalid model. Use the pinned enum options.")
     if vocal_gender and vocal_gender not in VOCAL_GENDER_OPTIONS:
@@ -267,11 +473,13 @@ def run_suno_generate(
     api_key = _load_api_key()
     headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
 
-    try:
-        response = requests.post(GENERATE_URL, headers=headers, json=payload, timeout=60)
-    except requests.RequestException as exc:
-        raise RuntimeError(f"Failed to call Suno generate endpoint: {exc}") from exc
+    with _span("createTask", model=f"suno/{model}"):
+        try:
+            response = requests.post(GENERATE_URL, headers=headers, json=payload, timeout=60)
+        except requests.RequestException as exc:
+            raise RuntimeError(f"Failed to call Suno generate endpoint: {exc}") from exc
 
+    _count_http_error(response.status_code)
     if response.status_code == 429 or response.status_code >= 500:
         raise TransientKieError(
             f"generate returned HTTP {response.status_code}: {response.text}",
@@ -291,9 +499,70 @@ def run_suno_generate(
     if not task_id:
         raise RuntimeError("generate endpoint did not return a taskId.")
 
+    _telemetry_task_created(task_id, f"suno/{model}")
     if log:
         _log(log, f"Suno task created: {task_id} (model={model})")
 
+    # Track 1 usually finishes well before track 2 (FIRST_SUCCESS). Start its
+    # download as soon as the final URL appears so it overlaps further polling.
+    executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="kie-suno-fetch")
+    prefetched: dict[str, Future] = {}
+
+    def _prefetch_first_track(record: dict[str, Any], state: str | None) -> None:
+        if state != FIRST_SUCCESS_STATE:
+            return
+        tracks = _extract_tracks(record)
+        audio_url_1 = tracks[0]["audio_url"] if tracks else None
+        if audio_url_1 and audio_url_1 not in prefetched:
+            if log:
+                _log(log, f"Suno track 1 ready; prefetching {audio_url_1}")
+            prefetched[audio_url_1] = executor.submit(_fetch_audio_output, audio_url_1, 1)
+
+    try:
+        record = _poll_music_until_complete(
+            api_key,
+            task_id,
+            poll_interval_s=poll_interval_s,
+            timeout_s=timeout_s,
+            log=log,
+            return_on_first=early_return,
+            use_stream_url=use_stream_url,
+            on_record=_prefetch_first_track,
+        )
+        if log:
+            _log(log, f"Suno record-info response keys: {list(record.keys())}")
+
+        state = record.get("status") or record.get("state") or record.get("callbackType")
+        if early_return and state == FIRST_SUCCESS_STATE:
+            outputs = _fetch_suno_first_track(
+                record, task_id=task_id, log=log, use_stream_url=use_stream_url, executor=executor, prefetched=prefetched
+            )
+        else:
+            outputs = _fetch_suno_outputs(record, log=log, executor=executor, prefetched=prefetched)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    audio_output_1, audio_output_2, image_tensor_1, image_tensor_2 = outputs
+    return audio_output_1, audio_output_2, _format_record_for_output(record), image_tensor_1, image_tensor_2, task_id
+
+
+@_profiled
+def run_suno_fetch(
+    *,
+    task_id: str,
+    poll_interval_s: float = 30.0,
+    timeout_s: int = 1800,
+    log: bool = True,
+) -> tuple[dict, dict, str, torch.Tensor, torch.Tensor]:
+    """Wait for an existing Suno task to reach SUCCESS and return both tracks and covers.
+
+    Used to fill in track 2 after an early-return generation.
+    """
+    task_id = (task_id or "").strip()
+    if not task_id:
+        raise RuntimeError("task_id is required.")
+
+    api_key = _load_api_key()
     record = _poll_music_until_complete(
         api_key,
         task_id,
@@ -301,67 +570,11 @@ def run_suno_generate(
         timeout_s=timeout_s,
         log=log,
     )
-    if log:
-        _log(log, f"Suno record-info response keys: {list(record.keys())}")
-    audio_urls = _extract_audio_urls(record)
-    if len(audio_urls) < 2:
-        raise RuntimeError("Expected two audio_url entries in record-info response.")
-    audio_url_1 = audio_urls[0]
-    audio_url_2 = audio_urls[1]
-    if log:
-        _log(log, f"Suno audio URL 1: {audio_url_1}")
-        _log(log, f"Suno audio URL 2: {audio_url_2}")
-
-    try:
-        response_1 = requests.get(audio_url_1, timeout=180)
-        response_2 = requests.get(audio_url_2, timeout=180)
-    except requests.RequestException as exc:
-        raise RuntimeError(f"Failed to download audio: {exc}") from exc
-    if response_1.status_code != 200:
-        raise RuntimeError(f"Failed to download audio 1 (status code {response_1.status_code}).")
-    if response_2.status_code != 200:
-        raise RuntimeError(f"Failed to download audio 2 (status code {response_2.status_code}).")
-
-    audio_bytes_1 = response_1.content
-    audio_bytes_2 = response_2.content
-
-    audio_output_1 = _audio_bytes_to_comfy_audio(audio_bytes_1, "audio_1.mp3")
-    audio_output_2 = _audio_bytes_to_comfy_audio(audio_bytes_2, "audio_2.mp3")
-    try:
-        import torch
-        for audio_output in (audio_output_1, audio_output_2):
-            waveform = audio_output.get("waveform")
-            if not isinstance(waveform, torch.Tensor):
-                waveform = torch.as_tensor(waveform)
-            if waveform.ndim == 1:
-                waveform = waveform.unsqueeze(0)
-            if waveform.ndim == 2:
-                waveform = waveform.unsqueeze(0)
-            audio_output["waveform"] = waveform
-    except Exception as exc:
-        raise RuntimeError(f"Failed to normalize audio waveform for ComfyUI: {exc}") from exc
-    if log:
-        waveform_1 = audio_output_1.get("waveform")
-        shape_1 = getattr(waveform_1, "shape", None)
-        _log(log, f"Suno audio 1 waveform shape: {shape_1}")
-        waveform_2 = audio_output_2.get("waveform")
-        shape_2 = getattr(waveform_2, "shape", None)
-        _log(log, f"Suno audio 2 waveform shape: {shape_2}")
-
-    image_urls = _extract_image_urls(record)
-    if len(image_urls) < 2:
-        raise RuntimeError("Expected two image_url entries in record-info response.")
-    image_url_1 = image_urls[0]
-    image_url_2 = image_urls[1]
-    if log:
-        _log(log, f"Suno cover image URL 1: {image_url_1}")
-        _log(log, f"Suno cover image URL 2: {image_url_2}")
+    executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="kie-suno-fetch")
     try:
-        image_bytes_1 = _download_image(image_url_1)
-        image_tensor_1 = _image_bytes_to_tensor(image_bytes_1)
-        image_bytes_2 = _download_image(image_url_2)
-        image_tensor_2 = _image_bytes_to_tensor(image_bytes_2)
-    except Exception as exc:
-        raise RuntimeError(f"Failed to download cover image: {exc}") from exc
+        outputs = _fetch_suno_outputs(record, log=log, executor=executor, prefetched={})
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
+    audio_output_1, audio_output_2, image_tensor_1, image_tensor_2 = outputs
     return audio_output_1, audio_output_2, _format_record_for_output(record), image_tensor_1, image_tensor_2
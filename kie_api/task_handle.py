@@ -0,0 +1,187 @@
+"""Non-blocking task handles for the Submit / Await node pair.
+
+A Submit node creates a KIE task and returns immediately with a `KIE_TASK` handle.
+The matching Await node polls and downloads only when its output is needed, so
+several long jobs in one graph run on KIE at the same time instead of back to back.
+
+Submitted tasks count against the scheduler's shared task budget like any other
+job: Submit waits for a slot before createTask and keeps it, and Await gives it
+back once the task has finished. Every Submit in a graph runs before any Await,
+so a Submit that is waiting for a slot checks the tasks of earlier Submits every
+SUBMIT_SLOT_RECHECK_S and frees the slots of those that already finished. A slot
+whose Await never runs is reclaimed after SUBMIT_SLOT_MAX_HOLD_S, when Await
+would have timed out anyway.
+
+A handle is a plain dict:
+
+    {
+        "task_id": "...",
+        "model": "kling-3.0/video",
+        "output_kind": "video",   # or "image"
+        "submitted_at": 1760000000.0,
+    }
+"""
+
+import threading
+import time
+from typing import Any
+
+from .auth import _load_api_key
+from .cancel import CANCEL_CHECK_INTERVAL_S, _raise_if_interrupted, _wait_future
+from .credits import _log_remaining_credits
+from .images import _fetch_result_image_batch, _validate_output_precision
+from .jobs import DEFAULT_TIMEOUT_S, _create_or_resume_task, _observe_task, _poll_task_until_complete
+from .journal import _journal_record_delivered, _journal_release
+from .log import _log
+from .options import TASK_HANDLE_TYPE
+from .pool import _submit_fetch
+from .scheduler import _release_task_slot, _request_task_slot, _wait_for_task_slot
+from .video import _fetch_result_video
+
+
+OUTPUT_KIND_OPTIONS = ["video", "image"]
+SUBMIT_SLOT_MAX_HOLD_S = DEFAULT_TIMEOUT_S
+SUBMIT_SLOT_RECHECK_S = 10.0
+
+_held_slots_lock = threading.Lock()
+_held_slots: dict[str, dict[str, Any]] = {}
+
+
+def _hold_task_slot(task_id: str, ticket: dict[str, Any]) -> None:
+    with _held_slots_lock:
+        previous = _held_slots.pop(task_id, None)
+        _held_slots[task_id] = ticket
+    _release_task_slot(previous)
+
+
+def _release_held_task_slot(task_id: str) -> None:
+    with _held_slots_lock:
+        ticket = _held_slots.pop(task_id, None)
+    _release_task_slot(ticket)
+
+
+def _release_finished_held_slots(api_key: str) -> None:
+    """Free the slots of submitted tasks that finished on KIE before their Await ran."""
+    with _held_slots_lock:
+        task_ids = list(_held_slots)
+    for task_id in task_ids:
+        try:
+            state, _data, _message_field = _observe_task(api_key, task_id, None)
+        except Exception:
+            continue
+        if state in ("success", "fail"):
+            _release_held_task_slot(task_id)
+
+
+def _acquire_submit_slot(api_key: str, model: Any, log: bool) -> dict[str, Any]:
+    ticket = _request_task_slot(model, max_hold_s=SUBMIT_SLOT_MAX_HOLD_S)
+    try:
+        if not _wait_for_task_slot(ticket, timeout=0):
+            _log(log, "All KIE task slots are busy; waiting for a running task to finish...")
+            next_check_at = 0.0
+            while not _wait_for_task_slot(ticket, timeout=CANCEL_CHECK_INTERVAL_S):
+                _raise_if_interrupted()
+                if time.time() >= next_check_at:
+                    next_check_at = time.time() + SUBMIT_SLOT_RECHECK_S
+                    _release_finished_held_slots(api_key)
+            _log(log, f"Task slot granted after {ticket['granted_at'] - ticket['enqueued_at']:.1f}s.")
+    except BaseException:
+        _release_task_slot(ticket)
+        raise
+    return ticket
+
+
+def submit_task(
+    payload: dict[str, Any],
+    *,
+    output_kind: str,
+    label: str,
+    log: bool = True,
+) -> dict[str, Any]:
+    """Create a KIE task from a prebuilt payload and return a KIE_TASK handle without polling."""
+    if output_kind not in OUTPUT_KIND_OPTIONS:
+        raise RuntimeError(f"Invalid output_kind '{output_kind}'. Use one of: {', '.join(OUTPUT_KIND_OPTIONS)}.")
+
+    api_key = _load_api_key()
+    ticket = _acquire_submit_slot(api_key, payload.get("model"), log)
+    _log(log, f"Submitting {label} task...")
+    start_time = time.time()
+    try:
+        task_id, create_response_text, record = _create_or_resume_task(api_key, payload, log=log)
+    except BaseException:
+        _release_task_slot(ticket)
+        raise
+    if record is not None:
+        # Reused results of a finished task: nothing left running on KIE.
+        _release_task_slot(ticket)
+    else:
+        _hold_task_slot(task_id, ticket)
+    if create_response_text:
+        _log(log, f"createTask response (elapsed={time.time() - start_time:.1f}s): {create_response_text}")
+        _log(log, f"Task created with ID {task_id}. Connect a KIE Await node to collect the result.")
+    return {
+        "task_id": task_id,
+        "model": payload.get("model"),
+        "output_kind": output_kind,
+        "submitted_at": start_time,
+    }
+
+
+def _validate_task_handle(task: Any) -> dict[str, Any]:
+    if not isinstance(task, dict) or not task.get("task_id"):
+        raise RuntimeError("task input must be a KIE_TASK handle from a KIE Submit node.")
+    if task.get("output_kind") not in OUTPUT_KIND_OPTIONS:
+        raise RuntimeError(f"KIE_TASK handle has an unknown output_kind: {task.get('output_kind')!r}.")
+    return task
+
+
+def await_task(
+    task: dict[str, Any],
+    *,
+    poll_interval_s: float = 10.0,
+    timeout_s: int = 2000,
+    log: bool = True,
+    output_precision: str = "float32",
+) -> Any:
+    """Poll a submitted task to completion and return its decoded output.
+
+    The timeout is measured from submission, not from when the Await node starts.
+
+    Returns:
+        A VIDEO object for `video` handles or an IMAGE batch tensor for `image` handles.
+    Raises:
+        RuntimeError: If the handle is invalid, the task fails or times out, or the download fails.
+        TransientKieError: If the task fails with a retryable condition.
+    """
+    task = _validate_task_handle(task)
+    _validate_output_precision(output_precision)
+    task_id = task["task_id"]
+    model = task.get("model") or "unknown model"
+
+    api_key = _load_api_key()
+    _log(log, f"Awaiting task {task_id} ({model})...")
+    try:
+        try:
+            record_data = _poll_task_until_complete(
+                api_key,
+                task_id,
+                poll_interval_s,
+                timeout_s,
+                log,
+                float(task.get("submitted_at") or time.time()),
+            )
+        finally:
+            # The task is no longer running on KIE (or is no longer ours to wait for).
+            _release_held_task_slot(task_id)
+
+        if task["output_kind"] == "video":
+            fetch_future = _submit_fetch(_fetch_result_video, record_data, log)
+        else:
+            fetch_future = _submit_fetch(_fetch_result_image_batch, record_data, model, log, output_precision)
+        _log_remaining_credits(log, record_data, api_key, _log)
+        output = _wait_future(fetch_future)
+        _journal_record_delivered(task_id)
+    finally:
+        # The Submit node claimed the task in the job journal; hand it back.
+        _journal_release(task_id)
+    return output
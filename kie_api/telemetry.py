@@ -0,0 +1,397 @@
+"""Per-phase timing spans for KIE jobs.
+
+Every job is broken into spans so a slow workflow can be attributed to the uplink,
+KIE's queue, or CPU-side work:
+
+- validate, encode, upload (one span per file)
+- createTask, queue_wait, generation
+- download, decode, credits
+
+Spans carry the model, task id, and byte counts where they apply, and the ComfyUI
+node they ran for. queue_wait and generation come from the task states observed
+while polling, so their boundaries are only as precise as the poll interval.
+
+With KIE_MEMORY=1, video and audio stages also record `memory` events with their
+RSS high-water marks (see memory.py).
+
+Spans are written as JSON lines to a size-rotated file, and/or summarized in the
+console when the node finishes, e.g.
+
+    [KIE] Timing KIE_NanoBanana2_Image: total 41.2s | upload 1.3s (2 files, 3.1 MB) | ...
+
+Work handed to the shared fetch pool keeps the span context of the node that
+submitted it. Spans are also collected, without being written anywhere, when
+Prometheus metrics (see metrics.py) or the latency stats database (see stats.py)
+are enabled.
+
+Environment:
+- KIE_TELEMETRY=1 writes spans to `config/kie_telemetry.jsonl`.
+- KIE_TELEMETRY_PATH overrides the file location.
+- KIE_TELEMETRY_MAX_BYTES / KIE_TELEMETRY_BACKUPS control rotation
+  (default 10 MB, 5 rotated files).
+- KIE_TELEMETRY_SUMMARY=1 logs a per-node timing summary.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from .journal import _current_owner
+from .log import _log
+from .metrics import SPAN_HISTOGRAMS, _metric_inc, _metric_observe, _metrics_enabled
+from .stats import _busy_s, _stats_enabled, _stats_record_tasks, _stats_task_row
+
+
+TELEMETRY_PATH = Path(__file__).resolve().parent.parent / "config" / "kie_telemetry.jsonl"
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUPS = 5
+SUMMARY_PHASES = [
+    "validate",
+    "encode",
+    "upload",
+    "createTask",
+    "queue_wait",
+    "generation",
+    "download",
+    "decode",
+    "credits",
+]
+# Forget tasks whose phases were never closed after this long.
+STALE_TASK_S = 6 * 3600
+_QUEUE_STATES = {"", "created", "waiting", "queuing", "queued", "pending"}
+
+# The node (job) whose spans are being collected in this context, or None.
+_current_job: contextvars.ContextVar[dict[str, Any] | None] = contextvars.ContextVar("kie_job", default=None)
+
+_lock = threading.Lock()
+_logger: logging.Logger | None = None
+_logger_path: Path | None = None
+_tasks: dict[str, dict[str, Any]] = {}
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "0").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(int(os.environ.get(name, default)), 0)
+    except ValueError:
+        return default
+
+
+def _telemetry_file_enabled() -> bool:
+    return _env_flag("KIE_TELEMETRY")
+
+
+def _telemetry_summary_enabled() -> bool:
+    return _env_flag("KIE_TELEMETRY_SUMMARY")
+
+
+def _telemetry_enabled() -> bool:
+    return _telemetry_file_enabled() or _telemetry_summary_enabled() or _metrics_enabled() or _stats_enabled()
+
+
+def _telemetry_path() -> Path:
+    override = os.environ.get("KIE_TELEMETRY_PATH", "").strip()
+    return Path(override) if override else TELEMETRY_PATH
+
+
+def _get_logger() -> logging.Logger | None:
+    """Return the rotating JSON-lines writer, (re)creating it when the path changes."""
+    global _logger, _logger_path
+    path = _telemetry_path()
+    with _lock:
+        if _logger is not None and _logger_path == path:
+            return _logger
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                path,
+                maxBytes=_env_int("KIE_TELEMETRY_MAX_BYTES", DEFAULT_MAX_BYTES),
+                backupCount=_env_int("KIE_TELEMETRY_BACKUPS", DEFAULT_BACKUPS),
+                encoding="utf-8",
+            )
+        except OSError:
+            return None
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger = logging.getLogger("kie_api.telemetry")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        for old_handler in list(logger.handlers):
+            logger.removeHandler(old_handler)
+            old_handler.close()
+        logger.addHandler(handler)
+        _logger, _logger_path = logger, path
+        return logger
+
+
+def _emit(event: dict[str, Any]) -> None:
+    if not _telemetry_file_enabled():
+        return
+    logger = _get_logger()
+    if logger is not None:
+        logger.info(json.dumps(event, ensure_ascii=False, default=str))
+
+
+def _record_span(phase: str, start: float, duration_s: float, job: dict[str, Any] | None = None, **fields: Any) -> None:
+    """Record a finished span (in the current node's job unless one is given)."""
+    if job is None:
+        job = _current_job.get()
+    if job is not None:
+        with _lock:
+            job["spans"].append({"phase": phase, "start": start, "duration_s": duration_s, **fields})
+    if phase in SPAN_HISTOGRAMS:
+        _observe_span_metric(phase, duration_s, fields.get("model"), job)
+    event: dict[str, Any] = {
+        "event": "span",
+        "phase": phase,
+        "ts": round(start, 3),
+        "duration_ms": round(duration_s * 1000.0, 2),
+    }
+    if job is not None:
+        event["job"] = job["name"]
+        event.update(job["owner"])
+    event.update({key: value for key, value in fields.items() if value is not None})
+    _emit(event)
+
+
+def _observe_span_metric(phase: str, duration_s: float, model: Any, job: dict[str, Any] | None) -> None:
+    """Feed a span into its latency histogram, labeled by model.
+
+    Uploads run before the node creates its task, so spans without a model wait
+    in the job until the first task of the node names it.
+    """
+    if model is None and job is not None:
+        with _lock:
+            model = job.get("model")
+            if model is None:
+                job["pending_metrics"].append((phase, duration_s))
+                return
+    _metric_observe(SPAN_HISTOGRAMS[phase], duration_s, model=model)
+
+
+def _flush_pending_metrics(job: dict[str, Any], model: Any) -> None:
+    with _lock:
+        pending, job["pending_metrics"] = job["pending_metrics"], []
+    for phase, duration_s in pending:
+        _metric_observe(SPAN_HISTOGRAMS[phase], duration_s, model=model)
+
+
+@contextmanager
+def _span(phase: str, **fields: Any) -> Iterator[dict[str, Any]]:
+    """Time the enclosed block as one span.
+
+    Yields the span's field dict so the block can add values that are only known at
+    the end (for example `fields["bytes"] = len(data)`). Failures are recorded with
+    `ok: false` and re-raised.
+    """
+    if not _telemetry_enabled():
+        yield fields
+        return
+    start = time.time()
+    began = time.perf_counter()
+    try:
+        yield fields
+    except BaseException as exc:
+        fields["ok"] = False
+        fields["error"] = type(exc).__name__
+        raise
+    finally:
+        _record_span(phase, start, time.perf_counter() - began, **fields)
+
+
+def _format_summary(job: dict[str, Any], total_s: float) -> str:
+    with _lock:
+        spans = list(job["spans"])
+    parts = [f"total {total_s:.1f}s"]
+    for phase in SUMMARY_PHASES:
+        phase_spans = [span for span in spans if span["phase"] == phase]
+        if not phase_spans:
+            continue
+        text = f"{phase} {sum(span['duration_s'] for span in phase_spans):.1f}s"
+        details = []
+        if phase in ("encode", "upload", "download", "decode") and len(phase_spans) > 1:
+            details.append(f"{len(phase_spans)} files")
+        byte_count = sum(span.get("bytes") or 0 for span in phase_spans)
+        if byte_count:
+            details.append(f"{byte_count / (1024 * 1024):.1f} MB")
+        if details:
+            text += f" ({', '.join(details)})"
+        parts.append(text)
+    memory_spans = [span for span in spans if span["phase"] == "memory" and span.get("rss_growth_bytes") is not None]
+    if memory_spans:
+        top = max(memory_spans, key=lambda span: span["rss_growth_bytes"])
+        parts.append(f"memory peak +{top['rss_growth_bytes'] / (1024 * 1024):.1f} MB ({top['stage']} {top['kind']})")
+    return f"Timing {job['name']}: " + " | ".join(parts)
+
+
+@contextmanager
+def _job_telemetry(name: str) -> Iterator[None]:
+    """Collect the spans of one node execution and summarize them when it ends."""
+    if not _telemetry_enabled() or _current_job.get() is not None:
+        yield
+        return
+    job = {
+        "name": name,
+        "owner": _current_owner(),
+        "spans": [],
+        "model": None,
+        "pending_metrics": [],
+        "task_rows": [],
+        "done": False,
+    }
+    token = _current_job.set(job)
+    start = time.time()
+    began = time.perf_counter()
+    ok = True
+    try:
+        yield
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        _current_job.reset(token)
+        _flush_pending_metrics(job, None)
+        total_s = time.perf_counter() - began
+        _record_span("node", start, total_s, job_name=name, ok=ok, **job["owner"])
+        _store_task_rows(job)
+        if _telemetry_summary_enabled():
+            _log(True, _format_summary(job, total_s))
+
+
+def _store_task_rows(job: dict[str, Any]) -> None:
+    """Write the node's finished tasks to the stats database, with its upload and download times."""
+    with _lock:
+        job["done"] = True
+        rows, job["task_rows"] = job["task_rows"], []
+        spans = list(job["spans"])
+    if not rows:
+        return
+    _stats_record_tasks(
+        rows,
+        node=job["name"],
+        upload_s=_busy_s([(span["start"], span["duration_s"]) for span in spans if span["phase"] == "upload"]),
+        download_s=_busy_s([(span["start"], span["duration_s"]) for span in spans if span["phase"] == "download"]),
+    )
+
+
+def _instrument_node(name: str, node_class: type) -> None:
+    """Wrap a node class's FUNCTION so each execution is one telemetry job."""
+    method = getattr(node_class, node_class.FUNCTION)
+
+    @functools.wraps(method)
+    def traced(self, *args, **kwargs):
+        with _job_telemetry(name):
+            return method(self, *args, **kwargs)
+
+    setattr(node_class, node_class.FUNCTION, traced)
+
+
+def _bind_context(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Return fn bound to a copy of the current context, for running on another thread."""
+    if _current_job.get() is None:
+        return fn
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def _telemetry_task_created(task_id: str, model: Any) -> None:
+    """Start timing a task's queue wait."""
+    if not _telemetry_enabled():
+        return
+    now = time.time()
+    job = _current_job.get()
+    if job is not None and job["model"] is None:
+        job["model"] = model
+        _flush_pending_metrics(job, model)
+    with _lock:
+        # Tasks that timed out or were abandoned mid-poll never reach a terminal state.
+        for stale_id in [tid for tid, task in _tasks.items() if now - task["created_at"] > STALE_TASK_S]:
+            del _tasks[stale_id]
+        _tasks[task_id] = {
+            "model": model,
+            "phase": "queue_wait",
+            "created_at": now,
+            "since": now,
+            "job": job,
+        }
+
+
+def _telemetry_task_state(
+    task_id: str,
+    state: Any,
+    *,
+    terminal: bool = False,
+    record: dict[str, Any] | None = None,
+) -> None:
+    """Close the queue_wait / generation span of a task when its observed state moves on.
+
+    `record` is the task's record data; for finished tasks its timestamps go to the
+    stats database.
+    """
+    if not _telemetry_enabled():
+        return
+    now = time.time()
+    is_queued = str(state or "").lower() in _QUEUE_STATES
+    finished: list[tuple[str, float, dict[str, Any]]] = []
+    with _lock:
+        task = _tasks.get(task_id)
+        if task is None:
+            return
+        if task["phase"] == "queue_wait" and not is_queued and not terminal:
+            finished.append(("queue_wait", task["since"], {}))
+            task["phase"], task["since"] = "generation", now
+        elif terminal:
+            # A task that finished between two polls was never seen generating; its
+            # whole run is reported as generation.
+            extra = {"queue_observed": False} if task["phase"] == "queue_wait" else {}
+            finished.append(("generation", task["since"], extra))
+            _tasks.pop(task_id, None)
+            if state in ("success", "SUCCESS", "complete"):
+                _metric_observe("kie_task_seconds", now - task["created_at"], model=task["model"])
+    if terminal and state != "abandoned":
+        _stats_task_finished(task_id, task, state, now, record)
+    for phase, since, extra in finished:
+        _record_span(
+            phase,
+            since,
+            now - since,
+            job=task["job"],
+            model=task["model"],
+            task_id=task_id,
+            state=state,
+            **extra,
+        )
+
+
+def _stats_task_finished(
+    task_id: str, task: dict[str, Any], state: Any, now: float, record: dict[str, Any] | None
+) -> None:
+    if not _stats_enabled():
+        return
+    started_seen = task["since"] if task["phase"] == "generation" else None
+    outcome = "success" if state in ("success", "SUCCESS", "complete") else "fail"
+    row = _stats_task_row(task_id, task["model"], outcome, task["created_at"], started_seen, now, record)
+    # The row waits for the node that is polling (KIE_Await polls tasks another node
+    # created) so it can carry that node's download time.
+    job = _current_job.get() or task["job"]
+    with _lock:
+        if job is not None and not job["done"]:
+            job["task_rows"].append(row)
+            return
+    _stats_record_tasks([row])
+
+
+def _telemetry_task_timed_out(task_id: str) -> None:
+    """Count a polling timeout and stop tracking the task."""
+    with _lock:
+        task = _tasks.pop(task_id, None)
+    _metric_inc("kie_timeouts_total", model=task["model"] if task else None)
@@ -8,7 +8,13 @@ from typing import Any
 import torch
 from PIL import Image
 
+from .cancel import _run_interruptibly
 from .http import TransientKieError, requests
+from .journal import _remember_upload
+from .memory import _memory_stage
+from .metrics import _count_http_error, _metric_in_progress
+from .singleflight import _singleflight, _upload_dedup_enabled
+from .telemetry import _span
 
 
 UPLOAD_URL = "https://kieai.redpandaai.co/api/file-stream-upload"
@@ -42,6 +48,13 @@ def _image_tensor_to_png_bytes(image: torch.Tensor) -> bytes:
     if image.numel() == 0:
         raise RuntimeError("Image tensor is empty.")
 
+    with _span("encode", kind="png") as span:
+        png_bytes = _encode_png(image)
+        span["bytes"] = len(png_bytes)
+    return png_bytes
+
+
+def _encode_png(image: torch.Tensor) -> bytes:
     if image.dtype != torch.uint8:
         working = image.detach().cpu().clamp(0, 1) * 255.0
         working = working.round().to(torch.uint8)
@@ -62,7 +75,24 @@ def _image_tensor_to_png_bytes(image: torch.Tensor) -> bytes:
         return output.getvalue()
 
 
+def _upload_flight_key(kind: str, payload_bytes: bytes) -> tuple[str, str, str] | None:
+    """Key under which identical concurrent uploads share one request, or None when disabled."""
+    if not _upload_dedup_enabled():
+        return None
+    return "upload", kind, hashlib.sha256(payload_bytes).hexdigest()
+
+
 def _upload_image(api_key: str, png_bytes: bytes) -> str:
+    with _metric_in_progress("kie_uploads_in_progress"):
+        with _span("upload", kind="image", bytes=len(png_bytes)) as span:
+            url, span["shared"] = _singleflight(
+                _upload_flight_key("image", png_bytes),
+                lambda: _run_interruptibly(_send_image_upload, api_key, png_bytes),
+            )
+    return url
+
+
+def _send_image_upload(api_key: str, png_bytes: bytes) -> str:
     filename = _build_unique_upload_filename(png_bytes, default_name="image.png")
     try:
         response = requests.post(
@@ -75,6 +105,7 @@ def _upload_image(api_key: str, png_bytes: bytes) -> str:
     except requests.RequestException as exc:
         raise RuntimeError(f"Failed to upload image: {exc}") from exc
 
+    _count_http_error(response.status_code)
     if response.status_code == 429 or response.status_code >= 500:
         raise TransientKieError(
             f"upload returned HTTP {response.status_code}: {response.text}",
@@ -89,9 +120,17 @@ def _upload_image(api_key: str, png_bytes: bytes) -> str:
     if not url:
         raise RuntimeError("Upload response missing downloadUrl.")
 
+    _remember_upload(url, png_bytes)
     return url
 
 
+def _record_body_size(response: Any, buffers: dict[str, int]) -> None:
+    """Record the size of the multipart body requests encoded in memory for an upload."""
+    body = getattr(getattr(response, "request", None), "body", None)
+    if isinstance(body, (bytes, bytearray)):
+        buffers["multipart_body"] = len(body)
+
+
 def _upload_video(api_key: str, video_bytes: bytes, filename: str = "video.mp4") -> str:
     if not isinstance(video_bytes, (bytes, bytearray)):
         raise RuntimeError("video_bytes must be raw bytes.")
@@ -101,6 +140,17 @@ def _upload_video(api_key: str, video_bytes: bytes, filename: str = "video.mp4")
     if not filename.lower().endswith(".mp4"):
         filename = f"{filename}.mp4"
 
+    with _metric_in_progress("kie_uploads_in_progress"), _memory_stage("upload", "video") as stage:
+        stage["bytes"] = len(video_bytes)
+        with _span("upload", kind="video", bytes=len(video_bytes)) as span:
+            url, span["shared"] = _singleflight(
+                _upload_flight_key("video", video_bytes),
+                lambda: _run_interruptibly(_send_video_upload, api_key, video_bytes, filename, stage["buffers"]),
+            )
+    return url
+
+
+def _send_video_upload(api_key: str, video_bytes: bytes, filename: str, buffers: dict[str, int]) -> str:
     unique_filename = _build_unique_upload_filename(
         video_bytes,
         default_name="video.mp4",
@@ -117,7 +167,9 @@ def _upload_video(api_key: str, video_bytes: bytes, filename: str = "video.mp4")
         )
     except requests.RequestException as exc:
         raise RuntimeError(f"Failed to upload video: {exc}") from exc
+    _record_body_size(response, buffers)
 
+    _count_http_error(response.status_code)
     if response.status_code == 429 or response.status_code >= 500:
         raise TransientKieError(
             f"upload returned HTTP {response.status_code}: {response.text}",
@@ -132,6 +184,7 @@ def _upload_video(api_key: str, video_bytes: bytes, filename: str = "video.mp4")
     if not url:
         raise RuntimeError("Upload response missing downloadUrl.")
 
+    _remember_upload(url, video_bytes)
     return url
 
 
@@ -150,6 +203,21 @@ def _upload_audio(api_key: str, audio_bytes: bytes, filename: str = "audio.wav")
     else:
         content_type = "application/octet-stream"
 
+    with _metric_in_progress("kie_uploads_in_progress"), _memory_stage("upload", "audio") as stage:
+        stage["bytes"] = len(audio_bytes)
+        with _span("upload", kind="audio", bytes=len(audio_bytes)) as span:
+            url, span["shared"] = _singleflight(
+                _upload_flight_key("audio", audio_bytes),
+                lambda: _run_interruptibly(
+                    _send_audio_upload, api_key, audio_bytes, name, content_type, stage["buffers"]
+                ),
+            )
+    return url
+
+
+def _send_audio_upload(
+    api_key: str, audio_bytes: bytes, name: str, content_type: str, buffers: dict[str, int]
+) -> str:
     unique_name = _build_unique_upload_filename(
         audio_bytes,
         default_name="audio.wav",
@@ -166,7 +234,9 @@ def _upload_audio(api_key: str, audio_bytes: bytes, filename: str = "audio.wav")
         )
     except requests.RequestException as exc:
         raise RuntimeError(f"Failed to upload audio: {exc}") from exc
+    _record_body_size(response, buffers)
 
+    _count_http_error(response.status_code)
     if response.status_code == 429 or response.status_code >= 500:
         raise TransientKieError(
             f"upload returned HTTP {response.status_code}: {response.text}",
@@ -181,4 +251,5 @@ def _upload_audio(api_key: str, audio_bytes: bytes, filename: str = "audio.wav")
     if not url:
         raise RuntimeError("Upload response missing downloadUrl.")
 
+    _remember_upload(url, audio_bytes)
     return url
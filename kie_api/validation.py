@@ -2,6 +2,8 @@
 
 import torch
 
+from .telemetry import _span
+
 
 def _validate_prompt(prompt: str, *, max_length: int) -> None:
     """Ensure prompts are present and below the specified maximum length."""
@@ -13,12 +15,13 @@ def _validate_prompt(prompt: str, *, max_length: int) -> None:
 
 def _validate_image_tensor_batch(images: torch.Tensor | None) -> torch.Tensor:
     """Ensure images are a non-empty [B, H, W, 3] tensor batch."""
-    if images is None:
-        raise RuntimeError("images input is required.")
-    if not isinstance(images, torch.Tensor):
-        raise RuntimeError("images input must be a tensor batch.")
-    if images.dim() != 4 or images.shape[-1] != 3:
-        raise RuntimeError("images input must have shape [B, H, W, 3].")
-    if images.shape[0] < 1:
-        raise RuntimeError("images input batch is empty.")
+    with _span("validate", kind="images"):
+        if images is None:
+            raise RuntimeError("images input is required.")
+        if not isinstance(images, torch.Tensor):
+            raise RuntimeError("images input must be a tensor batch.")
+        if images.dim() != 4 or images.shape[-1] != 3:
+            raise RuntimeError("images input must have shape [B, H, W, 3].")
+        if images.shape[0] < 1:
+            raise RuntimeError("images input batch is empty.")
     return images
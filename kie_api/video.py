@@ -7,26 +7,31 @@ from pathlib import Path
 import folder_paths
 from comfy_api.latest import InputImpl
 
-from .http import requests
+from .download import _download_bytes
+from .log import _log
+from .memory import _memory_stage
+from .results import _extract_result_urls
+from .telemetry import _span
 
 
-def _download_video(url: str) -> bytes:
-    """Download video bytes from a result URL."""
-    try:
-        response = requests.get(url, timeout=180)
-    except requests.RequestException as exc:
-        raise RuntimeError(f"Failed to download result video: {exc}") from exc
-
-    if response.status_code != 200:
-        raise RuntimeError(
-            f"Failed to download result video (status code {response.status_code})."
-        )
-
-    return response.content
+def _download_video(url: str, log: bool = False) -> bytes:
+    """Download video bytes from a result URL (chunked, resumable, size-verified)."""
+    with _memory_stage("download", "video") as stage:
+        video_bytes = _download_bytes(url, label="result video", timeout_s=180, log=log, buffers=stage["buffers"])
+        stage["bytes"] = len(video_bytes)
+    return video_bytes
 
 
 def _coerce_video_to_mp4_bytes(video) -> tuple[bytes, str]:
     """Coerce ComfyUI VIDEO input into MP4 bytes for upload."""
+    with _memory_stage("read", "video") as stage:
+        video_bytes, source = _read_video_input(video)
+        stage["bytes"] = len(video_bytes)
+        stage["buffers"]["file"] = len(video_bytes)
+    return video_bytes, source
+
+
+def _read_video_input(video) -> tuple[bytes, str]:
     if isinstance(video, (bytes, bytearray)):
         return bytes(video), "bytes"
 
@@ -84,6 +89,28 @@ def _video_bytes_to_comfy_video(video_bytes: bytes):
     """
     Convert MP4 bytes into a ComfyUI VIDEO object that the official SaveVideo node accepts.
     """
-    buf = BytesIO(video_bytes)
-    buf.seek(0)
-    return InputImpl.VideoFromFile(buf)
+    with _span("decode", kind="video", bytes=len(video_bytes)), _memory_stage("decode", "video") as stage:
+        stage["bytes"] = len(video_bytes)
+        # BytesIO shares the bytes object's buffer until it is written to, so no new buffer.
+        buf = BytesIO(video_bytes)
+        buf.seek(0)
+        return InputImpl.VideoFromFile(buf)
+
+
+def _select_video_url(result_urls: list[str]) -> str:
+    """Prefer the first URL with a video extension (some models also return frame images)."""
+    for url in result_urls:
+        lower = str(url).lower()
+        if any(lower.endswith(ext) for ext in (".mp4", ".mov", ".webm", ".m4v")):
+            return url
+    return result_urls[0]
+
+
+def _fetch_result_video(record_data: dict, log: bool = False):
+    """Download the video result of a successful task record as a VIDEO output."""
+    result_urls = _extract_result_urls(record_data)
+    video_url = _select_video_url(result_urls)
+    _log(log, f"Final video URL: {video_url}")
+
+    video_bytes = _download_video(video_url, log=log)
+    return _video_bytes_to_comfy_video(video_bytes)
@@ -1,176 +1,152 @@
+from __future__ import annotations
+
+import importlib
 import json
 import os
-import time
-
-import torch
+from typing import TYPE_CHECKING, Any, Callable
 
 from .kie_api.auth import _load_api_key
-from .kie_api.credits import _fetch_remaining_credits, _log_remaining_credits
-from .kie_api.nanobanana import (
-    ASPECT_RATIO_OPTIONS,
-    OUTPUT_FORMAT_OPTIONS,
-    RESOLUTION_OPTIONS,
-    _log,
-    run_nanobanana_image_job,
-)
-from .kie_api.nanobanana2 import (
-    ASPECT_RATIO_OPTIONS as NANOBANANA2_ASPECT_RATIO_OPTIONS,
-    OUTPUT_FORMAT_OPTIONS as NANOBANANA2_OUTPUT_FORMAT_OPTIONS,
-    RESOLUTION_OPTIONS as NANOBANANA2_RESOLUTION_OPTIONS,
-    run_nanobanana2_image_job,
-)
-from .kie_api.gpt_image2 import (
-    ASPECT_RATIO_OPTIONS as GPT_IMAGE2_ASPECT_RATIO_OPTIONS,
-    RESOLUTION_OPTIONS as GPT_IMAGE2_RESOLUTION_OPTIONS,
-    run_gpt_image2_image_to_image,
-    run_gpt_image2_text_to_image,
-)
-from .kie_api.seedream45_t2i import (
-    ASPECT_RATIO_OPTIONS as SEEDREAM_ASPECT_RATIO_OPTIONS,
-    QUALITY_OPTIONS as SEEDREAM_QUALITY_OPTIONS,
-    run_seedream45_text_to_image,
-)
-from .kie_api.seedream45_edit import (
-    ASPECT_RATIO_OPTIONS as SEEDREAM_EDIT_ASPECT_RATIO_OPTIONS,
-    QUALITY_OPTIONS as SEEDREAM_EDIT_QUALITY_OPTIONS,
-    run_seedream45_edit,
-)
-from .kie_api.seedance2_video import (
-    DEFAULT_MODEL as SEEDANCE2_DEFAULT_MODEL,
-    MODEL_OPTIONS as SEEDANCE2_MODEL_OPTIONS,
-    ASPECT_RATIO_OPTIONS as SEEDANCE2_ASPECT_RATIO_OPTIONS,
-    DURATION_OPTIONS as SEEDANCE2_DURATION_OPTIONS,
-    RESOLUTION_OPTIONS as SEEDANCE2_RESOLUTION_OPTIONS,
-    preflight_seedance2_payload,
-    summarize_seedance2_payload,
-    run_seedance2_video,
-    run_seedance2_video_from_request,
-)
-from .kie_api.seedancev1pro_fast_i2v import KIE_SeedanceV1Pro_Fast_I2V
-from .kie_api.seedance15pro_i2v import KIE_Seedance15Pro_I2V
-from .kie_api.kling26_i2v import (
-    DURATION_OPTIONS as KLING26_DURATION_OPTIONS,
-    run_kling26_i2v_video,
-)
-from .kie_api.kling25_i2v import (
-    DURATION_OPTIONS as KLING25_DURATION_OPTIONS,
-    run_kling25_i2v_job,
-)
-from .kie_api.kling26motion_i2v import (
-    CHARACTER_ORIENTATION_OPTIONS as KLING26MOTION_CHARACTER_ORIENTATION_OPTIONS,
-    MODE_OPTIONS as KLING26MOTION_MODE_OPTIONS,
-    run_kling26motion_i2v_video,
-)
-from .kie_api.kling3motion_i2v import (
-    CHARACTER_ORIENTATION_OPTIONS as KLING3MOTION_CHARACTER_ORIENTATION_OPTIONS,
-    MODE_OPTIONS as KLING3MOTION_MODE_OPTIONS,
-    run_kling3motion_i2v_video,
-)
-from .kie_api.kling26_t2v import (
-    ASPECT_RATIO_OPTIONS as KLING26_T2V_ASPECT_RATIO_OPTIONS,
-    DURATION_OPTIONS as KLING26_T2V_DURATION_OPTIONS,
-    run_kling26_t2v_video,
-)
-from .kie_api.kling3_video import (
-    ASPECT_RATIO_OPTIONS as KLING3_ASPECT_RATIO_OPTIONS,
-    DURATION_OPTIONS as KLING3_DURATION_OPTIONS,
-    MODE_OPTIONS as KLING3_MODE_OPTIONS,
-    build_kling3_element,
-    merge_kling3_elements,
-    preflight_kling3_payload,
-    run_kling3_video,
-    run_kling3_video_from_request,
-)
-from .kie_api.suno_music import MODEL_OPTIONS as SUNO_MODEL_OPTIONS, run_suno_generate
-from .kie_api.gemini3_pro_llm import (
-    MODEL_OPTIONS as GEMINI3_MODEL_OPTIONS,
-    REASONING_EFFORT_OPTIONS as GEMINI3_REASONING_EFFORT_OPTIONS,
-    ROLE_OPTIONS as GEMINI3_ROLE_OPTIONS,
-    run_gemini3_pro_chat,
-)
-from .kie_api.flux2_i2i import (
-    ASPECT_RATIO_OPTIONS as FLUX2_ASPECT_RATIO_OPTIONS,
-    MODEL_OPTIONS as FLUX2_MODEL_OPTIONS,
-    RESOLUTION_OPTIONS as FLUX2_RESOLUTION_OPTIONS,
-    run_flux2_i2i,
-)
-from .kie_api.grok_imagine_t2i import (
-    ASPECT_RATIO_OPTIONS as GROK_T2I_ASPECT_RATIO_OPTIONS,
-    run_grok_imagine_t2i,
-)
-from .kie_api.grok_imagine_t2v import (
-    ASPECT_RATIO_OPTIONS as GROK_T2V_ASPECT_RATIO_OPTIONS,
-    DURATION_OPTIONS as GROK_T2V_DURATION_OPTIONS,
-    MODE_OPTIONS as GROK_T2V_MODE_OPTIONS,
-    RESOLUTION_OPTIONS as GROK_T2V_RESOLUTION_OPTIONS,
-    run_grok_imagine_t2v_video,
-)
-from .kie_api.grok_imagine_i2i import run_grok_imagine_i2i
-from .kie_api.grok_imagine_i2v import (
-    DURATION_OPTIONS as GROK_I2V_DURATION_OPTIONS,
-    MODE_OPTIONS as GROK_I2V_MODE_OPTIONS,
-    RESOLUTION_OPTIONS as GROK_I2V_RESOLUTION_OPTIONS,
-    run_grok_imagine_i2v_video,
+from .kie_api.cancel import _interruptible_sleep
+from .kie_api.http import TransientKieError
+from .kie_api.log import _log
+from .kie_api.metrics import _register_metrics_route, _start_metrics_server
+from .kie_api.options import (
+    FLUX2_ASPECT_RATIO_OPTIONS,
+    FLUX2_MODEL_OPTIONS,
+    FLUX2_RESOLUTION_OPTIONS,
+    GEMINI3_MODEL_OPTIONS,
+    GEMINI3_REASONING_EFFORT_OPTIONS,
+    GEMINI3_ROLE_OPTIONS,
+    GPT_IMAGE2_ASPECT_RATIO_OPTIONS,
+    GPT_IMAGE2_RESOLUTION_OPTIONS,
+    GRID_VIDEO_ASPECT_RATIO_OPTIONS,
+    GRID_VIDEO_DEFAULT_MAX_CONCURRENCY,
+    GRID_VIDEO_DURATION_OPTIONS,
+    GRID_VIDEO_GROK_MODE_OPTIONS,
+    GRID_VIDEO_MAX_CONCURRENCY,
+    GRID_VIDEO_MODEL_OPTIONS,
+    GRID_VIDEO_RESOLUTION_OPTIONS,
+    GROK_I2V_DURATION_OPTIONS,
+    GROK_I2V_MODE_OPTIONS,
+    GROK_I2V_RESOLUTION_OPTIONS,
+    GROK_T2I_ASPECT_RATIO_OPTIONS,
+    GROK_T2V_ASPECT_RATIO_OPTIONS,
+    GROK_T2V_DURATION_OPTIONS,
+    GROK_T2V_MODE_OPTIONS,
+    GROK_T2V_RESOLUTION_OPTIONS,
+    IMAGE_OUTPUT_PRECISION_OPTIONS,
+    KLING25_DURATION_OPTIONS,
+    KLING26_DURATION_OPTIONS,
+    KLING26_T2V_ASPECT_RATIO_OPTIONS,
+    KLING26_T2V_DURATION_OPTIONS,
+    KLING26MOTION_CHARACTER_ORIENTATION_OPTIONS,
+    KLING26MOTION_MODE_OPTIONS,
+    KLING3_ASPECT_RATIO_OPTIONS,
+    KLING3_DURATION_OPTIONS,
+    KLING3_MODE_OPTIONS,
+    KLING3MOTION_CHARACTER_ORIENTATION_OPTIONS,
+    KLING3MOTION_MODE_OPTIONS,
+    NANOBANANA_ASPECT_RATIO_OPTIONS as ASPECT_RATIO_OPTIONS,
+    NANOBANANA_OUTPUT_FORMAT_OPTIONS as OUTPUT_FORMAT_OPTIONS,
+    NANOBANANA_RESOLUTION_OPTIONS as RESOLUTION_OPTIONS,
+    NANOBANANA2_ASPECT_RATIO_OPTIONS,
+    NANOBANANA2_OUTPUT_FORMAT_OPTIONS,
+    NANOBANANA2_RESOLUTION_OPTIONS,
+    PROMPT_BATCH_ASPECT_RATIO_OPTIONS,
+    PROMPT_BATCH_DEFAULT_MAX_CONCURRENCY,
+    PROMPT_BATCH_MAX_CONCURRENCY,
+    PROMPT_BATCH_MODEL_OPTIONS,
+    PROMPT_BATCH_OUTPUT_FORMAT_OPTIONS,
+    PROMPT_BATCH_RESOLUTION_OPTIONS,
+    SEEDANCE_V1PRO_FAST_DURATION_OPTIONS,
+    SEEDANCE_V1PRO_FAST_RESOLUTION_OPTIONS,
+    SEEDANCE15_ASPECT_RATIO_OPTIONS,
+    SEEDANCE15_DURATION_OPTIONS,
+    SEEDANCE15_RESOLUTION_OPTIONS,
+    SEEDANCE2_ASPECT_RATIO_OPTIONS,
+    SEEDANCE2_DEFAULT_MODEL,
+    SEEDANCE2_DURATION_OPTIONS,
+    SEEDANCE2_MODEL_OPTIONS,
+    SEEDANCE2_RESOLUTION_OPTIONS,
+    SEEDREAM_ASPECT_RATIO_OPTIONS,
+    SEEDREAM_EDIT_ASPECT_RATIO_OPTIONS,
+    SEEDREAM_EDIT_QUALITY_OPTIONS,
+    SEEDREAM_QUALITY_OPTIONS,
+    SUNO_MODEL_OPTIONS,
+    TASK_HANDLE_TYPE,
 )
 from .kie_api.prompt_lists import parse_prompts_json
-from .kie_api.grid import slice_grid_tensor
-from .kie_api.http import TransientKieError
+from .kie_api.prompt_templates import _prompt_template, _prompt_template_labels
+from .kie_api.scheduler import PRIORITY_OPTIONS as SCHEDULER_PRIORITY_OPTIONS
+from .kie_api.stats import GROUP_OPTIONS as STATS_GROUP_OPTIONS, _format_stats_report, _stats_report
+from .kie_api.telemetry import _instrument_node
+
+if TYPE_CHECKING:
+    import torch
+
+
+def _lazy(module: str, name: str) -> Callable[..., Any]:
+    """Return a function that calls kie_api.<module>.<name>, importing the module on first use.
+
+    The node classes below are built from kie_api/options.py alone, so loading the
+    pack does not import the model modules (or torch, PIL and comfy_api behind
+    them); each one is imported the first time a node that uses it runs.
+    """
+
+    def call(*args, **kwargs):
+        return getattr(importlib.import_module(f".kie_api.{module}", __package__), name)(*args, **kwargs)
+
+    call.__name__ = call.__qualname__ = name
+    return call
+
+
+_cached_remaining_credits = _lazy("credits", "_cached_remaining_credits")
+run_nanobanana_image_job = _lazy("nanobanana", "run_nanobanana_image_job")
+run_nanobanana2_image_job = _lazy("nanobanana2", "run_nanobanana2_image_job")
+run_gpt_image2_text_to_image = _lazy("gpt_image2", "run_gpt_image2_text_to_image")
+run_gpt_image2_image_to_image = _lazy("gpt_image2", "run_gpt_image2_image_to_image")
+run_image_prompt_batch = _lazy("prompt_batch", "run_image_prompt_batch")
+run_seedream45_text_to_image = _lazy("seedream45_t2i", "run_seedream45_text_to_image")
+run_seedream45_edit = _lazy("seedream45_edit", "run_seedream45_edit")
+preflight_seedance2_payload = _lazy("seedance2_video", "preflight_seedance2_payload")
+summarize_seedance2_payload = _lazy("seedance2_video", "summarize_seedance2_payload")
+run_seedance2_video = _lazy("seedance2_video", "run_seedance2_video")
+run_seedance2_video_from_request = _lazy("seedance2_video", "run_seedance2_video_from_request")
+submit_seedance2_video_from_request = _lazy("seedance2_video", "submit_seedance2_video_from_request")
+run_seedancev1pro_fast_i2v_video = _lazy("seedancev1pro_fast_i2v", "run_seedancev1pro_fast_i2v_video")
+run_seedance15pro_i2v_video = _lazy("seedance15pro_i2v", "run_seedance15pro_i2v_video")
+run_kling26_i2v_video = _lazy("kling26_i2v", "run_kling26_i2v_video")
+run_kling25_i2v_job = _lazy("kling25_i2v", "run_kling25_i2v_job")
+run_kling26motion_i2v_video = _lazy("kling26motion_i2v", "run_kling26motion_i2v_video")
+run_kling3motion_i2v_video = _lazy("kling3motion_i2v", "run_kling3motion_i2v_video")
+run_kling26_t2v_video = _lazy("kling26_t2v", "run_kling26_t2v_video")
+build_kling3_element = _lazy("kling3_video", "build_kling3_element")
+kling3_element_preview = _lazy("kling3_video", "kling3_element_preview")
+merge_kling3_elements = _lazy("kling3_video", "merge_kling3_elements")
+preflight_kling3_payload = _lazy("kling3_video", "preflight_kling3_payload")
+run_kling3_video = _lazy("kling3_video", "run_kling3_video")
+run_kling3_video_from_request = _lazy("kling3_video", "run_kling3_video_from_request")
+submit_kling3_video_from_request = _lazy("kling3_video", "submit_kling3_video_from_request")
+await_task = _lazy("task_handle", "await_task")
+run_suno_generate = _lazy("suno_music", "run_suno_generate")
+run_suno_fetch = _lazy("suno_music", "run_suno_fetch")
+run_gemini3_pro_chat = _lazy("gemini3_pro_llm", "run_gemini3_pro_chat")
+run_flux2_i2i = _lazy("flux2_i2i", "run_flux2_i2i")
+run_grok_imagine_t2i = _lazy("grok_imagine_t2i", "run_grok_imagine_t2i")
+run_grok_imagine_i2i = _lazy("grok_imagine_i2i", "run_grok_imagine_i2i")
+run_grok_imagine_t2v_video = _lazy("grok_imagine_t2v", "run_grok_imagine_t2v_video")
+run_grok_imagine_i2v_video = _lazy("grok_imagine_i2v", "run_grok_imagine_i2v_video")
+slice_grid_tensor = _lazy("grid", "slice_grid_tensor")
+run_grid_to_video = _lazy("grid_video", "run_grid_to_video")
 
 
-SYSTEM_PROMPT_MARKER = "system prompt below"
 SYSTEM_PROMPT_PLACEHOLDER = "{user_prompt}"
-SYSTEM_PROMPT_CATEGORIES = ("images", "videos")
 
 
 def _system_prompt_dir() -> str:
     return os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts")
 
 
-def _scan_system_prompt_templates() -> dict[str, str]:
-    prompt_dir = _system_prompt_dir()
-    if not os.path.isdir(prompt_dir):
-        raise RuntimeError(f"Prompt folder not found: {prompt_dir}")
-
-    templates: dict[str, str] = {}
-    for category in SYSTEM_PROMPT_CATEGORIES:
-        category_dir = os.path.join(prompt_dir, category)
-        if not os.path.isdir(category_dir):
-            continue
-        for filename in sorted(os.listdir(category_dir)):
-            if not filename.lower().endswith(".txt"):
-                continue
-            if filename.lower() == "readme.txt":
-                continue
-            path = os.path.join(category_dir, filename)
-            try:
-                with open(path, "r", encoding="utf-8") as handle:
-                    lines = handle.read().splitlines()
-            except OSError:
-                continue
-
-            name: str | None = None
-            body_index: int | None = None
-            for idx, line in enumerate(lines):
-                stripped = line.strip()
-                lower = stripped.lower()
-                if lower.startswith("name:") and name is None:
-                    name = stripped[5:].strip()
-                if lower == SYSTEM_PROMPT_MARKER and body_index is None:
-                    body_index = idx + 1
-
-            if not name or body_index is None:
-                continue
-
-            body = "\n".join(lines[body_index:]).strip()
-            if not body:
-                continue
-
-            label = f"{category}: {name}"
-            templates[label] = body
-
-    return templates
-
-
 class KIE_GetRemainingCredits:
     HELP = """
 KIE Get Remaining Credits
@@ -178,31 +154,80 @@ KIE Get Remaining Credits
 Reads your remaining KIE credits using the API key in config/kie_key.txt.
 
 Inputs:
-- (none)
+- refresh: Always call the API instead of using the cached balance
 
 Outputs:
 - STRING: data
 - INT: Remaining credits
 Notes:
 - If your key is missing/invalid, this node errors.
+- The balance is cached from finished tasks and earlier lookups for KIE_CREDITS_TTL_S
+  (default 300s); `data` then contains `"cached": true` and the cache age.
 """
     @classmethod
     def INPUT_TYPES(cls):
-        return {"required": {"log": ("BOOLEAN", {"default": True})}}
+        return {
+            "required": {"log": ("BOOLEAN", {"default": True})},
+            "optional": {"refresh": ("BOOLEAN", {"default": False})},
+        }
 
     RETURN_TYPES = ("STRING", "INT")
     RETURN_NAMES = ("data", "credits_remaining")
     FUNCTION = "get_remaining_credits"
     CATEGORY = "kie/api"
 
-    def get_remaining_credits(self, log: bool):
-        _log(log, "Requesting remaining credits...")
+    def get_remaining_credits(self, log: bool, refresh: bool = False):
         api_key = _load_api_key()
-        raw_json, credits_remaining = _fetch_remaining_credits(api_key)
-        _log(log, f"Credits remaining: {credits_remaining}")
+        raw_json, credits_remaining, age_s = _cached_remaining_credits(api_key, refresh=refresh)
+        source = "" if age_s is None else f" (cached {age_s:.0f}s ago)"
+        _log(log, f"Credits remaining: {credits_remaining}{source}")
         return (raw_json, credits_remaining)
 
 
+class KIE_LatencyStats:
+    HELP = """
+KIE Latency Stats
+
+Breaks the latency of finished tasks down into upload / KIE queue / KIE generation /
+download, per model and hour of day, from the local stats database.
+
+Inputs:
+- since_hours: Only include tasks created in the last N hours (0 = all)
+- group_by: model / model_hour / hour
+- model: Only include this model (optional)
+
+Outputs:
+- STRING: report (text table)
+- STRING: report_json
+Notes:
+- Tasks are only recorded while KIE_STATS=1 is set.
+- Queue and generation come from KIE's own timestamps when the task record has them,
+  otherwise from polling. "poll lag" is how long after KIE finished a task the node noticed.
+"""
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "since_hours": ("FLOAT", {"default": 168.0, "min": 0.0, "max": 87600.0, "step": 1.0}),
+                "group_by": (STATS_GROUP_OPTIONS, {"default": "model_hour"}),
+            },
+            "optional": {"model": ("STRING", {"default": ""})},
+        }
+
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("report", "report_json")
+    FUNCTION = "report"
+    CATEGORY = "kie/helpers"
+
+    def report(self, since_hours: float, group_by: str, model: str = ""):
+        report = _stats_report(
+            since_hours * 3600.0 if since_hours > 0 else None,
+            group_by=group_by,
+            model=(model or "").strip() or None,
+        )
+        return (_format_stats_report(report), json.dumps(report, indent=2))
+
+
 class KIE_NanoBananaPro_Image:
     HELP = """
 KIE Nano Banana Pro (Image)
@@ -217,6 +242,7 @@ Inputs:
 - output_format: png / jpg
 - poll_interval_s: Status check interval
 - timeout_s: Max wait time
+- output_precision: float32 (default) or float16 (half memory)
 - log: Console logging on/off
 
 Outputs:
@@ -231,6 +257,7 @@ Outputs:
                 "aspect_ratio": ("COMBO", {"options": ASPECT_RATIO_OPTIONS, "default": "auto"}),
                 "resolution": ("COMBO", {"options": RESOLUTION_OPTIONS, "default": "1K"}),
                 "output_format": ("COMBO", {"options": OUTPUT_FORMAT_OPTIONS, "default": "png"}),
+                "output_precision": ("COMBO", {"options": IMAGE_OUTPUT_PRECISION_OPTIONS, "default": "float32"}),
                 "log": ("BOOLEAN", {"default": True}),
             },
         }
@@ -247,6 +274,7 @@ Outputs:
         resolution: str = "1K",
         output_format: str = "png",
         log: bool = True,
+        output_precision: str = "float32",
         poll_interval_s: float = 10.0,
         timeout_s: int = 300,
         retry_on_fail: bool = True,
@@ -260,6 +288,7 @@ Outputs:
             resolution=resolution,
             output_format=output_format,
             log=log,
+            output_precision=output_precision,
             poll_interval_s=poll_interval_s,
             timeout_s=timeout_s,
             retry_on_fail=retry_on_fail,
@@ -286,6 +315,7 @@ Inputs:
 - output_format: jpg / png
 - poll_interval_s: Status check interval
 - timeout_s: Max wait time
+- output_precision: float32 (default) or float16 (half memory)
 - log: Console logging on/off
 
 Outputs:
@@ -302,6 +332,7 @@ Outputs:
                 "aspect_ratio": ("COMBO", {"options": NANOBANANA2_ASPECT_RATIO_OPTIONS, "default": "auto"}),
                 "resolution": ("COMBO", {"options": NANOBANANA2_RESOLUTION_OPTIONS, "default": "1K"}),
                 "output_format": ("COMBO", {"options": NANOBANANA2_OUTPUT_FORMAT_OPTIONS, "default": "jpg"}),
+                "output_precision": ("COMBO", {"options": IMAGE_OUTPUT_PRECISION_OPTIONS, "default": "float32"}),
                 "log": ("BOOLEAN", {"default": True}),
             },
         }
@@ -319,6 +350,7 @@ Outputs:
         resolution: str = "1K",
         output_format: str = "jpg",
         log: bool = True,
+        output_precision: str = "float32",
         poll_interval_s: float = 10.0,
         timeout_s: int = 300,
         retry_on_fail: bool = True,
@@ -333,6 +365,7 @@ Outputs:
             output_format=output_format,
             google_search=google_search,
             log=log,
+            output_precision=output_precision,
             poll_interval_s=poll_interval_s,
             timeout_s=timeout_s,
             retry_on_fail=retry_on_fail,
@@ -355,6 +388,7 @@ Inputs:
 - resolution: 1K, 2K, or 4K
 - poll_interval_s: Status check interval
 - timeout_s: Max wait time
+- output_precision: float32 (default) or float16 (half memory)
 - log: Console logging on/off
 
 Outputs:
@@ -374,6 +408,7 @@ Notes:
             "optional": {
                 "aspect_ratio": ("COMBO", {"options": GPT_IMAGE2_ASPECT_RATIO_OPTIONS, "default": "auto"}),
                 "resolution": ("COMBO", {"options": GPT_IMAGE2_RESOLUTION_OPTIONS, "default": "1K"}),
+                "output_precision": ("COMBO", {"options": IMAGE_OUTPUT_PRECISION_OPTIONS, "default": "float32"}),
                 "log": ("BOOLEAN", {"default": True}),
             },
         }
@@ -389,6 +424,7 @@ Notes:
         aspect_ratio: str = "auto",
         resolution: str = "1K",
         log: bool = True,
+        output_precision: str = "float32",
         poll_interval_s: float = 10.0,
         timeout_s: int = 300,
         retry_on_fail: bool = True,
@@ -402,6 +438,7 @@ Notes:
             poll_interval_s=poll_interval_s,
             timeout_s=timeout_s,
             log=log,
+            output_precision=output_precision,
             retry_on_fail=retry_on_fail,
             max_retries=max_retries,
             retry_backoff_s=retry_backoff_s,
@@ -422,6 +459,7 @@ Inputs:
 - resolution: 1K, 2K, or 4K
 - poll_interval_s: Status check interval
 - timeout_s: Max wait time
+- output_precision: float32 (default) or float16 (half memory)
 - log: Console logging on/off
 
 Outputs:
@@ -442,6 +480,7 @@ Notes:
             "optional": {
                 "aspect_ratio": ("COMBO", {"options": GPT_IMAGE2_ASPECT_RATIO_OPTIONS, "default": "auto"}),
                 "resolution": ("COMBO", {"options": GPT_IMAGE2_RESOLUTION_OPTIONS, "default": "1K"}),
+                "output_precision": ("COMBO", {"options": IMAGE_OUTPUT_PRECISION_OPTIONS, "default": "float32"}),
                 "log": ("BOOLEAN", {"default": True}),
             },
         }
@@ -458,6 +497,7 @@ Notes:
         aspect_ratio: str = "auto",
         resolution: str = "1K",
         log: bool = True,
+        output_precision: str = "float32",
         poll_interval_s: float = 10.0,
         timeout_s: int = 300,
         retry_on_fail: bool = True,
@@ -472,6 +512,7 @@ Notes:
             poll_interval_s=poll_interval_s,
             timeout_s=timeout_s,
             log=log,
+            output_precision=output_precision,
             retry_on_fail=retry_on_fail,
             max_retries=max_retries,
             retry_backoff_s=retry_backoff_s,
@@ -479,6 +520,102 @@ Notes:
         return (image_tensor,)
 
 
+class KIE_ImagePromptBatch:
+    HELP = """
+KIE Image Prompt Batch (Nano Banana / GPT Image)
+
+Run one image job per prompt concurrently and return all results as one IMAGE batch.
+Wire `prompts_list` from KIE Parse Prompt Grid JSON. Shared reference images are uploaded
+once, up to max_concurrency tasks run at once, and all tasks are polled together, so a
+9-prompt grid takes about as long as a single job.
+
+Inputs:
+- prompts_list: List of prompts (from KIE Parse Prompt Grid JSON)
+- model: nano-banana-pro, nano-banana-2, or gpt-image-2
+- images: Optional shared reference images (max 8 / 14 / 16 by model)
+- aspect_ratio: Output aspect ratio (validated per model; set one explicitly so results stack)
+- resolution: 1K / 2K / 4K
+- output_format: png / jpg (Nano Banana only)
+- google_search: Web search grounding (Nano Banana 2 only)
+- max_concurrency: Max tasks in flight at once
+- priority: Scheduler class when many KIE jobs compete for task slots
+  (auto infers interactive for image models)
+- output_precision: float32 (default) or float16 (half memory)
+- log: Console logging on/off
+
+Outputs:
+- IMAGE: Batch of N images in prompt order
+Notes:
+- Tasks of this batch are never hedged; KIE_HEDGE_MODELS applies to the single-image nodes only.
+- If a prompt fails, re-running reuses the prompts that finished and only retries the failed ones.
+"""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "prompts_list": ("STRING", {"forceInput": True}),
+                "model": ("COMBO", {"options": PROMPT_BATCH_MODEL_OPTIONS, "default": "nano-banana-pro"}),
+            },
+            "optional": {
+                "images": ("IMAGE",),
+                "aspect_ratio": ("COMBO", {"options": PROMPT_BATCH_ASPECT_RATIO_OPTIONS, "default": "1:1"}),
+                "resolution": ("COMBO", {"options": PROMPT_BATCH_RESOLUTION_OPTIONS, "default": "1K"}),
+                "output_format": ("COMBO", {"options": PROMPT_BATCH_OUTPUT_FORMAT_OPTIONS, "default": "png"}),
+                "google_search": ("BOOLEAN", {"default": False}),
+                "max_concurrency": (
+                    "INT",
+                    {
+                        "default": PROMPT_BATCH_DEFAULT_MAX_CONCURRENCY,
+                        "min": 1,
+                        "max": PROMPT_BATCH_MAX_CONCURRENCY,
+                    },
+                ),
+                "priority": ("COMBO", {"options": SCHEDULER_PRIORITY_OPTIONS, "default": "auto"}),
+                "output_precision": ("COMBO", {"options": IMAGE_OUTPUT_PRECISION_OPTIONS, "default": "float32"}),
+                "log": ("BOOLEAN", {"default": True}),
+            },
+        }
+
+    RETURN_TYPES = ("IMAGE",)
+    RETURN_NAMES = ("images",)
+    FUNCTION = "generate"
+    CATEGORY = "kie/api"
+
+    def generate(
+        self,
+        prompts_list,
+        model: str = "nano-banana-pro",
+        aspect_ratio: str = "1:1",
+        resolution: str = "1K",
+        output_format: str = "png",
+        google_search: bool = False,
+        max_concurrency: int = PROMPT_BATCH_DEFAULT_MAX_CONCURRENCY,
+        priority: str = "auto",
+        log: bool = True,
+        output_precision: str = "float32",
+        poll_interval_s: float = 10.0,
+        timeout_s: int = 300,
+        images: torch.Tensor | None = None,
+    ):
+        image_batch = run_image_prompt_batch(
+            prompts=prompts_list,
+            model=model,
+            images=images,
+            aspect_ratio=aspect_ratio,
+            resolution=resolution,
+            output_format=output_format,
+            google_search=google_search,
+            max_concurrency=max_concurrency,
+            poll_interval_s=poll_interval_s,
+            timeout_s=timeout_s,
+            priority=priority,
+            log=log,
+            output_precision=output_precision,
+        )
+        return (image_batch,)
+
+
 class KIE_Seedream45_TextToImage:
     HELP = """
 KIE Seedream 4.5 Text-To-Image
@@ -489,6 +626,7 @@ Inputs:
 - prompt: Text prompt (required)
 - aspect_ratio / resolution / output_format
 - poll_interval_s / timeout_s / log
+- output_precision: float32 (default) or float16 (half memory)
 
 Outputs:
 - IMAGE: ComfyUI image tensor (BHWC float32 0–1)
@@ -503,6 +641,7 @@ Outputs:
             "optional": {
                 "aspect_ratio": ("COMBO", {"options": SEEDREAM_ASPECT_RATIO_OPTIONS, "default": "1:1"}),
                 "quality": ("COMBO", {"options": SEEDREAM_QUALITY_OPTIONS, "default": "basic"}),
+                "output_precision": ("COMBO", {"options": IMAGE_OUTPUT_PRECISION_OPTIONS, "default": "float32"}),
                 "log": ("BOOLEAN", {"default": True}),
             },
         }
@@ -518,6 +657,7 @@ Outputs:
         aspect_ratio: str = "1:1",
         quality: str = "basic",
         log: bool = True,
+        output_precision: str = "float32",
         poll_interval_s: float = 10.0,
         timeout_s: int = 300,
     ):
@@ -528,6 +668,7 @@ Outputs:
             poll_interval_s=poll_interval_s,
             timeout_s=timeout_s,
             log=log,
+            output_precision=output_precision,
         )
         return (image_tensor,)
 
@@ -543,6 +684,7 @@ Inputs:
 - images: Source image batch (up to 14 images; all uploaded)
 - aspect_ratio / quality
 - poll_interval_s / timeout_s / log
+- output_precision: float32 (default) or float16 (half memory)
 
 Outputs:
 - IMAGE: ComfyUI image tensor (BHWC float32 0–1)
@@ -558,6 +700,7 @@ Outputs:
             "optional": {
                 "aspect_ratio": ("COMBO", {"options": SEEDREAM_EDIT_ASPECT_RATIO_OPTIONS, "default": "1:1"}),
                 "quality": ("COMBO", {"options": SEEDREAM_EDIT_QUALITY_OPTIONS, "default": "basic"}),
+                "output_precision": ("COMBO", {"options": IMAGE_OUTPUT_PRECISION_OPTIONS, "default": "float32"}),
                 "log": ("BOOLEAN", {"default": True}),
             },
         }
@@ -574,6 +717,7 @@ Outputs:
         aspect_ratio: str = "1:1",
         quality: str = "basic",
         log: bool = True,
+        output_precision: str = "float32",
         poll_interval_s: float = 10.0,
         timeout_s: int = 300,
     ):
@@ -585,6 +729,7 @@ Outputs:
             poll_interval_s=poll_interval_s,
             timeout_s=timeout_s,
             log=log,
+            output_precision=output_precision,
         )
         return (image_tensor,)
 
@@ -599,6 +744,7 @@ Inputs:
 - prompt: Text prompt (required, up to 5000 chars)
 - aspect_ratio: 2:3, 3:2, 1:1, 9:16, or 16:9
 - poll_interval_s / timeout_s / log
+- output_precision: float32 (default) or float16 (half memory)
 - retry_on_fail / max_retries / retry_backoff_s
 
 Outputs:
@@ -614,6 +760,7 @@ Outputs:
             },
             "optional": {
                 "aspect_ratio": ("COMBO", {"options": GROK_T2I_ASPECT_RATIO_OPTIONS, "default": "1:1"}),
+                "output_precision": ("COMBO", {"options": IMAGE_OUTPUT_PRECISION_OPTIONS, "default": "float32"}),
                 "log": ("BOOLEAN", {"default": True}),
             },
         }
@@ -628,6 +775,7 @@ Outputs:
         prompt: str,
         aspect_ratio: str = "1:1",
         log: bool = True,
+        output_precision: str = "float32",
         poll_interval_s: float = 10.0,
         timeout_s: int = 300,
         retry_on_fail: bool = True,
@@ -646,13 +794,14 @@ Outputs:
                     poll_interval_s=poll_interval_s,
                     timeout_s=timeout_s,
                     log=log,
+            output_precision=output_precision,
                 )
                 return (image_output, task_id)
             except TransientKieError:
                 if not retry_on_fail or attempt >= attempts:
                     raise
                 _log(log, f"Retrying (attempt {attempt + 1}/{attempts}) after {backoff}s")
-                time.sleep(backoff)
+                _interruptible_sleep(backoff)
 
 
 class KIE_GrokImagine_I2I:
@@ -665,6 +814,7 @@ Inputs:
 - images: Source image batch (first image used)
 - prompt: Optional prompt (up to 390000 chars)
 - poll_interval_s / timeout_s / log
+- output_precision: float32 (default) or float16 (half memory)
 - retry_on_fail / max_retries / retry_backoff_s
 
 Outputs:
@@ -680,6 +830,7 @@ Outputs:
             },
             "optional": {
                 "prompt": ("STRING", {"multiline": True, "default": ""}),
+                "output_precision": ("COMBO", {"options": IMAGE_OUTPUT_PRECISION_OPTIONS, "default": "float32"}),
                 "log": ("BOOLEAN", {"default": True}),
             },
         }
@@ -694,6 +845,7 @@ Outputs:
         images: torch.Tensor,
         prompt: str = "",
         log: bool = True,
+        output_precision: str = "float32",
         poll_interval_s: float = 10.0,
         timeout_s: int = 300,
         retry_on_fail: bool = True,
@@ -712,13 +864,142 @@ Outputs:
                     poll_interval_s=poll_interval_s,
                     timeout_s=timeout_s,
                     log=log,
+            output_precision=output_precision,
                 )
                 return (image_output, task_id)
             except TransientKieError:
                 if not retry_on_fail or attempt >= attempts:
                     raise
                 _log(log, f"Retrying (attempt {attempt + 1}/{attempts}) after {backoff}s")
-                time.sleep(backoff)
+                _interruptible_sleep(backoff)
+
+
+class KIE_SeedanceV1Pro_Fast_I2V:
+    HELP = """
+KIE Seedance V1 Pro Fast (Image-to-Video)
+
+Transform a single image plus prompt into an mp4 animation using ByteDance's fast Seedance V1 Pro pipeline.
+
+Inputs:
+- prompt (STRING)
+- images (IMAGE tensor, first frame used)
+- resolution: 720p or 1080p
+- duration: 5s or 10s
+- poll_interval_s / timeout_s / log
+
+Outputs:
+- VIDEO: Path to a temporary .mp4 file.
+"""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "prompt": ("STRING", {"multiline": True}),
+                "images": ("IMAGE",),
+            },
+            "optional": {
+                "resolution": ("COMBO", {"options": SEEDANCE_V1PRO_FAST_RESOLUTION_OPTIONS, "default": "720p"}),
+                "duration": ("COMBO", {"options": SEEDANCE_V1PRO_FAST_DURATION_OPTIONS, "default": "5"}),
+                "log": ("BOOLEAN", {"default": True}),
+            },
+        }
+
+    RETURN_TYPES = ("VIDEO",)
+    RETURN_NAMES = ("video",)
+    FUNCTION = "generate"
+    CATEGORY = "kie/api"
+
+    def generate(
+        self,
+        prompt: str,
+        images: torch.Tensor,
+        resolution: str = "720p",
+        duration: str = "5",
+        log: bool = True,
+        poll_interval_s: float = 10.0,
+        timeout_s: int = 2000,
+    ):
+        video_output = run_seedancev1pro_fast_i2v_video(
+            prompt=prompt,
+            images=images,
+            resolution=resolution,
+            duration=duration,
+            poll_interval_s=poll_interval_s,
+            timeout_s=timeout_s,
+            log=log,
+        )
+        return (video_output,)
+
+
+class KIE_Seedance15Pro_I2V:
+    HELP = """
+KIE Seedance 1.5 Pro (Image-to-Video / Text-to-Video)
+
+Generate a short video clip from a prompt with optional reference images.
+
+Inputs:
+- prompt: Text prompt (required)
+- images: Optional image batch (first two images used)
+- aspect_ratio: 1:1, 21:9, 4:3, 3:4, 16:9, or 9:16
+- resolution: 480p or 720p
+- duration: 4s, 8s, or 12s
+- fixed_lens: Lock camera lens during generation
+- generate_audio: Enable audio generation (additional cost)
+- poll_interval_s / timeout_s / log
+
+Outputs:
+- VIDEO: ComfyUI video output referencing a temporary .mp4 file
+"""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "prompt": ("STRING", {"multiline": True}),
+            },
+            "optional": {
+                "images": ("IMAGE",),
+                "aspect_ratio": ("COMBO", {"options": SEEDANCE15_ASPECT_RATIO_OPTIONS, "default": "1:1"}),
+                "resolution": ("COMBO", {"options": SEEDANCE15_RESOLUTION_OPTIONS, "default": "720p"}),
+                "duration": ("COMBO", {"options": SEEDANCE15_DURATION_OPTIONS, "default": "8"}),
+                "fixed_lens": ("BOOLEAN", {"default": False}),
+                "generate_audio": ("BOOLEAN", {"default": False}),
+                "log": ("BOOLEAN", {"default": True}),
+            },
+        }
+
+    RETURN_TYPES = ("VIDEO",)
+    RETURN_NAMES = ("video",)
+    FUNCTION = "generate"
+    CATEGORY = "kie/api"
+
+    def generate(
+        self,
+        prompt: str,
+        images: torch.Tensor | None = None,
+        aspect_ratio: str = "1:1",
+        resolution: str = "720p",
+        duration: str = "8",
+        fixed_lens: bool = False,
+        generate_audio: bool = False,
+        log: bool = True,
+        poll_interval_s: float = 10.0,
+        timeout_s: int = 2000,
+    ):
+        video_output = run_seedance15pro_i2v_video(
+            prompt=prompt,
+            images=images,
+            aspect_ratio=aspect_ratio,
+            resolution=resolution,
+            duration=duration,
+            fixed_lens=fixed_lens,
+            generate_audio=generate_audio,
+            poll_interval_s=poll_interval_s,
+            timeout_s=timeout_s,
+            log=log,
+        )
+        return (video_output,)
 
 
 class KIE_Seedance2_Video:
@@ -1015,7 +1296,7 @@ Outputs:
                 if not retry_on_fail or attempt >= attempts:
                     raise
                 _log(log, f"Retrying (attempt {attempt + 1}/{attempts}) after {backoff}s")
-                time.sleep(backoff)
+                _interruptible_sleep(backoff)
 
 
 class KIE_Kling26_I2V:
@@ -1088,7 +1369,7 @@ Outputs:
                 if not retry_on_fail or attempt >= attempts:
                     raise
                 _log(log, f"Retrying (attempt {attempt + 1}/{attempts}) after {backoff}s")
-                time.sleep(backoff)
+                _interruptible_sleep(backoff)
 
 
 class KIE_Kling26_T2V:
@@ -1161,7 +1442,7 @@ Outputs:
                 if not retry_on_fail or attempt >= attempts:
                     raise
                 _log(log, f"Retrying (attempt {attempt + 1}/{attempts}) after {backoff}s")
-                time.sleep(backoff)
+                _interruptible_sleep(backoff)
 
 
 class KIE_GrokImagine_T2V:
@@ -1238,7 +1519,7 @@ Outputs:
                 if not retry_on_fail or attempt >= attempts:
                     raise
                 _log(log, f"Retrying (attempt {attempt + 1}/{attempts}) after {backoff}s")
-                time.sleep(backoff)
+                _interruptible_sleep(backoff)
 
 
 class KIE_GrokImagine_I2V:
@@ -1328,7 +1609,7 @@ Outputs:
                 if not retry_on_fail or attempt >= attempts:
                     raise
                 _log(log, f"Retrying (attempt {attempt + 1}/{attempts}) after {backoff}s")
-                time.sleep(backoff)
+                _interruptible_sleep(backoff)
 
 
 class KIE_Kling26Motion_I2V:
@@ -1408,7 +1689,7 @@ Outputs:
                 if not retry_on_fail or attempt >= attempts:
                     raise
                 _log(log, f"Retrying (attempt {attempt + 1}/{attempts}) after {backoff}s")
-                time.sleep(backoff)
+                _interruptible_sleep(backoff)
 
 
 class KIE_Kling3Motion_I2V:
@@ -1488,7 +1769,7 @@ Outputs:
                 if not retry_on_fail or attempt >= attempts:
                     raise
                 _log(log, f"Retrying (attempt {attempt + 1}/{attempts}) after {backoff}s")
-                time.sleep(backoff)
+                _interruptible_sleep(backoff)
 
 
 class KIE_KlingElements:
@@ -1547,7 +1828,8 @@ Outputs:
             video=video,
             log=log,
         )
-        return (element_payload, json.dumps(element_payload, indent=2, ensure_ascii=False))
+        preview = kling3_element_preview(element_payload)
+        return (element_payload, json.dumps(preview, indent=2, ensure_ascii=False))
 
 
 class KIE_KlingElementsBatch:
@@ -1610,7 +1892,8 @@ Outputs:
         )
         if not elements:
             raise RuntimeError("Kling Elements Batch requires at least one element.")
-        return (elements, json.dumps(elements, indent=2, ensure_ascii=False))
+        preview = [kling3_element_preview(element) for element in elements]
+        return (elements, json.dumps(preview, indent=2, ensure_ascii=False))
 
 
 class KIE_Kling3_Video:
@@ -1864,6 +2147,146 @@ Outputs:
         return (payload, json.dumps(payload, indent=2, ensure_ascii=False), notes)
 
 
+class KIE_Kling3_Submit:
+    HELP = """
+KIE Submit (Kling 3.0)
+
+Create a Kling 3.0 task from a preflight payload and return immediately with a KIE_TASK handle.
+Connect the handle to KIE Await, which polls and downloads only when its output is needed.
+
+Submit nodes are output nodes, so ComfyUI runs every Submit in the graph before any Await:
+several long video jobs then generate on KIE at the same time instead of one after another.
+
+Inputs:
+- kling_data: KIE_KLING3_REQUEST from KIE Kling 3.0 Preflight
+- log: Console logging on/off
+
+Outputs:
+- KIE_TASK: task handle (task_id, model, output kind)
+- STRING: task_id
+"""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "kling_data": ("KIE_KLING3_REQUEST",),
+            },
+            "optional": {
+                "log": ("BOOLEAN", {"default": True}),
+            },
+        }
+
+    RETURN_TYPES = (TASK_HANDLE_TYPE, "STRING")
+    RETURN_NAMES = ("task", "task_id")
+    FUNCTION = "submit"
+    CATEGORY = "kie/api"
+    OUTPUT_NODE = True
+
+    def submit(self, kling_data: dict, log: bool = True):
+        task = submit_kling3_video_from_request(payload=kling_data, log=log)
+        return (task, task["task_id"])
+
+
+class KIE_Seedance2_Submit:
+    HELP = """
+KIE Submit (Seedance 2.0)
+
+Create a Seedance 2.0 task from a preflight payload and return immediately with a KIE_TASK handle.
+Connect the handle to KIE Await, which polls and downloads only when its output is needed.
+
+Submit nodes are output nodes, so ComfyUI runs every Submit in the graph before any Await:
+several long video jobs then generate on KIE at the same time instead of one after another.
+
+Inputs:
+- seedance_data: KIE_SEEDANCE2_REQUEST from KIE Seedance 2.0 Preflight
+- log: Console logging on/off
+
+Outputs:
+- KIE_TASK: task handle (task_id, model, output kind)
+- STRING: task_id
+"""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "seedance_data": ("KIE_SEEDANCE2_REQUEST",),
+            },
+            "optional": {
+                "log": ("BOOLEAN", {"default": True}),
+            },
+        }
+
+    RETURN_TYPES = (TASK_HANDLE_TYPE, "STRING")
+    RETURN_NAMES = ("task", "task_id")
+    FUNCTION = "submit"
+    CATEGORY = "kie/api"
+    OUTPUT_NODE = True
+
+    def submit(self, seedance_data: dict, log: bool = True):
+        task = submit_seedance2_video_from_request(payload=seedance_data, log=log)
+        return (task, task["task_id"])
+
+
+class KIE_Await:
+    HELP = """
+KIE Await
+
+Wait for a task created by a KIE Submit node and return its result.
+The timeout counts from submission, so time spent while other nodes ran is included.
+
+Inputs:
+- task: KIE_TASK handle from a KIE Submit node
+- output_precision: IMAGE precision for image tasks (float32 or float16)
+- log: Console logging on/off
+
+Outputs:
+- VIDEO: result video (video tasks only; empty otherwise)
+- IMAGE: result image batch (image tasks only; empty otherwise)
+- STRING: task_id
+
+Notes:
+- The task holds a slot of KIE_MAX_ACTIVE_TASKS from Submit until it finishes; Await frees it.
+"""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "task": (TASK_HANDLE_TYPE,),
+            },
+            "optional": {
+                "output_precision": ("COMBO", {"options": IMAGE_OUTPUT_PRECISION_OPTIONS, "default": "float32"}),
+                "log": ("BOOLEAN", {"default": True}),
+            },
+        }
+
+    RETURN_TYPES = ("VIDEO", "IMAGE", "STRING")
+    RETURN_NAMES = ("video", "image", "task_id")
+    FUNCTION = "await_result"
+    CATEGORY = "kie/api"
+
+    def await_result(
+        self,
+        task: dict,
+        output_precision: str = "float32",
+        log: bool = True,
+        poll_interval_s: float = 10.0,
+        timeout_s: int = 2000,
+    ):
+        output = await_task(
+            task,
+            poll_interval_s=poll_interval_s,
+            timeout_s=timeout_s,
+            log=log,
+            output_precision=output_precision,
+        )
+        if task.get("output_kind") == "image":
+            return (None, output, task["task_id"])
+        return (output, None, task["task_id"])
+
+
 class KIE_Flux2_I2I:
     HELP = """
 KIE Flux 2 (Image-to-Image)
@@ -1876,6 +2299,7 @@ Inputs:
 - model: flux-2/pro-image-to-image or flux-2/flex-image-to-image
 - aspect_ratio: Output aspect ratio (enum)
 - resolution: 1K or 2K
+- output_precision: float32 (default) or float16 (half memory)
 - log: Console logging on/off
 
 Outputs:
@@ -1893,6 +2317,7 @@ Outputs:
                 "resolution": ("COMBO", {"options": FLUX2_RESOLUTION_OPTIONS, "default": "1K"}),
             },
             "optional": {
+                "output_precision": ("COMBO", {"options": IMAGE_OUTPUT_PRECISION_OPTIONS, "default": "float32"}),
                 "log": ("BOOLEAN", {"default": True}),
             },
         }
@@ -1910,6 +2335,7 @@ Outputs:
         aspect_ratio: str = "1:1",
         resolution: str = "1K",
         log: bool = True,
+        output_precision: str = "float32",
         poll_interval_s: float = 10.0,
         timeout_s: int = 300,
     ):
@@ -1922,6 +2348,7 @@ Outputs:
             poll_interval_s=poll_interval_s,
             timeout_s=timeout_s,
             log=log,
+            output_precision=output_precision,
         )
         return (image_tensor,)
 
@@ -2031,6 +2458,8 @@ Inputs:
 Optional:
 - negative_tags: Optional tags to avoid
 - vocal_gender: m or f (custom mode only)
+- early_return: Return as soon as track 1 is ready (see Notes)
+- use_stream_url: Allow the streaming URL for track 1 in early_return mode (preview quality)
 - log: Console logging on/off
 
 Outputs:
@@ -2039,6 +2468,11 @@ Outputs:
 - STRING: data
 - IMAGE: Cover image 1
 - IMAGE: Cover image 2
+- STRING: task_id (wire into KIE Suno Music (Fetch))
+Notes:
+- With early_return, audio_2 is one second of silence and a cover that is not ready yet
+  is a black 64x64 image. Downstream nodes cannot tell them from real results; connect
+  task_id to KIE Suno Music (Fetch) to collect the real track 2 and covers.
 """
 
     @classmethod
@@ -2055,12 +2489,14 @@ Outputs:
             "optional": {
                 "negative_tags": ("STRING", {"default": ""}),
                 "vocal_gender": ("COMBO", {"options": ["male", "female"], "default": "male"}),
+                "early_return": ("BOOLEAN", {"default": False}),
+                "use_stream_url": ("BOOLEAN", {"default": False}),
                 "log": ("BOOLEAN", {"default": True}),
             },
         }
 
-    RETURN_TYPES = ("AUDIO", "AUDIO", "STRING", "IMAGE", "IMAGE")
-    RETURN_NAMES = ("audio_1", "audio_2", "data", "image_1", "image_2")
+    RETURN_TYPES = ("AUDIO", "AUDIO", "STRING", "IMAGE", "IMAGE", "STRING")
+    RETURN_NAMES = ("audio_1", "audio_2", "data", "image_1", "image_2", "task_id")
     FUNCTION = "generate"
     CATEGORY = "kie/api"
 
@@ -2074,10 +2510,12 @@ Outputs:
         model: str,
         negative_tags: str = "",
         vocal_gender: str = "male",
+        early_return: bool = False,
+        use_stream_url: bool = False,
         log: bool = True,
     ):
         gender_value = "m" if vocal_gender == "male" else "f"
-        audio_output_1, audio_output_2, raw_json, image_output_1, image_output_2 = run_suno_generate(
+        audio_output_1, audio_output_2, raw_json, image_output_1, image_output_2, task_id = run_suno_generate(
             prompt=prompt,
             custom_mode=custom_mode,
             instrumental=instrumental,
@@ -2086,9 +2524,11 @@ Outputs:
             title=title,
             negative_tags=negative_tags,
             vocal_gender=gender_value,
+            early_return=early_return,
+            use_stream_url=use_stream_url,
             log=log,
         )
-        return (audio_output_1, audio_output_2, raw_json, image_output_1, image_output_2)
+        return (audio_output_1, audio_output_2, raw_json, image_output_1, image_output_2, task_id)
 
 
 class KIE_Suno_Music_Advanced:
@@ -2109,6 +2549,8 @@ Optional:
 - negative_tags: Optional tags to avoid
 - vocal_gender: m or f (custom mode only)
 - style_weight / weirdness_constraint / audio_weight: 0..1
+- early_return: Return as soon as track 1 is ready (see Notes)
+- use_stream_url: Allow the streaming URL for track 1 in early_return mode (preview quality)
 - log: Console logging on/off
 
 Outputs:
@@ -2117,6 +2559,11 @@ Outputs:
 - STRING: data
 - IMAGE: Cover image 1
 - IMAGE: Cover image 2
+- STRING: task_id (wire into KIE Suno Music (Fetch))
+Notes:
+- With early_return, audio_2 is one second of silence and a cover that is not ready yet
+  is a black 64x64 image. Downstream nodes cannot tell them from real results; connect
+  task_id to KIE Suno Music (Fetch) to collect the real track 2 and covers.
 """
 
     @classmethod
@@ -2136,12 +2583,14 @@ Outputs:
                 "style_weight": ("FLOAT", {"default": 0.65, "min": 0.0, "max": 1.0, "step": 0.01}),
                 "weirdness_constraint": ("FLOAT", {"default": 0.65, "min": 0.0, "max": 1.0, "step": 0.01}),
                 "audio_weight": ("FLOAT", {"default": 0.65, "min": 0.0, "max": 1.0, "step": 0.01}),
+                "early_return": ("BOOLEAN", {"default": False}),
+                "use_stream_url": ("BOOLEAN", {"default": False}),
                 "log": ("BOOLEAN", {"default": True}),
             },
         }
 
-    RETURN_TYPES = ("AUDIO", "AUDIO", "STRING", "IMAGE", "IMAGE")
-    RETURN_NAMES = ("audio_1", "audio_2", "data", "image_1", "image_2")
+    RETURN_TYPES = ("AUDIO", "AUDIO", "STRING", "IMAGE", "IMAGE", "STRING")
+    RETURN_NAMES = ("audio_1", "audio_2", "data", "image_1", "image_2", "task_id")
     FUNCTION = "generate"
     CATEGORY = "kie/api"
 
@@ -2158,10 +2607,12 @@ Outputs:
         style_weight: float = 0.65,
         weirdness_constraint: float = 0.65,
         audio_weight: float = 0.65,
+        early_return: bool = False,
+        use_stream_url: bool = False,
         log: bool = True,
     ):
         gender_value = "m" if vocal_gender == "male" else "f"
-        audio_output_1, audio_output_2, raw_json, image_output_1, image_output_2 = run_suno_generate(
+        audio_output_1, audio_output_2, raw_json, image_output_1, image_output_2, task_id = run_suno_generate(
             prompt=prompt,
             custom_mode=custom_mode,
             instrumental=instrumental,
@@ -2173,6 +2624,57 @@ Outputs:
             style_weight=style_weight,
             weirdness_constraint=weirdness_constraint,
             audio_weight=audio_weight,
+            early_return=early_return,
+            use_stream_url=use_stream_url,
+            log=log,
+        )
+        return (audio_output_1, audio_output_2, raw_json, image_output_1, image_output_2, task_id)
+
+
+class KIE_Suno_Music_Fetch:
+    HELP = """
+KIE Suno Music (Fetch)
+
+Wait for an existing Suno task to finish and return both tracks. Use it to fill in
+track 2 after a Suno Music node ran with early_return enabled.
+
+Inputs:
+- task_id: Suno task id (the task_id output of the Suno Music nodes)
+- poll_interval_s: Status check interval
+- timeout_s: Max wait time
+- log: Console logging on/off
+
+Outputs:
+- AUDIO: Generated audio 1
+- AUDIO: Generated audio 2
+- STRING: data
+- IMAGE: Cover image 1
+- IMAGE: Cover image 2
+"""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "task_id": ("STRING", {"default": ""}),
+            },
+            "optional": {
+                "poll_interval_s": ("FLOAT", {"default": 30.0, "min": 1.0, "max": 600.0, "step": 1.0}),
+                "timeout_s": ("INT", {"default": 1800, "min": 60, "max": 7200, "step": 60}),
+                "log": ("BOOLEAN", {"default": True}),
+            },
+        }
+
+    RETURN_TYPES = ("AUDIO", "AUDIO", "STRING", "IMAGE", "IMAGE")
+    RETURN_NAMES = ("audio_1", "audio_2", "data", "image_1", "image_2")
+    FUNCTION = "fetch"
+    CATEGORY = "kie/api"
+
+    def fetch(self, task_id: str, poll_interval_s: float = 30.0, timeout_s: int = 1800, log: bool = True):
+        audio_output_1, audio_output_2, raw_json, image_output_1, image_output_2 = run_suno_fetch(
+            task_id=task_id,
+            poll_interval_s=poll_interval_s,
+            timeout_s=timeout_s,
             log=log,
         )
         return (audio_output_1, audio_output_2, raw_json, image_output_1, image_output_2)
@@ -2240,6 +2742,108 @@ Outputs:
         return (tile_batch,)
 
 
+class KIE_GridToVideo:
+    HELP = """
+KIE Grid to Video (Kling 2.6 / Seedance / Grok)
+
+Animate every tile of a sliced grid with one image-to-video job per tile.
+Wire `tiles` from KIE Grid Slice and `prompts_list` from KIE Parse Prompt Grid JSON.
+Tiles are uploaded in parallel, up to max_concurrency tasks run at once, and all tasks
+are polled together, so a 3x3 grid takes about as long as a single video.
+
+Inputs:
+- tiles: Tile batch (from KIE Grid Slice)
+- prompts_list: One prompt per tile, or a single prompt for every tile
+- model: kling-2.6, seedance-1.5-pro, or grok-imagine
+- duration: Clip length in seconds (validated per model: Kling 5/10, Seedance 4/8/12, Grok 6/10/15)
+- resolution: 480p / 720p (Seedance and Grok)
+- aspect_ratio: Output aspect ratio (Seedance only)
+- sound: Generate audio (Kling and Seedance)
+- fixed_lens: Lock the camera lens (Seedance only)
+- grok_mode: normal / fun (Grok only)
+- max_concurrency: Max tasks in flight at once (also capped by KIE_MAX_ACTIVE_TASKS,
+  default 16, shared with every other KIE job)
+- priority: Scheduler class when many KIE jobs compete for task slots
+  (auto infers batch for video models)
+- log: Console logging on/off
+
+Outputs:
+- videos: List of VIDEO outputs in tile order
+
+Notes:
+- When a tile fails the node raises; re-running it with the same grid reuses the finished tiles.
+"""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "tiles": ("IMAGE",),
+                "prompts_list": ("STRING", {"forceInput": True}),
+                "model": ("COMBO", {"options": GRID_VIDEO_MODEL_OPTIONS, "default": "kling-2.6"}),
+            },
+            "optional": {
+                "duration": ("COMBO", {"options": GRID_VIDEO_DURATION_OPTIONS, "default": "5"}),
+                "resolution": ("COMBO", {"options": GRID_VIDEO_RESOLUTION_OPTIONS, "default": "720p"}),
+                "aspect_ratio": ("COMBO", {"options": GRID_VIDEO_ASPECT_RATIO_OPTIONS, "default": "1:1"}),
+                "sound": ("BOOLEAN", {"default": False}),
+                "fixed_lens": ("BOOLEAN", {"default": False}),
+                "grok_mode": ("COMBO", {"options": GRID_VIDEO_GROK_MODE_OPTIONS, "default": "normal"}),
+                "max_concurrency": (
+                    "INT",
+                    {
+                        "default": GRID_VIDEO_DEFAULT_MAX_CONCURRENCY,
+                        "min": 1,
+                        "max": GRID_VIDEO_MAX_CONCURRENCY,
+                    },
+                ),
+                "priority": ("COMBO", {"options": SCHEDULER_PRIORITY_OPTIONS, "default": "auto"}),
+                "log": ("BOOLEAN", {"default": True}),
+            },
+        }
+
+    RETURN_TYPES = ("VIDEO",)
+    RETURN_NAMES = ("videos",)
+    OUTPUT_IS_LIST = (True,)
+    FUNCTION = "generate"
+    CATEGORY = "kie/api"
+
+    def generate(
+        self,
+        tiles: torch.Tensor,
+        prompts_list,
+        model: str = "kling-2.6",
+        duration: str = "5",
+        resolution: str = "720p",
+        aspect_ratio: str = "1:1",
+        sound: bool = False,
+        fixed_lens: bool = False,
+        grok_mode: str = "normal",
+        max_concurrency: int = GRID_VIDEO_DEFAULT_MAX_CONCURRENCY,
+        priority: str = "auto",
+        log: bool = True,
+        poll_interval_s: float = 10.0,
+        timeout_s: int = 2000,
+    ):
+        videos = run_grid_to_video(
+            tiles=tiles,
+            prompts=prompts_list,
+            model=model,
+            duration=duration,
+            resolution=resolution,
+            aspect_ratio=aspect_ratio,
+            sound=sound,
+            fixed_lens=fixed_lens,
+            grok_mode=grok_mode,
+            max_concurrency=max_concurrency,
+            poll_interval_s=poll_interval_s,
+            timeout_s=timeout_s,
+            priority=priority,
+            log=log,
+        )
+        return (videos,)
+
+
 class KIEParsePromptGridJSON:
     HELP = """
 KIE Parse Prompt Grid JSON (1..9)
@@ -2358,14 +2962,14 @@ KIE System Prompt Selector
 
 Combine a user prompt with a system prompt template loaded from the `prompts/` folder.
 
-Template format (in prompts/images or prompts/videos .txt files):
+Template format (.txt files in prompts/images, prompts/videos, or subfolders of either):
 - name: <dropdown label>
 - system prompt below
 - <system prompt body with optional {user_prompt} placeholder>
 
 Inputs:
 - user_prompt: The user prompt text to inject
-- system_template: Dropdown from prompt files (images/videos)
+- system_template: Dropdown from prompt files, labelled "<folder>: <name>"
 
 Outputs:
 - STRING: Combined prompt
@@ -2374,8 +2978,7 @@ Outputs:
     @classmethod
     def INPUT_TYPES(cls):
         try:
-            templates = _scan_system_prompt_templates()
-            options = sorted(templates.keys())
+            options = _prompt_template_labels(_system_prompt_dir())
         except RuntimeError:
             options = []
 
@@ -2395,13 +2998,12 @@ Outputs:
     CATEGORY = "kie/helpers"
 
     def build(self, user_prompt: str, system_template: str):
-        templates = _scan_system_prompt_templates()
-        if system_template not in templates:
+        template = _prompt_template(_system_prompt_dir(), system_template)
+        if template is None:
             raise RuntimeError(
                 f"System template '{system_template}' not found in {_system_prompt_dir()}."
             )
 
-        template = templates[system_template]
         user_prompt = (user_prompt or "").strip()
         if SYSTEM_PROMPT_PLACEHOLDER in template:
             combined = template.replace(SYSTEM_PROMPT_PLACEHOLDER, user_prompt)
@@ -2415,10 +3017,12 @@ Outputs:
 
 NODE_CLASS_MAPPINGS = {
     "KIE_GetRemainingCredits": KIE_GetRemainingCredits,
+    "KIE_LatencyStats": KIE_LatencyStats,
     "KIE_NanoBananaPro_Image": KIE_NanoBananaPro_Image,
     "KIE_NanoBanana2_Image": KIE_NanoBanana2_Image,
     "KIE_GPTImage2_TextToImage": KIE_GPTImage2_TextToImage,
     "KIE_GPTImage2_ImageToImage": KIE_GPTImage2_ImageToImage,
+    "KIE_ImagePromptBatch": KIE_ImagePromptBatch,
     "KIE_Seedream45_TextToImage": KIE_Seedream45_TextToImage,
     "KIE_Seedream45_Edit": KIE_Seedream45_Edit,
     "KIE_GrokImagine_T2I": KIE_GrokImagine_T2I,
@@ -2427,6 +3031,7 @@ NODE_CLASS_MAPPINGS = {
     "KIE_Seedance15Pro_I2V": KIE_Seedance15Pro_I2V,
     "KIE_Seedance2_Video": KIE_Seedance2_Video,
     "KIE_Seedance2_Preflight": KIE_Seedance2_Preflight,
+    "KIE_Seedance2_Submit": KIE_Seedance2_Submit,
     "KIE_Kling25_I2V_Pro": KIE_Kling25_I2V_Pro,
     "KIE_Kling26_I2V": KIE_Kling26_I2V,
     "KIE_Kling26_T2V": KIE_Kling26_T2V,
@@ -2436,22 +3041,28 @@ NODE_CLASS_MAPPINGS = {
     "KIE_KlingElementsBatch": KIE_KlingElementsBatch,
     "KIE_Kling3_Video": KIE_Kling3_Video,
     "KIE_Kling3_Preflight": KIE_Kling3_Preflight,
+    "KIE_Kling3_Submit": KIE_Kling3_Submit,
+    "KIE_Await": KIE_Await,
     "KIE_Flux2_I2I": KIE_Flux2_I2I,
     "KIE_GrokImagine_T2V": KIE_GrokImagine_T2V,
     "KIE_GrokImagine_I2V": KIE_GrokImagine_I2V,
     "KIE_Gemini3Pro_LLM": KIE_Gemini3Pro_LLM,
     "KIE_Suno_Music_Basic": KIE_Suno_Music_Basic,
     "KIE_Suno_Music_Advanced": KIE_Suno_Music_Advanced,
+    "KIE_Suno_Music_Fetch": KIE_Suno_Music_Fetch,
     "KIE_GridSlice": KIE_GridSlice,
+    "KIE_GridToVideo": KIE_GridToVideo,
     "KIEParsePromptGridJSON": KIEParsePromptGridJSON,
     "KIE_SystemPrompt_Selector": KIE_SystemPrompt_Selector,
 }
 NODE_DISPLAY_NAME_MAPPINGS = {
     "KIE_GetRemainingCredits": "KIE Get Remaining Credits",
+    "KIE_LatencyStats": "KIE Latency Stats",
     "KIE_NanoBananaPro_Image": "KIE Nano Banana Pro (Image)",
     "KIE_NanoBanana2_Image": "Nano Banana 2",
     "KIE_GPTImage2_TextToImage": "KIE GPT Image 2 (Text-to-Image)",
     "KIE_GPTImage2_ImageToImage": "KIE GPT Image 2 (Image-to-Image)",
+    "KIE_ImagePromptBatch": "KIE Image Prompt Batch (Nano Banana / GPT Image)",
     "KIE_Seedream45_TextToImage": "KIE Seedream 4.5 Text-To-Image",
     "KIE_Seedream45_Edit": "KIE Seedream 4.5 Edit",
     "KIE_GrokImagine_T2I": "KIE Grok Imagine (T2I)",
@@ -2460,6 +3071,7 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "KIE_Seedance15Pro_I2V": "KIE Seedance 1.5 Pro (I2V/T2V)",
     "KIE_Seedance2_Video": "KIE Seedance 2.0 (Video)",
     "KIE_Seedance2_Preflight": "KIE Seedance 2.0 Preflight",
+    "KIE_Seedance2_Submit": "KIE Submit (Seedance 2.0)",
     "KIE_Kling25_I2V_Pro": "KIE Kling 2.5 I2V Pro",
     "KIE_Kling26_I2V": "KIE Kling 2.6 (I2V)",
     "KIE_Kling26_T2V": "KIE Kling 2.6 (T2V)",
@@ -2469,13 +3081,24 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "KIE_KlingElementsBatch": "KIE Kling Elements Batch",
     "KIE_Kling3_Video": "KIE Kling 3.0 (Video)",
     "KIE_Kling3_Preflight": "KIE Kling 3.0 Preflight",
+    "KIE_Kling3_Submit": "KIE Submit (Kling 3.0)",
+    "KIE_Await": "KIE Await",
     "KIE_Flux2_I2I": "KIE Flux 2 (Image-to-Image)",
     "KIE_GrokImagine_T2V": "KIE Grok Imagine (T2V)",
     "KIE_GrokImagine_I2V": "KIE Grok Imagine (I2V)",
     "KIE_Gemini3Pro_LLM": "KIE Gemini (LLM) [Experimental]",
     "KIE_Suno_Music_Basic": "KIE Suno Music (Basic)",
     "KIE_Suno_Music_Advanced": "KIE Suno Music (Advanced)",
+    "KIE_Suno_Music_Fetch": "KIE Suno Music (Fetch)",
     "KIE_GridSlice": "KIE Grid Slice",
+    "KIE_GridToVideo": "KIE Grid to Video (Kling 2.6 / Seedance / Grok)",
     "KIEParsePromptGridJSON": "KIE Parse Prompt Grid JSON (1..9)",
     "KIE_SystemPrompt_Selector": "KIE System Prompt Selector",
 }
+
+# Each node execution is one telemetry job (see kie_api/telemetry.py).
+for _node_name, _node_class in NODE_CLASS_MAPPINGS.items():
+    _instrument_node(_node_name, _node_class)
+
+_register_metrics_route()
+_start_metrics_server()
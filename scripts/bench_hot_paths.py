@@ -0,0 +1,309 @@
+"""Micro-benchmarks for the pack's CPU hot paths.
+
+Times the local (non-network) work a node does around a KIE job:
+
+- PNG encode of IMAGE tensors and decode of result images at 512, 1K, 2K and 4K
+- stacking large decoded batches
+- grid slicing for every grid layout and batch size
+- prompt-list parsing of large, messy LLM outputs
+- WAV encode of long stereo waveforms
+- the system prompt template index with many templates: a full scan, and the
+  cached label list and lookup behind the System Prompt Selector
+
+Each case runs a few warm-up calls and then reports the median and minimum of N
+timed repeats. `--save` records the results as a JSON baseline; `--compare` re-runs
+the suite and exits non-zero when a case is slower than its baseline by more than
+`--tolerance`. Baselines are machine-specific, so compare only against a baseline
+recorded on the same machine.
+
+Usage:
+    python scripts/bench_hot_paths.py
+    python scripts/bench_hot_paths.py --quick --only png
+    python scripts/bench_hot_paths.py --save
+    python scripts/bench_hot_paths.py --compare --tolerance 0.25
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BASELINE_PATH = REPO_ROOT / "scripts" / "benchmarks" / "baseline.json"
+
+IMAGE_SIZES = {"512": 512, "1K": 1024, "2K": 2048, "4K": 4096}
+STACK_BATCHES = (16, 64)
+SLICE_BATCHES = (1, 4, 16)
+SLICE_SIZE = 2048
+PROMPT_COUNTS = (9, 100, 1000)
+WAV_SECONDS = (30, 240, 600)
+WAV_SAMPLE_RATE = 48000
+TEMPLATE_COUNTS = (50, 500)
+
+# A case is a name plus a setup function returning the callable to time.
+Case = tuple[str, Callable[[], Callable[[], Any]]]
+
+
+def _random_image(size: int, batch: int = 1):
+    import torch
+
+    generator = torch.Generator().manual_seed(0)
+    # Noise is the worst case for PNG compression; the smooth ramp keeps it realistic.
+    ramp = torch.linspace(0.0, 1.0, size).view(1, 1, size, 1).expand(batch, size, size, 3)
+    noise = torch.rand((batch, size, size, 3), generator=generator) * 0.1
+    return (ramp * 0.9 + noise).contiguous()
+
+
+def _png_bytes(size: int) -> bytes:
+    import numpy as np
+    from PIL import Image
+
+    pixels = (_random_image(size)[0].numpy() * 255.0).astype(np.uint8)
+    with BytesIO() as output:
+        Image.fromarray(pixels).save(output, format="PNG")
+        return output.getvalue()
+
+
+def _messy_llm_output(count: int) -> str:
+    """Prompts the way chat models tend to return them: prose, a fence, odd keys."""
+    items = {
+        f"prompt_{idx}" if idx % 3 else f"P{idx}": (
+            f"Cinematic shot {idx}: a \"quoted\" subject with {{braces}} and [brackets], "
+            "soft rim light, 35mm, shallow depth of field, film grain. " * 3
+        )
+        for idx in range(1, count + 1)
+    }
+    body = json.dumps(items, indent=2)
+    return f"Sure! Here are {count} prompts for your grid:\n\n```json\n{body}\n```\n\nLet me know if you want changes."
+
+
+def _write_templates(root: Path, count: int) -> None:
+    body = "You are a prompt director.\n" + "Describe camera, lighting, and motion for {user_prompt}.\n" * 40
+    for idx in range(count):
+        category = "images" if idx % 2 else "videos"
+        folder = root / category / f"set_{idx % 5}" if idx % 3 == 0 else root / category
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"template_{idx:04d}.txt").write_text(
+            f"name: Template {idx}\ndescription: benchmark template\n\nsystem prompt below\n{body}",
+            encoding="utf-8",
+        )
+
+
+def _image_cases() -> list[Case]:
+    from kie_api.images import _image_bytes_to_tensor, _stack_image_tensors
+    from kie_api.upload import _image_tensor_to_png_bytes
+
+    def encode(size: int) -> Callable[[], Any]:
+        image = _random_image(size)
+        return lambda: _image_tensor_to_png_bytes(image)
+
+    def decode(size: int) -> Callable[[], Any]:
+        data = _png_bytes(size)
+        return lambda: _image_bytes_to_tensor(data)
+
+    def stack(batch: int) -> Callable[[], Any]:
+        tensors = list(_random_image(1024, batch).split(1))
+        return lambda: _stack_image_tensors(tensors)
+
+    cases: list[Case] = []
+    for label, size in IMAGE_SIZES.items():
+        cases.append((f"png_encode/{label}", lambda size=size: encode(size)))
+        cases.append((f"png_decode/{label}", lambda size=size: decode(size)))
+    for batch in STACK_BATCHES:
+        cases.append((f"stack/{batch}x1K", lambda batch=batch: stack(batch)))
+    return cases
+
+
+def _grid_cases() -> list[Case]:
+    from kie_api.grid import VALID_GRIDS, slice_grid_tensor
+
+    def setup(grid: str, batch: int) -> Callable[[], Any]:
+        image = _random_image(SLICE_SIZE, batch)
+        return lambda: slice_grid_tensor(image, grid, 8, 4, "row-major", "all", False)
+
+    return [
+        (f"slice_grid/{grid}/b{batch}", lambda grid=grid, batch=batch: setup(grid, batch))
+        for grid in VALID_GRIDS
+        for batch in SLICE_BATCHES
+    ]
+
+
+def _prompt_cases() -> list[Case]:
+    from kie_api.prompt_lists import parse_prompts_json
+
+    def setup(count: int) -> Callable[[], Any]:
+        text = _messy_llm_output(count)
+        return lambda: parse_prompts_json(text, max_items=count)
+
+    return [(f"parse_prompts/{count}", lambda count=count: setup(count)) for count in PROMPT_COUNTS]
+
+
+def _audio_cases() -> list[Case]:
+    import torch
+
+    from kie_api.audio import _waveform_to_wav_bytes
+
+    def setup(seconds: int) -> Callable[[], Any]:
+        generator = torch.Generator().manual_seed(0)
+        waveform = torch.rand((1, 2, seconds * WAV_SAMPLE_RATE), generator=generator) * 2.0 - 1.0
+        return lambda: _waveform_to_wav_bytes(waveform, WAV_SAMPLE_RATE)
+
+    return [(f"wav_encode/{seconds}s_stereo", lambda seconds=seconds: setup(seconds)) for seconds in WAV_SECONDS]
+
+
+def _template_cases(workdir: Path) -> list[Case]:
+    from kie_api.prompt_templates import _prompt_template, _prompt_template_labels, _reset_prompt_templates
+
+    os.environ["KIE_PROMPT_WATCH"] = "0"
+
+    def prompt_dir(count: int) -> str:
+        folder = workdir / f"prompts_{count}"
+        if not folder.is_dir():
+            _write_templates(folder, count)
+        return str(folder)
+
+    def scan(count: int) -> Callable[[], Any]:
+        folder = prompt_dir(count)
+
+        def run() -> list[str]:
+            _reset_prompt_templates()
+            return _prompt_template_labels(folder)
+
+        return run
+
+    def labels(count: int) -> Callable[[], Any]:
+        folder = prompt_dir(count)
+        return lambda: _prompt_template_labels(folder)
+
+    def lookup(count: int) -> Callable[[], Any]:
+        folder = prompt_dir(count)
+        label = _prompt_template_labels(folder)[-1]
+        return lambda: _prompt_template(folder, label)
+
+    cases: list[Case] = []
+    for count in TEMPLATE_COUNTS:
+        cases.append((f"scan_templates/{count}", lambda count=count: scan(count)))
+        cases.append((f"template_labels/{count}", lambda count=count: labels(count)))
+        cases.append((f"template_lookup/{count}", lambda count=count: lookup(count)))
+    return cases
+
+
+def _time_case(fn: Callable[[], Any], repeats: int, warmup: int) -> dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeats):
+        began = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - began)
+    return {
+        "median_ms": round(statistics.median(samples) * 1000.0, 3),
+        "min_ms": round(min(samples) * 1000.0, 3),
+        "repeats": repeats,
+    }
+
+
+def _environment() -> dict[str, Any]:
+    info: dict[str, Any] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+    try:
+        import torch
+
+        info["torch"] = torch.__version__
+        info["torch_threads"] = torch.get_num_threads()
+    except ImportError:
+        pass
+    return info
+
+
+def _run_suite(only: list[str], repeats: int, warmup: int, workdir: Path) -> dict[str, dict[str, Any]]:
+    results: dict[str, dict[str, Any]] = {}
+    groups = [_image_cases, _grid_cases, _prompt_cases, _audio_cases, lambda: _template_cases(workdir)]
+    for group in groups:
+        try:
+            cases = group()
+        except Exception as exc:
+            print(f"skipped group: {type(exc).__name__}: {exc}")
+            continue
+        for name, setup in cases:
+            if only and not any(term in name for term in only):
+                continue
+            result = _time_case(setup(), repeats, warmup)
+            results[name] = result
+            print(f"{name:<32} median {result['median_ms']:>10.2f} ms   min {result['min_ms']:>10.2f} ms")
+    return results
+
+
+def _compare(results: dict[str, dict[str, Any]], baseline: dict[str, Any], tolerance: float) -> int:
+    regressions = 0
+    print(f"\n{'case':<32} {'baseline ms':>12} {'now ms':>12} {'change':>8}")
+    for name, result in results.items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            print(f"{name:<32} {'(new)':>12} {result['median_ms']:>12.2f}")
+            continue
+        change = result["median_ms"] / previous["median_ms"] - 1.0 if previous["median_ms"] else 0.0
+        flag = "  REGRESSION" if change > tolerance else ""
+        regressions += 1 if flag else 0
+        print(f"{name:<32} {previous['median_ms']:>12.2f} {result['median_ms']:>12.2f} {change:>+7.0%}{flag}")
+    if regressions:
+        print(f"\n{regressions} case(s) slower than baseline by more than {tolerance:.0%}.")
+        return 1
+    print(f"\nNo case slower than baseline by more than {tolerance:.0%}.")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", action="append", default=[], help="Run only cases whose name contains this text.")
+    parser.add_argument("--repeats", type=int, default=7, help="Timed repeats per case (median is reported).")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed calls before timing each case.")
+    parser.add_argument("--quick", action="store_true", help="Three repeats, no warm-up.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline JSON path.")
+    parser.add_argument("--save", action="store_true", help="Write the results as the new baseline.")
+    parser.add_argument("--compare", action="store_true", help="Fail when a case regressed against the baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown for --compare (0.25 = 25%%).")
+    args = parser.parse_args()
+
+    repeats, warmup = (3, 0) if args.quick else (max(args.repeats, 1), max(args.warmup, 0))
+    sys.path.insert(0, str(REPO_ROOT))
+
+    with tempfile.TemporaryDirectory(prefix="kie-bench-") as workdir:
+        results = _run_suite(args.only, repeats, warmup, Path(workdir))
+
+    if not results:
+        print("No benchmark ran.")
+        return 1
+
+    status = 0
+    if args.compare:
+        if not args.baseline.is_file():
+            print(f"\nNo baseline at {args.baseline}; run with --save first.")
+            return 1
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get("environment", {}).get("platform") != platform.platform():
+            print(f"\nWarning: baseline was recorded on {baseline.get('environment', {}).get('platform')}.")
+        status = _compare(results, baseline, args.tolerance)
+
+    if args.save:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"environment": _environment(), "results": results}
+        args.baseline.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"\nBaseline saved to {args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,98 @@
+"""Memory benchmark for IMAGE output precision modes.
+
+Decodes a synthetic result image (and a small batch of them) with each
+`output_precision` option and reports the resulting tensor size and the peak RSS
+growth of the decode. Each measurement runs in a fresh subprocess so peaks do not
+leak between modes.
+
+Usage:
+    python scripts/bench_image_precision.py
+    python scripts/bench_image_precision.py --width 5504 --height 3072 --batch 4
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _measure(width: int, height: int, batch: int, precision: str) -> dict:
+    import resource
+    from io import BytesIO
+
+    import numpy as np
+    from PIL import Image
+
+    sys.path.insert(0, str(REPO_ROOT))
+    from kie_api.images import _image_bytes_to_tensor, _stack_image_tensors
+
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+    with BytesIO() as output:
+        Image.fromarray(pixels).save(output, format="PNG", compress_level=1)
+        image_bytes = output.getvalue()
+    del pixels
+
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    rss_unit = 1 if sys.platform == "darwin" else 1024
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * rss_unit
+    tensors = [_image_bytes_to_tensor(image_bytes, precision) for _ in range(batch)]
+    result = _stack_image_tensors(tensors) if batch > 1 else tensors[0]
+    del tensors
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * rss_unit
+
+    return {
+        "precision": precision,
+        "shape": list(result.shape),
+        "dtype": str(result.dtype),
+        "tensor_mb": round(result.element_size() * result.nelement() / (1024 * 1024), 1),
+        "peak_rss_growth_mb": round((peak - baseline) / (1024 * 1024), 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=5504, help="Image width (default: 4K Nano Banana Pro 16:9).")
+    parser.add_argument("--height", type=int, default=3072, help="Image height.")
+    parser.add_argument("--batch", type=int, default=1, help="Images decoded and stacked into one batch.")
+    parser.add_argument("--precision", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.precision:
+        print(json.dumps(_measure(args.width, args.height, args.batch, args.precision)))
+        return 0
+
+    sys.path.insert(0, str(REPO_ROOT))
+    from kie_api.images import OUTPUT_PRECISION_OPTIONS
+
+    print(f"Decoding {args.batch} x {args.width}x{args.height} RGB image(s)")
+    print(f"{'precision':<10} {'dtype':<14} {'tensor MB':>10} {'peak RSS growth MB':>20}")
+    for precision in OUTPUT_PRECISION_OPTIONS:
+        completed = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--width",
+                str(args.width),
+                "--height",
+                str(args.height),
+                "--batch",
+                str(args.batch),
+                "--precision",
+                precision,
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        row = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(f"{row['precision']:<10} {row['dtype']:<14} {row['tensor_mb']:>10} {row['peak_rss_growth_mb']:>20}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,166 @@
+"""Import-time benchmark for the node pack.
+
+Measures what ComfyUI pays for the pack at startup, each in a fresh interpreter:
+
+- import: loading `__init__.py` (and nodes.py) as a package, the way ComfyUI does
+- input_types: calling INPUT_TYPES of every node once, as ComfyUI does to build
+  the node list
+
+and reports the median of `--repeats` runs, how many of the pack's modules were
+imported, and which heavy dependencies (torch, numpy, PIL, requests, comfy_api)
+were loaded. `--top` adds the slowest modules of one run (from `python -X
+importtime`). `--compare REF` benchmarks a git ref (e.g. `HEAD~1`) the same way,
+extracted to a temporary directory, and prints both side by side.
+
+Bytecode is compiled by an uncounted first run, so the figures are warm-cache
+starts. Run from ComfyUI's Python environment with the ComfyUI root on
+PYTHONPATH: trees that import torch or ComfyUI modules at import time need them.
+
+Usage:
+    python scripts/bench_import_time.py
+    python scripts/bench_import_time.py --repeats 20 --top 15
+    python scripts/bench_import_time.py --compare HEAD~1
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+from pathlib import Path
+from typing import Any
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ("torch", "numpy", "PIL", "requests", "comfy_api", "av")
+
+# Runs in the child interpreter: argv[1] is the pack directory.
+CHILD_SOURCE = """
+import importlib.util, json, sys, time
+root = sys.argv[1]
+heavy = sys.argv[2].split(",")
+began = time.perf_counter()
+spec = importlib.util.spec_from_file_location("kie_pack", root + "/__init__.py", submodule_search_locations=[root])
+package = importlib.util.module_from_spec(spec)
+sys.modules["kie_pack"] = package
+spec.loader.exec_module(package)
+import_s = time.perf_counter() - began
+began = time.perf_counter()
+for node_class in package.NODE_CLASS_MAPPINGS.values():
+    node_class.INPUT_TYPES()
+input_types_s = time.perf_counter() - began
+print(json.dumps({
+    "import_s": import_s,
+    "input_types_s": input_types_s,
+    "nodes": len(package.NODE_CLASS_MAPPINGS),
+    "pack_modules": sum(1 for name in sys.modules if name == "kie_pack" or name.startswith("kie_pack.")),
+    "heavy_modules": [name for name in heavy if name in sys.modules],
+}))
+"""
+
+
+def _child_env(write_bytecode: bool) -> dict[str, str]:
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    if not write_bytecode:
+        env["PYTHONDONTWRITEBYTECODE"] = "1"
+    env.setdefault("KIE_JOB_JOURNAL", "0")
+    return env
+
+
+def _run_child(root: Path, *, write_bytecode: bool = False, importtime: bool = False) -> tuple[dict[str, Any], str]:
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", CHILD_SOURCE, str(root), ",".join(HEAVY_MODULES)]
+    completed = subprocess.run(command, capture_output=True, text=True, env=_child_env(write_bytecode))
+    if completed.returncode != 0:
+        last_line = (completed.stderr.strip().splitlines() or ["no output"])[-1]
+        raise RuntimeError(f"Importing the pack from {root} failed: {last_line}")
+    return json.loads(completed.stdout.strip().splitlines()[-1]), completed.stderr
+
+
+def _slowest_modules(importtime_output: str, top: int) -> list[tuple[str, int]]:
+    """(module, cumulative microseconds) of the slowest imports in `-X importtime` output."""
+    rows = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _self, cumulative, name = line[len("import time:") :].split("|", 2)
+        try:
+            rows.append((name.strip(), int(cumulative)))
+        except ValueError:
+            continue
+    return sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+
+
+def _benchmark(root: Path, repeats: int, top: int) -> dict[str, Any]:
+    _run_child(root, write_bytecode=True)
+    runs = [_run_child(root)[0] for _ in range(repeats)]
+    result = {
+        "root": str(root),
+        "import_s": statistics.median(run["import_s"] for run in runs),
+        "import_min_s": min(run["import_s"] for run in runs),
+        "input_types_s": statistics.median(run["input_types_s"] for run in runs),
+        "nodes": runs[-1]["nodes"],
+        "pack_modules": runs[-1]["pack_modules"],
+        "heavy_modules": runs[-1]["heavy_modules"],
+    }
+    if top:
+        _summary, importtime_output = _run_child(root, importtime=True)
+        result["slowest_modules"] = _slowest_modules(importtime_output, top)
+    return result
+
+
+def _extract_ref(ref: str, directory: Path) -> Path:
+    archive = subprocess.run(
+        ["git", "-C", str(REPO_ROOT), "archive", "--format=tar", ref], capture_output=True, check=False
+    )
+    if archive.returncode != 0:
+        raise RuntimeError(f"git archive {ref} failed: {archive.stderr.decode(errors='replace').strip()}")
+    with tarfile.open(fileobj=io.BytesIO(archive.stdout)) as tar:
+        tar.extractall(directory)
+    return directory
+
+
+def _print_result(label: str, result: dict[str, Any]) -> None:
+    heavy = ", ".join(result["heavy_modules"]) or "none"
+    print(
+        f"{label:<10} import {result['import_s'] * 1000:8.1f} ms (min {result['import_min_s'] * 1000:.1f})  "
+        f"INPUT_TYPES {result['input_types_s'] * 1000:7.1f} ms  "
+        f"{result['pack_modules']:>3} pack modules, {result['nodes']} nodes  heavy: {heavy}"
+    )
+    for name, microseconds in result.get("slowest_modules", []):
+        print(f"{'':<10}   {microseconds / 1000:8.1f} ms  {name}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=10, help="Fresh interpreters per measurement.")
+    parser.add_argument("--top", type=int, default=0, help="Also list the N slowest imported modules.")
+    parser.add_argument("--compare", metavar="REF", help="Also benchmark this git ref and show the difference.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args()
+
+    results = {"current": _benchmark(REPO_ROOT, args.repeats, args.top)}
+    if args.compare:
+        with tempfile.TemporaryDirectory(prefix="kie_import_") as workdir:
+            results[args.compare] = _benchmark(_extract_ref(args.compare, Path(workdir)), args.repeats, args.top)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    for label, result in results.items():
+        _print_result(label, result)
+    if args.compare:
+        before, after = results[args.compare]["import_s"], results["current"]["import_s"]
+        print(f"\nimport: {before * 1000:.1f} ms -> {after * 1000:.1f} ms ({(after - before) / before * 100:+.0f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,226 @@
+"""Memory regression check for the video and audio paths.
+
+Runs each video and audio stage once, with memory tracking on (KIE_MEMORY=1, see
+kie_api/memory.py):
+
+- read: `_coerce_video_to_mp4_bytes` / `_coerce_audio_to_wav_bytes` of a file on disk
+- upload: `_upload_video` / `_upload_audio`
+- download: `_download_video` / Suno's `_download_audio`
+- decode: `_video_bytes_to_comfy_video` / `_audio_bytes_to_comfy_audio`
+
+Uploads and downloads go to the local KIE stand-in (scripts/kie_standin.py), which
+runs in its own process so its buffers are not counted. For every stage the RSS
+growth of this process must stay below `--max-ratio` times the file size, plus
+`--slack-mb` for allocator and interpreter noise; the script exits with status 1
+when a stage exceeds its budget, so it can gate CI or a release.
+
+Run from ComfyUI's Python environment with the ComfyUI root on PYTHONPATH (video
+decoding imports ComfyUI modules). Audio decoding needs torchaudio or soundfile;
+stages whose dependencies are missing are reported as skipped.
+
+Usage:
+    python scripts/check_memory.py
+    python scripts/check_memory.py --video-mb 256 --audio-s 600 --max-ratio 2.5
+    python scripts/check_memory.py --json
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import wave
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import urlsplit, urlunsplit
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+STANDIN_SCRIPT = Path(__file__).resolve().parent / "kie_standin.py"
+KIE_HOSTS = {"api.kie.ai", "kieai.redpandaai.co"}
+API_KEY = "memory-check-key"
+
+
+def _start_standin(video_mb: float, audio_s: float) -> tuple[subprocess.Popen, str]:
+    command = [
+        sys.executable,
+        str(STANDIN_SCRIPT),
+        "--port",
+        "0",
+        "--video-mb",
+        str(video_mb),
+        "--audio-s",
+        str(audio_s),
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    line = process.stdout.readline().strip()
+    if not line.startswith("KIE stand-in listening on "):
+        process.kill()
+        raise RuntimeError(f"Stand-in failed to start: {line or process.stderr.read()}")
+    return process, line.rsplit(" ", 1)[-1]
+
+
+def _stop_standin(process: subprocess.Popen) -> None:
+    if os.name == "posix":
+        process.send_signal(signal.SIGINT)
+    else:
+        process.terminate()
+    try:
+        process.communicate(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def _route_requests_to(base_url: str) -> None:
+    """Send KIE traffic from this process to the stand-in and refuse everything else."""
+    import requests
+
+    local = urlsplit(base_url)
+    original = requests.Session.request
+
+    def routed(self, method, url, *args, **kwargs):
+        parts = urlsplit(url)
+        if parts.hostname in KIE_HOSTS:
+            url = urlunsplit((local.scheme, local.netloc, parts.path, parts.query, parts.fragment))
+        elif parts.netloc != local.netloc:
+            raise RuntimeError(f"Memory check refused a request to {parts.netloc}.")
+        return original(self, method, url, *args, **kwargs)
+
+    requests.Session.request = routed
+
+
+def _write_inputs(directory: Path, video_mb: float, audio_s: float) -> tuple[Path, Path]:
+    video_path = directory / "check.mp4"
+    video_path.write_bytes(random.Random(1).randbytes(int(video_mb * 1024 * 1024)))
+    audio_path = directory / "check.wav"
+    with wave.open(str(audio_path), "wb") as writer:
+        writer.setnchannels(2)
+        writer.setsampwidth(2)
+        writer.setframerate(44100)
+        writer.writeframes(b"\x00\x00\x00\x00" * int(audio_s * 44100))
+    return video_path, audio_path
+
+
+def _stage_plan(base_url: str, video_path: Path, audio_path: Path) -> list[tuple[str, str, Callable[[dict], None]]]:
+    """(stage, kind, run) in pipeline order; each run keeps its result in a shared dict."""
+    from kie_api.audio import _audio_bytes_to_comfy_audio, _coerce_audio_to_wav_bytes
+    from kie_api.suno_music import _download_audio
+    from kie_api.upload import _upload_audio, _upload_video
+    from kie_api.video import _coerce_video_to_mp4_bytes, _download_video, _video_bytes_to_comfy_video
+
+    def read_video(held: dict) -> None:
+        held["video"] = _coerce_video_to_mp4_bytes(str(video_path))[0]
+
+    def upload_video(held: dict) -> None:
+        _upload_video(API_KEY, held.pop("video"))
+
+    def download_video(held: dict) -> None:
+        held["video"] = _download_video(f"{base_url}/files/check.mp4")
+
+    def decode_video(held: dict) -> None:
+        _video_bytes_to_comfy_video(held.pop("video"))
+
+    def read_audio(held: dict) -> None:
+        held["audio"] = _coerce_audio_to_wav_bytes(str(audio_path))[0]
+
+    def upload_audio(held: dict) -> None:
+        _upload_audio(API_KEY, held.pop("audio"))
+
+    def download_audio(held: dict) -> None:
+        held["audio"] = _download_audio(f"{base_url}/files/check.wav", 1)
+
+    def decode_audio(held: dict) -> None:
+        _audio_bytes_to_comfy_audio(held.pop("audio"), "check.wav")
+
+    return [
+        ("read", "video", read_video),
+        ("upload", "video", upload_video),
+        ("download", "video", download_video),
+        ("decode", "video", decode_video),
+        ("read", "audio", read_audio),
+        ("upload", "audio", upload_audio),
+        ("download", "audio", download_audio),
+        ("decode", "audio", decode_audio),
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--video-mb", type=float, default=64.0, help="Size of the test video.")
+    parser.add_argument("--audio-s", type=float, default=300.0, help="Length of the test WAV (44.1 kHz stereo).")
+    parser.add_argument("--max-ratio", type=float, default=3.0, help="Allowed RSS growth per stage, as a multiple of the file size.")
+    parser.add_argument("--slack-mb", type=float, default=32.0, help="Allowance on top of the ratio for allocator noise.")
+    parser.add_argument("--sample-ms", type=float, default=2.0, help="RSS sampling interval.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args()
+
+    os.environ["KIE_MEMORY"] = "1"
+    os.environ["KIE_MEMORY_SAMPLE_MS"] = str(args.sample_ms)
+    os.environ["KIE_JOB_JOURNAL"] = "0"
+    os.environ["KIE_SPEND_HISTORY"] = "0"
+    sys.path.insert(0, str(REPO_ROOT))
+    from kie_api.memory import _memory_high_water, _rss_bytes
+
+    if _rss_bytes() is None:
+        print("RSS cannot be read on this system (no /proc and no psutil); nothing to check.")
+        return 1
+
+    process, base_url = _start_standin(args.video_mb, args.audio_s)
+    results: list[dict[str, Any]] = []
+    failed = False
+    try:
+        _route_requests_to(base_url)
+        with tempfile.TemporaryDirectory(prefix="kie_memory_") as workdir:
+            video_path, audio_path = _write_inputs(Path(workdir), args.video_mb, args.audio_s)
+            held: dict[str, bytes] = {}
+            for stage, kind, run in _stage_plan(base_url, video_path, audio_path):
+                gc.collect()
+                try:
+                    run(held)
+                except (ImportError, RuntimeError) as exc:
+                    held.pop(kind, None)
+                    results.append({"stage": stage, "kind": kind, "skipped": str(exc)})
+                    continue
+                mark = _memory_high_water()[(stage, kind)]
+                budget = args.max_ratio * mark["file_bytes"] + args.slack_mb * 1024 * 1024
+                ok = mark["rss_growth_bytes"] <= budget
+                failed = failed or not ok
+                results.append(
+                    {
+                        "stage": stage,
+                        "kind": kind,
+                        "file_bytes": mark["file_bytes"],
+                        "rss_growth_bytes": mark["rss_growth_bytes"],
+                        "budget_bytes": int(budget),
+                        "largest_buffer_bytes": mark["largest_buffer_bytes"],
+                        "ok": ok,
+                    }
+                )
+    finally:
+        _stop_standin(process)
+
+    if args.json:
+        print(json.dumps({"max_ratio": args.max_ratio, "slack_mb": args.slack_mb, "stages": results}, indent=2))
+        return 1 if failed else 0
+
+    mb = 1024 * 1024
+    print(f"\n{'stage':<16} {'file MB':>8} {'RSS +MB':>8} {'ratio':>6} {'budget MB':>10}  result")
+    for row in results:
+        name = f"{row['kind']} {row['stage']}"
+        if "skipped" in row:
+            print(f"{name:<16} {'':>8} {'':>8} {'':>6} {'':>10}  skipped: {row['skipped']}")
+            continue
+        ratio = row["rss_growth_bytes"] / row["file_bytes"] if row["file_bytes"] else 0.0
+        print(
+            f"{name:<16} {row['file_bytes'] / mb:>8.1f} {row['rss_growth_bytes'] / mb:>8.1f} {ratio:>6.2f} "
+            f"{row['budget_bytes'] / mb:>10.1f}  {'ok' if row['ok'] else 'OVER BUDGET'}"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
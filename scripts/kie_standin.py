@@ -0,0 +1,300 @@
+"""Local stand-in for the KIE API, for offline load tests.
+
+Serves the endpoints the pack calls, with the same response shapes:
+
+- POST /api/v1/jobs/createTask and GET /api/v1/jobs/recordInfo (Market models)
+- POST /api/v1/generate and GET /api/v1/generate/record-info (Suno)
+- POST /api/file-stream-upload
+- GET /api/v1/chat/credit
+- GET /files/<name> for result images (PNG), videos and audio (WAV)
+
+Tasks move through queued -> generating -> success on a wall-clock schedule per
+model family (image, video, Suno), scaled by --time-scale. KIE's per-account
+concurrency limit and transient errors can be simulated with --max-active (HTTP
+429 from createTask) and --error-rate (HTTP 500 from the status endpoints).
+
+Result videos are opaque bytes: the pack hands them to ComfyUI without decoding.
+Only the Python standard library is used, so the stand-in can run anywhere.
+
+Usage:
+    python scripts/kie_standin.py --port 8765
+    python scripts/kie_standin.py --port 0 --time-scale 0.05 --max-active 50
+"""
+
+import argparse
+import io
+import json
+import random
+import struct
+import sys
+import threading
+import time
+import uuid
+import wave
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+
+# Unscaled (queue_s, generation_s) per model family; Suno reaches FIRST_SUCCESS
+# halfway through generation.
+PROFILES = {
+    "image": (2.0, 15.0),
+    "video": (10.0, 90.0),
+    "suno": (5.0, 60.0),
+}
+VIDEO_MARKERS = ("video", "i2v", "t2v", "motion")
+START_CREDITS = 1_000_000
+
+
+def _model_family(model: str) -> str:
+    lower = model.lower()
+    if lower.startswith("suno"):
+        return "suno"
+    return "video" if any(marker in lower for marker in VIDEO_MARKERS) else "image"
+
+
+def _png_bytes(size: int) -> bytes:
+    """A size x size RGB gradient PNG, written without PIL."""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    scale = max(size - 1, 1)
+    rows = bytearray()
+    for y in range(size):
+        rows.append(0)
+        rows.extend(value for x in range(size) for value in (x * 255 // scale, y * 255 // scale, 128))
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(bytes(rows), 6)) + chunk(b"IEND", b"")
+
+
+def _wav_bytes(seconds: float, sample_rate: int = 44100) -> bytes:
+    with io.BytesIO() as output:
+        with wave.open(output, "wb") as writer:
+            writer.setnchannels(2)
+            writer.setsampwidth(2)
+            writer.setframerate(sample_rate)
+            writer.writeframes(b"\x00\x00\x00\x00" * int(seconds * sample_rate))
+        return output.getvalue()
+
+
+class StandInState:
+    def __init__(self, time_scale: float, max_active: int, error_rate: float, files: dict[str, bytes]):
+        self.time_scale = time_scale
+        self.max_active = max_active
+        self.error_rate = error_rate
+        self.files = files
+        self.lock = threading.Lock()
+        self.tasks: dict[str, dict[str, Any]] = {}
+        self.credits = START_CREDITS
+        self.counts = {"createTask": 0, "rate_limited": 0, "uploads": 0, "status": 0, "downloads": 0}
+
+    def _active(self, now: float) -> int:
+        return sum(1 for task in self.tasks.values() if task["done_at"] > now)
+
+    def create(self, model: str) -> str | None:
+        """Register a task; returns None when the simulated account limit is reached."""
+        now = time.time()
+        family = _model_family(model)
+        queue_s, generation_s = PROFILES[family]
+        with self.lock:
+            self.counts["createTask"] += 1
+            if self.max_active and self._active(now) >= self.max_active:
+                self.counts["rate_limited"] += 1
+                return None
+            task_id = uuid.uuid4().hex
+            started_at = now + queue_s * self.time_scale
+            self.tasks[task_id] = {
+                "model": model,
+                "family": family,
+                "created_at": now,
+                "started_at": started_at,
+                "done_at": started_at + generation_s * self.time_scale,
+            }
+            self.credits -= 10
+            return task_id
+
+    def task(self, task_id: str) -> dict[str, Any] | None:
+        with self.lock:
+            self.counts["status"] += 1
+            return self.tasks.get(task_id)
+
+    def count(self, key: str) -> None:
+        with self.lock:
+            self.counts[key] += 1
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    server_version = "KieStandIn/1.0"
+    state: StandInState
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return
+
+    def _send_json(self, payload: Any, status: int = 200) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _transient_error(self) -> bool:
+        if self.state.error_rate and random.random() < self.state.error_rate:
+            self._send_json({"code": 500, "msg": "internal error, try again later"}, status=500)
+            return True
+        return False
+
+    def do_POST(self) -> None:
+        path = urlparse(self.path).path
+        body = self._read_body()
+        if path == "/api/file-stream-upload":
+            self.state.count("uploads")
+            url = f"{self._base_url()}/files/upload-{uuid.uuid4().hex}.png"
+            self._send_json({"success": True, "code": 200, "msg": "ok", "data": {"downloadUrl": url}})
+            return
+        if path in ("/api/v1/jobs/createTask", "/api/v1/generate"):
+            try:
+                payload = json.loads(body or b"{}")
+            except json.JSONDecodeError:
+                self._send_json({"code": 400, "msg": "invalid JSON"}, status=400)
+                return
+            model = str(payload.get("model") or "")
+            if path == "/api/v1/generate":
+                model = f"suno/{model}"
+            task_id = self.state.create(model)
+            if task_id is None:
+                self._send_json({"code": 429, "msg": "too many requests"}, status=429)
+                return
+            self._send_json({"code": 200, "msg": "success", "data": {"taskId": task_id}})
+            return
+        self.send_error(404)
+
+    def do_GET(self) -> None:
+        parsed = urlparse(self.path)
+        path = parsed.path
+        if path == "/api/v1/chat/credit":
+            self._send_json({"code": 200, "msg": "success", "data": self.state.credits})
+            return
+        if path in ("/api/v1/jobs/recordInfo", "/api/v1/generate/record-info"):
+            if self._transient_error():
+                return
+            task_id = (parse_qs(parsed.query).get("taskId") or [""])[0]
+            task = self.state.task(task_id)
+            if task is None:
+                self._send_json({"code": 404, "msg": f"task {task_id} not found"})
+                return
+            record = self._suno_record(task_id, task) if task["family"] == "suno" else self._market_record(task_id, task)
+            self._send_json({"code": 200, "msg": "success", "data": record})
+            return
+        if path.startswith("/files/"):
+            self._send_file(path)
+            return
+        self.send_error(404)
+
+    def _market_record(self, task_id: str, task: dict[str, Any]) -> dict[str, Any]:
+        now = time.time()
+        record: dict[str, Any] = {"taskId": task_id, "model": task["model"], "remainedCredits": self.state.credits}
+        if now < task["started_at"]:
+            record["state"] = "waiting"
+        elif now < task["done_at"]:
+            record["state"] = "generating"
+        else:
+            ext = "mp4" if task["family"] == "video" else "png"
+            url = f"{self._base_url()}/files/{task_id}.{ext}"
+            record["state"] = "success"
+            record["resultJson"] = json.dumps({"resultUrls": [url]})
+            record["costTime"] = int((task["done_at"] - task["created_at"]) * 1000)
+        return record
+
+    def _suno_record(self, task_id: str, task: dict[str, Any]) -> dict[str, Any]:
+        now = time.time()
+        first_at = (task["started_at"] + task["done_at"]) / 2.0
+        if now < task["started_at"]:
+            status = "PENDING"
+        elif now < first_at:
+            status = "TEXT_SUCCESS"
+        elif now < task["done_at"]:
+            status = "FIRST_SUCCESS"
+        else:
+            status = "SUCCESS"
+        tracks = []
+        for idx in (1, 2):
+            ready = status == "SUCCESS" or (idx == 1 and status == "FIRST_SUCCESS")
+            tracks.append(
+                {
+                    "id": f"{task_id}-{idx}",
+                    "title": f"Track {idx}",
+                    "audioUrl": f"{self._base_url()}/files/{task_id}-{idx}.wav" if ready else "",
+                    "streamAudioUrl": f"{self._base_url()}/files/{task_id}-{idx}.wav",
+                    "imageUrl": f"{self._base_url()}/files/{task_id}-{idx}.png",
+                    "duration": 10.0,
+                }
+            )
+        return {"taskId": task_id, "status": status, "response": {"taskId": task_id, "sunoData": tracks}}
+
+    def _send_file(self, path: str) -> None:
+        ext = path.rsplit(".", 1)[-1].lower()
+        body = self.state.files.get(ext)
+        if body is None:
+            self.send_error(404)
+            return
+        self.state.count("downloads")
+        content_type = {"png": "image/png", "mp4": "video/mp4", "wav": "audio/wav"}[ext]
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Hundreds of simulated users connect at once; the default backlog of 5 would
+    # turn a load test into a test of the listen queue.
+    request_queue_size = 1024
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="0 picks a free port (printed on start).")
+    parser.add_argument("--time-scale", type=float, default=0.1, help="Multiplier for queue and generation times.")
+    parser.add_argument("--max-active", type=int, default=0, help="Simulated account task limit (0 = unlimited).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of status polls answered with HTTP 500.")
+    parser.add_argument("--image-size", type=int, default=1024, help="Edge length of result images.")
+    parser.add_argument("--video-mb", type=float, default=8.0, help="Size of result videos.")
+    parser.add_argument("--audio-s", type=float, default=30.0, help="Length of result audio tracks.")
+    args = parser.parse_args()
+
+    files = {
+        "png": _png_bytes(args.image_size),
+        "mp4": random.Random(0).randbytes(int(args.video_mb * 1024 * 1024)),
+        "wav": _wav_bytes(args.audio_s),
+    }
+    StandInHandler.state = StandInState(max(args.time_scale, 0.0), max(args.max_active, 0), args.error_rate, files)
+    server = StandInServer((args.host, args.port), StandInHandler)
+    host, port = server.server_address[:2]
+    print(f"KIE stand-in listening on http://{host}:{port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(StandInHandler.state.counts), file=sys.stderr, flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,390 @@
+"""Offline load test: many concurrent workflows through the real node classes.
+
+Starts the local KIE stand-in (scripts/kie_standin.py) in a subprocess, routes
+every KIE request of this process to it, and runs simulated users, each executing
+workflows back to back through the node classes in nodes.py:
+
+- edit:  KIE_NanoBanana2_Image with a reference image (upload, task, download, decode)
+- grid:  KIE_GridToVideo over a 2x2 tile batch (4 uploads, 4 concurrent I2V tasks)
+- video: KIE_Kling26_T2V, a long text-to-video job
+- suno:  KIE_Suno_Music_Basic (two tracks and two covers)
+
+Load is applied in stages (`--users 10,50,100,200`), each running for `--duration`
+seconds. Every stage reports throughput, latency percentiles per workflow type and
+errors; threads, open sockets and RSS of this process are sampled over time. The
+stand-in runs in its own process so its threads and sockets are not counted.
+
+Requests to any other host are refused, so a load test can never reach the real
+API or spend credits. The job journal and the spend history are disabled for the
+run, and a throwaway API key is used.
+
+Run from ComfyUI's Python environment with the ComfyUI root on PYTHONPATH (the
+node classes import ComfyUI modules).
+
+Usage:
+    python scripts/load_test.py --users 10,50,100 --duration 60
+    python scripts/load_test.py --mix edit=1 --users 200 --kie-max-active 100
+    python scripts/load_test.py --users 50 --report load_report.json
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import urlsplit, urlunsplit
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+STANDIN_SCRIPT = Path(__file__).resolve().parent / "kie_standin.py"
+KIE_HOSTS = {"api.kie.ai", "kieai.redpandaai.co"}
+DEFAULT_MIX = "edit=5,grid=2,video=2,suno=1"
+
+
+def _load_nodes_module():
+    """Import nodes.py the way ComfyUI does, as a submodule of the pack package."""
+    spec = importlib.util.spec_from_file_location(
+        "kie_pack", REPO_ROOT / "__init__.py", submodule_search_locations=[str(REPO_ROOT)]
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules["kie_pack"] = package
+    spec.loader.exec_module(package)
+    return sys.modules["kie_pack.nodes"]
+
+
+def _start_standin(args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    command = [
+        sys.executable,
+        str(STANDIN_SCRIPT),
+        "--port",
+        "0",
+        "--time-scale",
+        str(args.time_scale),
+        "--max-active",
+        str(args.kie_max_active),
+        "--error-rate",
+        str(args.kie_error_rate),
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    line = process.stdout.readline().strip()
+    if not line.startswith("KIE stand-in listening on "):
+        process.kill()
+        raise RuntimeError(f"Stand-in failed to start: {line or process.stderr.read()}")
+    return process, line.rsplit(" ", 1)[-1]
+
+
+def _stop_standin(process: subprocess.Popen) -> dict[str, Any]:
+    # SIGINT lets the stand-in print its request counts before exiting.
+    if os.name == "posix":
+        process.send_signal(signal.SIGINT)
+    else:
+        process.terminate()
+    try:
+        _out, err = process.communicate(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        return {}
+    try:
+        return json.loads(err.strip().splitlines()[-1])
+    except (IndexError, json.JSONDecodeError):
+        return {}
+
+
+def _route_requests_to(base_url: str) -> None:
+    """Send KIE traffic from this process to the stand-in and refuse everything else."""
+    import requests
+
+    local = urlsplit(base_url)
+    original = requests.Session.request
+
+    def routed(self, method, url, *args, **kwargs):
+        parts = urlsplit(url)
+        if parts.hostname in KIE_HOSTS:
+            url = urlunsplit((local.scheme, local.netloc, parts.path, parts.query, parts.fragment))
+        elif parts.netloc != local.netloc:
+            raise RuntimeError(f"Load test refused a request to {parts.netloc}.")
+        return original(self, method, url, *args, **kwargs)
+
+    requests.Session.request = routed
+
+
+def _parse_mix(text: str) -> dict[str, float]:
+    mix: dict[str, float] = {}
+    for part in text.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown workflow '{name}'. Use: {', '.join(SCENARIOS)}.")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def _edit(nodes, torch, uid: str, poll_s: float):
+    image = torch.rand((1, 1024, 1024, 3))
+    return nodes.KIE_NanoBanana2_Image().generate(
+        prompt=f"Make the sky stormy ({uid})", images=image, poll_interval_s=poll_s, log=False
+    )
+
+
+def _grid(nodes, torch, uid: str, poll_s: float):
+    tiles = torch.rand((4, 512, 512, 3))
+    return nodes.KIE_GridToVideo().generate(
+        tiles=tiles, prompts_list=[f"Slow push-in ({uid})"], poll_interval_s=poll_s, log=False
+    )
+
+
+def _video(nodes, torch, uid: str, poll_s: float):
+    return nodes.KIE_Kling26_T2V().generate(
+        prompt=f"A lighthouse in a storm at night ({uid})", duration="10", poll_interval_s=poll_s, log=False
+    )
+
+
+def _suno(nodes, torch, uid: str, poll_s: float):
+    return nodes.KIE_Suno_Music_Basic().generate(
+        title="",
+        style="",
+        prompt=f"Calm lo-fi beat for studying ({uid})",
+        custom_mode=False,
+        instrumental=True,
+        model="V4_5",
+        log=False,
+    )
+
+
+SCENARIOS: dict[str, Callable[..., Any]] = {"edit": _edit, "grid": _grid, "video": _video, "suno": _suno}
+
+
+def _open_sockets() -> int | None:
+    fd_dir = Path("/proc/self/fd")
+    if fd_dir.is_dir():
+        count = 0
+        for entry in fd_dir.iterdir():
+            try:
+                count += os.readlink(entry).startswith("socket:")
+            except OSError:
+                continue
+        return count
+    try:
+        import psutil
+
+        return len(psutil.Process().net_connections())
+    except Exception:
+        return None
+
+
+def _rss_mb() -> float:
+    statm = Path("/proc/self/statm")
+    if statm.is_file():
+        pages = int(statm.read_text().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    import resource
+
+    # Peak rather than current RSS; ru_maxrss is KiB on Linux and bytes on macOS.
+    rss_unit = 1 if sys.platform == "darwin" else 1024
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * rss_unit / (1024 * 1024), 1)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(pct / 100.0 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+class LoadRun:
+    def __init__(self, nodes, torch, mix: dict[str, float], poll_s: float):
+        self.nodes = nodes
+        self.torch = torch
+        self.mix = mix
+        self.poll_s = poll_s
+        self.lock = threading.Lock()
+        self.running = 0
+        self.completed = 0
+        self.results: list[dict[str, Any]] = []
+        self.timeline: list[dict[str, Any]] = []
+
+    def run_workflow(self, name: str, uid: str) -> None:
+        with self.lock:
+            self.running += 1
+        began = time.perf_counter()
+        error = None
+        try:
+            SCENARIOS[name](self.nodes, self.torch, uid, self.poll_s)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+        latency = time.perf_counter() - began
+        with self.lock:
+            self.running -= 1
+            self.completed += 1
+            self.results.append({"workflow": name, "latency_s": latency, "error": error, "finished": time.time()})
+
+    def user(self, user_id: int, stop_at: float, start_delay: float) -> None:
+        time.sleep(start_delay)
+        rng = random.Random(user_id)
+        names, weights = list(self.mix), list(self.mix.values())
+        iteration = 0
+        while time.time() < stop_at:
+            iteration += 1
+            self.run_workflow(rng.choices(names, weights)[0], f"u{user_id}-{iteration}")
+
+    def sample(self, stage_users: int, started: float) -> dict[str, Any]:
+        with self.lock:
+            running, completed = self.running, self.completed
+        point = {
+            "t_s": round(time.time() - started, 1),
+            "users": stage_users,
+            "running": running,
+            "completed": completed,
+            "threads": threading.active_count(),
+            "sockets": _open_sockets(),
+            "rss_mb": _rss_mb(),
+        }
+        self.timeline.append(point)
+        return point
+
+
+def _stage_summary(results: list[dict[str, Any]], users: int, wall_s: float) -> dict[str, Any]:
+    by_workflow: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for result in results:
+        by_workflow[result["workflow"]].append(result)
+    workflows = {}
+    for name, items in sorted(by_workflow.items()):
+        latencies = [item["latency_s"] for item in items if item["error"] is None]
+        errors = [item["error"] for item in items if item["error"] is not None]
+        workflows[name] = {
+            "ok": len(latencies),
+            "errors": len(errors),
+            "p50_s": round(statistics.median(latencies), 2) if latencies else None,
+            "p90_s": round(_percentile(latencies, 90), 2) if latencies else None,
+            "p99_s": round(_percentile(latencies, 99), 2) if latencies else None,
+            "max_s": round(max(latencies), 2) if latencies else None,
+            "first_error": errors[0] if errors else None,
+        }
+    ok_count = sum(item["ok"] for item in workflows.values())
+    return {
+        "users": users,
+        "wall_s": round(wall_s, 1),
+        "completed": len(results),
+        "throughput_per_min": round(ok_count / wall_s * 60.0, 1) if wall_s else 0.0,
+        "error_rate": round((len(results) - ok_count) / len(results), 3) if results else 0.0,
+        "workflows": workflows,
+    }
+
+
+def _print_stage(summary: dict[str, Any]) -> None:
+    print(
+        f"\n== {summary['users']} users: {summary['completed']} workflows in {summary['wall_s']}s, "
+        f"{summary['throughput_per_min']}/min, error rate {summary['error_rate']:.1%}"
+    )
+    print(f"{'workflow':<8} {'ok':>6} {'errors':>7} {'p50 s':>8} {'p90 s':>8} {'p99 s':>8} {'max s':>8}")
+    for name, stats in summary["workflows"].items():
+        cells = [stats[key] if stats[key] is not None else "-" for key in ("p50_s", "p90_s", "p99_s", "max_s")]
+        print(f"{name:<8} {stats['ok']:>6} {stats['errors']:>7} " + " ".join(f"{cell:>8}" for cell in cells))
+        if stats["first_error"]:
+            print(f"         first error: {stats['first_error'][:160]}")
+
+
+def _run_stage(run: LoadRun, users: int, args: argparse.Namespace, started: float) -> dict[str, Any]:
+    stage_began = time.time()
+    stop_at = stage_began + args.duration
+    first_result = len(run.results)
+    threads = [
+        threading.Thread(
+            target=run.user,
+            args=(user_id, stop_at, args.ramp_s * user_id / max(users, 1)),
+            name=f"load-user-{user_id}",
+            daemon=True,
+        )
+        for user_id in range(users)
+    ]
+    for thread in threads:
+        thread.start()
+    # Users finish the workflow they are in when the stage ends; sampling continues
+    # until the last one returns.
+    while any(thread.is_alive() for thread in threads):
+        point = run.sample(users, started)
+        print(
+            f"t={point['t_s']:>7.1f}s users={users:<4} running={point['running']:<4} done={point['completed']:<6} "
+            f"threads={point['threads']:<5} sockets={point['sockets']} rss={point['rss_mb']} MB",
+            flush=True,
+        )
+        deadline = time.time() + args.sample_s
+        for thread in threads:
+            thread.join(timeout=max(deadline - time.time(), 0.0))
+    return _stage_summary(run.results[first_result:], users, time.time() - stage_began)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", default="10,50,100", help="Comma-separated concurrent users per stage.")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds each stage starts new workflows.")
+    parser.add_argument("--ramp-s", type=float, default=5.0, help="Spread user start times over this many seconds.")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Workflow weights (default {DEFAULT_MIX}).")
+    parser.add_argument("--poll-s", type=float, default=1.0, help="Node poll interval (Suno included).")
+    parser.add_argument("--time-scale", type=float, default=0.1, help="Stand-in queue/generation time multiplier.")
+    parser.add_argument("--kie-max-active", type=int, default=0, help="Stand-in account task limit (HTTP 429 above).")
+    parser.add_argument("--kie-error-rate", type=float, default=0.0, help="Fraction of status polls failing with 500.")
+    parser.add_argument("--sample-s", type=float, default=2.0, help="Resource sampling interval.")
+    parser.add_argument("--report", type=Path, help="Write stages and the resource timeline as JSON.")
+    args = parser.parse_args()
+
+    stages = [int(part) for part in args.users.split(",") if part.strip()]
+    mix = _parse_mix(args.mix)
+
+    workdir = tempfile.TemporaryDirectory(prefix="kie-load-")
+    os.environ["KIE_JOB_JOURNAL"] = "0"
+    os.environ["KIE_SPEND_HISTORY"] = "0"
+    process, base_url = _start_standin(args)
+    print(f"Stand-in at {base_url}; stages {stages} x {args.duration:.0f}s; mix {mix}")
+    try:
+        _route_requests_to(base_url)
+        nodes = _load_nodes_module()
+        import torch
+
+        auth = sys.modules["kie_pack.kie_api.auth"]
+        auth.KIE_KEY_PATH = Path(workdir.name) / "kie_key.txt"
+        auth.KIE_KEY_PATH.write_text("load-test-key", encoding="utf-8")
+        # The Suno node has no poll interval input; bind the load test's.
+        suno_generate = nodes.run_suno_generate
+        nodes.run_suno_generate = lambda **kwargs: suno_generate(poll_interval_s=args.poll_s, **kwargs)
+
+        run = LoadRun(nodes, torch, mix, args.poll_s)
+        started = time.time()
+        summaries = []
+        for users in stages:
+            summary = _run_stage(run, users, args, started)
+            summaries.append(summary)
+            _print_stage(summary)
+    finally:
+        standin_counts = _stop_standin(process)
+        workdir.cleanup()
+
+    print(f"\nStand-in requests: {standin_counts}")
+    if run.timeline:
+        print(
+            f"Peak threads {max(point['threads'] for point in run.timeline)}, "
+            f"sockets {max(point['sockets'] or 0 for point in run.timeline)}, "
+            f"RSS {max(point['rss_mb'] for point in run.timeline)} MB"
+        )
+    if args.report:
+        report = {
+            "args": {key: str(value) for key, value in vars(args).items()},
+            "stages": summaries,
+            "timeline": run.timeline,
+            "standin": standin_counts,
+        }
+        args.report.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Report written to {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+"""Summarize the profile dumps written with KIE_PROFILE.
+
+Without arguments, lists every profiled job in the profile directory (newest
+last) with its wall time, CPU time, and peak traced memory. `--show` prints the
+hot functions (cProfile) and allocation sites (tracemalloc) of one job;
+`--function` merges the cProfile dumps of every job of one entry point.
+
+Usage:
+    python scripts/profile_summary.py
+    python scripts/profile_summary.py --show latest
+    python scripts/profile_summary.py --show 20260101-120000_run_nanobanana2_image_job_1a2b3c --sort tottime
+    python scripts/profile_summary.py --function run_kling3_video_from_request --top 40
+"""
+
+import argparse
+import json
+import os
+import pstats
+import sys
+import tracemalloc
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DIR = REPO_ROOT / "config" / "kie_profiles"
+
+
+def _load_summaries(directory: Path) -> list[tuple[Path, dict]]:
+    summaries = []
+    for path in sorted(directory.glob("*.json")):
+        try:
+            summaries.append((path, json.loads(path.read_text(encoding="utf-8"))))
+        except (OSError, json.JSONDecodeError):
+            continue
+    summaries.sort(key=lambda item: item[1].get("started") or 0.0)
+    return summaries
+
+
+def _print_list(summaries: list[tuple[Path, dict]]) -> None:
+    print(f"{'job':<64} {'wall s':>8} {'cpu s':>8} {'peak MB':>8}  status")
+    for path, summary in summaries:
+        peak = summary.get("traced_peak_mb")
+        status = "ok" if summary.get("ok") else f"error {summary.get('error')}"
+        print(
+            f"{path.stem:<64} {summary['wall_s']:>8.2f} {summary['thread_cpu_s']:>8.2f} "
+            f"{'-' if peak is None else peak:>8}  {status}"
+        )
+
+
+def _print_stats(profile_paths: list[Path], sort: str, top: int) -> None:
+    stats = pstats.Stats(*(str(path) for path in profile_paths), stream=sys.stdout)
+    stats.strip_dirs().sort_stats(sort).print_stats(top)
+
+
+def _show(path: Path, summary: dict, sort: str, top: int) -> None:
+    print(f"{summary['function']} ({summary['module']}), modes {', '.join(summary['modes'])}")
+    print(
+        f"wall {summary['wall_s']:.2f}s, calling-thread CPU {summary['thread_cpu_s']:.2f}s, "
+        f"process CPU {summary['process_cpu_s']:.2f}s, {'ok' if summary['ok'] else 'error ' + str(summary['error'])}"
+    )
+    profile_path = path.with_suffix(".prof")
+    if profile_path.is_file():
+        if summary.get("cprofile_scope") == "process":
+            print("\n== cProfile (process-wide: every thread, including overlapping jobs)")
+        else:
+            print(f"\n== cProfile ({summary.get('worker_profiles', 0)} fetch-pool task(s) merged)")
+        _print_stats([profile_path], sort, top)
+    snapshot_path = path.with_suffix(".tracemalloc")
+    if snapshot_path.is_file():
+        print(f"== tracemalloc: peak {summary.get('traced_peak_mb')} MB, live at end {summary.get('traced_current_mb')} MB")
+        snapshot = tracemalloc.Snapshot.load(str(snapshot_path))
+        for stat in snapshot.statistics("lineno")[:top]:
+            frame = stat.traceback[0]
+            print(f"{stat.size / (1024 * 1024):>10.3f} MB {stat.count:>8} blocks  {os.path.basename(frame.filename)}:{frame.lineno}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dir", type=Path, help="Profile directory (default: KIE_PROFILE_DIR or config/kie_profiles).")
+    parser.add_argument("--show", help="Job to show: a file stem from the list, or 'latest'.")
+    parser.add_argument("--function", help="Merge the cProfile dumps of every job of this entry point.")
+    parser.add_argument("--sort", default="cumulative", help="pstats sort key (cumulative, tottime, calls, ...).")
+    parser.add_argument("--top", type=int, default=25, help="Rows to print.")
+    args = parser.parse_args()
+
+    directory = args.dir or Path(os.environ.get("KIE_PROFILE_DIR", "").strip() or DEFAULT_DIR)
+    summaries = _load_summaries(directory)
+    if not summaries:
+        print(f"No profiles in {directory}. Set KIE_PROFILE=1 and run a node.")
+        return 1
+
+    if args.function:
+        paths = [
+            path.with_suffix(".prof")
+            for path, summary in summaries
+            if summary["function"] == args.function and path.with_suffix(".prof").is_file()
+        ]
+        if not paths:
+            print(f"No cProfile dumps for {args.function}.")
+            return 1
+        walls = [summary["wall_s"] for _path, summary in summaries if summary["function"] == args.function]
+        print(f"{args.function}: {len(walls)} job(s), mean wall {sum(walls) / len(walls):.2f}s; merged {len(paths)} dump(s)\n")
+        _print_stats(paths, args.sort, args.top)
+        return 0
+
+    if args.show:
+        matches = [item for item in summaries if args.show in ("latest", item[0].stem)]
+        if not matches:
+            print(f"No profile named {args.show}.")
+            return 1
+        path, summary = matches[-1]
+        _show(path, summary, args.sort, args.top)
+        return 0
+
+    _print_list(summaries)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,56 @@
+"""Per-model cost and throughput report from the credit ledger's spend history.
+
+Reads `config/kie_spend.jsonl` (or KIE_SPEND_HISTORY_PATH / --path) and prints,
+per model: finished tasks, failures, attributed credits, credits per task, average
+task duration, and tasks per hour over the covered window.
+
+Usage:
+    python scripts/spend_report.py
+    python scripts/spend_report.py --since-hours 24
+    python scripts/spend_report.py --json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--since-hours", type=float, help="Only include tasks finished in the last N hours.")
+    parser.add_argument("--path", type=Path, help="Spend history file (default: the configured one).")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(REPO_ROOT))
+    from kie_api.ledger import _spend_report
+
+    since_s = args.since_hours * 3600.0 if args.since_hours else None
+    report = _spend_report(since_s, args.path)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    if not report:
+        print("No spend history.")
+        return 0
+
+    def cell(value) -> str:
+        return "-" if value is None else str(value)
+
+    print(f"{'model':<36} {'tasks':>6} {'failed':>6} {'credits':>10} {'per task':>9} {'avg s':>7} {'per hour':>9}")
+    for model, stats in report.items():
+        print(
+            f"{model:<36} {stats['tasks']:>6} {stats['failed']:>6} {stats['credits']:>10} "
+            f"{cell(stats['credits_per_task']):>9} {cell(stats['avg_duration_s']):>7} {cell(stats['tasks_per_hour']):>9}"
+        )
+    total = sum(stats["credits"] for stats in report.values())
+    print(f"{'total':<36} {sum(stats['tasks'] for stats in report.values()):>6} {'':>6} {round(total, 2):>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,45 @@
+"""Latency breakdown report from the stats database.
+
+Reads `config/kie_stats.sqlite` (or KIE_STATS_PATH / --path), written while
+KIE_STATS=1 is set, and prints for each model and/or hour of day: finished tasks,
+failures, mean upload / KIE queue / KIE generation / download time, p50 and p90 of
+the total, mean poll lag, and the share of tasks timed by KIE's own timestamps.
+
+A high queue time points at a busy model (or hour); a poll lag close to the poll
+interval means polling more often would return results sooner.
+
+Usage:
+    python scripts/stats_report.py
+    python scripts/stats_report.py --group-by model --since-hours 24
+    python scripts/stats_report.py --model kling-3.0/video --json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--since-hours", type=float, help="Only include tasks created in the last N hours.")
+    parser.add_argument("--group-by", default="model_hour", choices=["model", "model_hour", "hour"])
+    parser.add_argument("--model", help="Only include this model.")
+    parser.add_argument("--path", type=Path, help="Stats database (default: the configured one).")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(REPO_ROOT))
+    from kie_api.stats import _format_stats_report, _stats_report
+
+    since_s = args.since_hours * 3600.0 if args.since_hours else None
+    report = _stats_report(since_s, group_by=args.group_by, model=args.model, path=args.path)
+    print(json.dumps(report, indent=2) if args.json else _format_stats_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())